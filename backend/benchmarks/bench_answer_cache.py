@@ -0,0 +1,115 @@
+"""Measure the semantic answer cache on first questions asked by many users.
+
+Each request opens a new thread with a question about one of ``--topics``
+topics (a few topics are asked about far more often), phrased with one of
+several templates. On a cache miss the agent turn is simulated: two model
+calls of ``--llm-latency`` seconds and a tool call of ``--tool-latency``
+seconds, after which the answer is stored. Questions are embedded with
+hashed word counts, a local stand-in for the embedding API: real
+embeddings match paraphrases with different wording more often.
+
+Usage:
+    python -m benchmarks.bench_answer_cache --requests 300 --thresholds 0.8 0.9 0.95
+
+Reports, per similarity threshold, the hit rate, the share of hits that
+answered a different topic (wrong answers), and the mean turn latency.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import re
+import tempfile
+import time
+import zlib
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+
+from src.core.answer_cache import SemanticAnswerCache
+
+_TEMPLATES = [
+    "latest papers on {}",
+    "Latest papers on {}?",
+    "recent research on {}",
+    "what are the latest papers on {}",
+    "find recent studies about {}",
+]
+_TOPICS = [
+    "CRISPR off-target effects", "CRISPR delivery in vivo", "sleep and memory consolidation",
+    "sleep deprivation and memory", "protein structure prediction", "protein design with diffusion",
+    "gut microbiome and depression", "gut microbiome and obesity", "transformer efficiency",
+    "transformer interpretability", "long COVID cognitive symptoms", "mRNA vaccine stability",
+]
+
+
+class _HashedWordEmbeddings(Embeddings):
+    """Normalized counts of hashed words."""
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * 512
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % 512] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+def _workload(requests: int, topics: int, seed: int) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    names = (_TOPICS * (topics // len(_TOPICS) + 1))[:topics]
+    names = [name if i < len(_TOPICS) else f"{name} {i}" for i, name in enumerate(names)]
+    weights = [1 / (rank + 1) for rank in range(topics)]
+    return [
+        (topic, rng.choice(_TEMPLATES).format(topic))
+        for topic in rng.choices(names, weights=weights, k=requests)
+    ]
+
+
+async def _run_threshold(args: argparse.Namespace, threshold: float) -> tuple[float, float, float]:
+    workload = _workload(args.requests, args.topics, seed=1)
+    hits = wrong = 0
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SemanticAnswerCache(
+            _HashedWordEmbeddings(), path=directory, threshold=threshold
+        )
+        for topic, question in workload:
+            cached = await cache.lookup(question)
+            if cached is not None:
+                hits += 1
+                wrong += cached.answer != f"Answer about {topic}"
+                continue
+            await asyncio.sleep(2 * args.llm_latency + args.tool_latency)
+            await cache.store(question, [AIMessage(content=f"Answer about {topic}")])
+    elapsed = time.perf_counter() - start
+    return hits / len(workload), wrong / hits if hits else 0.0, elapsed / len(workload)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    print(f"{'threshold':>9} {'hit rate':>9} {'wrong hits':>11} {'mean s/turn':>12}")
+    uncached = 2 * args.llm_latency + args.tool_latency
+    print(f"{'off':>9} {0:>9.0%} {0:>11.0%} {uncached:>12.3f}")
+    for threshold in args.thresholds:
+        hit_rate, wrong, latency = await _run_threshold(args, threshold)
+        print(f"{threshold:>9.2f} {hit_rate:>9.0%} {wrong:>11.0%} {latency:>12.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--topics", type=int, default=12)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.9, 0.95])
+    parser.add_argument("--llm-latency", type=float, default=0.02)
+    parser.add_argument("--tool-latency", type=float, default=0.01)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
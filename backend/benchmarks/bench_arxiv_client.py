@@ -0,0 +1,144 @@
+"""Compare arXiv identifier lookups: legacy wrapper vs async batched client.
+
+A local stub server answers arXiv ``query`` requests with an Atom feed
+after ``--latency`` milliseconds, one entry per requested identifier.
+Three strategies look up the same ``n`` identifiers:
+
+- legacy: one blocking ``arxiv`` package lookup per identifier, as the
+  agent did through ``ArxivAPIWrapper`` (new HTTP session per call);
+- per_id: ``ArxivClient.fetch_ids`` once per identifier on a shared client;
+- batched: one ``ArxivClient.fetch_ids`` call with all identifiers.
+
+Request pacing is disabled for all three; against the real API every extra
+request also costs arXiv's 3 second interval.
+
+Usage:
+    python -m benchmarks.bench_arxiv_client --ids 1 5 20 --latency 80
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import arxiv
+
+from src.tools.arxiv import ArxivClient
+
+ABSTRACT = "We study a problem and report results. " * 30
+
+
+def _feed(ids: list[str]) -> bytes:
+    entries = "".join(
+        f"<entry><id>http://arxiv.org/abs/{i}v1</id>"
+        f"<updated>2025-10-15T12:00:00Z</updated><published>2025-10-15T12:00:00Z</published>"
+        f"<title>Paper {i}</title><summary>{ABSTRACT}</summary>"
+        f"<author><name>Ada Lovelace</name></author>"
+        f'<link href="http://arxiv.org/abs/{i}v1" rel="alternate" type="text/html"/>'
+        f"</entry>"
+        for i in ids
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        f"<title>query</title><opensearch:totalResults>{len(ids)}</opensearch:totalResults>"
+        f"{entries}</feed>"
+    ).encode()
+
+
+def _start_server(latency: float) -> tuple[ThreadingHTTPServer, dict[str, int]]:
+    counter = {"requests": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; avoid delayed-ACK stalls
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            counter["requests"] += 1
+            params = parse_qs(urlsplit(self.path).query)
+            ids = [i for i in params.get("id_list", [""])[0].split(",") if i]
+            # The arxiv package pages through results; answer later pages empty
+            if int(params.get("start", ["0"])[0]) > 0:
+                ids = []
+            time.sleep(latency)
+            body = _feed(ids)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counter
+
+
+def _legacy(ids: list[str]) -> int:
+    # ArxivAPIWrapper calls the removed Search.results(); this is its equivalent
+    return sum(
+        len(list(arxiv.Client().results(arxiv.Search(id_list=[i], max_results=5))))
+        for i in ids
+    )
+
+
+async def _per_id(client: ArxivClient, ids: list[str]) -> int:
+    return sum([len(await client.fetch_ids([i])) for i in ids])
+
+
+async def _batched(client: ArxivClient, ids: list[str]) -> int:
+    return len(await client.fetch_ids(ids))
+
+
+def _time(strategy, repeats: int, counter: dict[str, int]) -> tuple[float, int, int]:
+    samples = []
+    found = 0
+    counter["requests"] = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        found = strategy()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples), counter["requests"] // repeats, found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ids", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--latency", type=float, default=80.0, help="server latency in ms")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    server, counter = _start_server(args.latency / 1e3)
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/query"
+    arxiv.Client.query_url_format = url + "?{}"
+
+    loop = asyncio.new_event_loop()
+    client = ArxivClient(base_url=url, requests_per_second=0)
+
+    print(f"{'ids':>4} {'strategy':>9} {'requests':>9} {'found':>6} {'ms':>9}")
+    for n in args.ids:
+        ids = [f"2510.{10000 + i}" for i in range(n)]
+        strategies = {
+            "legacy": lambda ids=ids: _legacy(ids),
+            "per_id": lambda ids=ids: loop.run_until_complete(_per_id(client, ids)),
+            "batched": lambda ids=ids: loop.run_until_complete(_batched(client, ids)),
+        }
+        for name, strategy in strategies.items():
+            ms, requests, found = _time(strategy, args.repeats, counter)
+            print(f"{n:>4} {name:>9} {requests:>9} {found:>6} {ms:>9.1f}")
+
+    loop.run_until_complete(client.aclose())
+    loop.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Compare chat response size and encode time against thread length.
+
+The legacy path collects every ``values`` snapshot of the run and encodes
+the response through FastAPI's generic encoder; the current path collects
+node ``updates`` (only the new messages) and encodes with pydantic-core.
+Each turn runs a search step (tool call plus a PubMed-sized result) and an
+answer step on a thread pre-filled with ``length`` messages.
+
+Usage:
+    python -m benchmarks.bench_chat_response --lengths 10 100 1000 --repeats 20
+
+Reports median agent run time (collecting the response) and median encode
+time per turn, in the chat endpoint's two phases.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Annotated, Any, TypedDict
+
+from fastapi.encoders import jsonable_encoder
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from src.api.routes.chat import _to_message, _update_messages
+from src.schemas import ChatResponse, Message, MessageRole
+
+# Size of the simulated tool output and answer
+TOOL_OUTPUT_CHARS = 2000
+ANSWER_CHARS = 1500
+
+
+class State(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+
+def _search(state: State) -> dict[str, Any]:
+    call_id = f"call-{len(state['messages'])}"
+    return {"messages": [
+        AIMessage(content="", tool_calls=[{"name": "pubmed", "args": {"query": "q"}, "id": call_id}]),
+        ToolMessage(content="p" * TOOL_OUTPUT_CHARS, tool_call_id=call_id, name="pubmed"),
+    ]}
+
+
+def _answer(_state: State) -> dict[str, Any]:
+    return {"messages": [AIMessage(content="a" * ANSWER_CHARS)]}
+
+
+def _build_graph() -> Any:
+    builder = StateGraph(State)
+    builder.add_node("search", _search)
+    builder.add_node("answer", _answer)
+    builder.add_edge(START, "search")
+    builder.add_edge("search", "answer")
+    builder.add_edge("answer", END)
+    return builder.compile(checkpointer=MemorySaver())
+
+
+async def _legacy_turn(graph: Any, config: dict[str, Any]) -> tuple[bytes, float, float]:
+    """Reproduce the previous implementation: one message per values snapshot."""
+    start = time.perf_counter()
+    messages = []
+    final_response = ""
+    async for step in graph.astream(
+        {"messages": [HumanMessage(content="next question")]}, config, stream_mode="values"
+    ):
+        last = step["messages"][-1]
+        message = Message(role=MessageRole(last.type), content=last.content)
+        messages.append(message)
+        final_response = message.content
+    response = ChatResponse(thread_id="t", messages=messages, final_response=final_response)
+    collected = time.perf_counter()
+    body = json.dumps(jsonable_encoder(response)).encode()
+    return body, collected - start, time.perf_counter() - collected
+
+
+async def _delta_turn(graph: Any, config: dict[str, Any]) -> tuple[bytes, float, float]:
+    """Current implementation: only the turn's new messages, pydantic-core encoding."""
+    start = time.perf_counter()
+    produced = [HumanMessage(content="next question")]
+    async for payload in graph.astream({"messages": produced[:1]}, config, stream_mode="updates"):
+        produced.extend(_update_messages(payload))
+    messages = [_to_message(message) for message in produced]
+    response = ChatResponse(thread_id="t", messages=messages, final_response=messages[-1].content)
+    collected = time.perf_counter()
+    body = response.model_dump_json().encode()
+    return body, collected - start, time.perf_counter() - collected
+
+
+async def _measure(length: int, repeats: int) -> dict[str, Any]:
+    results: dict[str, Any] = {"length": length}
+    for name, turn in (("legacy", _legacy_turn), ("delta", _delta_turn)):
+        graph = _build_graph()
+        config = {"configurable": {"thread_id": "t"}}
+        history = []
+        for i in range(length // 4):
+            history.extend([HumanMessage(content=f"question {i}")])
+            history.extend(_search({"messages": history})["messages"])
+            history.extend(_answer({"messages": history})["messages"])
+        await graph.aupdate_state(config, {"messages": history})
+
+        run_ms, encode_us = [], []
+        body = b""
+        for _ in range(repeats):
+            body, run_seconds, encode_seconds = await turn(graph, config)
+            run_ms.append(run_seconds * 1e3)
+            encode_us.append(encode_seconds * 1e6)
+        results[name] = {
+            "bytes": len(body),
+            "run_ms": round(statistics.median(run_ms), 2),
+            "encode_us": round(statistics.median(encode_us), 1),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    columns = ("bytes", "run_ms", "encode_us")
+    print(f"{'messages':>9}" + "".join(
+        f" {f'{name} {column}':>17}" for name in ("legacy", "delta") for column in columns
+    ))
+    for length in args.lengths:
+        r = asyncio.run(_measure(length, args.repeats))
+        print(f"{r['length']:>9}" + "".join(
+            f" {r[name][column]:>17}" for name in ("legacy", "delta") for column in columns
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compare MemorySaver and SQLiteCheckpointSaver memory use and turn latency.
+
+Each backend runs in a fresh subprocess so resident memory is measured in
+isolation. Every thread gets ``--turns`` conversation turns through a
+minimal message graph, so the numbers reflect checkpointing cost only.
+
+Usage:
+    python -m benchmarks.bench_checkpointer --threads 10000 --turns 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated, Any, TypedDict
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+# Size of each simulated assistant reply (a typical research answer)
+REPLY_CHARS = 1500
+
+
+class State(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+
+def _reply(_state: State) -> dict[str, Any]:
+    return {"messages": [AIMessage(content="r" * REPLY_CHARS)]}
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+async def _run(backend: str, threads: int, turns: int, db_path: str) -> dict[str, Any]:
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.core.checkpoint import SQLiteCheckpointSaver
+
+    saver = MemorySaver() if backend == "memory" else SQLiteCheckpointSaver(db_path)
+    builder = StateGraph(State)
+    builder.add_node("reply", _reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    graph = builder.compile(checkpointer=saver)
+
+    rss_start = _rss_mb()
+    latencies: list[float] = []
+    for turn in range(turns):
+        for i in range(threads):
+            config = {"configurable": {"thread_id": f"thread-{i}"}}
+            started = time.perf_counter()
+            await graph.ainvoke({"messages": [HumanMessage(content=f"question {turn}")]}, config)
+            latencies.append(time.perf_counter() - started)
+
+    if isinstance(saver, SQLiteCheckpointSaver):
+        saver.close()
+    latencies.sort()
+    return {
+        "backend": backend,
+        "rss_growth_mb": round(_rss_mb() - rss_start, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        "db_mb": round(Path(db_path).stat().st_size / 1024 / 1024, 1)
+        if backend == "sqlite"
+        else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], help=argparse.SUPPRESS)
+    parser.add_argument("--db-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        result = asyncio.run(_run(args.backend, args.threads, args.turns, args.db_path))
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = []
+        for backend in ("memory", "sqlite"):
+            output = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.bench_checkpointer",
+                    "--backend", backend,
+                    "--threads", str(args.threads),
+                    "--turns", str(args.turns),
+                    "--db-path", str(Path(tmp) / "bench.sqlite"),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            rows.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{args.threads} threads x {args.turns} turns")
+    print(f"{'backend':<8} {'RSS growth MB':>14} {'p50 ms':>8} {'p99 ms':>8} {'DB MB':>7}")
+    for row in rows:
+        print(
+            f"{row['backend']:<8} {row['rss_growth_mb']:>14} {row['p50_ms']:>8} "
+            f"{row['p99_ms']:>8} {row['db_mb']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
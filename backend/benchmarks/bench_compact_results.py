@@ -0,0 +1,107 @@
+"""Measure the prompt tokens saved by compact rendering of search results.
+
+Builds PubMed and ArXiv results of the usual size (``--pubmed`` and
+``--arxiv`` papers with ~``--abstract-words`` word abstracts), formats them
+the way the tools return them, and compares the tokens of that output with
+the compact listing the agent now receives. The tools used to cut their
+whole output at ``doc_content_chars_max`` (2000 chars for PubMed, 4000 for
+ArXiv), so besides tokens the report shows how many papers each format
+gets in front of the model. A research turn here is one PubMed and one
+ArXiv search.
+
+Usage:
+    python -m benchmarks.bench_compact_results --pubmed 10 --arxiv 5
+
+Counts use the configured model's tiktoken encoding (estimated from length
+when the encoding can't be loaded).
+"""
+
+import argparse
+import random
+
+from src.config import get_settings
+from src.core.history import TokenCounter
+from src.tools import Paper, PaperRenderer
+from src.tools.papers import parse_results
+
+_WORDS = [
+    "sleep", "memory", "consolidation", "hippocampal", "replay", "cortical", "slow",
+    "oscillations", "spindles", "participants", "cohort", "randomized", "trial", "significant",
+    "effect", "analysis", "model", "neural", "protein", "expression", "dataset", "results",
+    "suggest", "mechanism", "increased", "reduced", "across",
+]
+
+
+def _abstract(rng: random.Random, words: int) -> str:
+    sentences = []
+    while sum(len(s.split()) for s in sentences) < words:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(12, 24)))
+        sentences.append(sentence.capitalize() + ".")
+    return " ".join(sentences)
+
+
+def _papers(source: str, count: int, abstract_words: int, rng: random.Random) -> list[Paper]:
+    return [
+        Paper(
+            title=f"{' '.join(rng.choice(_WORDS) for _ in range(8)).capitalize()}",
+            authors=[f"Author{j} {chr(65 + j)}" for j in range(rng.randint(2, 9))],
+            year=str(rng.randint(2005, 2025)),
+            venue="Journal of Sleep Research" if source == "pubmed" else "",
+            pmid=str(30000000 + i) if source == "pubmed" else "",
+            arxiv_id=f"2{rng.randint(100, 599)}.{rng.randint(10000, 99999)}"
+            if source == "arxiv" else "",
+            abstract=_abstract(rng, abstract_words),
+            sources=[source],
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pubmed", type=int, default=10)
+    parser.add_argument("--arxiv", type=int, default=5)
+    parser.add_argument("--abstract-words", type=int, default=230)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    counter = TokenCounter(settings.openai_model)
+    renderer = PaperRenderer(
+        max_tokens=settings.compact_results_max_tokens,
+        abstract_tokens=settings.compact_results_abstract_tokens,
+        count_tokens=counter.count_text,
+    )
+    rng = random.Random(1)
+    # Previous per-call output caps of the tools (doc_content_chars_max)
+    searches = {
+        "pubmed": (_papers("pubmed", args.pubmed, args.abstract_words, rng), 2000),
+        "arxiv": (_papers("arxiv", args.arxiv, args.abstract_words, rng), 4000),
+    }
+
+    print(f"{'tool':>8} {'':>14} {'full':>7} {'capped':>7} {'compact':>8}")
+    totals = {"full": [0, 0], "capped": [0, 0], "compact": [0, 0]}
+    for name, (papers, cap) in searches.items():
+        text = "\n\n".join(paper.to_text() for paper in papers)
+        compact = renderer.render(papers)
+        rows = {
+            "full": (counter.count_text(text), len(papers)),
+            "capped": (counter.count_text(text[:cap]), len(parse_results(text[:cap]))),
+            "compact": (counter.count_text(compact), compact.count("\n[") + 1),
+        }
+        for mode, (tokens, shown) in rows.items():
+            totals[mode][0] += tokens
+            totals[mode][1] += shown
+        _print_rows(name, rows)
+    _print_rows("turn", {mode: tuple(values) for mode, values in totals.items()})
+
+
+def _print_rows(name: str, rows: dict[str, tuple[int, int]]) -> None:
+    print(f"{name:>8} {'tokens':>14} " + " ".join(f"{rows[m][0]:>7}" for m in rows))
+    print(f"{'':>8} {'papers shown':>14} " + " ".join(f"{rows[m][1]:>7}" for m in rows))
+    print(f"{'':>8} {'tokens/paper':>14} " + " ".join(
+        f"{rows[m][0] / max(rows[m][1], 1):>7.0f}" for m in rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Measure tokens per turn and relevance of query-focused abstract compression.
+
+Builds PubMed and ArXiv results (``--pubmed`` and ``--arxiv`` papers with
+~``--abstract-words`` word abstracts) in which one sentence per abstract, at
+a random position, answers the query. Each turn (one PubMed and one ArXiv
+search) is rendered four ways:
+
+- ``full``: every record in full, no cap.
+- ``cut``: the previous tool output, cut at ``doc_content_chars_max``.
+- ``tools``: the tool output now, abstracts compressed to fit that cap.
+- ``compact``: the listing the agent gets with compact results enabled.
+
+Usage:
+    python -m benchmarks.bench_compression --turns 20
+
+Reports tokens per turn and the share of answer sentences that reach the
+model. Counts use the configured model's tiktoken encoding (estimated from
+length when the encoding can't be loaded).
+"""
+
+import argparse
+import random
+
+from src.config import get_settings
+from src.core.history import TokenCounter
+from src.tools import Paper, PaperRenderer
+from src.tools.papers import papers_to_text
+
+_FILLER = [
+    "participants", "cohort", "randomized", "analysis", "dataset", "significant", "model",
+    "baseline", "measured", "across", "sites", "outcome", "secondary", "protocol", "sample",
+]
+_TOPICS = [
+    ("hippocampal replay memory consolidation", "Hippocampal replay predicted memory "
+     "consolidation gains during slow-wave sleep."),
+    ("protein folding transformer", "A transformer model predicted protein folding "
+     "structures with near-experimental accuracy."),
+    ("gut microbiome depression", "Gut microbiome diversity was associated with lower "
+     "depression scores at follow-up."),
+]
+
+# Previous per-call output caps of the tools (doc_content_chars_max)
+_CAPS = {"pubmed": 2000, "arxiv": 4000}
+
+
+def _abstract(rng: random.Random, words: int, answer: str) -> str:
+    sentences = []
+    while sum(len(s.split()) for s in sentences) < words:
+        sentence = " ".join(rng.choice(_FILLER) for _ in range(rng.randint(12, 24)))
+        sentences.append(sentence.capitalize() + ".")
+    sentences.insert(rng.randrange(len(sentences) + 1), answer)
+    return " ".join(sentences)
+
+
+def _papers(source: str, count: int, words: int, answer: str, rng: random.Random) -> list[Paper]:
+    return [
+        Paper(
+            title=f"Study {i} of {source}",
+            authors=[f"Author{j} {chr(65 + j)}" for j in range(rng.randint(2, 6))],
+            year=str(rng.randint(2005, 2025)),
+            pmid=str(30000000 + i) if source == "pubmed" else "",
+            arxiv_id=f"2{rng.randint(100, 599)}.{rng.randint(10000, 99999)}"
+            if source == "arxiv" else "",
+            abstract=_abstract(rng, words, answer),
+            sources=[source],
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--pubmed", type=int, default=10)
+    parser.add_argument("--arxiv", type=int, default=5)
+    parser.add_argument("--abstract-words", type=int, default=230)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    counter = TokenCounter(settings.openai_model)
+    renderer = PaperRenderer(
+        max_tokens=settings.compact_results_max_tokens,
+        abstract_tokens=settings.compact_results_abstract_tokens,
+        count_tokens=counter.count_text,
+    )
+    rng = random.Random(1)
+    modes = ("full", "cut", "tools", "compact")
+    tokens = dict.fromkeys(modes, 0)
+    answers = dict.fromkeys(modes, 0)
+    total_answers = 0
+
+    for turn in range(args.turns):
+        query, answer = _TOPICS[turn % len(_TOPICS)]
+        for source, count in (("pubmed", args.pubmed), ("arxiv", args.arxiv)):
+            papers = _papers(source, count, args.abstract_words, answer, rng)
+            full = "\n\n".join(paper.to_text() for paper in papers)
+            outputs = {
+                "full": full,
+                "cut": full[: _CAPS[source]],
+                "tools": papers_to_text(papers, query, _CAPS[source]),
+                "compact": renderer.render(papers, query=query),
+            }
+            total_answers += count
+            for mode, output in outputs.items():
+                tokens[mode] += counter.count_text(output)
+                answers[mode] += output.count(answer)
+
+    print(f"{'mode':>8} {'tokens/turn':>12} {'saved/turn':>11} {'answers shown':>14}")
+    for mode in modes:
+        print(
+            f"{mode:>8} {tokens[mode] / args.turns:>12.0f}"
+            f" {(tokens['full'] - tokens[mode]) / args.turns:>11.0f}"
+            f" {answers[mode] / total_answers:>14.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
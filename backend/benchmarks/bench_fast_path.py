@@ -0,0 +1,107 @@
+"""Measure the identifier fast path: how often it applies and what it saves.
+
+Routes a sample of chat messages (topic questions, citation fixes and
+identifier lookups phrased in different ways) through ``parse_identifiers``
+to report the share the fast path takes. Then answers the same arXiv lookup
+turn twice on the real ReAct agent graph: through the agent, with a scripted
+chat model waiting ``--llm-latency`` seconds per call (one call to request
+the tool, one to answer), and through ``FastPathRouter``. The search tool
+waits ``--tool-latency`` seconds in both.
+
+Usage:
+    python -m benchmarks.bench_fast_path --llm-latency 1.0 --tool-latency 0.6
+
+Reports the hit rate, median turn latency and model calls per turn.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from benchmarks.bench_federated_search import _LatentChatModel
+from src.core.fastpath import FastPathRouter, parse_identifiers
+from src.tools import Paper
+
+MESSAGES = [
+    "get me 2510.13422",
+    "2301.00001v2",
+    "PMID: 31452104",
+    "can you find https://arxiv.org/abs/2510.13422 please?",
+    "doi:10.1038/nature12373",
+    "show me the abstract of 31452104",
+    "summarize 2510.13422",
+    "compare 2510.13422 with 2301.00001",
+    "find recent papers on sleep and memory consolidation",
+    "what are the main approaches to protein structure prediction?",
+    "fix this citation: Smith, J. (2020) Sleep. Nature 1, 2-3",
+    "papers by Yann LeCun on self-supervised learning",
+]
+
+
+def _arxiv_tool(latency: float) -> StructuredTool:
+    async def arxiv(query: str) -> str:
+        await asyncio.sleep(latency)
+        return Paper(title="Graph networks", arxiv_id=query, abstract="Graphs.").to_text()
+
+    return StructuredTool.from_function(coroutine=arxiv, name="arxiv", description="arXiv")
+
+
+async def _agent_turn(llm_latency: float, tool_latency: float, thread: str) -> tuple[float, int]:
+    model = _LatentChatModel(
+        responses=[
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "arxiv", "args": {"query": "2510.13422"}, "id": "call-1"}],
+            ),
+            AIMessage(content="**Graph networks**"),
+        ],
+        latency=llm_latency,
+    )
+    agent = create_react_agent(model, [_arxiv_tool(tool_latency)], checkpointer=MemorySaver())
+    start = time.perf_counter()
+    await agent.ainvoke(
+        {"messages": [HumanMessage(content="get me 2510.13422")]},
+        {"configurable": {"thread_id": thread}},
+    )
+    return time.perf_counter() - start, model.calls
+
+
+async def _fast_turn(llm_latency: float, tool_latency: float, thread: str) -> tuple[float, int]:
+    model = _LatentChatModel(responses=[], latency=llm_latency)
+    agent = create_react_agent(model, [], checkpointer=MemorySaver())
+    router = FastPathRouter({"arxiv": _arxiv_tool(tool_latency)})
+    start = time.perf_counter()
+    await router.route(agent, {"configurable": {"thread_id": thread}}, "get me 2510.13422")
+    return time.perf_counter() - start, model.calls
+
+
+async def _run(args: argparse.Namespace) -> None:
+    hits = sum(parse_identifiers(message) is not None for message in MESSAGES)
+    print(f"fast path hit rate: {hits}/{len(MESSAGES)} sample messages ({hits / len(MESSAGES):.0%})")
+
+    print(f"{'path':>8} {'median s':>9} {'model calls':>12}")
+    for name, turn in (("agent", _agent_turn), ("fast", _fast_turn)):
+        results = [
+            await turn(args.llm_latency, args.tool_latency, f"{name}-{i}")
+            for i in range(args.repeats)
+        ]
+        latency = statistics.median(seconds for seconds, _ in results)
+        print(f"{name:>8} {latency:>9.2f} {results[0][1]:>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--tool-latency", type=float, default=0.6)
+    parser.add_argument("--repeats", type=int, default=3)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
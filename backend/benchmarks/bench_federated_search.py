@@ -0,0 +1,149 @@
+"""Compare turn latency of sequential per-database searches and federated search.
+
+Runs the real ReAct agent graph with a scripted chat model that waits
+``--llm-latency`` seconds per call, and search tools that wait a fixed
+per-source latency. Three plans answer the same "find papers on X" turn:
+
+- sequential: one tool call per model step (google_scholar, pubmed, arxiv),
+  the pattern the agent follows today;
+- parallel_calls: the three tool calls emitted in a single model step;
+- federated: one ``federated_search`` call fanning out to the three sources.
+
+Usage:
+    python -m benchmarks.bench_federated_search --llm-latency 1.0 --repeats 3
+
+Reports median turn latency and the number of model calls per turn.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from langgraph.prebuilt import create_react_agent
+from typing_extensions import override
+
+from src.tools import BaseTool, FederatedSearchTool
+
+# Simulated response time of each source, in seconds
+SOURCE_LATENCY = {"google_scholar": 1.2, "pubmed": 0.8, "arxiv": 0.6}
+
+
+class _LatentChatModel(BaseChatModel):
+    """Chat model replaying scripted replies after a fixed delay."""
+
+    responses: list[AIMessage]
+    latency: float
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "latent"
+
+    @override
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "_LatentChatModel":
+        return self
+
+    @override
+    def _generate(self, messages: list[BaseMessage], stop: Any = None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    @override
+    async def _agenerate(
+        self, messages: list[BaseMessage], stop: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        response = self.responses[self.calls].model_copy()
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+
+class _SimulatedSource(BaseTool):
+    """Search source returning two fixed papers after its simulated latency."""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return f"Simulated {self._name} search"
+
+    def create_tool(self) -> StructuredTool:
+        async def search(query: str) -> str:
+            await asyncio.sleep(SOURCE_LATENCY[self._name])
+            return "\n\n".join(
+                f"Published: 2024-01-0{i}\nTitle: {query} study {i}\nAuthors: A. Author\n"
+                f"Summary: Findings on {query} from {self._name}."
+                for i in (1, 2)
+            )
+
+        return StructuredTool.from_function(
+            coroutine=search, name=self.name, description=self.description
+        )
+
+
+def _call(name: str, index: int) -> dict[str, Any]:
+    return {"name": name, "args": {"query": "sleep"}, "id": f"call-{name}-{index}"}
+
+
+def _plans() -> dict[str, list[AIMessage]]:
+    answer = AIMessage(content="Here are the papers.")
+    sources = list(SOURCE_LATENCY)
+    return {
+        "sequential": [
+            *(AIMessage(content="", tool_calls=[_call(name, 0)]) for name in sources),
+            answer,
+        ],
+        "parallel_calls": [
+            AIMessage(content="", tool_calls=[_call(name, 0) for name in sources]),
+            answer,
+        ],
+        "federated": [
+            AIMessage(content="", tool_calls=[_call("federated_search", 0)]),
+            answer,
+        ],
+    }
+
+
+async def _run_turn(plan: list[AIMessage], llm_latency: float) -> tuple[float, int]:
+    sources = [_SimulatedSource(name) for name in SOURCE_LATENCY]
+    tools = [source.create_tool() for source in sources]
+    tools.append(FederatedSearchTool(sources=sources).create_tool())
+    model = _LatentChatModel(responses=plan, latency=llm_latency)
+    agent = create_react_agent(model, tools)
+
+    start = time.perf_counter()
+    await agent.ainvoke({"messages": [HumanMessage(content="Find papers on sleep")]})
+    return time.perf_counter() - start, model.calls
+
+
+async def _measure(llm_latency: float, repeats: int) -> dict[str, tuple[float, int]]:
+    results = {}
+    for name, plan in _plans().items():
+        samples = [await _run_turn(plan, llm_latency) for _ in range(repeats)]
+        results[name] = (statistics.median(s[0] for s in samples), samples[0][1])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'plan':>15} {'model calls':>12} {'turn s':>8}")
+    for name, (seconds, calls) in asyncio.run(_measure(args.llm_latency, args.repeats)).items():
+        print(f"{name:>15} {calls:>12} {seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
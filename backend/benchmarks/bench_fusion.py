@@ -0,0 +1,114 @@
+"""Measure deduplication quality and speed of cross-source paper fusion.
+
+Draws ``--unique`` distinct papers and lets ``--sources`` sources each return
+a ranked subset, the way PubMed, ArXiv and Scholar overlap on a topic. Copies
+of a paper carry different subsets of its ids and a lightly edited title
+(case, punctuation, a typo, a dropped plural). Duplicates are then removed
+by exact normalized title, the previous federated search merge, and by
+``fuse_papers``.
+
+Usage:
+    python -m benchmarks.bench_fusion --unique 100 200 400 --sources 4
+
+Reports the papers left after merging (the ideal is the number of distinct
+papers returned) and the time per merge.
+"""
+
+import argparse
+import random
+import time
+
+from src.tools import Paper
+from src.tools.fusion import fuse_papers
+from src.tools.papers import title_key
+
+_WORDS = [
+    "sleep", "memory", "consolidation", "hippocampal", "replay", "cortical", "oscillation",
+    "spindle", "cohort", "randomized", "trial", "effect", "neural", "protein", "expression",
+    "dataset", "mechanism", "network", "model", "learning", "deep", "graph", "structure",
+    "prediction", "folding", "genome", "association", "variant",
+]
+
+
+def _edit(title: str, rng: random.Random) -> str:
+    edit = rng.randrange(5)
+    if edit == 0:
+        return title.upper()
+    if edit == 1:
+        return title + "."
+    if edit == 2:
+        i = rng.randrange(1, len(title) - 1)
+        return title[:i] + title[i + 1 :]
+    if edit == 3:
+        return title.replace("s ", " ", 1)
+    return title
+
+
+def _corpus(
+    unique: int, sources: int, rng: random.Random
+) -> tuple[dict[str, list[Paper]], int]:
+    originals = [
+        Paper(
+            title=" ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 12))).capitalize(),
+            year=str(rng.randint(2000, 2025)),
+            doi=f"10.1000/{i}",
+            pmid=str(30000000 + i),
+        )
+        for i in range(unique)
+    ]
+    results = {}
+    returned = set()
+    for s in range(sources):
+        source = f"source{s}"
+        picked = rng.sample(originals, k=unique // 2)
+        returned.update(paper.doi for paper in picked)
+        results[source] = [
+            Paper(
+                title=_edit(paper.title, rng),
+                year=paper.year,
+                # Sources expose different ids, or none (Scholar, web results)
+                doi=paper.doi if rng.random() < 0.3 else "",
+                pmid=paper.pmid if rng.random() < 0.3 else "",
+                sources=[source],
+            )
+            for paper in picked
+        ]
+    return results, len(returned)
+
+
+def _exact_titles(results: dict[str, list[Paper]]) -> int:
+    return len({title_key(paper.title) for papers in results.values() for paper in papers})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--unique", type=int, nargs="+", default=[100, 200, 400])
+    parser.add_argument("--sources", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'candidates':>10} {'distinct':>9} {'exact title':>12} {'fused':>6} {'ms/merge':>9}"
+    )
+    for unique in args.unique:
+        rng = random.Random(unique)
+        results, distinct = _corpus(unique, args.sources, rng)
+        candidates = sum(len(papers) for papers in results.values())
+        elapsed = 0.0
+        for _ in range(args.repeat):
+            # fuse_papers merges into the records it is given
+            copies = {
+                source: [Paper.from_dict(paper.to_dict()) for paper in papers]
+                for source, papers in results.items()
+            }
+            start = time.perf_counter()
+            fused = fuse_papers(copies)
+            elapsed += time.perf_counter() - start
+        print(
+            f"{candidates:>10} {distinct:>9} {_exact_titles(results):>12} {len(fused):>6}"
+            f" {elapsed / args.repeat * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measure the tail latency saved by hedged tool calls, and their cost.
+
+A simulated search source answers most calls in ``--base-latency`` seconds
+but a fraction ``--slow-rate`` of them take ``--slow-latency`` seconds, the
+pattern of an occasionally stalled upstream. The same sequence of calls is
+run plain and through ``HedgedTool``; hedging starts once the warm-up calls
+have established the source's p90.
+
+Usage:
+    python -m benchmarks.bench_hedging --calls 400 --slow-rate 0.05
+
+Reports p50/p95/p99 latency and the extra upstream calls hedging made.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from langchain_core.tools import StructuredTool
+
+from src.tools import BaseTool, HedgedTool
+
+
+class _TailySource(BaseTool):
+    """Search source with an occasional slow response."""
+
+    def __init__(self, base: float, slow: float, slow_rate: float, seed: int):
+        self._base = base
+        self._slow = slow
+        self._slow_rate = slow_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "pubmed"
+
+    @property
+    def description(self) -> str:
+        return "Simulated search source"
+
+    def create_tool(self) -> StructuredTool:
+        async def search(query: str) -> str:
+            self.calls += 1
+            latency = self._slow if self._random.random() < self._slow_rate else self._base
+            await asyncio.sleep(latency * self._random.uniform(0.8, 1.2))
+            return f"Title: {query}"
+
+        return StructuredTool.from_function(
+            coroutine=search, name=self.name, description=self.description
+        )
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100)[q - 1]
+
+
+async def _run(source: _TailySource, hedged: bool, calls: int, warmup: int) -> list[float]:
+    wrapper = HedgedTool(source, min_samples=warmup, budget=0.2) if hedged else source
+    tool = wrapper.create_tool()
+    latencies = []
+    for i in range(calls + warmup):
+        start = time.perf_counter()
+        await tool.ainvoke({"query": f"q{i}"})
+        if i >= warmup:
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--warmup", type=int, default=40)
+    parser.add_argument("--base-latency", type=float, default=0.02)
+    parser.add_argument("--slow-latency", type=float, default=0.5)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'upstream calls':>15}")
+    for hedged in (False, True):
+        source = _TailySource(args.base_latency, args.slow_latency, args.slow_rate, seed=1)
+        latencies = asyncio.run(_run(source, hedged, args.calls, args.warmup))
+        print(
+            f"{'hedged' if hedged else 'plain':>8}"
+            f" {_percentile(latencies, 50) * 1000:>8.1f}"
+            f" {_percentile(latencies, 95) * 1000:>8.1f}"
+            f" {_percentile(latencies, 99) * 1000:>8.1f}"
+            f" {source.calls - args.warmup:>15}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Measure the LLM response cache on a workload of repeated prompts.
+
+Sends ``--requests`` citation corrections drawn from ``--distinct`` different
+citations, with a Zipf-like skew (a few citations are corrected often), to a
+scripted chat model waiting ``--llm-latency`` seconds per call. The workload
+runs once without a cache and once through ``LLMResponseCache`` on a
+temporary SQLite file, then the cached responses are looked up again from a
+new cache instance (a restarted process) to time disk hits.
+
+Usage:
+    python -m benchmarks.bench_llm_cache --requests 200 --distinct 40
+
+Reports model calls, hit rate, total time and per-lookup overhead.
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage
+
+from benchmarks.bench_federated_search import _LatentChatModel
+from src.core.llm_cache import LLMResponseCache
+
+
+def _workload(requests: int, distinct: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    picks = rng.choices(range(distinct), weights=weights, k=requests)
+    return [
+        f"Fix this citation: Author{i}, A. ({2000 + i % 25}) Title {i}. Journal, {i}."
+        for i in picks
+    ]
+
+
+async def _run_workload(
+    prompts: list[str], latency: float, cache: LLMResponseCache | None
+) -> tuple[float, int]:
+    model = _LatentChatModel(
+        responses=[AIMessage(content=f"Corrected citation {i}. " * 20) for i in range(len(prompts))],
+        latency=latency,
+        cache=cache,
+    )
+    start = time.perf_counter()
+    for prompt in prompts:
+        await model.ainvoke([HumanMessage(content=prompt)])
+    return time.perf_counter() - start, model.calls
+
+
+async def _run(args: argparse.Namespace) -> None:
+    prompts = _workload(args.requests, args.distinct, seed=1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "llm_cache.sqlite"
+        uncached_seconds, uncached_calls = await _run_workload(prompts, args.llm_latency, None)
+        cache = LLMResponseCache(path, memory_entries=args.memory_entries)
+        cached_seconds, cached_calls = await _run_workload(prompts, args.llm_latency, cache)
+        cache.close()
+
+        print(f"{'cache':>7} {'model calls':>12} {'hit rate':>9} {'total s':>8}")
+        print(f"{'off':>7} {uncached_calls:>12} {0:>9.0%} {uncached_seconds:>8.2f}")
+        hit_rate = 1 - cached_calls / len(prompts)
+        print(f"{'on':>7} {cached_calls:>12} {hit_rate:>9.0%} {cached_seconds:>8.2f}")
+
+        # A new instance starts with an empty memory LRU: hits come from SQLite
+        reopened = LLMResponseCache(path, memory_entries=args.memory_entries)
+        model = _LatentChatModel(responses=[], latency=args.llm_latency)
+        llm_string = model._get_llm_string()
+        serialized = [dumps([HumanMessage(content=p)]) for p in dict.fromkeys(prompts)]
+        for label in ("disk", "memory"):
+            start = time.perf_counter()
+            for prompt in serialized:
+                assert reopened.lookup(prompt, llm_string) is not None
+            lookup_ms = (time.perf_counter() - start) / len(serialized) * 1000
+            print(f"{label} hit: {lookup_ms:.3f} ms per lookup")
+        reopened.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=40)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--memory-entries", type=int, default=256)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
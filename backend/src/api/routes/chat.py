@@ -1,23 +1,51 @@
 """Chat endpoints for the research agent."""
 
+import asyncio
 import logging
-from typing import Any, AsyncGenerator
+from collections.abc import AsyncGenerator
+from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from langchain_core.messages import HumanMessage
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from starlette.background import BackgroundTask
 
 from ...config import get_settings
-from ...core import AgentFactory
-from ...schemas import ChatRequest, ChatResponse, Message, MessageRole
+from ...core import (
+    AgentFactory,
+    AgentRun,
+    AgentRunCancelledError,
+    FastPathRouter,
+    RunTicket,
+    SchedulerSaturatedError,
+    SemanticAnswerCache,
+    get_run_scheduler,
+    is_cached_answer,
+)
+from ...schemas import (
+    ChatRequest,
+    ChatResponse,
+    ConversationHistory,
+    Message,
+    MessageRole,
+    StreamChunk,
+    ThreadInfo,
+    ThreadList,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# Interval between client-disconnect checks while an agent run is in flight
+_DISCONNECT_POLL_SECONDS = 0.5
+
 # Global agent factory (initialized once)
 _agent_factory: AgentFactory | None = None
 _agent: Any = None
+_fast_path: FastPathRouter | None = None
+_answer_cache: SemanticAnswerCache | None = None
 
 
 def _check_api_key() -> None:
@@ -30,6 +58,155 @@ def _check_api_key() -> None:
         )
 
 
+def _admit(thread_id: str) -> RunTicket:
+    """Reserve a place in the run queue for a thread.
+
+    Args:
+        thread_id: Conversation thread the run belongs to.
+
+    Returns:
+        Ticket to enter before running the agent.
+
+    Raises:
+        HTTPException: 429 with ``Retry-After`` if the queue is full.
+    """
+    try:
+        return get_run_scheduler().reserve(thread_id)
+    except SchedulerSaturatedError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many concurrent research requests. Please retry later.",
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
+
+
+def _message_text(message: BaseMessage) -> str:
+    """Extract the plain-text content of a (possibly multi-part) message.
+
+    Args:
+        message: LangChain message or message chunk.
+
+    Returns:
+        Concatenated text content.
+    """
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content
+    )
+
+
+def _update_messages(payload: dict[str, Any]) -> list[BaseMessage]:
+    """Collect the messages added by the nodes in an ``updates`` stream item.
+
+    Args:
+        payload: Mapping of node name to that node's state update.
+
+    Returns:
+        New messages, in the order the nodes produced them.
+    """
+    messages: list[BaseMessage] = []
+    for update in payload.values():
+        if isinstance(update, dict):
+            messages.extend(update.get("messages", []))
+    return messages
+
+
+def _to_message(message: BaseMessage) -> Message:
+    """Convert a LangChain message to the API schema.
+
+    Args:
+        message: LangChain message.
+
+    Returns:
+        Message with tool calls or the answered tool call ID filled in.
+    """
+    tool_calls = None
+    if isinstance(message, AIMessage) and message.tool_calls:
+        tool_calls = [
+            {"id": call["id"], "name": call["name"], "args": call["args"]}
+            for call in message.tool_calls
+        ]
+    return Message(
+        role=MessageRole(message.type),
+        content=_message_text(message),
+        tool_calls=tool_calls,
+        tool_call_id=message.tool_call_id if isinstance(message, ToolMessage) else None,
+    )
+
+
+def _sse_event(event_id: int, chunk: StreamChunk) -> str:
+    """Encode a stream chunk as a Server-Sent Events frame.
+
+    Args:
+        event_id: Monotonic event id within the stream.
+        chunk: Chunk to encode.
+
+    Returns:
+        SSE frame with an ``id`` and a JSON ``data`` field.
+    """
+    return f"id: {event_id}\ndata: {chunk.model_dump_json(exclude_none=True)}\n\n"
+
+
+def _stream_chunks(mode: str, payload: Any) -> list[StreamChunk]:
+    """Translate one ``astream`` item into typed stream chunks.
+
+    Token deltas come from the ``messages`` stream mode; tool call starts and
+    results come from the ``updates`` stream mode once a node has finished.
+
+    Args:
+        mode: Stream mode that produced the payload.
+        payload: Item emitted by the agent for that mode.
+
+    Returns:
+        Chunks to send to the client (possibly empty).
+    """
+    chunks: list[StreamChunk] = []
+
+    if mode == "messages":
+        message, _metadata = payload
+        # Token chunks while the model streams (AIMessageChunk is an AIMessage)
+        if isinstance(message, AIMessage):
+            text = _message_text(message)
+            if text:
+                chunks.append(StreamChunk(type="message", content=text))
+        return chunks
+
+    for message in _update_messages(payload):
+        if isinstance(message, AIMessage):
+            for tool_call in message.tool_calls:
+                chunks.append(StreamChunk(
+                    type="tool_call",
+                    tool_name=tool_call["name"],
+                    tool_input=tool_call["args"],
+                    tool_call_id=tool_call["id"],
+                ))
+        elif isinstance(message, ToolMessage):
+            chunks.append(StreamChunk(
+                type="tool_result",
+                tool_name=message.name,
+                tool_output=_message_text(message),
+                tool_call_id=message.tool_call_id,
+            ))
+    return chunks
+
+
+async def _cancel_on_disconnect(http_request: Request, run: AgentRun) -> None:
+    """Cancel an agent run as soon as the HTTP client disconnects.
+
+    Args:
+        http_request: Incoming HTTP request.
+        run: Agent run serving the request.
+    """
+    while not run.done:
+        if await http_request.is_disconnected():
+            run.cancel("client disconnected")
+            return
+        await asyncio.sleep(_DISCONNECT_POLL_SECONDS)
+
+
 def get_agent_factory() -> AgentFactory:
     """Get or create the agent factory singleton.
 
@@ -42,6 +219,37 @@ def get_agent_factory() -> AgentFactory:
     return _agent_factory
 
 
+def close_agent_factory() -> None:
+    """Flush and close the agent factory's conversation memory, if created."""
+    global _agent_factory, _agent, _fast_path, _answer_cache
+    if _agent_factory is not None:
+        _agent_factory.memory_manager.close()
+    _agent_factory = None
+    _agent = None
+    _fast_path = None
+    _answer_cache = None
+
+
+async def sweep_threads_periodically(interval: float) -> None:
+    """Evict idle conversation threads every ``interval`` seconds until cancelled.
+
+    Threads with a run executing or queued are never evicted.
+
+    Args:
+        interval: Seconds between sweeps.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if _agent_factory is None:
+            continue
+        try:
+            await _agent_factory.memory_manager.asweep(
+                lambda: get_run_scheduler().active_threads
+            )
+        except Exception:
+            logger.exception("Conversation thread sweep failed")
+
+
 def get_agent() -> Any:
     """Get or create the agent singleton.
 
@@ -55,17 +263,87 @@ def get_agent() -> Any:
     return _agent
 
 
+def get_fast_path_router() -> FastPathRouter | None:
+    """Get or create the identifier fast path router singleton.
+
+    Returns:
+        FastPathRouter instance, or None if the fast path is disabled.
+    """
+    global _fast_path
+    if _fast_path is None:
+        _fast_path = get_agent_factory().create_fast_path_router()
+    return _fast_path
+
+
+def get_answer_cache() -> SemanticAnswerCache | None:
+    """Get or create the semantic answer cache singleton.
+
+    Returns:
+        SemanticAnswerCache instance, or None if the cache is disabled.
+    """
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = get_agent_factory().create_answer_cache()
+    return _answer_cache
+
+
+async def _answer_fast(
+    agent: Any, config: RunnableConfig, message: str
+) -> list[BaseMessage] | None:
+    """Answer an identifier lookup without running the agent, if it is one.
+
+    Args:
+        agent: Agent whose thread checkpoint records the exchange.
+        config: Thread configuration for the agent.
+        message: User message.
+
+    Returns:
+        The turn's messages, or None if the agent must answer.
+    """
+    fast_path = get_fast_path_router()
+    if fast_path is None:
+        return None
+    return await fast_path.route(agent, config, message)
+
+
+async def _first_turn_cache(agent: Any, config: RunnableConfig) -> SemanticAnswerCache | None:
+    """Get the answer cache if it applies to this turn, i.e. the thread is new.
+
+    Later turns depend on the conversation so far, so only first turns are
+    looked up and stored.
+
+    Args:
+        agent: Agent holding the thread checkpoint.
+        config: Thread configuration for the agent.
+
+    Returns:
+        The answer cache, or None if it is disabled or the thread has messages.
+    """
+    answer_cache = get_answer_cache()
+    if answer_cache is None:
+        return None
+    state = await agent.aget_state(config)
+    if state.values.get("messages"):
+        return None
+    return answer_cache
+
+
 @router.post("", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
+async def chat(request: ChatRequest, http_request: Request) -> Response:
     """Send a message to the research agent.
 
+    Only the messages of this turn are returned; earlier turns are available
+    from the history endpoint.
+
     Args:
         request: Chat request with message and thread_id.
+        http_request: Raw HTTP request, used to detect client disconnects.
 
     Returns:
-        Chat response with agent's reply.
+        Chat response with agent's reply, encoded as JSON.
     """
     _check_api_key()
+    ticket = _admit(request.thread_id)
     try:
         agent = get_agent()
         factory = get_agent_factory()
@@ -73,58 +351,81 @@ async def chat(request: ChatRequest) -> ChatResponse:
 
         # Create human message
         human_message = HumanMessage(content=request.message)
-
-        # Run agent
-        messages_list: list[Message] = []
-        final_response = ""
-
-        for step in agent.stream(
-            {"messages": [human_message]},
-            config,
-            stream_mode="values",
-        ):
-            last_message = step["messages"][-1]
-
-            # Convert to our schema
-            if hasattr(last_message, "type"):
-                role = MessageRole(last_message.type)
+        produced: list[BaseMessage] = [human_message]
+
+        # Run agent without blocking the event loop; node updates carry only
+        # the new messages, so the cost does not grow with the thread length
+        async with ticket:
+            answer_cache = None
+            answered = await _answer_fast(agent, config, request.message)
+            if answered is None:
+                answer_cache = await _first_turn_cache(agent, config)
+                if answer_cache is not None:
+                    answered = await answer_cache.route(agent, config, request.message)
+            if answered is not None:
+                produced = answered
             else:
-                role = MessageRole.ASSISTANT
-
-            message = Message(
-                role=role,
-                content=last_message.content if hasattr(last_message, "content") else str(last_message),
-            )
-            messages_list.append(message)
-            final_response = message.content
-
-        return ChatResponse(
+                run = AgentRun(
+                    agent, {"messages": [human_message]}, config, stream_mode=["updates"]
+                )
+                watcher = asyncio.create_task(_cancel_on_disconnect(http_request, run))
+                try:
+                    async for _mode, payload in run:
+                        produced.extend(_update_messages(payload))
+                finally:
+                    watcher.cancel()
+                    run.cancel("request aborted")
+                if answer_cache is not None:
+                    await answer_cache.store(request.message, produced)
+
+        messages_list = [_to_message(message) for message in produced]
+        response = ChatResponse(
             thread_id=request.thread_id,
             messages=messages_list,
-            final_response=final_response,
+            final_response=messages_list[-1].content,
+            cached=is_cached_answer(produced[-1]),
         )
+        # Serialize with pydantic-core directly, skipping FastAPI's re-validation
+        return Response(content=response.model_dump_json(), media_type="application/json")
+
+    except AgentRunCancelledError:
+        # Nobody is left to read the response; 499 mirrors nginx's convention
+        raise HTTPException(status_code=499, detail="Client closed request") from None
 
     except Exception as e:
         logger.exception("Error processing chat request")
         raise HTTPException(
             status_code=500,
             detail=f"Error processing request: {e}",
-        )
+        ) from e
+
+    finally:
+        ticket.release()
 
 
 @router.post("/stream")
-async def chat_stream(request: ChatRequest) -> StreamingResponse:
+async def chat_stream(request: ChatRequest, http_request: Request) -> StreamingResponse:
     """Stream responses from the research agent.
 
+    Emits JSON-encoded ``StreamChunk`` frames as Server-Sent Events: LLM
+    tokens as they are generated, tool call starts and results, and a final
+    ``done`` chunk. If the client disconnects, the agent run (including
+    in-flight tool calls) is cancelled.
+
     Args:
         request: Chat request with message and thread_id.
+        http_request: Raw HTTP request, used to detect client disconnects.
 
     Returns:
         Streaming response with agent's reply.
     """
     _check_api_key()
+    ticket = _admit(request.thread_id)
 
     async def generate() -> AsyncGenerator[str, None]:
+        event_id = 0
+        run: AgentRun | None = None
+        watcher: asyncio.Task[None] | None = None
         try:
             agent = get_agent()
             factory = get_agent_factory()
@@ -132,32 +433,154 @@ async def chat_stream(request: ChatRequest) -> StreamingResponse:
 
             human_message = HumanMessage(content=request.message)
 
-            for step in agent.stream(
+            await ticket.acquire()
+            fast = await _answer_fast(agent, config, request.message)
+            if fast is not None:
+                # Same events as an agent turn: tool calls, results, the answer
+                chunks = _stream_chunks("updates", {"agent": {"messages": fast[1:]}})
+                chunks.append(StreamChunk(type="message", content=_message_text(fast[-1])))
+                for chunk in chunks:
+                    event_id += 1
+                    yield _sse_event(event_id, chunk)
+                event_id += 1
+                yield _sse_event(event_id, StreamChunk(type="done"))
+                return
+
+            answer_cache = await _first_turn_cache(agent, config)
+            cached = (
+                await answer_cache.route(agent, config, request.message)
+                if answer_cache is not None else None
+            )
+            if cached is not None:
+                event_id += 1
+                yield _sse_event(event_id, StreamChunk(
+                    type="message", content=_message_text(cached[-1]), cached=True
+                ))
+                event_id += 1
+                yield _sse_event(event_id, StreamChunk(type="done"))
+                return
+
+            run = AgentRun(
+                agent,
                 {"messages": [human_message]},
                 config,
-                stream_mode="values",
-            ):
-                last_message = step["messages"][-1]
-                content = last_message.content if hasattr(last_message, "content") else str(last_message)
+                stream_mode=["messages", "updates"],
+            )
+            watcher = asyncio.create_task(_cancel_on_disconnect(http_request, run))
+
+            produced: list[BaseMessage] = []
+            async for mode, payload in run:
+                if mode == "updates":
+                    produced.extend(_update_messages(payload))
+                for chunk in _stream_chunks(mode, payload):
+                    event_id += 1
+                    yield _sse_event(event_id, chunk)
 
-                # Yield as Server-Sent Events format
-                yield f"data: {content}\n\n"
+            event_id += 1
+            yield _sse_event(event_id, StreamChunk(type="done"))
 
-            yield "data: [DONE]\n\n"
+            # After "done", so storing doesn't delay the client
+            if answer_cache is not None:
+                await answer_cache.store(request.message, produced)
+
+        except AgentRunCancelledError:
+            logger.info(f"Stream for thread '{request.thread_id}' cancelled by client disconnect")
 
         except Exception as e:
             logger.exception("Error in streaming chat")
-            yield f"data: Error: {e}\n\n"
+            event_id += 1
+            yield _sse_event(event_id, StreamChunk(type="error", content=str(e)))
+
+        finally:
+            # Also reached when the server aborts the response on disconnect
+            if watcher is not None:
+                watcher.cancel()
+            if run is not None:
+                run.cancel("stream closed")
+            ticket.release()
 
     return StreamingResponse(
         generate(),
         media_type="text/event-stream",
+        # Frees the reservation even if the stream never starts
+        background=BackgroundTask(ticket.release),
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable proxy buffering so tokens reach the client immediately
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/threads", response_model=ThreadList)
+async def list_threads(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+) -> ThreadList:
+    """List conversation threads, most recently updated first.
+
+    Args:
+        limit: Maximum number of threads per page.
+        cursor: Cursor from a previous page.
+
+    Returns:
+        Page of threads with the cursor of the next page.
+    """
+    index = get_agent_factory().memory_manager.thread_index
+    if index is None:
+        return ThreadList(threads=[])
+    try:
+        threads, next_cursor = await asyncio.to_thread(index.list_threads, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return ThreadList(
+        threads=[ThreadInfo(**thread) for thread in threads],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/{thread_id}/history", response_model=ConversationHistory)
+async def get_history(
+    thread_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+) -> ConversationHistory:
+    """Get a page of a thread's messages, starting from the most recent.
+
+    Args:
+        thread_id: Thread ID to read.
+        limit: Maximum number of messages per page.
+        cursor: Cursor from a previous page, to fetch older messages.
+
+    Returns:
+        Messages in chronological order with the cursor of the older page.
+    """
+    index = get_agent_factory().memory_manager.thread_index
+    thread = await asyncio.to_thread(index.get_thread, thread_id) if index else None
+    if index is None or thread is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Thread '{thread_id}' not found",
+        )
+    try:
+        messages, next_cursor = await asyncio.to_thread(
+            index.get_messages, thread_id, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return ConversationHistory(
+        thread_id=thread_id,
+        messages=[Message(**message) for message in messages],
+        created_at=thread["created_at"],
+        updated_at=thread["updated_at"],
+        next_cursor=next_cursor,
     )
 
 
 @router.delete("/{thread_id}")
 async def delete_thread(thread_id: str) -> dict[str, str]:
-    """Delete a conversation thread.
+    """Delete a conversation thread and all its stored checkpoints.
 
     Args:
         thread_id: Thread ID to delete.
@@ -166,7 +589,9 @@ async def delete_thread(thread_id: str) -> dict[str, str]:
         Deletion status.
     """
     factory = get_agent_factory()
-    deleted = factory.memory_manager.delete_thread(thread_id)
+    # Wait for any run on the thread so it cannot re-create state we purge
+    async with get_run_scheduler().thread_exclusive(thread_id):
+        deleted = await factory.memory_manager.adelete_thread(thread_id)
 
     if deleted:
         return {"status": "deleted", "thread_id": thread_id}
@@ -1,8 +1,12 @@
 """Health check endpoints."""
 
+from typing import Any
+
 from fastapi import APIRouter
 
 from ...config import get_settings
+from ...core import get_run_scheduler
+from ...monitoring import get_metrics
 
 router = APIRouter(tags=["health"])
 
@@ -18,16 +22,32 @@ async def health_check() -> dict[str, str]:
 
 
 @router.get("/ready")
-async def readiness_check() -> dict[str, str | bool]:
+async def readiness_check() -> dict[str, str | bool | int]:
     """Check if the API is ready to serve requests.
 
     Returns:
-        Readiness status with configuration info.
+        Readiness status with configuration info and run queue saturation.
     """
     settings = get_settings()
+    scheduler = get_run_scheduler()
     return {
         "status": "ready",
         "openai_configured": bool(settings.openai_api_key),
         "tavily_configured": bool(settings.tavily_api_key),
         "serp_configured": bool(settings.serp_api_key),
+        "in_flight": scheduler.in_flight,
+        "queue_depth": scheduler.queue_depth,
+        "max_concurrent_runs": scheduler.max_concurrent,
+        "max_queued_runs": scheduler.max_queued,
+        "saturated": scheduler.saturated,
     }
+
+
+@router.get("/metrics")
+async def metrics() -> dict[str, Any]:
+    """Get operational metrics.
+
+    Returns:
+        Snapshot of counters, value summaries and gauges.
+    """
+    return get_metrics().snapshot()
@@ -4,9 +4,13 @@ from fastapi import APIRouter
 
 from ...config import get_settings
 from ...schemas import ToolInfo, ToolsResponse
+from ...tools.circuit import CircuitState, get_circuit_breaker
 
 router = APIRouter(prefix="/tools", tags=["tools"])
 
+# Tools calling external APIs, guarded by circuit breakers
+_GUARDED_TOOLS = {"google_scholar", "tavily_search", "pubmed", "arxiv", "duckduckgo"}
+
 
 @router.get("", response_model=ToolsResponse)
 async def list_tools() -> ToolsResponse:
@@ -42,6 +46,18 @@ async def list_tools() -> ToolsResponse:
             requires_api_key=False,
             is_available=True,
         ),
+        ToolInfo(
+            name="federated_search",
+            description="Search all academic databases concurrently and merge the results",
+            requires_api_key=False,
+            is_available=True,
+        ),
+        ToolInfo(
+            name="paper_details",
+            description="Full details of papers listed by the search tools",
+            requires_api_key=False,
+            is_available=settings.compact_results_enabled,
+        ),
         ToolInfo(
             name="duckduckgo",
             description="Search the web using DuckDuckGo (free)",
@@ -56,6 +72,13 @@ async def list_tools() -> ToolsResponse:
         ),
     ]
 
+    # A configured tool is unavailable while its breaker is open
+    for tool in tools:
+        if tool.name in _GUARDED_TOOLS:
+            state = get_circuit_breaker(tool.name).state
+            tool.circuit_state = state.value
+            tool.is_available = tool.is_available and state is not CircuitState.OPEN
+
     return ToolsResponse(
         tools=tools,
         total=len(tools),
@@ -26,15 +26,129 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o-mini"
     openai_temperature: float = 0.0
 
+    # Prompt History Budget (0 disables trimming)
+    history_max_tokens: int = 12000
+    history_stale_tool_chars: int = 600
+    history_summarize: bool = True
+
     # Search Tools API Keys
     tavily_api_key: str | None = None
     serp_api_key: str | None = None
+    ncbi_api_key: str | None = None
+
+    # Pooled HTTP Clients for Search Tools
+    http_max_connections_per_host: int = 10
+    http_max_keepalive_per_host: int = 5
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 20.0
+    http2_enabled: bool = True
+
+    # Upstream Rate Limits (requests/s by API host or tool name; bucket state is
+    # shared by all workers through RATE_LIMIT_STORE_PATH, empty for per-process)
+    rate_limits: dict[str, float] = {
+        "google_scholar": 5.0,
+        "tavily_search": 5.0,
+        "duckduckgo": 1.0,
+    }
+    rate_limit_store_path: str = "./data/rate_limits.sqlite"
+    rate_limit_max_wait: float = 20.0
+
+    # Search Result Cache (TTL in seconds per tool; tools without a TTL aren't cached)
+    tool_cache_enabled: bool = True
+    tool_cache_path: str = "./data/tool_cache.sqlite"
+    tool_cache_memory_entries: int = 512
+    tool_cache_ttls: dict[str, float] = {
+        # SerpAPI bills per query, so Scholar results are kept longest
+        "google_scholar": 7 * 24 * 60 * 60,
+        "pubmed": 24 * 60 * 60,
+        "arxiv": 24 * 60 * 60,
+        "tavily_search": 6 * 60 * 60,
+        "duckduckgo": 6 * 60 * 60,
+    }
+    tool_cache_stale_seconds: float = 24 * 60 * 60
+
+    # Circuit Breakers (per tool, over the last CIRCUIT_BREAKER_WINDOW calls) and
+    # fallback chains tried while a tool's breaker is open or its call fails
+    circuit_breaker_window: int = 20
+    circuit_breaker_min_calls: int = 5
+    circuit_breaker_error_rate: float = 0.5
+    circuit_breaker_p95_seconds: float = 10.0
+    circuit_breaker_open_seconds: float = 30.0
+    circuit_breaker_timeout: float = 15.0
+    tool_fallbacks: dict[str, list[str]] = {"tavily_search": ["duckduckgo"]}
+
+    # Hedged Requests (opt-in per tool: a duplicate call is sent once a call runs
+    # past the tool's observed HEDGE_PERCENTILE latency, for at most HEDGE_BUDGET
+    # of calls and only when a rate-limit slot is free)
+    hedged_tools: list[str] = []
+    hedge_percentile: float = 0.9
+    hedge_min_samples: int = 20
+    hedge_budget: float = 0.1
+
+    # Compact Search Results (listing handed to the agent, within a token budget;
+    # abstracts are cut to their sentences most relevant to the query; full
+    # records are kept for the paper_details tool)
+    compact_results_enabled: bool = True
+    compact_results_max_tokens: int = 600
+    compact_results_abstract_tokens: int = 50
+    paper_details_ttl: float = 7 * 24 * 60 * 60
+
+    # Federated Academic Search
+    federated_search_timeout: float = 15.0
+    federated_search_max_results: int = 10
+
+    # Identifier Fast Path (messages that only ask for papers by arXiv ID, PMID
+    # or DOI are answered by fetching them directly, without LLM calls)
+    fast_path_enabled: bool = True
+
+    # LLM Response Cache (exact match on model, parameters and messages; models
+    # with a temperature above 0 are never cached; least recently used responses
+    # are evicted past LLM_CACHE_MAX_BYTES)
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "./data/llm_cache.sqlite"
+    llm_cache_memory_entries: int = 256
+    llm_cache_max_bytes: int = 256 * 1024 * 1024
+
+    # Semantic Answer Cache (opt-in: a thread's first message is answered with
+    # the answer to an earlier first message at least ANSWER_CACHE_THRESHOLD
+    # cosine-similar to it, from any thread, for ANSWER_CACHE_TTL seconds;
+    # empty path for a per-process index)
+    answer_cache_enabled: bool = False
+    answer_cache_path: str = "./data/answer_cache"
+    answer_cache_embedding_model: str = "text-embedding-3-small"
+    answer_cache_threshold: float = 0.92
+    answer_cache_ttl: float = 6 * 60 * 60
 
     # LangSmith Tracing (Optional)
     langchain_tracing_v2: bool = False
     langchain_api_key: str | None = None
     langchain_project: str = "agente-investigador"
 
+    # Agent Run Scheduling
+    max_concurrent_runs: int = 8
+    max_queued_runs: int = 32
+
+    # Conversation Checkpointing ("memory" or "sqlite")
+    checkpointer_backend: str = "memory"
+    checkpoint_db_path: str = "./data/checkpoints.sqlite"
+    checkpoint_cache_max_bytes: int = 64 * 1024 * 1024
+    checkpoint_batch_size: int = 64
+    checkpoint_flush_interval: float = 1.0
+    thread_index_path: str = "./data/threads.sqlite"
+
+    # Large Tool Output Offloading ("auto", "memory", "disk" or "none")
+    blob_store_backend: str = "auto"
+    blob_store_path: str = "./data/blobs"
+    blob_offload_threshold: int = 2048
+
+    # Conversation Thread Eviction (0 disables each limit). Eviction deletes a
+    # thread for good, so when unset both limits apply only to the "memory"
+    # backend (24 hours, 512 MiB) and are disabled for "sqlite", whose history
+    # must survive restarts; set them to expire persisted threads as well.
+    thread_ttl_seconds: float | None = None
+    thread_max_bytes: int | None = None
+    thread_sweep_interval: float = 60.0
+
     # Vector Store Configuration
     chroma_persist_directory: str = "./data/chroma"
     chroma_collection_name: str = "apa_documents"
@@ -1,7 +1,27 @@
 """Core agent module."""
 
 from .agent import AgentFactory
+from .answer_cache import SemanticAnswerCache, is_cached_answer
+from .fastpath import FastPathRouter
+from .llm_cache import LLMResponseCache, get_llm_cache
 from .memory import MemoryManager
 from .prompts import SYSTEM_PROMPTS
+from .runner import AgentRun, AgentRunCancelledError
+from .scheduler import RunScheduler, RunTicket, SchedulerSaturatedError, get_run_scheduler
 
-__all__ = ["AgentFactory", "MemoryManager", "SYSTEM_PROMPTS"]
+__all__ = [
+    "AgentFactory",
+    "AgentRun",
+    "AgentRunCancelledError",
+    "FastPathRouter",
+    "LLMResponseCache",
+    "MemoryManager",
+    "RunScheduler",
+    "RunTicket",
+    "SYSTEM_PROMPTS",
+    "SchedulerSaturatedError",
+    "SemanticAnswerCache",
+    "get_llm_cache",
+    "get_run_scheduler",
+    "is_cached_answer",
+]
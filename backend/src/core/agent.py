@@ -3,21 +3,34 @@
 from typing import Any
 
 from langchain.tools import BaseTool as LangChainBaseTool
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableConfig
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langgraph.prebuilt import create_react_agent
 
 from ..config import get_settings
 from ..tools import (
     ArxivSearchTool,
     DuckDuckGoSearchTool,
+    FederatedSearchTool,
     GoogleScholarTool,
     PubMedSearchTool,
     TavilySearchTool,
     APACorrectorTool,
 )
-from ..tools.base import BaseTool
+from ..tools.base import BaseTool, WrappedTool
+from ..tools.cache import CachedTool, get_tool_cache
+from ..tools.circuit import CircuitBreakerTool, FallbackTool, get_circuit_breaker
+from ..tools.hedging import HedgedTool
+from ..tools.http import get_http_registry
+from ..tools.papers import CompactResultsTool, PaperDetailsTool, PaperRenderer, get_paper_store
+from ..tools.ratelimit import RateLimitedTool, get_rate_limiter
+from ..tools.singleflight import SingleFlightTool
+from .answer_cache import SemanticAnswerCache
+from .fastpath import FastPathRouter
+from .history import HistoryTrimmer, ResearchAgentState, TokenCounter
+from .llm_cache import llm_cache_for
 from .memory import MemoryManager
-from .prompts import RESEARCH_AGENT_PROMPT
+from .prompts import RESEARCH_AGENT_PROMPT, RESEARCH_AGENT_SYSTEM_PROMPT
 
 
 class AgentFactory:
@@ -51,8 +64,172 @@ class AgentFactory:
         return ChatOpenAI(
             model=self._model_name,
             temperature=self._temperature,
+            cache=llm_cache_for(self._temperature),
         )
 
+    def _create_history_trimmer(self) -> HistoryTrimmer:
+        """Create the pre-model hook that keeps the prompt within budget.
+
+        Returns:
+            Configured HistoryTrimmer instance.
+        """
+        settings = get_settings()
+        return HistoryTrimmer(
+            max_tokens=settings.history_max_tokens,
+            model_name=self._model_name,
+            summarizer=self._create_llm() if settings.history_summarize else None,
+            stale_tool_chars=settings.history_stale_tool_chars,
+            system_prompt=RESEARCH_AGENT_SYSTEM_PROMPT,
+            blob_store=self._memory_manager.blob_store,
+        )
+
+    def _with_rate_limit(self, tool: BaseTool) -> BaseTool:
+        """Queue a tool's calls on its upstream's limiter, hedging them if enabled.
+
+        Args:
+            tool: Tool wrapper instance.
+
+        Returns:
+            The tool wrapped in a HedgedTool (which also applies the limiter)
+            or RateLimitedTool, or the tool itself.
+        """
+        settings = get_settings()
+        rate = settings.rate_limits.get(tool.name)
+        limiter = get_rate_limiter(tool.name, rate) if rate else None
+        if tool.name in settings.hedged_tools:
+            # Tools pacing their own requests (PubMed, arXiv) hedge on their
+            # host's limiter, so hedges don't queue behind it
+            paced = limiter is None and tool.rate_limiter is not None
+            return HedgedTool(
+                tool,
+                limiter=tool.rate_limiter if paced else limiter,
+                paced=paced,
+                percentile=settings.hedge_percentile,
+                min_samples=settings.hedge_min_samples,
+                budget=settings.hedge_budget,
+            )
+        if limiter is None:
+            return tool
+        return RateLimitedTool(tool, limiter)
+
+    def _with_breaker(self, tool: BaseTool) -> BaseTool:
+        """Guard a tool's calls with its circuit breaker.
+
+        Args:
+            tool: Tool wrapper instance.
+
+        Returns:
+            The tool wrapped in a CircuitBreakerTool.
+        """
+        return CircuitBreakerTool(
+            tool,
+            breaker=get_circuit_breaker(tool.name),
+            timeout=get_settings().circuit_breaker_timeout,
+        )
+
+    def _with_fallbacks(self, tool: BaseTool, tools: dict[str, BaseTool]) -> BaseTool:
+        """Reroute a tool's failed calls to its configured fallback chain.
+
+        Args:
+            tool: Tool wrapper instance.
+            tools: Available tools by name, to resolve the chain from.
+
+        Returns:
+            The tool wrapped in a FallbackTool, or the tool itself if none of
+            its fallbacks is available.
+        """
+        chain = get_settings().tool_fallbacks.get(tool.name, [])
+        fallbacks = [tools[name] for name in chain if name in tools and name != tool.name]
+        if not fallbacks:
+            return tool
+        return FallbackTool(tool, fallbacks)
+
+    def _with_cache(self, tool: BaseTool) -> BaseTool:
+        """Serve a search tool's results from the shared cache if it has a TTL.
+
+        Args:
+            tool: Tool wrapper instance.
+
+        Returns:
+            The tool wrapped in a CachedTool, or the tool itself.
+        """
+        settings = get_settings()
+        ttl = settings.tool_cache_ttls.get(tool.name)
+        if not settings.tool_cache_enabled or not ttl:
+            return tool
+        return CachedTool(
+            tool,
+            cache=get_tool_cache(),
+            ttl=ttl,
+            stale_ttl=settings.tool_cache_stale_seconds,
+        )
+
+    def _create_paper_renderer(self) -> PaperRenderer | None:
+        """Create the compact renderer of search results, if enabled.
+
+        Returns:
+            Configured PaperRenderer, or None to hand the agent full results.
+        """
+        settings = get_settings()
+        if not settings.compact_results_enabled:
+            return None
+        return PaperRenderer(
+            max_tokens=settings.compact_results_max_tokens,
+            abstract_tokens=settings.compact_results_abstract_tokens,
+            count_tokens=TokenCounter(self._model_name).count_text,
+            store=get_paper_store(),
+        )
+
+    def _wrap(self, tool: BaseTool) -> BaseTool:
+        """Add caching, rate limiting and circuit breaking around a tool.
+
+        The limiter wraps the breaker, so time spent queueing for a slot
+        isn't counted against the breaker's timeout and latency threshold,
+        and limiter rejections aren't recorded as upstream failures.
+
+        Args:
+            tool: Tool wrapper instance.
+
+        Returns:
+            The wrapped tool.
+        """
+        return self._with_cache(self._with_rate_limit(self._with_breaker(tool)))
+
+    def _get_academic_tools(self) -> list[BaseTool]:
+        """Get the academic search sources, guarded and coalesced.
+
+        With compact listings, sources return structured full records and
+        the listings are applied on top.
+
+        Returns:
+            List of tool wrapper instances.
+        """
+        settings = get_settings()
+        academic: list[BaseTool] = []
+        if settings.serp_api_key:
+            academic.append(GoogleScholarTool())
+
+        # These don't require API keys. Compact listings budget the results
+        # themselves, so the sources return their full records, structured
+        # rather than as text to parse back, for listings and paper_details.
+        http_registry = get_http_registry()
+        structured = settings.compact_results_enabled
+        academic.extend([
+            PubMedSearchTool(
+                api_key=settings.ncbi_api_key,
+                http_registry=http_registry,
+                structured_output=structured,
+            ),
+            ArxivSearchTool(http_registry=http_registry, structured_output=structured),
+        ])
+
+        # Wrapped tools are shared with federated search, so both paths hit the
+        # cache, draw from the same rate limits and trip the same breakers.
+        # Cache hits don't take a slot and are served while a breaker is open.
+        # Identical concurrent calls, e.g. a source's direct and federated
+        # calls, are coalesced.
+        return [SingleFlightTool(self._wrap(tool)) for tool in academic]
+
     def _get_default_tools(self) -> list[BaseTool]:
         """Get the default set of research tools.
 
@@ -61,20 +238,33 @@ class AgentFactory:
         """
         settings = get_settings()
         tools: list[BaseTool] = []
+        academic = self._get_academic_tools()
 
         # Add tools based on available API keys
-        if settings.serp_api_key:
-            tools.append(GoogleScholarTool())
-
         if settings.tavily_api_key:
             tools.append(TavilySearchTool())
+        tools.append(DuckDuckGoSearchTool())
 
-        # These don't require API keys
-        tools.extend([
-            PubMedSearchTool(),
-            ArxivSearchTool(),
-            DuckDuckGoSearchTool(),
-        ])
+        tools = [self._wrap(tool) for tool in tools]
+        by_name = {tool.name: tool for tool in tools + academic}
+        tools = [SingleFlightTool(self._with_fallbacks(tool, by_name)) for tool in tools]
+        tools += academic
+
+        # The agent gets compact listings; federated search merges full results
+        renderer = self._create_paper_renderer()
+        if renderer is not None:
+            tools = [CompactResultsTool(tool, renderer) for tool in tools]
+
+        # Query all academic sources in one call instead of one LLM round trip each
+        tools.append(FederatedSearchTool(
+            sources=academic,
+            timeout=settings.federated_search_timeout,
+            max_results=settings.federated_search_max_results,
+            renderer=renderer,
+        ))
+
+        if renderer is not None:
+            tools.append(PaperDetailsTool(get_paper_store()))
 
         return tools
 
@@ -90,7 +280,11 @@ class AgentFactory:
         Returns:
             List of LangChain tool instances.
         """
-        return [wrapper.create_tool() for wrapper in tool_wrappers]
+        # Identical concurrent calls from any agent run share one upstream call
+        return [
+            (wrapper if _is_coalesced(wrapper) else SingleFlightTool(wrapper)).create_tool()
+            for wrapper in tool_wrappers
+        ]
 
     def create_agent(
         self,
@@ -126,10 +320,40 @@ class AgentFactory:
             langchain_tools,
             checkpointer=self._memory_manager.checkpointer,
             prompt=RESEARCH_AGENT_PROMPT,
+            state_schema=ResearchAgentState,
+            pre_model_hook=self._create_history_trimmer().as_hook(),
         )
 
         return agent
 
+    def create_fast_path_router(self) -> FastPathRouter | None:
+        """Create the router answering identifier lookups without the LLM.
+
+        Returns:
+            Configured FastPathRouter, or None if the fast path is disabled.
+        """
+        if not get_settings().fast_path_enabled:
+            return None
+        tools = {tool.name: tool.create_tool() for tool in self._get_academic_tools()}
+        return FastPathRouter(tools, renderer=self._create_paper_renderer())
+
+    def create_answer_cache(self) -> SemanticAnswerCache | None:
+        """Create the semantic cache of first-turn answers.
+
+        Returns:
+            Configured SemanticAnswerCache, or None if it is disabled.
+        """
+        settings = get_settings()
+        if not settings.answer_cache_enabled:
+            return None
+        return SemanticAnswerCache(
+            OpenAIEmbeddings(model=settings.answer_cache_embedding_model),
+            path=settings.answer_cache_path or None,
+            namespace=self._model_name,
+            threshold=settings.answer_cache_threshold,
+            ttl=settings.answer_cache_ttl,
+        )
+
     @property
     def memory_manager(self) -> MemoryManager:
         """Get the memory manager.
@@ -139,7 +363,7 @@ class AgentFactory:
         """
         return self._memory_manager
 
-    def get_thread_config(self, thread_id: str) -> dict[str, Any]:
+    def get_thread_config(self, thread_id: str) -> RunnableConfig:
         """Get configuration for a conversation thread.
 
         Args:
@@ -149,3 +373,12 @@ class AgentFactory:
             Configuration dict for the agent.
         """
         return self._memory_manager.get_config(thread_id)
+
+
+def _is_coalesced(tool: BaseTool) -> bool:
+    """Check whether a tool already has a SingleFlightTool in its wrappers."""
+    while isinstance(tool, WrappedTool):
+        if isinstance(tool, SingleFlightTool):
+            return True
+        tool = tool.inner
+    return False
@@ -0,0 +1,269 @@
+"""Semantic cache of first-turn answers, shared across threads.
+
+Different users often open a conversation with nearly the same question
+("latest papers on CRISPR off-target effects"). The answer to a thread's
+first message depends on that message alone, so it is stored under the
+message's embedding and reused, within a freshness TTL, for later first
+messages similar enough to it. Only the question and final answer text are
+stored: no tool results, thread ids or later turns.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import chromadb
+from chromadb.api.types import (
+    LiteralValue,
+    LogicalOperator,
+    PyEmbedding,
+    Where,
+    WhereOperator,
+)
+from chromadb.config import Settings as ChromaSettings
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+from ..monitoring import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Key of the response metadata marking an answer served from the cache
+CACHED_ANSWER_KEY = "answer_cache"
+
+# Expired entries are deleted every this many stores
+_PRUNE_EVERY = 64
+
+# Embeddings of recent questions, so a miss isn't embedded again when stored
+_EMBEDDING_MEMO_SIZE = 256
+
+
+@dataclass(frozen=True, slots=True)
+class CachedAnswer:
+    """Answer found for a question, with how close its original question was."""
+
+    answer: str
+    similarity: float
+    age_seconds: float
+
+
+def _normalize(question: str) -> str:
+    return " ".join(question.split())
+
+
+def _expiry(operator: WhereOperator, at: float) -> Where:
+    """Filter on answers expiring before or after a time."""
+    condition: dict[WhereOperator | LogicalOperator, LiteralValue] = {operator: at}
+    return {"expires_at": condition}
+
+
+def _answer_text(messages: list[BaseMessage]) -> str | None:
+    """Get the final answer of a turn, if it ended with one."""
+    if not messages:
+        return None
+    last = messages[-1]
+    if not isinstance(last, AIMessage) or last.tool_calls:
+        return None
+    content = last.content
+    if not isinstance(content, str):
+        content = "".join(
+            part if isinstance(part, str) else part.get("text", "") for part in content
+        )
+    return content.strip() or None
+
+
+class SemanticAnswerCache:
+    """Reuse the answers of earlier first turns for similar first messages.
+
+    Questions are embedded and matched by cosine similarity in a local
+    Chroma index. A cached answer is served when the nearest question of the
+    same model scores at least ``threshold`` and was answered less than
+    ``ttl`` seconds ago. Lookups are counted under ``answer_cache.*``; the
+    nearest similarity of every lookup is recorded in
+    ``answer_cache.similarity`` to tune the threshold.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        path: str | Path | None = None,
+        namespace: str = "",
+        threshold: float = 0.92,
+        ttl: float = 6 * 60 * 60,
+        collection_name: str = "answer_cache",
+    ):
+        """Initialize the cache.
+
+        Args:
+            embeddings: Embedding model of the questions.
+            path: Directory persisting the index (None for a process-local index).
+            namespace: Scope of the answers, e.g. the agent's model name;
+                answers of other namespaces are never served.
+            threshold: Minimum cosine similarity of a question to reuse its answer.
+            ttl: Seconds an answer is served after it was produced.
+            collection_name: Name of the Chroma collection.
+        """
+        settings = ChromaSettings(anonymized_telemetry=False)
+        if path is None:
+            client = chromadb.EphemeralClient(settings=settings)
+        else:
+            Path(path).mkdir(parents=True, exist_ok=True)
+            client = chromadb.PersistentClient(path=str(path), settings=settings)
+        self._collection = client.get_or_create_collection(
+            collection_name, metadata={"hnsw:space": "cosine"}
+        )
+        self._embeddings = embeddings
+        self._namespace = namespace
+        self._threshold = threshold
+        self._ttl = ttl
+        self._memo: OrderedDict[str, list[float]] = OrderedDict()
+        self._stores = 0
+
+        metrics = get_metrics()
+        metrics.register_gauge("answer_cache.hit_rate", _hit_rate)
+        metrics.register_gauge("answer_cache.threshold", lambda: self._threshold)
+
+    async def _embed(self, question: str) -> list[float]:
+        vector = self._memo.get(question)
+        if vector is None:
+            vector = await self._embeddings.aembed_query(question)
+            self._memo[question] = vector
+            if len(self._memo) > _EMBEDDING_MEMO_SIZE:
+                self._memo.popitem(last=False)
+        self._memo.move_to_end(question)
+        return vector
+
+    async def lookup(self, question: str) -> CachedAnswer | None:
+        """Find the answer of a similar earlier question.
+
+        Args:
+            question: First message of a thread.
+
+        Returns:
+            The cached answer, or None if no fresh answer is similar enough.
+        """
+        metrics = get_metrics()
+        question = _normalize(question)
+        now = time.time()
+        where: Where = {"$and": [{"namespace": self._namespace}, _expiry("$gt", now)]}
+        try:
+            vectors: list[PyEmbedding] = [await self._embed(question)]
+            result = await asyncio.to_thread(
+                self._collection.query,
+                query_embeddings=vectors,
+                n_results=1,
+                where=where,
+                include=["documents", "metadatas", "distances"],
+            )
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            metrics.increment("answer_cache.errors")
+            return None
+
+        distances, documents, metadatas = (
+            result["distances"], result["documents"], result["metadatas"]
+        )
+        if not result["ids"][0] or distances is None or documents is None or metadatas is None:
+            metrics.increment("answer_cache.misses")
+            return None
+        similarity = 1.0 - distances[0][0]
+        metrics.observe("answer_cache.similarity", similarity)
+        created_at = metadatas[0][0]["created_at"]
+        if similarity < self._threshold or not isinstance(created_at, int | float):
+            metrics.increment("answer_cache.misses")
+            return None
+        metrics.increment("answer_cache.hits")
+        return CachedAnswer(
+            answer=documents[0][0],
+            similarity=similarity,
+            age_seconds=now - float(created_at),
+        )
+
+    async def store(self, question: str, messages: list[BaseMessage]) -> bool:
+        """Store the answer of a first turn.
+
+        Args:
+            question: First message of the thread.
+            messages: Messages the turn produced; only the final answer is kept.
+
+        Returns:
+            Whether an answer was stored (turns ending without one aren't).
+        """
+        answer = _answer_text(messages)
+        if answer is None:
+            return False
+        question = _normalize(question)
+        now = time.time()
+        try:
+            vectors: list[PyEmbedding] = [await self._embed(question)]
+            await asyncio.to_thread(
+                self._collection.add,
+                ids=[uuid.uuid4().hex],
+                embeddings=vectors,
+                documents=[answer],
+                metadatas=[{
+                    "namespace": self._namespace,
+                    "created_at": now,
+                    "expires_at": now + self._ttl,
+                }],
+            )
+            self._stores += 1
+            if self._stores % _PRUNE_EVERY == 0:
+                await asyncio.to_thread(self.prune)
+        except Exception as e:
+            logger.warning(f"Storing answer in cache failed: {e}")
+            get_metrics().increment("answer_cache.errors")
+            return False
+        get_metrics().increment("answer_cache.stores")
+        return True
+
+    def prune(self) -> None:
+        """Delete answers past their TTL."""
+        self._collection.delete(where=_expiry("$lt", time.time()))
+
+    async def route(
+        self, agent: Any, config: RunnableConfig, message: str
+    ) -> list[BaseMessage] | None:
+        """Answer a thread's first message from the cache, if possible.
+
+        Args:
+            agent: Compiled agent whose thread checkpoint records the exchange.
+            config: Thread configuration of the agent; must be a new thread.
+            message: User message.
+
+        Returns:
+            The turn's messages (question and cached answer), or None if the
+            agent must answer.
+        """
+        cached = await self.lookup(message)
+        if cached is None:
+            return None
+        answer = AIMessage(
+            content=cached.answer,
+            response_metadata={CACHED_ANSWER_KEY: {
+                "similarity": round(cached.similarity, 4),
+                "age_seconds": round(cached.age_seconds),
+            }},
+        )
+        messages: list[BaseMessage] = [HumanMessage(content=message), answer]
+        # Recorded as the agent's output, so follow-up turns see the answer
+        await agent.aupdate_state(config, {"messages": messages}, as_node="agent")
+        return messages
+
+
+def is_cached_answer(message: BaseMessage) -> bool:
+    """Check whether a message is an answer served from the answer cache."""
+    return CACHED_ANSWER_KEY in getattr(message, "response_metadata", {})
+
+
+def _hit_rate() -> float:
+    metrics = get_metrics()
+    hits = metrics.counter("answer_cache.hits")
+    lookups = hits + metrics.counter("answer_cache.misses")
+    return hits / lookups if lookups else 0.0
@@ -0,0 +1,367 @@
+"""Content-addressed storage for large tool outputs kept out of checkpoints."""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import BaseMessage, ToolMessage
+from langgraph.checkpoint.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ..monitoring import get_metrics
+
+# Key in ToolMessage.additional_kwargs holding the hash of the offloaded content
+BLOB_REF_KEY = "blob_ref"
+
+
+class BlobStore(ABC):
+    """Content-addressed store: each distinct payload is kept once under its hash."""
+
+    def __init__(self, cache_size: int = 64):
+        """Initialize the store.
+
+        Args:
+            cache_size: Number of recently read payloads kept in memory.
+        """
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def key_for(text: str) -> str:
+        """Compute the content address of a payload.
+
+        Args:
+            text: Payload to address.
+
+        Returns:
+            Hex SHA-256 digest of the UTF-8 payload.
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def put(self, text: str) -> str:
+        """Store a payload unless an identical one is already stored.
+
+        Args:
+            text: Payload to store.
+
+        Returns:
+            Content address of the payload.
+        """
+        key = self.key_for(text)
+        metrics = get_metrics()
+        if self._write(key, text):
+            metrics.increment("blobs.stored")
+            metrics.increment("blobs.stored_bytes", len(text))
+        else:
+            metrics.increment("blobs.deduplicated")
+        return key
+
+    def get(self, key: str) -> str:
+        """Read a payload by its content address.
+
+        Args:
+            key: Content address returned by ``put``.
+
+        Returns:
+            Stored payload.
+
+        Raises:
+            KeyError: If no payload is stored under the key.
+        """
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        text = self._read(key)
+        get_metrics().increment("blobs.reads")
+        if not self._cache_size:
+            return text
+        with self._cache_lock:
+            self._cache[key] = text
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return text
+
+    @abstractmethod
+    def touch(self, key: str) -> None:
+        """Mark a payload as still referenced, deferring its pruning.
+
+        Args:
+            key: Content address of the payload.
+        """
+        pass
+
+    @abstractmethod
+    def _write(self, key: str, text: str) -> bool:
+        """Store a payload, returning False if it already existed."""
+        pass
+
+    @abstractmethod
+    def _read(self, key: str) -> str:
+        """Read a payload, raising KeyError if it does not exist."""
+        pass
+
+    @abstractmethod
+    def prune(self, max_idle_seconds: float) -> int:
+        """Delete payloads not written or touched for a while.
+
+        Args:
+            max_idle_seconds: Idle time after which a payload is deleted.
+
+        Returns:
+            Number of payloads deleted.
+        """
+        pass
+
+
+class InMemoryBlobStore(BlobStore):
+    """Blob store held in process memory."""
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        # Payloads are already in memory, so no read cache is needed
+        super().__init__(cache_size=0)
+        self._blobs: dict[str, str] = {}
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def touch(self, key: str) -> None:
+        """Mark a payload as still referenced, deferring its pruning.
+
+        Args:
+            key: Content address of the payload.
+        """
+        if key in self._blobs:
+            self._touched[key] = time.monotonic()
+
+    def _write(self, key: str, text: str) -> bool:
+        with self._lock:
+            self._touched[key] = time.monotonic()
+            if key in self._blobs:
+                return False
+            self._blobs[key] = text
+            return True
+
+    def _read(self, key: str) -> str:
+        return self._blobs[key]
+
+    def prune(self, max_idle_seconds: float) -> int:
+        """Delete payloads not written or touched for a while.
+
+        Args:
+            max_idle_seconds: Idle time after which a payload is deleted.
+
+        Returns:
+            Number of payloads deleted.
+        """
+        cutoff = time.monotonic() - max_idle_seconds
+        with self._lock:
+            stale = [key for key, touched in self._touched.items() if touched < cutoff]
+            for key in stale:
+                del self._touched[key]
+                self._blobs.pop(key, None)
+        return len(stale)
+
+
+class FileBlobStore(BlobStore):
+    """Blob store on disk, one file per payload sharded by hash prefix.
+
+    File modification times record when a payload was last referenced, so
+    pruning survives restarts.
+    """
+
+    def __init__(self, directory: str | Path, cache_size: int = 64):
+        """Initialize the store.
+
+        Args:
+            directory: Directory holding the payload files.
+            cache_size: Number of recently read payloads kept in memory.
+        """
+        super().__init__(cache_size=cache_size)
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        # Last touch per key, to avoid a utime syscall on every checkpoint
+        self._touched: dict[str, float] = {}
+
+    def _path(self, key: str) -> Path:
+        return self._directory / key[:2] / key[2:]
+
+    def touch(self, key: str) -> None:
+        """Mark a payload as still referenced, deferring its pruning.
+
+        Args:
+            key: Content address of the payload.
+        """
+        now = time.time()
+        if now - self._touched.get(key, 0.0) < 60:
+            return
+        self._touched[key] = now
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(self._path(key))
+
+    def _write(self, key: str, text: str) -> bool:
+        path = self._path(key)
+        if path.exists():
+            self.touch(key)
+            return False
+        path.parent.mkdir(exist_ok=True)
+        # Write to a temporary file and rename, so readers never see partial blobs
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        self._touched[key] = time.time()
+        return True
+
+    def _read(self, key: str) -> str:
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def prune(self, max_idle_seconds: float) -> int:
+        """Delete payloads not written or touched for a while.
+
+        Args:
+            max_idle_seconds: Idle time after which a payload is deleted.
+
+        Returns:
+            Number of payloads deleted.
+        """
+        cutoff = time.time() - max_idle_seconds
+        deleted = 0
+        for path in self._directory.glob("*/*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    deleted += 1
+            except FileNotFoundError:
+                continue
+        # Forget keys not touched since the cutoff, whether or not their file was here
+        self._touched = {key: at for key, at in self._touched.items() if at >= cutoff}
+        return deleted
+
+
+class BlobOffloadingSerializer(SerializerProtocol):
+    """Checkpoint serializer that moves large tool outputs into a blob store.
+
+    Tool messages whose content exceeds ``threshold`` characters are
+    serialized with a short placeholder and the content's hash; the content
+    itself is written once to the blob store. Deserialization keeps the
+    placeholder, so checkpoints load without touching the store; callers
+    that need the text resolve it with ``resolve_message``.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        threshold: int = 2048,
+        serde: SerializerProtocol | None = None,
+    ):
+        """Initialize the serializer.
+
+        Args:
+            store: Store receiving offloaded tool outputs.
+            threshold: Minimum content length (characters) to offload.
+            serde: Serializer for the rewritten objects. Defaults to LangGraph's.
+        """
+        self._store = store
+        self._threshold = threshold
+        self._serde = serde or JsonPlusSerializer()
+
+    @property
+    def store(self) -> BlobStore:
+        """Store receiving offloaded tool outputs."""
+        return self._store
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        """Serialize an object, offloading large tool outputs.
+
+        Args:
+            obj: Object to serialize (checkpoint, channel value or write).
+
+        Returns:
+            ``(type, bytes)`` pair from the wrapped serializer.
+        """
+        return self._serde.dumps_typed(self._offload(obj))
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        """Deserialize an object, leaving offloaded content as placeholders.
+
+        Args:
+            data: ``(type, bytes)`` pair produced by ``dumps_typed``.
+
+        Returns:
+            Deserialized object.
+        """
+        return self._serde.loads_typed(data)
+
+    def _offload(self, obj: Any) -> Any:
+        """Rewrite large tool messages nested in ``obj``, copying only what changes."""
+        if isinstance(obj, ToolMessage):
+            ref = obj.additional_kwargs.get(BLOB_REF_KEY)
+            if ref:
+                # Already stored: keep the reference alive, and drop the text
+                # again if this is a resolved copy
+                self._store.touch(ref)
+                if len(obj.content) < self._threshold:
+                    return obj
+                return obj.model_copy(update={"content": _placeholder(ref, len(obj.content))})
+            if not isinstance(obj.content, str) or len(obj.content) < self._threshold:
+                return obj
+            key = self._store.put(obj.content)
+            get_metrics().increment("blobs.offloaded_messages")
+            return obj.model_copy(update={
+                "content": _placeholder(key, len(obj.content)),
+                "additional_kwargs": {**obj.additional_kwargs, BLOB_REF_KEY: key},
+            })
+        if isinstance(obj, dict):
+            rewritten = {k: self._offload(v) for k, v in obj.items()}
+            changed = any(rewritten[k] is not v for k, v in obj.items())
+            return rewritten if changed else obj
+        if isinstance(obj, (list, tuple)):
+            rewritten_items = [self._offload(v) for v in obj]
+            if all(new is old for new, old in zip(rewritten_items, obj, strict=True)):
+                return obj
+            return type(obj)(rewritten_items) if isinstance(obj, list) else tuple(rewritten_items)
+        return obj
+
+
+def _placeholder(key: str, length: int) -> str:
+    return f"[tool output of {length} characters stored out of band as sha256:{key}]"
+
+
+def resolve_message(message: BaseMessage, store: BlobStore | None) -> BaseMessage:
+    """Restore the content of a message whose tool output was offloaded.
+
+    Args:
+        message: Message loaded from a checkpoint.
+        store: Store holding offloaded content (None if offloading is off).
+
+    Returns:
+        The message itself, or a copy with its original content. The copy
+        keeps its reference, so serializing it again does not re-store it.
+    """
+    if store is None or not isinstance(message, ToolMessage):
+        return message
+    key = message.additional_kwargs.get(BLOB_REF_KEY)
+    if not key:
+        return message
+    try:
+        content = store.get(key)
+    except KeyError:
+        # Pruned blob: keep the placeholder rather than failing the turn
+        return message
+    return message.model_copy(update={"content": content})
@@ -0,0 +1,669 @@
+"""Disk-backed checkpointer for conversation state."""
+
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+from ..monitoring import get_metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+"""
+
+# Row layouts: (thread_id, ns, checkpoint_id, parent_id, type, blob, metadata_type, metadata)
+CheckpointRow = tuple[str, str, str, str | None, str, bytes, str, bytes]
+# (thread_id, ns, checkpoint_id, task_id, idx, channel, type, value, task_path)
+WriteRow = tuple[str, str, str, str, int, str, str, bytes, str]
+# (thread_id, ns, channel, version, type, value); type "empty" for channels without a value
+BlobRow = tuple[str, str, str, str, str, bytes | None]
+
+
+class _CachedThread:
+    """Serialized latest checkpoint of a thread namespace, its channel values and writes."""
+
+    __slots__ = ("row", "blobs", "writes", "nbytes")
+
+    def __init__(
+        self,
+        row: CheckpointRow,
+        blobs: dict[str, BlobRow],
+        writes: dict[tuple[str, int], WriteRow],
+    ):
+        self.row = row
+        self.blobs = blobs
+        self.writes = writes
+        self.nbytes = (
+            len(row[5])
+            + len(row[7])
+            + sum(len(b[5] or b"") for b in blobs.values())
+            + sum(len(w[7]) for w in writes.values())
+        )
+
+    def add_write(self, write: WriteRow) -> int:
+        """Store a write, returning the change in cached bytes."""
+        key = (write[3], write[4])
+        if key in self.writes and write[4] >= 0:
+            return 0
+        previous = self.writes.get(key)
+        self.writes[key] = write
+        delta = len(write[7]) - (len(previous[7]) if previous else 0)
+        self.nbytes += delta
+        return delta
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """LangGraph checkpointer persisted in SQLite (WAL mode).
+
+    Writes are buffered and committed in batches, either when the batch is
+    full or every ``flush_interval`` seconds by a background flusher. The
+    latest checkpoint of recently used threads is kept in an in-memory LRU
+    bounded by ``cache_max_bytes``, so hot threads are served without
+    touching disk while idle threads cost no memory at all.
+
+    Channel values are stored apart from the checkpoint, one row per channel
+    version, so each step writes only the channels it changed.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        serde: SerializerProtocol | None = None,
+    ):
+        """Initialize the SQLite checkpointer.
+
+        Args:
+            path: Database file path (``:memory:`` for a throwaway database).
+            cache_max_bytes: Memory budget for the hot-thread LRU cache.
+            batch_size: Number of buffered rows that triggers a flush.
+            flush_interval: Maximum seconds buffered rows wait before a flush.
+            serde: Serializer for checkpoints. Defaults to LangGraph's.
+        """
+        super().__init__(serde=serde)
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._path = str(path)
+        self._cache_max_bytes = cache_max_bytes
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._pending_checkpoints: list[CheckpointRow] = []
+        self._pending_blobs: list[BlobRow] = []
+        self._pending_writes: list[WriteRow] = []
+        self._cache: OrderedDict[tuple[str, str], _CachedThread] = OrderedDict()
+        self._cache_bytes = 0
+
+        self._closed = threading.Event()
+        self._flusher: threading.Thread | None = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically,
+                name="sqlite-checkpoint-flusher",
+                daemon=True,
+            )
+            self._flusher.start()
+
+    @property
+    def cache_bytes(self) -> int:
+        """Bytes currently held by the hot-thread cache."""
+        return self._cache_bytes
+
+    @property
+    def pending_rows(self) -> int:
+        """Rows buffered in memory and not yet committed to disk."""
+        with self._lock:
+            return (
+                len(self._pending_checkpoints)
+                + len(self._pending_blobs)
+                + len(self._pending_writes)
+            )
+
+    # Write path
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Buffer a checkpoint for writing and cache it as the thread's latest.
+
+        Only the values of the channels in ``new_versions`` are serialized;
+        the others are already stored under their current version.
+
+        Args:
+            config: Config of the parent checkpoint.
+            checkpoint: Checkpoint to save.
+            metadata: Metadata to save with the checkpoint.
+            new_versions: New channel versions as of this write.
+
+        Returns:
+            Config pointing at the saved checkpoint.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values = checkpoint.get("channel_values", {})
+        blobs: list[BlobRow] = []
+        for channel, version in new_versions.items():
+            if channel in values:
+                value_type, value_blob = self.serde.dumps_typed(values[channel])
+            else:
+                value_type, value_blob = "empty", None
+            blobs.append(
+                (thread_id, checkpoint_ns, channel, str(version), value_type, value_blob)
+            )
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(
+            {**checkpoint, "channel_values": {}}
+        )
+        metadata_type, metadata_blob = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        row: CheckpointRow = (
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            config["configurable"].get("checkpoint_id"),
+            checkpoint_type,
+            checkpoint_blob,
+            metadata_type,
+            metadata_blob,
+        )
+
+        with self._lock:
+            self._pending_checkpoints.append(row)
+            self._pending_blobs.extend(blobs)
+            key = (thread_id, checkpoint_ns)
+            cached = self._cache.get(key)
+            if cached is None or cached.row[2] <= row[2]:
+                current = _current_blobs(cached, checkpoint["channel_versions"], blobs)
+                if current is not None:
+                    self._cache_put(key, _CachedThread(row, current, {}))
+                elif cached is not None:
+                    # Unchanged values aren't cached: the next read loads them from disk
+                    self._cache_bytes -= self._cache.pop(key).nbytes
+            self._maybe_flush()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Buffer intermediate writes linked to a checkpoint.
+
+        Args:
+            config: Config of the checkpoint the writes belong to.
+            writes: ``(channel, value)`` pairs to save.
+            task_id: Identifier of the task creating the writes.
+            task_path: Path of the task creating the writes.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows: list[WriteRow] = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_blob = self.serde.dumps_typed(value)
+            rows.append((
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                value_type,
+                value_blob,
+                task_path,
+            ))
+
+        with self._lock:
+            self._pending_writes.extend(rows)
+            key = (thread_id, checkpoint_ns)
+            cached = self._cache.get(key)
+            if cached is not None and cached.row[2] == checkpoint_id:
+                for row in rows:
+                    self._cache_bytes += cached.add_write(row)
+                self._cache.move_to_end(key)
+                self._evict()
+            self._maybe_flush()
+
+    def flush(self) -> None:
+        """Commit all buffered rows to disk in a single transaction."""
+        with self._lock:
+            if not self._pending_checkpoints and not self._pending_writes:
+                return
+            checkpoints, self._pending_checkpoints = self._pending_checkpoints, []
+            blobs, self._pending_blobs = self._pending_blobs, []
+            writes, self._pending_writes = self._pending_writes, []
+
+            started = time.perf_counter()
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    checkpoints,
+                )
+                self._conn.executemany("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs)
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [w for w in writes if w[4] >= 0],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [w for w in writes if w[4] < 0],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                # Keep the rows so the next flush retries them
+                self._pending_checkpoints[:0] = checkpoints
+                self._pending_blobs[:0] = blobs
+                self._pending_writes[:0] = writes
+                raise
+
+        metrics = get_metrics()
+        metrics.increment("checkpoint.flushes")
+        metrics.observe("checkpoint.flush_rows", len(checkpoints) + len(blobs) + len(writes))
+        metrics.observe("checkpoint.flush_seconds", time.perf_counter() - started)
+
+    def _maybe_flush(self) -> None:
+        pending = (
+            len(self._pending_checkpoints) + len(self._pending_blobs) + len(self._pending_writes)
+        )
+        if pending >= self._batch_size:
+            self.flush()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self._flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Rows stay buffered; the next tick retries
+                continue
+
+    # Hot-thread cache
+
+    def _cache_put(self, key: tuple[str, str], entry: _CachedThread) -> None:
+        previous = self._cache.pop(key, None)
+        if previous is not None:
+            self._cache_bytes -= previous.nbytes
+        self._cache[key] = entry
+        self._cache_bytes += entry.nbytes
+        self._evict()
+
+    def _evict(self) -> None:
+        # Always keep the most recently used entry, even if it alone exceeds the budget
+        while self._cache_bytes > self._cache_max_bytes and len(self._cache) > 1:
+            _, entry = self._cache.popitem(last=False)
+            self._cache_bytes -= entry.nbytes
+            get_metrics().increment("checkpoint.cache_evictions")
+
+    # Read path
+
+    def _load_writes(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> dict[tuple[str, int], WriteRow]:
+        rows = self._conn.execute(
+            "SELECT * FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return {(row[3], row[4]): row for row in rows}
+
+    def _load_blobs(
+        self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> dict[str, BlobRow]:
+        blobs: dict[str, BlobRow] = {}
+        for channel, version in versions.items():
+            row = self._conn.execute(
+                "SELECT * FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is not None:
+                blobs[channel] = row
+        return blobs
+
+    def _to_tuple(
+        self,
+        row: CheckpointRow,
+        writes: dict[tuple[str, int], WriteRow],
+        blobs: dict[str, BlobRow] | None = None,
+    ) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id = row[:4]
+        checkpoint = self.serde.loads_typed((row[4], row[5]))
+        if blobs is None:
+            with self._lock:
+                blobs = self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"])
+        # Checkpoints written before values were stored apart still hold them inline
+        values = dict(checkpoint.get("channel_values") or {})
+        for channel, (*_, value_type, value) in blobs.items():
+            if channel not in values and value_type != "empty" and value is not None:
+                values[channel] = self.serde.loads_typed((value_type, value))
+        checkpoint["channel_values"] = values
+        ordered = sorted(writes.values(), key=lambda w: writes_sort_key(w[8], w[3], w[4]))
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=checkpoint,
+            metadata=self.serde.loads_typed((row[6], row[7])),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (w[3], w[5], self.serde.loads_typed((w[6], w[7]))) for w in ordered
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        """Get a checkpoint tuple, from the hot-thread cache when possible.
+
+        Args:
+            config: Config identifying the thread and optionally the checkpoint.
+
+        Returns:
+            The checkpoint tuple, or None if not found.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        key = (thread_id, checkpoint_ns)
+        metrics = get_metrics()
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and checkpoint_id in (None, cached.row[2]):
+                self._cache.move_to_end(key)
+                metrics.increment("checkpoint.cache_hits")
+                row, blobs, writes = cached.row, dict(cached.blobs), dict(cached.writes)
+            else:
+                metrics.increment("checkpoint.cache_misses")
+                self.flush()
+                if checkpoint_id:
+                    row = self._conn.execute(
+                        "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                        "AND checkpoint_id = ?",
+                        (thread_id, checkpoint_ns, checkpoint_id),
+                    ).fetchone()
+                else:
+                    row = self._conn.execute(
+                        "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                        "ORDER BY checkpoint_id DESC LIMIT 1",
+                        (thread_id, checkpoint_ns),
+                    ).fetchone()
+                if row is None:
+                    return None
+                writes = self._load_writes(thread_id, checkpoint_ns, row[2])
+                versions = self.serde.loads_typed((row[4], row[5]))["channel_versions"]
+                blobs = self._load_blobs(thread_id, checkpoint_ns, versions)
+                if checkpoint_id is None:
+                    self._cache_put(key, _CachedThread(row, dict(blobs), dict(writes)))
+
+        return self._to_tuple(row, writes, blobs)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first.
+
+        Args:
+            config: Base config for filtering (thread, namespace, checkpoint).
+            filter: Metadata key/value pairs that must match.
+            before: Only list checkpoints created before this one.
+            limit: Maximum number of checkpoints to return.
+
+        Yields:
+            Matching checkpoint tuples.
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                f"SELECT * FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+
+        remaining = limit
+        for row in rows:
+            if remaining is not None and remaining <= 0:
+                break
+            if filter:
+                metadata = self.serde.loads_typed((row[6], row[7]))
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            with self._lock:
+                writes = self._load_writes(row[0], row[1], row[2])
+            if remaining is not None:
+                remaining -= 1
+            yield self._to_tuple(row, writes)
+
+    def thread_sizes(self) -> dict[str, int]:
+        """Get the stored size of every thread.
+
+        Returns:
+            Mapping of thread ID to bytes of checkpoints, channel values and
+            writes on disk.
+        """
+        with self._lock:
+            self.flush()
+            sizes: dict[str, int] = {}
+            for thread_id, nbytes in self._conn.execute(
+                "SELECT thread_id, SUM(LENGTH(checkpoint) + LENGTH(metadata)) "
+                "FROM checkpoints GROUP BY thread_id"
+            ):
+                sizes[thread_id] = nbytes or 0
+            for table, column in (("blobs", "blob"), ("writes", "value")):
+                for thread_id, nbytes in self._conn.execute(
+                    f"SELECT thread_id, SUM(LENGTH({column})) FROM {table} GROUP BY thread_id"
+                ):
+                    sizes[thread_id] = sizes.get(thread_id, 0) + (nbytes or 0)
+        return sizes
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints, channel values and writes of a thread, buffered or on disk.
+
+        Args:
+            thread_id: Thread ID to delete.
+        """
+        with self._lock:
+            self._pending_checkpoints = [
+                r for r in self._pending_checkpoints if r[0] != thread_id
+            ]
+            self._pending_blobs = [b for b in self._pending_blobs if b[0] != thread_id]
+            self._pending_writes = [w for w in self._pending_writes if w[0] != thread_id]
+            for key in [k for k in self._cache if k[0] == thread_id]:
+                self._cache_bytes -= self._cache.pop(key).nbytes
+            self._conn.execute("BEGIN")
+            try:
+                for table in ("checkpoints", "blobs", "writes"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        """Flush buffered rows and close the database."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    # Async API (SQLite I/O runs in a worker thread to keep the event loop free)
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        """Async version of ``get_tuple``."""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Async version of ``list``."""
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Async version of ``put``."""
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Async version of ``put_writes``."""
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Async version of ``delete_thread``."""
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: str | None, _channel: None) -> str:
+        """Generate the next (monotonically increasing) channel version."""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def _current_blobs(
+    cached: _CachedThread | None, versions: ChannelVersions, new: list[BlobRow]
+) -> dict[str, BlobRow] | None:
+    """Combine a checkpoint's new channel values with the unchanged cached ones.
+
+    Returns:
+        Values of every channel at its version in ``versions``, or None if
+        some unchanged value isn't cached.
+    """
+    blobs = {blob[2]: blob for blob in new}
+    for channel, version in versions.items():
+        if channel in blobs:
+            continue
+        previous = cached.blobs.get(channel) if cached is not None else None
+        if previous is None or previous[3] != str(version):
+            return None
+        blobs[channel] = previous
+    return blobs
@@ -0,0 +1,293 @@
+"""Fast path answering identifier lookups without the LLM loop.
+
+Messages that only ask for papers by arXiv ID, PMID or DOI ("get me
+2510.13422") are answered by fetching the papers directly with the search
+tools. The exchange is written to the thread checkpoint as the tool call and
+answer the agent would have produced, so follow-up turns see it.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from langchain.tools import BaseTool as LangChainBaseTool
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from ..monitoring import get_metrics
+from ..tools.papers import Paper, PaperRenderer, papers_from_output
+
+logger = logging.getLogger(__name__)
+
+# Identifiers in links to the paper
+_URL = re.compile(
+    r"https?://(?:www\.)?(?:"
+    r"arxiv\.org/(?:abs|pdf)/(?P<arxiv>[^\s?#]+?)(?:\.pdf)?"
+    r"|(?:dx\.)?doi\.org/(?P<doi>[^\s?#]+)"
+    r"|pubmed\.ncbi\.nlm\.nih\.gov/(?P<pmid>\d+)"
+    r")/?(?=[\s,;)]|$)",
+    re.IGNORECASE,
+)
+_DOI = re.compile(r"(?:\bdoi:?\s*)?\b(10\.\d{4,9}/[^\s,;]+)", re.IGNORECASE)
+_ARXIV_ID = re.compile(
+    r"(?:\barxiv:?\s*)?\b(\d{4}\.\d{4,5}(?:v\d+)?|[a-z][a-z\-]+(?:\.[A-Z]{2})?/\d{7}(?:v\d+)?)\b",
+    re.IGNORECASE,
+)
+# Labelled PMIDs of any length, bare numbers only of current PMID lengths
+_PMID = re.compile(r"\bpmid:?\s*(\d{1,8})\b|\b(\d{7,8})\b", re.IGNORECASE)
+_ARXIV_DOI = re.compile(r"^10\.48550/arxiv\.(.+)$", re.IGNORECASE)
+
+# Words that may surround identifiers in a plain lookup request
+_FILLER = frozenset({
+    "a", "abstract", "abstracts", "about", "and", "are", "article", "articles", "arxiv", "can",
+    "could", "details", "doi", "dois", "fetch", "find", "for", "get", "give", "hello", "hey",
+    "hi", "i", "id", "ids", "info", "information", "is", "lookup", "look", "me", "metadata",
+    "need", "of", "on", "open", "paper", "papers", "please", "pls", "preprint", "pmid",
+    "pmids", "publication", "pubmed", "pull", "retrieve", "show", "study", "thanks", "the",
+    "these", "this", "those", "up", "us", "want", "what", "with", "would", "you",
+})
+_WORD = re.compile(r"\w+")
+
+# More identifiers than this go through the agent
+_MAX_IDENTIFIERS = 10
+
+# Authors listed in an answer before "et al."
+_MAX_AUTHORS = 10
+
+
+@dataclass(frozen=True, slots=True)
+class Identifier:
+    """A paper identifier found in a message."""
+
+    kind: str  # "arxiv", "pmid" or "doi"
+    value: str
+
+    def matches(self, paper: Paper) -> bool:
+        """Check whether a fetched paper is the one identified."""
+        if self.kind == "arxiv":
+            return _strip_version(paper.arxiv_id) == _strip_version(self.value)
+        if self.kind == "pmid":
+            return paper.pmid == self.value
+        return paper.doi.lower() == self.value.lower()
+
+
+def _strip_version(arxiv_id: str) -> str:
+    return re.sub(r"v\d+$", "", arxiv_id.lower())
+
+
+def _identifier(kind: str, value: str) -> Identifier:
+    if kind == "doi":
+        value = value.rstrip(".)]")
+        arxiv = _ARXIV_DOI.match(value)
+        if arxiv:
+            return Identifier("arxiv", arxiv.group(1))
+    return Identifier(kind, value)
+
+
+def parse_identifiers(message: str) -> list[Identifier] | None:
+    """Extract the identifiers of a message that is only a lookup request.
+
+    Args:
+        message: User message.
+
+    Returns:
+        Identifiers in message order, or None if the message asks for more
+        than a lookup (other content words) or names no identifier.
+    """
+    found: list[tuple[int, Identifier]] = []
+
+    def take(pattern: re.Pattern[str], text: str) -> str:
+        def replace(match: re.Match[str]) -> str:
+            for kind in ("arxiv", "doi", "pmid"):
+                value = match.groupdict().get(kind)
+                if value:
+                    found.append((match.start(), _identifier(kind, value)))
+            return " " * len(match.group(0))
+
+        return pattern.sub(replace, text)
+
+    def take_group(pattern: re.Pattern[str], kind: str, text: str) -> str:
+        def replace(match: re.Match[str]) -> str:
+            value = next(group for group in match.groups() if group)
+            found.append((match.start(), _identifier(kind, value)))
+            return " " * len(match.group(0))
+
+        return pattern.sub(replace, text)
+
+    rest = take(_URL, message)
+    rest = take_group(_DOI, "doi", rest)
+    rest = take_group(_ARXIV_ID, "arxiv", rest)
+    rest = take_group(_PMID, "pmid", rest)
+
+    found.sort(key=lambda item: item[0])
+    identifiers = list(dict.fromkeys(identifier for _, identifier in found))
+    if not identifiers or len(identifiers) > _MAX_IDENTIFIERS:
+        return None
+    if any(word not in _FILLER for word in _WORD.findall(rest.lower())):
+        return None
+    return identifiers
+
+
+def format_papers(papers: list[Paper]) -> str:
+    """Format looked-up papers as the answer to the user.
+
+    Args:
+        papers: Papers in the order they were asked for.
+
+    Returns:
+        Markdown with each paper's title, authors, venue, ids and abstract.
+    """
+    blocks = []
+    for paper in papers:
+        lines = [f"**{paper.title}**"]
+        authors = ", ".join(paper.authors[:_MAX_AUTHORS])
+        if len(paper.authors) > _MAX_AUTHORS:
+            authors += " et al."
+        byline = " ".join(filter(None, (
+            authors,
+            f"({paper.year})" if paper.year else "",
+            f"*{paper.venue}*" if paper.venue else "",
+        )))
+        if byline:
+            lines.append(byline)
+        ids = [
+            f"{label}: {value}"
+            for label, value in (
+                ("arXiv", paper.arxiv_id), ("PMID", paper.pmid), ("DOI", paper.doi),
+            )
+            if value
+        ]
+        if paper.citations is not None:
+            ids.append(f"Citations: {paper.citations}")
+        if ids:
+            lines.append(" | ".join(ids))
+        if paper.url:
+            lines.append(paper.url)
+        if paper.abstract:
+            lines.append(f"\n{paper.abstract}")
+        blocks.append("\n".join(lines))
+    return "\n\n---\n\n".join(blocks)
+
+
+class FastPathRouter:
+    """Answer identifier-only messages by fetching the papers directly.
+
+    arXiv IDs are fetched with the ``arxiv`` tool, PMIDs and DOIs with the
+    ``pubmed`` tool. A message falls back to the agent when a lookup fails
+    or doesn't return every paper asked for. Outcomes are counted under
+    ``fastpath.*``; ``fastpath.hit_rate`` is the share of routed messages
+    answered here.
+    """
+
+    def __init__(
+        self,
+        tools: dict[str, LangChainBaseTool],
+        renderer: PaperRenderer | None = None,
+    ):
+        """Initialize the router.
+
+        Args:
+            tools: Search tools by name (``arxiv`` and ``pubmed`` are used),
+                returning full records.
+            renderer: Renderer of the tool results recorded in the thread,
+                as the agent would have seen them. Defaults to the full text.
+        """
+        self._tools = tools
+        self._renderer = renderer
+
+        get_metrics().register_gauge("fastpath.hit_rate", _hit_rate)
+
+    def _plan(self, identifiers: list[Identifier]) -> dict[str, str] | None:
+        """Group identifiers into one query per tool."""
+        arxiv = [i.value for i in identifiers if i.kind == "arxiv"]
+        pubmed = [f"{i.value}[{i.kind}]" for i in identifiers if i.kind != "arxiv"]
+        plan = {}
+        if arxiv:
+            plan["arxiv"] = ", ".join(arxiv)
+        if pubmed:
+            plan["pubmed"] = " OR ".join(pubmed)
+        if any(name not in self._tools for name in plan):
+            return None
+        return plan
+
+    async def route(
+        self, agent: Any, config: RunnableConfig, message: str
+    ) -> list[BaseMessage] | None:
+        """Answer a message on the fast path if it is an identifier lookup.
+
+        Args:
+            agent: Compiled agent whose thread checkpoint records the exchange.
+            config: Thread configuration of the agent.
+            message: User message.
+
+        Returns:
+            The turn's messages (question, tool calls, results, answer), or
+            None if the message must go through the agent.
+        """
+        metrics = get_metrics()
+        identifiers = parse_identifiers(message)
+        plan = self._plan(identifiers) if identifiers else None
+        if identifiers is None or plan is None:
+            metrics.increment("fastpath.misses")
+            return None
+
+        start = time.perf_counter()
+        names = list(plan)
+        outputs = await asyncio.gather(
+            *(self._tools[name].ainvoke({"query": plan[name]}) for name in names),
+            return_exceptions=True,
+        )
+        papers: dict[str, list[Paper]] = {}
+        for name, output in zip(names, outputs, strict=True):
+            found = None if isinstance(output, BaseException) else papers_from_output(output, name)
+            if found is None:
+                logger.info("Fast path lookup with %s failed: %s", name, output)
+                metrics.increment("fastpath.fallbacks")
+                return None
+            papers[name] = found
+
+        ordered: list[Paper] = []
+        for identifier in identifiers:
+            name = "arxiv" if identifier.kind == "arxiv" else "pubmed"
+            paper = next((p for p in papers[name] if identifier.matches(p)), None)
+            if paper is None:
+                metrics.increment("fastpath.fallbacks")
+                return None
+            if paper not in ordered:
+                ordered.append(paper)
+
+        calls = [
+            {"name": name, "args": {"query": plan[name]}, "id": f"fastpath-{uuid.uuid4().hex}"}
+            for name in names
+        ]
+        messages: list[BaseMessage] = [
+            HumanMessage(content=message),
+            AIMessage(content="", tool_calls=calls),
+        ]
+        for name, call in zip(names, calls, strict=True):
+            found = papers[name]
+            content = (
+                await self._renderer.arender(found) if self._renderer is not None
+                else "\n\n".join(paper.to_text() for paper in found)
+            )
+            messages.append(
+                ToolMessage(content=content, name=name, tool_call_id=call["id"])
+            )
+        messages.append(AIMessage(content=format_papers(ordered)))
+
+        # Recorded as the agent's output, so the graph ends the turn here
+        await agent.aupdate_state(config, {"messages": messages}, as_node="agent")
+        metrics.increment("fastpath.hits")
+        metrics.observe("fastpath.latency_seconds", time.perf_counter() - start)
+        return messages
+
+
+def _hit_rate() -> float:
+    metrics = get_metrics()
+    hits = metrics.counter("fastpath.hits")
+    routed = hits + metrics.counter("fastpath.misses") + metrics.counter("fastpath.fallbacks")
+    return hits / routed if routed else 0.0
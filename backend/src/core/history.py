@@ -0,0 +1,359 @@
+"""Token-budgeted history trimming for the agent's prompt."""
+
+import json
+import logging
+import math
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any, NotRequired
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.constants import TAG_NOSTREAM
+from langgraph.prebuilt.chat_agent_executor import AgentState
+
+from ..monitoring import get_metrics
+from .blobs import BlobStore, resolve_message
+
+logger = logging.getLogger(__name__)
+
+# Approximate per-message overhead of the chat format, in tokens
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+# Characters per token used when no tiktoken encoding is available
+_CHARS_PER_TOKEN = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+SUMMARIZE_PROMPT = """Update the running summary of a research conversation.
+
+Keep the user's goals, the papers found (title, authors, year, identifiers) and any
+citations already corrected. Drop raw search output and small talk. Answer with the
+updated summary only, in at most {max_words} words.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}"""
+
+
+class ResearchAgentState(AgentState):
+    """Agent state extended with the rolling summary of folded-away turns."""
+
+    history_summary: NotRequired[str]
+    summarized_messages: NotRequired[int]
+
+
+@lru_cache
+def _encoding(model_name: str) -> Any:
+    """Load the tiktoken encoding for a model, or None if it is unavailable."""
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        pass
+    except Exception:
+        logger.warning("tiktoken encoding unavailable, estimating prompt tokens by length")
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        logger.warning("tiktoken encoding unavailable, estimating prompt tokens by length")
+        return None
+
+
+class TokenCounter:
+    """Count message tokens with tiktoken, caching results per message."""
+
+    def __init__(self, model_name: str, cache_size: int = 4096):
+        """Initialize the counter.
+
+        Args:
+            model_name: Model whose tokenizer to use.
+            cache_size: Number of per-message counts to remember.
+        """
+        self._encoding = _encoding(model_name)
+        self._cache: OrderedDict[tuple[str, str, int], int] = OrderedDict()
+        self._cache_size = cache_size
+
+    def count_text(self, text: str) -> int:
+        """Count the tokens of a string.
+
+        Args:
+            text: Text to count.
+
+        Returns:
+            Number of tokens (estimated if no encoding is available).
+        """
+        if not text:
+            return 0
+        if self._encoding is None:
+            return math.ceil(len(text) / _CHARS_PER_TOKEN)
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def count_message(self, message: BaseMessage) -> int:
+        """Count the tokens a message contributes to the prompt.
+
+        Args:
+            message: Message to count.
+
+        Returns:
+            Number of tokens, including tool call arguments.
+        """
+        text = message.text
+        key = (message.id, message.type, len(text)) if message.id else None
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        tokens = _MESSAGE_OVERHEAD_TOKENS + self.count_text(text)
+        if isinstance(message, AIMessage) and message.tool_calls:
+            tokens += self.count_text(json.dumps([
+                {"name": call["name"], "args": call["args"]} for call in message.tool_calls
+            ]))
+
+        if key is not None:
+            self._cache[key] = tokens
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_messages(self, messages: Sequence[BaseMessage]) -> int:
+        """Count the tokens of a message list.
+
+        Args:
+            messages: Messages to count.
+
+        Returns:
+            Total number of tokens.
+        """
+        return sum(self.count_message(message) for message in messages)
+
+
+class HistoryTrimmer:
+    """Pre-model hook keeping the agent's prompt under a token budget.
+
+    Before each LLM call, tool outputs from earlier turns are collapsed to a
+    short excerpt. If the prompt is still over budget, the oldest turns are
+    folded into a rolling summary (kept in the graph state, so each turn is
+    summarized only once) or dropped when no summarizer is configured. The
+    current turn is always sent in full, and the stored history is untouched.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        model_name: str,
+        summarizer: BaseChatModel | None = None,
+        stale_tool_chars: int = 600,
+        system_prompt: str = "",
+        summary_max_words: int = 300,
+        blob_store: BlobStore | None = None,
+    ):
+        """Initialize the trimmer.
+
+        Args:
+            max_tokens: Prompt budget in tokens (0 disables trimming).
+            model_name: Model whose tokenizer is used for counting.
+            summarizer: Chat model used to summarize old turns. Old turns are
+                dropped without a summary if omitted.
+            stale_tool_chars: Characters kept from tool outputs of earlier turns.
+            system_prompt: System prompt prepended by the agent, counted
+                against the budget.
+            summary_max_words: Target length of the rolling summary.
+            blob_store: Store holding tool outputs offloaded from checkpoints.
+                Only messages still inside the prompt window are resolved.
+        """
+        self._max_tokens = max_tokens
+        self._counter = TokenCounter(model_name)
+        self._summarizer = summarizer.with_config(tags=[TAG_NOSTREAM]) if summarizer else None
+        self._stale_tool_chars = stale_tool_chars
+        self._system_tokens = self._counter.count_text(system_prompt)
+        self._summary_max_words = summary_max_words
+        self._blob_store = blob_store
+
+    @property
+    def counter(self) -> TokenCounter:
+        """Token counter used for the budget."""
+        return self._counter
+
+    def as_hook(self) -> RunnableLambda:
+        """Wrap the trimmer as a LangGraph pre-model hook.
+
+        Returns:
+            Runnable with sync and async implementations.
+        """
+        return RunnableLambda(self.trim, afunc=self.atrim, name="trim_history")
+
+    def trim(self, state: dict[str, Any], config: RunnableConfig | None = None) -> dict[str, Any]:
+        """Build the LLM input for the current state (sync).
+
+        Args:
+            state: Agent state with ``messages``.
+            config: Run configuration, used for logging the thread ID.
+
+        Returns:
+            State update with ``llm_input_messages`` and the rolling summary.
+        """
+        plan = self._plan(state)
+        if plan["fold"]:
+            plan["summary"] = self._fold(plan["summary"], plan["fold"])
+        return self._finish(plan, config)
+
+    async def atrim(
+        self, state: dict[str, Any], config: RunnableConfig | None = None
+    ) -> dict[str, Any]:
+        """Build the LLM input for the current state (async).
+
+        Args:
+            state: Agent state with ``messages``.
+            config: Run configuration, used for logging the thread ID.
+
+        Returns:
+            State update with ``llm_input_messages`` and the rolling summary.
+        """
+        plan = self._plan(state)
+        if plan["fold"]:
+            plan["summary"] = await self._afold(plan["summary"], plan["fold"])
+        return self._finish(plan, config)
+
+    def _plan(self, state: dict[str, Any]) -> dict[str, Any]:
+        """Decide which messages to send, collapse or fold into the summary."""
+        messages: list[BaseMessage] = list(state["messages"])
+        summary = state.get("history_summary", "")
+        start = state.get("summarized_messages", 0)
+        if start > len(messages):
+            summary, start = "", 0
+        if self._blob_store is not None:
+            # Messages already folded into the summary are never dereferenced
+            messages[start:] = [resolve_message(m, self._blob_store) for m in messages[start:]]
+
+        before = self._system_tokens + self._counter.count_messages(messages)
+        plan = {
+            "messages": messages[start:],
+            "summary": summary,
+            "start": start,
+            "fold": [],
+            "collapsed": 0,
+            "before": before,
+        }
+        if self._max_tokens <= 0:
+            return plan
+
+        recent = messages[start:]
+        current = _current_turn_start(recent)
+        collapsed = 0
+        for i in range(current):
+            trimmed = self._collapse(recent[i])
+            if trimmed is not recent[i]:
+                recent[i] = trimmed
+                collapsed += 1
+
+        budget = self._max_tokens - self._system_tokens
+        total = self._counter.count_messages(recent) + self._summary_tokens(summary)
+        fold_until = 0
+        turn_starts = [i for i in range(1, current + 1) if isinstance(recent[i], HumanMessage)]
+        for turn_start in turn_starts:
+            if total <= budget:
+                break
+            total -= self._counter.count_messages(recent[fold_until:turn_start])
+            fold_until = turn_start
+
+        plan.update({
+            "messages": recent[fold_until:],
+            "start": start + fold_until,
+            "fold": recent[:fold_until],
+            "collapsed": collapsed,
+        })
+        return plan
+
+    def _collapse(self, message: BaseMessage) -> BaseMessage:
+        """Shorten a stale tool output, returning the message itself if short."""
+        if not isinstance(message, ToolMessage):
+            return message
+        text = message.text
+        if len(text) <= self._stale_tool_chars:
+            return message
+        excerpt = text[: self._stale_tool_chars].rstrip()
+        omitted = len(text) - len(excerpt)
+        return message.model_copy(
+            update={"content": f"{excerpt}\n[... {omitted} characters of earlier tool output omitted]"}
+        )
+
+    def _summary_tokens(self, summary: str) -> int:
+        if not summary:
+            return 0
+        return _MESSAGE_OVERHEAD_TOKENS + self._counter.count_text(summary)
+
+    def _summary_request(self, summary: str, messages: list[BaseMessage]) -> list[BaseMessage]:
+        transcript = "\n".join(f"{m.type}: {m.text}" for m in messages if m.text)
+        prompt = SUMMARIZE_PROMPT.format(
+            max_words=self._summary_max_words,
+            summary=summary or "(none)",
+            messages=transcript,
+        )
+        return [HumanMessage(content=prompt)]
+
+    def _fold(self, summary: str, messages: list[BaseMessage]) -> str:
+        """Fold messages into the rolling summary (unchanged without a summarizer)."""
+        if self._summarizer is None:
+            return summary
+        try:
+            return self._summarizer.invoke(self._summary_request(summary, messages)).text
+        except Exception:
+            logger.exception("History summarization failed, dropping old turns instead")
+            return summary
+
+    async def _afold(self, summary: str, messages: list[BaseMessage]) -> str:
+        """Async version of ``_fold``."""
+        if self._summarizer is None:
+            return summary
+        try:
+            response = await self._summarizer.ainvoke(self._summary_request(summary, messages))
+            return response.text
+        except Exception:
+            logger.exception("History summarization failed, dropping old turns instead")
+            return summary
+
+    def _finish(self, plan: dict[str, Any], config: RunnableConfig | None) -> dict[str, Any]:
+        """Assemble the LLM input and report the prompt size before and after."""
+        summary = plan["summary"]
+        llm_input = list(plan["messages"])
+        if summary:
+            llm_input.insert(0, SystemMessage(content=f"{SUMMARY_PREFIX}\n{summary}"))
+
+        after = self._system_tokens + self._counter.count_messages(llm_input)
+        metrics = get_metrics()
+        metrics.observe("history.prompt_tokens", plan["before"])
+        metrics.observe("history.trimmed_prompt_tokens", after)
+        if plan["collapsed"]:
+            metrics.increment("history.collapsed_tool_outputs", plan["collapsed"])
+        if plan["fold"]:
+            metrics.increment("history.folded_messages", len(plan["fold"]))
+
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+        logger.info(f"Prompt for thread {thread_id}: {plan['before']} -> {after} tokens")
+
+        return {
+            "llm_input_messages": llm_input,
+            "history_summary": summary,
+            "summarized_messages": plan["start"],
+        }
+
+
+def _current_turn_start(messages: Sequence[BaseMessage]) -> int:
+    """Index of the last human message, where the turn being answered starts."""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return i
+    return 0
@@ -0,0 +1,312 @@
+"""Exact-match cache of chat model responses.
+
+A response is reused when the model, its parameters and the messages sent
+are the same as an earlier call. Only deterministic calls are cached: models
+created with a temperature above 0 get no cache (see ``llm_cache_for``).
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import AIMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from ..config import get_settings
+from ..monitoring import get_metrics
+
+# Message fields that differ between otherwise identical calls
+_VOLATILE_FIELDS = frozenset({"response_metadata", "usage_metadata"})
+
+
+def canonicalize_prompt(prompt: str) -> str:
+    """Normalize a serialized prompt so equivalent message lists compare equal.
+
+    Keys are sorted, response and usage metadata dropped, and tool call ids
+    renumbered in order of appearance (they are random per call).
+
+    Args:
+        prompt: Messages as serialized by the chat model (JSON).
+
+    Returns:
+        Canonical JSON, or the prompt itself if it isn't JSON.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    call_ids: dict[str, str] = {}
+
+    def call_id(value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        return call_ids.setdefault(value, f"call-{len(call_ids)}")
+
+    def normalize(value: Any) -> Any:
+        if isinstance(value, list):
+            return [normalize(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        normalized = {}
+        for key, item in value.items():
+            if key in _VOLATILE_FIELDS:
+                continue
+            if key == "tool_call_id":
+                normalized[key] = call_id(item)
+            elif key == "tool_calls" and isinstance(item, list):
+                normalized[key] = [
+                    {**normalize(call), "id": call_id(call.get("id"))}
+                    if isinstance(call, dict) else call
+                    for call in item
+                ]
+            else:
+                normalized[key] = normalize(item)
+        return normalized
+
+    return json.dumps(normalize(messages), sort_keys=True, ensure_ascii=False)
+
+
+def _serialize(generations: Sequence[Generation]) -> str:
+    """Serialize generations, without ids or token usage of the original call."""
+    items: list[dict[str, Any]] = []
+    for generation in generations:
+        if isinstance(generation, ChatGeneration):
+            message = generation.message.model_copy(update={"id": None})
+            if isinstance(message, AIMessage):
+                message.usage_metadata = None
+            items.append({"message": message_to_dict(message)})
+        else:
+            items.append({"text": generation.text})
+    return json.dumps(items, ensure_ascii=False)
+
+
+def _deserialize(value: str) -> list[Generation]:
+    """Rebuild cached generations, giving tool calls fresh ids."""
+    generations: list[Generation] = []
+    for item in json.loads(value):
+        if "message" not in item:
+            generations.append(Generation(text=item["text"]))
+            continue
+        message = messages_from_dict([item["message"]])[0]
+        if isinstance(message, AIMessage) and message.tool_calls:
+            message = message.model_copy(update={
+                "tool_calls": [
+                    {**call, "id": f"call_{uuid.uuid4().hex[:24]}"} for call in message.tool_calls
+                ],
+                "additional_kwargs": {
+                    k: v for k, v in message.additional_kwargs.items() if k != "tool_calls"
+                },
+            })
+        generations.append(ChatGeneration(message=message))
+    return generations
+
+
+class LLMResponseCache(BaseCache):
+    """SQLite-backed cache of chat model responses with an in-memory LRU in front.
+
+    Keys hash the model configuration and the canonicalized messages. The
+    database is kept under ``max_bytes`` by evicting the least recently used
+    responses. Lookups are counted under ``llm_cache.*``;
+    ``llm_cache.hit_rate`` is the share of lookups answered from the cache.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ":memory:",
+        memory_entries: int = 256,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file (``:memory:`` for a process-local cache).
+            memory_entries: Number of responses kept in the in-memory LRU.
+            max_bytes: Total size of the stored responses (0 for no limit).
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        if str(path) != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)"
+        )
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_entries = memory_entries
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = self._stored_bytes()
+
+        metrics = get_metrics()
+        metrics.register_gauge("llm_cache.hit_rate", _hit_rate)
+        metrics.register_gauge("llm_cache.bytes", lambda: self._bytes)
+
+    @staticmethod
+    def key_for(prompt: str, llm_string: str) -> str:
+        """Compute the cache key of a model call.
+
+        Args:
+            prompt: Serialized messages.
+            llm_string: Serialized model name and parameters.
+
+        Returns:
+            Hex SHA-256 of the configuration and canonicalized messages.
+        """
+        return hashlib.sha256(f"{llm_string}\0{canonicalize_prompt(prompt)}".encode()).hexdigest()
+
+    def _stored_bytes(self) -> int:
+        return int(
+            self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        )
+
+    def _remember(self, key: str, value: str) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        """Look up the response of a model call.
+
+        Args:
+            prompt: Serialized messages.
+            llm_string: Serialized model name and parameters.
+
+        Returns:
+            The cached generations, or None on a miss.
+        """
+        key = self.key_for(prompt, llm_string)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is None:
+                row = self._conn.execute(
+                    "SELECT value FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                value = row[0] if row is not None else None
+            if value is not None:
+                self._conn.execute(
+                    "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                )
+                self._remember(key, value)
+        get_metrics().increment("llm_cache.hits" if value is not None else "llm_cache.misses")
+        return _deserialize(value) if value is not None else None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store the response of a model call.
+
+        Args:
+            prompt: Serialized messages.
+            llm_string: Serialized model name and parameters.
+            return_val: Generations returned by the model.
+        """
+        key = self.key_for(prompt, llm_string)
+        value = _serialize(return_val)
+        size = len(value.encode())
+        if self._max_bytes and size > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._remember(key, value)
+            self._bytes += size - (previous[0] if previous else 0)
+            if self._max_bytes and self._bytes > self._max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used responses until the store fits ``max_bytes``."""
+        # Other processes may share the file, so start from the stored total
+        self._bytes = self._stored_bytes()
+        evicted = 0
+        rows = self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY accessed_at"
+        ).fetchall()
+        for key, size in rows:
+            if self._bytes <= self._max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self._bytes -= size
+            evicted += 1
+        if evicted:
+            get_metrics().increment("llm_cache.evictions", evicted)
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        """Look up the response of a model call in a worker thread (SQLite I/O)."""
+        return await asyncio.to_thread(self.lookup, prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store the response of a model call in a worker thread (SQLite I/O)."""
+        await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    def clear(self, **_kwargs: Any) -> None:
+        """Delete every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._memory.clear()
+            self._bytes = 0
+
+    async def aclear(self, **_kwargs: Any) -> None:
+        """Delete every cached response."""
+        await asyncio.to_thread(self.clear)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _hit_rate() -> float:
+    metrics = get_metrics()
+    hits = metrics.counter("llm_cache.hits")
+    lookups = hits + metrics.counter("llm_cache.misses")
+    return hits / lookups if lookups else 0.0
+
+
+@lru_cache
+def get_llm_cache() -> LLMResponseCache:
+    """Get the process-wide LLM response cache configured from settings."""
+    settings = get_settings()
+    return LLMResponseCache(
+        path=settings.llm_cache_path,
+        memory_entries=settings.llm_cache_memory_entries,
+        max_bytes=settings.llm_cache_max_bytes,
+    )
+
+
+def llm_cache_for(temperature: float | None) -> LLMResponseCache | None:
+    """Get the response cache for a model created with a given temperature.
+
+    Args:
+        temperature: Sampling temperature of the model.
+
+    Returns:
+        The process-wide cache, or None if caching is disabled or the model
+        samples (temperature above 0), where a response is one draw of many.
+    """
+    if not get_settings().llm_cache_enabled or temperature is None or temperature > 0:
+        return None
+    return get_llm_cache()
@@ -1,43 +1,265 @@
 """Memory management for agent conversations."""
 
-from typing import Any
+import asyncio
+import logging
+import time
+from collections.abc import Callable
 
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, SerializerProtocol
 from langgraph.checkpoint.memory import MemorySaver
 
+from ..config import Settings, get_settings
+from ..monitoring import get_metrics
+from .blobs import (
+    BlobOffloadingSerializer,
+    BlobStore,
+    FileBlobStore,
+    InMemoryBlobStore,
+    resolve_message,
+)
+from .checkpoint import SQLiteCheckpointSaver
+from .thread_index import (
+    IndexedMemorySaver,
+    IndexedSQLiteCheckpointSaver,
+    ThreadIndex,
+    ThreadIndexMixin,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def create_blob_store(settings: Settings) -> BlobStore | None:
+    """Create the store for large tool outputs selected by settings.
+
+    Args:
+        settings: Application settings.
+
+    Returns:
+        Blob store, or None if offloading is disabled.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    backend = settings.blob_store_backend.lower()
+    if backend == "auto":
+        # Blobs must outlive the process whenever checkpoints do
+        backend = "disk" if settings.checkpointer_backend.lower() == "sqlite" else "memory"
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return InMemoryBlobStore()
+    if backend == "disk":
+        return FileBlobStore(settings.blob_store_path)
+    raise ValueError(f"Unknown blob store backend: {settings.blob_store_backend}")
+
+
+def create_thread_index(settings: Settings, blob_store: BlobStore | None = None) -> ThreadIndex:
+    """Create the message index for the checkpointer selected by settings.
+
+    Args:
+        settings: Application settings.
+        blob_store: Store for large tool outputs, shared with the checkpointer.
+
+    Returns:
+        Index on disk when checkpoints are persisted, in memory otherwise.
+    """
+    persistent = settings.checkpointer_backend.lower() == "sqlite"
+    return ThreadIndex(
+        settings.thread_index_path if persistent else ":memory:",
+        blob_store=blob_store,
+        blob_threshold=settings.blob_offload_threshold,
+    )
+
+
+def create_checkpointer(
+    settings: Settings,
+    serde: SerializerProtocol | None = None,
+) -> BaseCheckpointSaver:
+    """Create the checkpointer selected by settings.
+
+    Args:
+        settings: Application settings.
+        serde: Serializer for checkpoints. Defaults to LangGraph's.
+
+    Returns:
+        Checkpointer for the configured backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    backend = settings.checkpointer_backend.lower()
+    if backend == "memory":
+        return IndexedMemorySaver(serde=serde)
+    if backend == "sqlite":
+        return IndexedSQLiteCheckpointSaver(
+            settings.checkpoint_db_path,
+            cache_max_bytes=settings.checkpoint_cache_max_bytes,
+            batch_size=settings.checkpoint_batch_size,
+            flush_interval=settings.checkpoint_flush_interval,
+            serde=serde,
+        )
+    raise ValueError(f"Unknown checkpointer backend: {settings.checkpointer_backend}")
+
+
+# Eviction limits of in-memory threads when settings leave them unset
+_DEFAULT_TTL_SECONDS = 24 * 60 * 60
+_DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _thread_config(thread_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _memory_saver_thread_sizes(saver: MemorySaver) -> dict[str, int]:
+    """Measure the serialized size of every thread held by a MemorySaver.
+
+    Args:
+        saver: In-memory checkpointer.
+
+    Returns:
+        Mapping of thread ID to bytes of checkpoints, blobs and writes.
+    """
+    sizes: dict[str, int] = {}
+    for thread_id, namespaces in list(saver.storage.items()):
+        if not any(namespaces.values()):
+            # Lookups of unknown threads leave empty entries in the defaultdict
+            continue
+        sizes[thread_id] = sum(
+            len(checkpoint[1]) + len(metadata[1])
+            for checkpoints in namespaces.values()
+            for checkpoint, metadata, _parent in checkpoints.values()
+        )
+    for (thread_id, *_), (_type, blob) in list(saver.blobs.items()):
+        if thread_id in sizes:
+            sizes[thread_id] += len(blob)
+    for (thread_id, *_), writes in list(saver.writes.items()):
+        if thread_id in sizes:
+            sizes[thread_id] += sum(
+            len(value[1]) for _task, _channel, value, _path in writes.values()
+        )
+    return sizes
+
 
 class MemoryManager:
     """Manage conversation memory for the agent.
 
-    Wraps LangGraph's MemorySaver with additional functionality.
+    Wraps a LangGraph checkpointer (in-process MemorySaver or the disk-backed
+    SQLiteCheckpointSaver, selected via settings) with additional functionality.
     """
 
-    def __init__(self):
-        """Initialize memory manager."""
-        self._memory_saver = MemorySaver()
-        self._active_threads: dict[str, Any] = {}
+    def __init__(
+        self,
+        checkpointer: BaseCheckpointSaver | None = None,
+        ttl_seconds: float | None = None,
+        max_bytes: int | None = None,
+    ):
+        """Initialize memory manager.
+
+        Args:
+            checkpointer: Checkpointer to use. Defaults to the one selected by
+                settings, offloading large tool outputs to the configured blob store.
+            ttl_seconds: Idle time after which a thread is evicted (0 disables).
+                Defaults to settings.
+            max_bytes: Byte budget for all stored threads; least recently used
+                threads are evicted above it (0 disables). Defaults to settings.
+
+        Limits left unset in settings are disabled for a SQLite checkpointer,
+        since evicting a thread deletes its persisted history.
+        """
+        settings = get_settings()
+        if checkpointer is None:
+            store = create_blob_store(settings)
+            serde = (
+                BlobOffloadingSerializer(store, threshold=settings.blob_offload_threshold)
+                if store is not None
+                else None
+            )
+            checkpointer = create_checkpointer(settings, serde)
+            if isinstance(checkpointer, ThreadIndexMixin):
+                checkpointer.thread_index = create_thread_index(settings, store)
+        self._checkpointer = checkpointer
+        durable = isinstance(checkpointer, SQLiteCheckpointSaver)
+        if ttl_seconds is None:
+            ttl_seconds = settings.thread_ttl_seconds
+        if ttl_seconds is None:
+            ttl_seconds = 0 if durable else _DEFAULT_TTL_SECONDS
+        if max_bytes is None:
+            max_bytes = settings.thread_max_bytes
+        if max_bytes is None:
+            max_bytes = 0 if durable else _DEFAULT_MAX_BYTES
+        self._ttl_seconds = ttl_seconds
+        self._max_bytes = max_bytes
+        # Thread ID -> last access time (monotonic), in least-recently-used order
+        self._active_threads: dict[str, float] = {}
+        self._stored_bytes = 0
+
+        metrics = get_metrics()
+        metrics.register_gauge("memory.threads", lambda: len(self._active_threads))
+        metrics.register_gauge("memory.stored_bytes", lambda: self._stored_bytes)
 
     @property
-    def checkpointer(self) -> MemorySaver:
+    def checkpointer(self) -> BaseCheckpointSaver:
         """Get the underlying checkpointer.
 
         Returns:
-            MemorySaver instance for use with LangGraph agent.
+            Checkpointer instance for use with LangGraph agent.
         """
-        return self._memory_saver
+        return self._checkpointer
+
+    @property
+    def blob_store(self) -> BlobStore | None:
+        """Get the store holding offloaded tool outputs, if offloading is on."""
+        serde = getattr(self._checkpointer, "serde", None)
+        return serde.store if isinstance(serde, BlobOffloadingSerializer) else None
+
+    def resolve_messages(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Restore offloaded tool outputs in messages loaded from a checkpoint.
+
+        Args:
+            messages: Messages as stored in the checkpoint.
+
+        Returns:
+            Messages with their original content.
+        """
+        store = self.blob_store
+        if store is None:
+            return messages
+        return [resolve_message(message, store) for message in messages]
+
+    @property
+    def thread_index(self) -> ThreadIndex | None:
+        """Get the message index of the checkpointer, if it keeps one."""
+        if isinstance(self._checkpointer, ThreadIndexMixin):
+            return self._checkpointer.thread_index
+        return None
+
+    def close(self) -> None:
+        """Flush and release the checkpointer's resources, if it holds any."""
+        close = getattr(self._checkpointer, "close", None)
+        if callable(close):
+            close()
+        if self.thread_index is not None:
+            self.thread_index.close()
 
-    def get_config(self, thread_id: str) -> dict[str, Any]:
+    def _touch(self, thread_id: str) -> None:
+        self._active_threads.pop(thread_id, None)
+        self._active_threads[thread_id] = time.monotonic()
+
+    def get_config(self, thread_id: str) -> RunnableConfig:
         """Get configuration for a conversation thread.
 
+        Also marks the thread as recently used for eviction purposes.
+
         Args:
             thread_id: Unique identifier for the conversation.
 
         Returns:
             Configuration dict for the agent.
         """
-        if thread_id not in self._active_threads:
-            self._active_threads[thread_id] = {"created": True}
-
-        return {"configurable": {"thread_id": thread_id}}
+        self._touch(thread_id)
+        return _thread_config(thread_id)
 
     def list_threads(self) -> list[str]:
         """List all active thread IDs.
@@ -54,11 +276,13 @@ class MemoryManager:
             thread_id: Thread ID to check.
 
         Returns:
-            True if thread exists.
+            True if the thread is active or has stored checkpoints.
         """
-        return thread_id in self._active_threads
+        if thread_id in self._active_threads:
+            return True
+        return self._checkpointer.get_tuple(_thread_config(thread_id)) is not None
 
-    def create_thread(self, thread_id: str) -> dict[str, Any]:
+    def create_thread(self, thread_id: str) -> RunnableConfig:
         """Create a new conversation thread.
 
         Args:
@@ -67,11 +291,10 @@ class MemoryManager:
         Returns:
             Configuration for the new thread.
         """
-        self._active_threads[thread_id] = {"created": True}
         return self.get_config(thread_id)
 
     def delete_thread(self, thread_id: str) -> bool:
-        """Delete a conversation thread.
+        """Delete a conversation thread and purge all its checkpoints and writes.
 
         Args:
             thread_id: Thread ID to delete.
@@ -79,7 +302,145 @@ class MemoryManager:
         Returns:
             True if thread was deleted, False if not found.
         """
-        if thread_id in self._active_threads:
-            del self._active_threads[thread_id]
-            return True
-        return False
+        if not self.thread_exists(thread_id):
+            return False
+        self._checkpointer.delete_thread(thread_id)
+        self._active_threads.pop(thread_id, None)
+        get_metrics().increment("memory.deleted_threads")
+        return True
+
+    async def adelete_thread(self, thread_id: str) -> bool:
+        """Asynchronously delete a conversation thread.
+
+        Args:
+            thread_id: Thread ID to delete.
+
+        Returns:
+            True if thread was deleted, False if not found.
+        """
+        exists = thread_id in self._active_threads or (
+            await self._checkpointer.aget_tuple(_thread_config(thread_id)) is not None
+        )
+        if not exists:
+            return False
+        await self._checkpointer.adelete_thread(thread_id)
+        self._active_threads.pop(thread_id, None)
+        get_metrics().increment("memory.deleted_threads")
+        return True
+
+    def thread_sizes(self) -> dict[str, int]:
+        """Measure the stored size of every thread in the checkpointer.
+
+        Returns:
+            Mapping of thread ID to stored bytes.
+        """
+        if isinstance(self._checkpointer, SQLiteCheckpointSaver):
+            return self._checkpointer.thread_sizes()
+        if isinstance(self._checkpointer, MemorySaver):
+            return _memory_saver_thread_sizes(self._checkpointer)
+        return {}
+
+    def _select_victims(self, sizes: dict[str, int], protected: set[str]) -> list[tuple[str, str]]:
+        """Pick the threads to evict by TTL, then least recently used ones over budget.
+
+        Args:
+            sizes: Stored bytes of every thread.
+            protected: Thread IDs that must not be evicted.
+
+        Returns:
+            ``(thread_id, reason)`` pairs, in eviction order.
+        """
+        now = time.monotonic()
+        # Threads found in storage but never used by this process start their idle clock now
+        for thread_id in sizes:
+            if thread_id not in self._active_threads:
+                self._active_threads[thread_id] = now
+        self._active_threads = dict(sorted(self._active_threads.items(), key=lambda kv: kv[1]))
+
+        victims: dict[str, str] = {}
+        if self._ttl_seconds > 0:
+            for thread_id, last_used in self._active_threads.items():
+                if now - last_used < self._ttl_seconds:
+                    break
+                if thread_id not in protected:
+                    victims[thread_id] = "ttl"
+
+        total = sum(size for thread_id, size in sizes.items() if thread_id not in victims)
+        if self._max_bytes > 0 and total > self._max_bytes:
+            for thread_id in self._active_threads:
+                if total <= self._max_bytes:
+                    break
+                if thread_id in protected or thread_id in victims:
+                    continue
+                total -= sizes.get(thread_id, 0)
+                victims[thread_id] = "lru"
+
+        self._stored_bytes = total
+        return list(victims.items())
+
+    def _record_eviction(self, thread_id: str, reason: str, size: int) -> None:
+        self._active_threads.pop(thread_id, None)
+        metrics = get_metrics()
+        metrics.increment(f"memory.evicted_threads.{reason}")
+        metrics.increment("memory.evicted_bytes", size)
+
+    def _prune_blobs(self) -> None:
+        store = self.blob_store
+        if store is not None and self._ttl_seconds > 0:
+            # Referenced blobs are touched on every checkpoint of their thread;
+            # the extra margin covers threads whose idle clock restarted
+            pruned = store.prune(2 * self._ttl_seconds)
+            get_metrics().increment("blobs.pruned", pruned)
+
+    def sweep(self, protected: set[str] | None = None) -> list[str]:
+        """Evict idle threads by TTL, then least recently used ones over budget.
+
+        Args:
+            protected: Thread IDs that must not be evicted (e.g. with a run in flight).
+
+        Returns:
+            IDs of the evicted threads.
+        """
+        sizes = self.thread_sizes()
+        victims = self._select_victims(sizes, protected or set())
+        for thread_id, reason in victims:
+            self._checkpointer.delete_thread(thread_id)
+            self._record_eviction(thread_id, reason, sizes.get(thread_id, 0))
+        self._prune_blobs()
+        if victims:
+            logger.info(f"Evicted {len(victims)} idle conversation thread(s)")
+        return [thread_id for thread_id, _ in victims]
+
+    async def asweep(self, protected: Callable[[], set[str]] | None = None) -> list[str]:
+        """Asynchronously evict idle threads (see ``sweep``).
+
+        Victims are picked on the event loop, where threads are touched and
+        runs admitted; only disk reads and deletes run in worker threads.
+
+        Args:
+            protected: Returns the thread IDs that must not be evicted. It is
+                called again before each eviction, so threads that got a run
+                while the sweep was waiting on the disk are spared.
+
+        Returns:
+            IDs of the evicted threads.
+        """
+        current = protected or set
+        if not isinstance(self._checkpointer, SQLiteCheckpointSaver):
+            return self.sweep(current())
+
+        sizes = await asyncio.to_thread(self.thread_sizes)
+        selected_at = time.monotonic()
+        evicted: list[str] = []
+        for thread_id, reason in self._select_victims(sizes, current()):
+            size = sizes.get(thread_id, 0)
+            if thread_id in current() or self._active_threads.get(thread_id, 0) >= selected_at:
+                self._stored_bytes += size
+                continue
+            await self._checkpointer.adelete_thread(thread_id)
+            self._record_eviction(thread_id, reason, size)
+            evicted.append(thread_id)
+        await asyncio.to_thread(self._prune_blobs)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} idle conversation thread(s)")
+        return evicted
@@ -0,0 +1,197 @@
+"""Cancellable agent runs decoupled from the HTTP response lifecycle."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from ..monitoring import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Content recorded for tool calls that were aborted before returning
+CANCELLED_TOOL_RESULT = "Tool call cancelled: the client disconnected before it finished."
+
+# Sentinel marking the end of the agent's output queue
+_END = object()
+
+# Strong references to checkpoint repair tasks scheduled after cancellation
+_repair_tasks: set[asyncio.Task[None]] = set()
+
+
+class AgentRunCancelledError(Exception):
+    """Raised when iterating a run that was cancelled before it finished."""
+
+
+class AgentRun:
+    """A single agent invocation executing in its own task.
+
+    The agent is driven by a producer task that feeds an output queue, so the
+    run can be cancelled independently of whoever consumes it (e.g. when the
+    HTTP client disconnects). Cancelling the task cancels the in-flight LLM
+    call and any awaiting tool coroutines; the thread checkpoint is then
+    repaired so that no tool call is left without a result.
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        inputs: dict[str, Any],
+        config: RunnableConfig,
+        stream_mode: str | list[str] = "values",
+    ):
+        """Start an agent run.
+
+        Args:
+            agent: Compiled LangGraph agent.
+            inputs: Graph input (e.g. ``{"messages": [...]}``).
+            config: Thread configuration for the agent.
+            stream_mode: Stream mode(s) passed to ``agent.astream``.
+        """
+        self._agent = agent
+        self._inputs = inputs
+        self._config = config
+        self._stream_mode = stream_mode
+        self._multi_mode = isinstance(stream_mode, list)
+        self._queue: asyncio.Queue[Any] = asyncio.Queue()
+        self._pending_tool_calls: dict[str, str] = {}
+        self._llm_in_flight = False
+        self._chunks_emitted = 0
+        self._cancel_reason: str | None = None
+        self._task = asyncio.create_task(self._produce())
+        self._task.add_done_callback(self._on_done)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the run was cancelled before completing."""
+        return self._task.cancelled()
+
+    @property
+    def done(self) -> bool:
+        """Whether the run has finished (completed, failed or cancelled)."""
+        return self._task.done()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel the run if it is still executing.
+
+        Args:
+            reason: Short reason recorded in logs.
+        """
+        if not self._task.done():
+            self._cancel_reason = reason
+            self._task.cancel()
+
+    async def _produce(self) -> None:
+        try:
+            async for item in self._agent.astream(
+                self._inputs,
+                self._config,
+                stream_mode=self._stream_mode,
+            ):
+                self._track(item)
+                self._queue.put_nowait(item)
+        finally:
+            self._queue.put_nowait(_END)
+
+    def _track(self, item: Any) -> None:
+        """Keep track of outstanding work so cancellation can be accounted."""
+        self._chunks_emitted += 1
+        if not self._multi_mode:
+            return
+        mode, payload = item
+        if mode == "messages":
+            self._llm_in_flight = True
+            return
+        if mode != "updates":
+            return
+        for update in payload.values():
+            if not isinstance(update, dict):
+                continue
+            for message in update.get("messages", []):
+                if isinstance(message, AIMessage):
+                    self._llm_in_flight = False
+                    for tool_call in message.tool_calls:
+                        if tool_call["id"] is not None:
+                            self._pending_tool_calls[tool_call["id"]] = tool_call["name"]
+                elif isinstance(message, ToolMessage):
+                    self._pending_tool_calls.pop(message.tool_call_id, None)
+
+    def _on_done(self, task: asyncio.Task[None]) -> None:
+        if not task.cancelled():
+            return
+
+        metrics = get_metrics()
+        metrics.increment("chat.cancelled_runs")
+        metrics.increment("chat.cancelled_tool_calls", len(self._pending_tool_calls))
+        if self._llm_in_flight or not self._pending_tool_calls:
+            metrics.increment("chat.cancelled_llm_calls")
+        metrics.observe("chat.chunks_before_cancel", self._chunks_emitted)
+        logger.info(
+            "Agent run cancelled (%s) with %d pending tool call(s)",
+            self._cancel_reason or "consumer cancelled",
+            len(self._pending_tool_calls),
+        )
+
+        repair = asyncio.ensure_future(self._repair_checkpoint())
+        _repair_tasks.add(repair)
+        repair.add_done_callback(_repair_tasks.discard)
+
+    async def _repair_checkpoint(self) -> None:
+        """Answer tool calls left dangling by the cancellation.
+
+        A checkpoint whose last AI message requests tool calls without
+        matching tool results would be rejected by the model on the next turn.
+        """
+        try:
+            state = await self._agent.aget_state(self._config)
+            messages = state.values.get("messages", []) if state else []
+            answered: set[str] = set()
+            for message in reversed(messages):
+                if isinstance(message, ToolMessage):
+                    answered.add(message.tool_call_id)
+                elif isinstance(message, AIMessage):
+                    missing = [c for c in message.tool_calls if c["id"] not in answered]
+                    if missing:
+                        await self._agent.aupdate_state(
+                            self._config,
+                            {"messages": [
+                                ToolMessage(
+                                    content=CANCELLED_TOOL_RESULT,
+                                    name=call["name"],
+                                    tool_call_id=call["id"],
+                                )
+                                for call in missing
+                            ]},
+                            as_node="tools",
+                        )
+                    break
+        except Exception:
+            logger.exception("Failed to repair checkpoint after cancelled run")
+
+    async def wait_closed(self) -> None:
+        """Wait until the run and any checkpoint repair have finished."""
+        await asyncio.gather(self._task, return_exceptions=True)
+        if _repair_tasks:
+            await asyncio.gather(*_repair_tasks, return_exceptions=True)
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """Iterate over the items streamed by the agent.
+
+        Raises:
+            AgentRunCancelledError: If the run was cancelled.
+            Exception: Any error raised by the agent.
+        """
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                break
+            yield item
+
+        if self._task.cancelled():
+            raise AgentRunCancelledError(self._cancel_reason or "cancelled")
+        exc = self._task.exception()
+        if exc is not None:
+            raise exc
@@ -0,0 +1,259 @@
+"""Admission control and scheduling for agent runs."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from types import TracebackType
+
+from ..config import get_settings
+from ..monitoring import get_metrics
+
+
+class SchedulerSaturatedError(Exception):
+    """Raised when the run queue is full and a new run cannot be admitted."""
+
+    def __init__(self, retry_after: int):
+        """Initialize the error.
+
+        Args:
+            retry_after: Suggested number of seconds before retrying.
+        """
+        super().__init__(f"Agent run queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RunTicket:
+    """Reservation for one agent run, obtained from ``RunScheduler.reserve``.
+
+    Entering the ticket (``async with``) waits for the thread's previous run
+    to finish and for a global execution slot, in FIFO order. Exiting it frees
+    both. A ticket that is never entered must be released with ``release()``.
+    """
+
+    def __init__(self, scheduler: "RunScheduler", thread_id: str):
+        """Initialize the ticket.
+
+        Args:
+            scheduler: Scheduler that issued the ticket.
+            thread_id: Conversation thread the run belongs to.
+        """
+        self._scheduler = scheduler
+        self._thread_id = thread_id
+        self._holds_thread = False
+        self._holds_slot = False
+        self._released = False
+        self._started_at = 0.0
+
+    async def acquire(self) -> None:
+        """Wait for the thread's turn and a global execution slot."""
+        scheduler = self._scheduler
+        enqueued_at = time.monotonic()
+        try:
+            await scheduler._thread_lock(self._thread_id).acquire()
+            self._holds_thread = True
+            await scheduler._acquire_slot()
+            self._holds_slot = True
+        except BaseException:
+            self.release()
+            raise
+
+        scheduler._queued -= 1
+        self._started_at = time.monotonic()
+        get_metrics().observe("scheduler.queue_wait_seconds", self._started_at - enqueued_at)
+
+    async def __aenter__(self) -> "RunTicket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.release()
+
+    def release(self) -> None:
+        """Release the ticket's slot and thread lock. Safe to call repeatedly."""
+        if self._released:
+            return
+        self._released = True
+        scheduler = self._scheduler
+
+        if self._holds_slot:
+            scheduler._record_duration(time.monotonic() - self._started_at)
+            scheduler._release_slot()
+        else:
+            scheduler._queued -= 1
+
+        if self._holds_thread:
+            scheduler._thread_lock(self._thread_id).release()
+        scheduler._drop_thread_ref(self._thread_id)
+
+
+class RunScheduler:
+    """Bounded FIFO scheduler for agent runs.
+
+    At most ``max_concurrent`` runs execute at once and at most ``max_queued``
+    more wait for a slot; further requests are rejected with a retry hint.
+    Runs on the same conversation thread are serialized so they never race
+    on the thread's checkpoint.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrent: Maximum number of runs executing at once.
+            max_queued: Maximum number of admitted runs waiting to execute.
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self._max_concurrent = max_concurrent
+        self._max_queued = max(max_queued, 0)
+        self._running = 0
+        self._queued = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._thread_locks: dict[str, asyncio.Lock] = {}
+        self._thread_refs: dict[str, int] = {}
+        self._avg_run_seconds = 1.0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of runs currently executing."""
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of admitted runs waiting to execute."""
+        return self._queued
+
+    @property
+    def max_concurrent(self) -> int:
+        """Maximum number of runs executing at once."""
+        return self._max_concurrent
+
+    @property
+    def max_queued(self) -> int:
+        """Maximum number of admitted runs waiting to execute."""
+        return self._max_queued
+
+    @property
+    def saturated(self) -> bool:
+        """Whether new runs would currently be rejected."""
+        return self._running + self._queued >= self._max_concurrent + self._max_queued
+
+    @property
+    def active_threads(self) -> set[str]:
+        """Threads with a run executing or waiting to execute."""
+        return set(self._thread_refs)
+
+    def retry_after(self) -> int:
+        """Estimate how long a rejected client should wait before retrying.
+
+        Returns:
+            Whole seconds, based on the average run duration and backlog.
+        """
+        backlog = self._queued + 1
+        return max(1, math.ceil(self._avg_run_seconds * backlog / self._max_concurrent))
+
+    def reserve(self, thread_id: str) -> RunTicket:
+        """Admit a run into the queue.
+
+        Args:
+            thread_id: Conversation thread the run belongs to.
+
+        Returns:
+            Ticket to enter once the run is ready to execute.
+
+        Raises:
+            SchedulerSaturatedError: If the queue is full.
+        """
+        if self.saturated:
+            get_metrics().increment("scheduler.rejected")
+            raise SchedulerSaturatedError(self.retry_after())
+
+        self._queued += 1
+        self._thread_refs[thread_id] = self._thread_refs.get(thread_id, 0) + 1
+        get_metrics().increment("scheduler.admitted")
+        return RunTicket(self, thread_id)
+
+    @asynccontextmanager
+    async def thread_exclusive(self, thread_id: str) -> AsyncIterator[None]:
+        """Hold a thread's lock without taking an execution slot.
+
+        Used for maintenance on a thread (e.g. deletion) that must not
+        interleave with its runs, and must not be rejected by admission control.
+
+        Args:
+            thread_id: Conversation thread to lock.
+        """
+        self._thread_refs[thread_id] = self._thread_refs.get(thread_id, 0) + 1
+        try:
+            async with self._thread_lock(thread_id):
+                yield
+        finally:
+            self._drop_thread_ref(thread_id)
+
+    def _thread_lock(self, thread_id: str) -> asyncio.Lock:
+        lock = self._thread_locks.get(thread_id)
+        if lock is None:
+            lock = self._thread_locks[thread_id] = asyncio.Lock()
+        return lock
+
+    def _drop_thread_ref(self, thread_id: str) -> None:
+        refs = self._thread_refs.get(thread_id, 0) - 1
+        if refs > 0:
+            self._thread_refs[thread_id] = refs
+        else:
+            self._thread_refs.pop(thread_id, None)
+            self._thread_locks.pop(thread_id, None)
+
+    async def _acquire_slot(self) -> None:
+        if self._running < self._max_concurrent and not self._waiters:
+            self._running += 1
+            return
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we were cancelled
+                self._release_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter (FIFO)
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    def _record_duration(self, seconds: float) -> None:
+        # Exponentially weighted moving average of run durations
+        self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * seconds
+        get_metrics().observe("scheduler.run_seconds", seconds)
+
+
+@lru_cache
+def get_run_scheduler() -> RunScheduler:
+    """Get the process-wide run scheduler configured from settings."""
+    settings = get_settings()
+    scheduler = RunScheduler(
+        max_concurrent=settings.max_concurrent_runs,
+        max_queued=settings.max_queued_runs,
+    )
+    metrics = get_metrics()
+    metrics.register_gauge("scheduler.in_flight", lambda: scheduler.in_flight)
+    metrics.register_gauge("scheduler.queue_depth", lambda: scheduler.queue_depth)
+    return scheduler
@@ -0,0 +1,382 @@
+"""Incremental index of conversation messages for browsing thread history."""
+
+import base64
+import json
+import sqlite3
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from .blobs import BLOB_REF_KEY, BlobStore
+from .checkpoint import SQLiteCheckpointSaver
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    message_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_by_update ON threads (updated_at DESC, thread_id DESC);
+CREATE TABLE IF NOT EXISTS messages (
+    thread_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message_id TEXT,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (thread_id, seq)
+);
+"""
+
+# Characters of the first user message used as a thread title
+_TITLE_CHARS = 80
+
+
+def _encode_cursor(*parts: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(parts).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> list[Any]:
+    try:
+        parts = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+    if not isinstance(parts, list):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return parts
+
+
+class ThreadIndex:
+    """Per-thread message log kept in SQLite, updated as checkpoints are written.
+
+    Each checkpoint only appends the messages that are new since the last
+    one, so the index stays cheap to maintain, and pages of history or the
+    thread listing are read without deserializing whole checkpoints. Tool
+    outputs that were offloaded to a blob store are stored as references.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ":memory:",
+        blob_store: BlobStore | None = None,
+        blob_threshold: int = 2048,
+    ):
+        """Initialize the index.
+
+        Args:
+            path: Database file path (``:memory:`` for an in-process index).
+            blob_store: Store for tool outputs above ``blob_threshold`` characters.
+            blob_threshold: Minimum tool output length kept out of the index.
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._blob_store = blob_store
+        self._blob_threshold = blob_threshold
+        # Thread ID -> (message count, ID of the last indexed message)
+        self._heads: dict[str, tuple[int, str | None]] = {}
+
+    @property
+    def blob_store(self) -> BlobStore | None:
+        """Store holding tool outputs referenced by the index."""
+        return self._blob_store
+
+    def record(self, thread_id: str, messages: Sequence[BaseMessage], timestamp: str) -> None:
+        """Bring a thread's log in line with its latest message list.
+
+        Appends only the new messages when the list grew; rewrites the log if
+        earlier messages were replaced or removed.
+
+        Args:
+            thread_id: Conversation thread.
+            messages: Full message list of the latest checkpoint.
+            timestamp: ISO timestamp of the checkpoint.
+        """
+        with self._lock:
+            count, last_id = self._head(thread_id)
+            if count <= len(messages) and (count == 0 or messages[count - 1].id == last_id):
+                start = count
+            else:
+                start = 0
+            new = messages[start:]
+            if not new and start == count:
+                return
+
+            title = ""
+            for message in messages:
+                if message.type == "human":
+                    title = message.text[:_TITLE_CHARS]
+                    break
+
+            self._conn.execute("BEGIN")
+            try:
+                if start == 0:
+                    self._conn.execute("DELETE FROM messages WHERE thread_id = ?", (thread_id,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO messages (thread_id, seq, message_id, payload) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (thread_id, start + i, message.id, json.dumps(self._payload(message)))
+                        for i, message in enumerate(new)
+                    ],
+                )
+                self._conn.execute(
+                    "INSERT INTO threads (thread_id, title, message_count, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (thread_id) DO UPDATE SET "
+                    "title = excluded.title, message_count = excluded.message_count, "
+                    "updated_at = excluded.updated_at",
+                    (thread_id, title, len(messages), timestamp, timestamp),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._heads.pop(thread_id, None)
+                raise
+            self._heads[thread_id] = (len(messages), messages[-1].id if messages else None)
+
+    def _head(self, thread_id: str) -> tuple[int, str | None]:
+        head = self._heads.get(thread_id)
+        if head is None:
+            row = self._conn.execute(
+                "SELECT seq + 1, message_id FROM messages WHERE thread_id = ? "
+                "ORDER BY seq DESC LIMIT 1",
+                (thread_id,),
+            ).fetchone()
+            head = self._heads[thread_id] = (row[0], row[1]) if row else (0, None)
+        return head
+
+    def _payload(self, message: BaseMessage) -> dict[str, Any]:
+        payload: dict[str, Any] = {"role": message.type, "content": message.text}
+        if isinstance(message, AIMessage) and message.tool_calls:
+            payload["tool_calls"] = [
+                {"id": call["id"], "name": call["name"], "args": call["args"]}
+                for call in message.tool_calls
+            ]
+        if isinstance(message, ToolMessage):
+            payload["tool_call_id"] = message.tool_call_id
+            content = payload["content"]
+            ref = message.additional_kwargs.get(BLOB_REF_KEY)
+            if ref:
+                # Loaded from a checkpoint with the content already offloaded
+                payload["content"] = None
+                payload["blob_ref"] = ref
+            elif self._blob_store is not None and len(content) >= self._blob_threshold:
+                # Same content address as the checkpoint's copy, so stored once
+                payload["content"] = None
+                payload["blob_ref"] = self._blob_store.put(content)
+        return payload
+
+    def _load(self, payload: str) -> dict[str, Any]:
+        message: dict[str, Any] = json.loads(payload)
+        ref = message.pop("blob_ref", None)
+        if ref is not None:
+            try:
+                message["content"] = self._blob_store.get(ref) if self._blob_store else ""
+            except KeyError:
+                message["content"] = ""
+        return message
+
+    def get_thread(self, thread_id: str) -> dict[str, Any] | None:
+        """Get the metadata of a thread.
+
+        Args:
+            thread_id: Conversation thread.
+
+        Returns:
+            Dict with title, message_count, created_at and updated_at, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT thread_id, title, message_count, created_at, updated_at "
+                "FROM threads WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+        return _thread_row(row) if row else None
+
+    def list_threads(
+        self, limit: int = 20, cursor: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """List threads, most recently updated first.
+
+        Args:
+            limit: Maximum number of threads to return.
+            cursor: Cursor returned by a previous call, to continue after it.
+
+        Returns:
+            Threads on this page and the cursor of the next page (None at the end).
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        query = (
+            "SELECT thread_id, title, message_count, created_at, updated_at FROM threads "
+        )
+        params: list[Any] = []
+        if cursor is not None:
+            updated_at, thread_id = _decode_cursor(cursor)
+            query += "WHERE (updated_at, thread_id) < (?, ?) "
+            params += [updated_at, thread_id]
+        query += "ORDER BY updated_at DESC, thread_id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        threads = [_thread_row(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = threads[-1]
+            next_cursor = _encode_cursor(last["updated_at"], last["thread_id"])
+        return threads, next_cursor
+
+    def get_messages(
+        self, thread_id: str, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Get a page of a thread's messages, newest page first.
+
+        Messages within a page are in chronological order; the returned
+        cursor leads to the page of older messages.
+
+        Args:
+            thread_id: Conversation thread.
+            limit: Maximum number of messages to return.
+            cursor: Cursor returned by a previous call.
+
+        Returns:
+            Message dicts (role, content, tool_calls, tool_call_id) and the
+            cursor of the next (older) page, or None if there are no older messages.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        before = None
+        if cursor is not None:
+            (before,) = _decode_cursor(cursor)
+            if not isinstance(before, int):
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+
+        query = "SELECT seq, payload FROM messages WHERE thread_id = ? "
+        params: list[Any] = [thread_id]
+        if before is not None:
+            query += "AND seq < ? "
+            params.append(before)
+        query += "ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        rows.reverse()
+        messages = [self._load(payload) for _seq, payload in rows]
+        next_cursor = _encode_cursor(rows[0][0]) if rows and rows[0][0] > 0 else None
+        return messages, next_cursor
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Remove a thread and its messages from the index.
+
+        Args:
+            thread_id: Conversation thread.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM messages WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("COMMIT")
+            self._heads.pop(thread_id, None)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _thread_row(row: tuple[Any, ...]) -> dict[str, Any]:
+    thread_id, title, message_count, created_at, updated_at = row
+    return {
+        "thread_id": thread_id,
+        "title": title,
+        "message_count": message_count,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+
+
+if TYPE_CHECKING:
+    # Lets the mixin's super() calls type-check against the checkpointer API
+    _SaverBase = BaseCheckpointSaver[Any]
+else:
+    _SaverBase = object
+
+
+class ThreadIndexMixin(_SaverBase):
+    """Checkpointer mixin that keeps a ``ThreadIndex`` in step with ``put``.
+
+    Must precede the concrete checkpointer class in the bases. Async methods
+    of the supported savers delegate to the sync ones, so they are covered too.
+    """
+
+    thread_index: ThreadIndex | None = None
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint and index any new top-level messages.
+
+        Args:
+            config: Config of the parent checkpoint.
+            checkpoint: Checkpoint to save.
+            metadata: Metadata to save with the checkpoint.
+            new_versions: New channel versions as of this write.
+
+        Returns:
+            Config pointing at the saved checkpoint.
+        """
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        if (
+            self.thread_index is not None
+            and "messages" in new_versions
+            and not config["configurable"].get("checkpoint_ns")
+        ):
+            self.thread_index.record(
+                config["configurable"]["thread_id"],
+                checkpoint["channel_values"].get("messages", []),
+                checkpoint["ts"],
+            )
+        return saved
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete a thread's checkpoints and its index entries.
+
+        Args:
+            thread_id: Conversation thread.
+        """
+        super().delete_thread(thread_id)
+        if self.thread_index is not None:
+            self.thread_index.delete_thread(thread_id)
+
+
+class IndexedMemorySaver(ThreadIndexMixin, MemorySaver):
+    """In-process checkpointer with a message index."""
+
+
+class IndexedSQLiteCheckpointSaver(ThreadIndexMixin, SQLiteCheckpointSaver):
+    """Disk-backed checkpointer with a message index."""
@@ -1,5 +1,7 @@
 """FastAPI application entry point."""
 
+import asyncio
+import contextlib
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -17,8 +19,9 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path)
 
-from .api.routes import chat, health, tools
-from .config import get_settings
+from .api.routes import chat, health, tools  # noqa: E402
+from .config import get_settings  # noqa: E402
+from .tools.http import close_http_registry, init_http_registry  # noqa: E402
 
 # Configure logging
 logging.basicConfig(
@@ -46,11 +49,25 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("  - PubMed: available (no API key required)")
     logger.info("  - ArXiv: available (no API key required)")
     logger.info("  - DuckDuckGo: available (no API key required)")
+    logger.info(f"Conversation checkpointer: {settings.checkpointer_backend}")
+
+    # Pooled connections shared by the search tools of every request
+    init_http_registry(settings)
+
+    sweeper = None
+    if settings.thread_sweep_interval > 0:
+        sweeper = asyncio.create_task(chat.sweep_threads_periodically(settings.thread_sweep_interval))
 
     yield
 
     # Shutdown
     logger.info("Shutting down application")
+    if sweeper is not None:
+        sweeper.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await sweeper
+    chat.close_agent_factory()
+    await close_http_registry()
 
 
 def create_app() -> FastAPI:
@@ -116,7 +133,7 @@ def create_app() -> FastAPI:
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.detail},
-            headers=cors_headers,
+            headers={**cors_headers, **(exc.headers or {})},
         )
 
     # Handle all other exceptions
@@ -0,0 +1,5 @@
+"""Monitoring module."""
+
+from .metrics import MetricsRegistry, get_metrics
+
+__all__ = ["MetricsRegistry", "get_metrics"]
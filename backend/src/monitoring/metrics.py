@@ -0,0 +1,124 @@
+"""In-process metrics registry for operational counters."""
+
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+
+class _Summary:
+    """Running summary of observed values."""
+
+    __slots__ = ("count", "total", "min", "max", "last")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.last = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.last = value
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "last": self.last,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, value summaries and gauges.
+
+    Metric names are dotted paths (e.g. ``chat.cancelled_runs``) so each
+    component owns its own namespace.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._summaries: dict[str, _Summary] = {}
+        self._gauges: dict[str, Callable[[], Any]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter.
+
+        Args:
+            name: Counter name.
+            value: Amount to add.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a value (latency, size, ...) in a running summary.
+
+        Args:
+            name: Summary name.
+            value: Observed value.
+        """
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                summary = self._summaries[name] = _Summary()
+            summary.add(value)
+
+    def register_gauge(self, name: str, callback: Callable[[], Any]) -> None:
+        """Register a gauge computed lazily when a snapshot is taken.
+
+        Args:
+            name: Gauge name.
+            callback: Zero-argument callable returning the current value.
+        """
+        with self._lock:
+            self._gauges[name] = callback
+
+    def counter(self, name: str) -> float:
+        """Get the current value of a counter.
+
+        Args:
+            name: Counter name.
+
+        Returns:
+            Counter value, 0 if never incremented.
+        """
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get a point-in-time copy of all metrics.
+
+        Returns:
+            Dict with ``counters``, ``summaries`` and ``gauges`` sections.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {name: s.as_dict() for name, s in self._summaries.items()}
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "summaries": summaries,
+            "gauges": {name: callback() for name, callback in gauges.items()},
+        }
+
+    def reset(self) -> None:
+        """Clear counters and summaries (gauges stay registered)."""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return MetricsRegistry()
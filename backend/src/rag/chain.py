@@ -9,6 +9,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_openai import ChatOpenAI
 
+from ..core.llm_cache import llm_cache_for
 from .document_loader import DocumentLoader
 from .retriever import RetrieverFactory
 from .vector_store import VectorStoreManager
@@ -113,6 +114,7 @@ class APARagChain:
         llm = ChatOpenAI(
             model=self._model_name,
             temperature=self._temperature,
+            cache=llm_cache_for(self._temperature),
         )
 
         # Build chain
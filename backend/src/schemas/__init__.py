@@ -1,13 +1,26 @@
 """API schemas module."""
 
-from .chat import ChatRequest, ChatResponse, Message, MessageRole
+from .chat import (
+    ChatRequest,
+    ChatResponse,
+    ConversationHistory,
+    Message,
+    MessageRole,
+    StreamChunk,
+    ThreadInfo,
+    ThreadList,
+)
 from .tools import ToolInfo, ToolsResponse
 
 __all__ = [
     "ChatRequest",
     "ChatResponse",
+    "ConversationHistory",
     "Message",
     "MessageRole",
+    "StreamChunk",
+    "ThreadInfo",
+    "ThreadList",
     "ToolInfo",
     "ToolsResponse",
 ]
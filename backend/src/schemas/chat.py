@@ -3,7 +3,7 @@
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class MessageRole(str, Enum):
@@ -20,14 +20,13 @@ class MessageRole(str, Enum):
 class Message(BaseModel):
     """A single message in the conversation."""
 
+    model_config = ConfigDict(use_enum_values=True)
+
     role: MessageRole
     content: str
     tool_calls: list[dict[str, Any]] | None = None
     tool_call_id: str | None = None
 
-    class Config:
-        use_enum_values = True
-
 
 class ChatRequest(BaseModel):
     """Request schema for chat endpoint."""
@@ -50,8 +49,15 @@ class ChatResponse(BaseModel):
     """Response schema for chat endpoint."""
 
     thread_id: str
-    messages: list[Message]
+    messages: list[Message] = Field(
+        ...,
+        description="Messages of this turn: the user's message, then those produced by the agent",
+    )
     final_response: str
+    cached: bool = Field(
+        default=False,
+        description="Whether the answer was reused from an earlier, similar question",
+    )
 
 
 class StreamChunk(BaseModel):
@@ -59,12 +65,14 @@ class StreamChunk(BaseModel):
 
     type: str = Field(
         ...,
-        description="Type of chunk: 'message', 'tool_call', 'tool_result', 'done'",
+        description="Type of chunk: 'message', 'tool_call', 'tool_result', 'done', 'error'",
     )
     content: str | None = None
     tool_name: str | None = None
+    tool_call_id: str | None = None
     tool_input: dict[str, Any] | None = None
     tool_output: str | None = None
+    cached: bool | None = None
 
 
 class ConversationHistory(BaseModel):
@@ -74,3 +82,27 @@ class ConversationHistory(BaseModel):
     messages: list[Message]
     created_at: str | None = None
     updated_at: str | None = None
+    next_cursor: str | None = Field(
+        default=None,
+        description="Cursor for the page of older messages, if any",
+    )
+
+
+class ThreadInfo(BaseModel):
+    """Schema for a conversation thread in a listing."""
+
+    thread_id: str
+    title: str = Field(..., description="Start of the first user message")
+    message_count: int
+    created_at: str
+    updated_at: str
+
+
+class ThreadList(BaseModel):
+    """Schema for a page of conversation threads."""
+
+    threads: list[ThreadInfo]
+    next_cursor: str | None = Field(
+        default=None,
+        description="Cursor for the next page of threads, if any",
+    )
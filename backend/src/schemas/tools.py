@@ -10,6 +10,7 @@ class ToolInfo(BaseModel):
     description: str
     requires_api_key: bool = False
     is_available: bool = True
+    circuit_state: str | None = None
 
 
 class ToolsResponse(BaseModel):
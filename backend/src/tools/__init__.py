@@ -1,19 +1,43 @@
 """Research tools module."""
 
-from .base import BaseTool
+from .base import BaseTool, WrappedTool
 from .arxiv import ArxivSearchTool
+from .cache import CachedTool, ToolResultCache
+from .circuit import CircuitBreaker, CircuitBreakerTool, FallbackTool
 from .duckduckgo import DuckDuckGoSearchTool
+from .federated_search import FederatedSearchTool
 from .google_scholar import GoogleScholarTool
+from .hedging import HedgedTool
+from .http import HTTPClientRegistry
+from .papers import CompactResultsTool, Paper, PaperDetailsTool, PaperRenderer
 from .pubmed import PubMedSearchTool
+from .ratelimit import RateLimitedTool, TokenBucketLimiter
+from .singleflight import SingleFlightTool
 from .tavily_search import TavilySearchTool
 from .apa_corrector import APACorrectorTool
 
 __all__ = [
     "BaseTool",
+    "WrappedTool",
     "ArxivSearchTool",
+    "CachedTool",
+    "ToolResultCache",
+    "CircuitBreaker",
+    "CircuitBreakerTool",
+    "FallbackTool",
     "DuckDuckGoSearchTool",
+    "FederatedSearchTool",
     "GoogleScholarTool",
+    "HedgedTool",
+    "HTTPClientRegistry",
+    "CompactResultsTool",
+    "Paper",
+    "PaperDetailsTool",
+    "PaperRenderer",
     "PubMedSearchTool",
+    "RateLimitedTool",
+    "TokenBucketLimiter",
+    "SingleFlightTool",
     "TavilySearchTool",
     "APACorrectorTool",
 ]
@@ -2,7 +2,8 @@
 
 from typing import TYPE_CHECKING
 
-from langchain.tools import BaseTool as LangChainBaseTool, tool
+from langchain.tools import BaseTool as LangChainBaseTool
+from langchain_core.tools import StructuredTool
 
 from .base import BaseTool
 
@@ -51,13 +52,9 @@ class APACorrectorTool(BaseTool):
             LangChainBaseTool: Configured APA corrector tool.
         """
         rag_chain = self._get_rag_chain()
-        tool_description = self.description
 
-        @tool
         def apa_citation_corrector(citation: str) -> str:
             """Correct APA citations according to APA 7th edition guidelines.
-            Input should be a citation that needs to be validated and corrected.
-            Returns the corrected citation with explanation of changes.
 
             Args:
                 citation: The citation to correct.
@@ -70,7 +67,19 @@ class APACorrectorTool(BaseTool):
             except Exception as e:
                 return f"Error processing citation: {e}"
 
-        return apa_citation_corrector
+        async def aapa_citation_corrector(citation: str) -> str:
+            """Async variant used when the agent runs on the event loop."""
+            try:
+                return await rag_chain.ainvoke(citation)
+            except Exception as e:
+                return f"Error processing citation: {e}"
+
+        return StructuredTool.from_function(
+            func=apa_citation_corrector,
+            coroutine=aapa_citation_corrector,
+            name=self.name,
+            description=self.description,
+        )
 
     def validate_config(self) -> bool:
         """Check if RAG chain can be initialized."""
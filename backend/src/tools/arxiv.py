@@ -1,10 +1,253 @@
 """ArXiv search tool for preprints and open-access papers."""
 
+import asyncio
+import logging
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any, cast
+from xml.etree.ElementTree import Element, XMLPullParser
+
+import httpx
 from langchain.tools import BaseTool as LangChainBaseTool
-from langchain_community.tools.arxiv.tool import ArxivQueryRun
-from langchain_community.utilities.arxiv import ArxivAPIWrapper
+from langchain_core.tools import StructuredTool
 
+from ..monitoring import get_metrics
 from .base import BaseTool
+from .http import HTTPClientRegistry
+from .papers import Paper, papers_to_records, papers_to_text
+from .ratelimit import RateLimitExceeded, TokenBucketLimiter, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+
+# arXiv asks API clients for at most one request every three seconds
+_DEFAULT_RATE = 1 / 3
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ARXIV = "{http://arxiv.org/schemas/atom}"
+
+# New-style (2510.13422v2) and old-style (hep-th/9901001) identifiers
+_ARXIV_ID = re.compile(
+    r"(?:arxiv:)?(\d{4}\.\d{4,5}(?:v\d+)?|[a-z][a-z\-]+(?:\.[A-Z]{2})?/\d{7}(?:v\d+)?)",
+    re.IGNORECASE,
+)
+
+@dataclass
+class ArxivRecord:
+    """Paper metadata returned by the arXiv API."""
+
+    arxiv_id: str
+    title: str
+    authors: list[str] = field(default_factory=list)
+    published: str = ""
+    summary: str = ""
+    doi: str = ""
+
+    def to_paper(self) -> Paper:
+        """Convert to the common paper record."""
+        return Paper(
+            title=self.title,
+            authors=list(self.authors),
+            year=self.published[:4],
+            doi=self.doi,
+            arxiv_id=self.arxiv_id,
+            url=f"https://arxiv.org/abs/{self.arxiv_id}",
+            abstract=self.summary,
+            sources=["arxiv"],
+        )
+
+    def to_text(self) -> str:
+        """Render the record in the labelled format the search tools return."""
+        return self.to_paper().to_text()
+
+
+def parse_arxiv_ids(query: str) -> list[str]:
+    """Extract arXiv identifiers from a query made only of identifiers.
+
+    Args:
+        query: Tool input, e.g. ``"2510.13422, arXiv:2301.00001v2"``.
+
+    Returns:
+        Identifiers in input order, or an empty list if the query contains
+        anything else (it is then a free-text search).
+    """
+    ids = _ARXIV_ID.findall(query)
+    if not ids or _ARXIV_ID.sub("", query).strip(" ,;\n\t"):
+        return []
+    return ids
+
+
+def _text(element: Element | None) -> str:
+    if element is None or element.text is None:
+        return ""
+    return " ".join(element.text.split())
+
+
+def _parse_entry(entry: Element) -> ArxivRecord | None:
+    entry_id = _text(entry.find(f"{_ATOM}id"))
+    # Unknown identifiers come back as an entry pointing at the error docs
+    if "/api/errors" in entry_id or not entry_id:
+        return None
+    return ArxivRecord(
+        arxiv_id=entry_id.rsplit("/abs/", 1)[-1],
+        title=_text(entry.find(f"{_ATOM}title")),
+        authors=[_text(author) for author in entry.iterfind(f"{_ATOM}author/{_ATOM}name")],
+        published=_text(entry.find(f"{_ATOM}published"))[:10],
+        summary=_text(entry.find(f"{_ATOM}summary")),
+        doi=_text(entry.find(f"{_ARXIV}doi")),
+    )
+
+
+class ArxivFeedParser:
+    """Incremental parser for arXiv Atom feeds.
+
+    Each entry is converted and released as soon as its closing tag
+    arrives, so records are available before the feed has finished
+    downloading and memory does not grow with the feed size.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._parser: XMLPullParser[Element] = XMLPullParser(events=("start", "end"))
+        self._root: Element | None = None
+
+    def feed(self, data: bytes) -> Iterator[ArxivRecord]:
+        """Parse a chunk of the feed.
+
+        Args:
+            data: Next chunk of the Atom document.
+
+        Yields:
+            Records of the entries completed by this chunk.
+        """
+        self._parser.feed(data)
+        # Only start and end events are requested, and both carry an element
+        events = cast(Iterator[tuple[str, Element]], self._parser.read_events())
+        for event, element in events:
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                continue
+            if element.tag == f"{_ATOM}entry":
+                record = _parse_entry(element)
+                if self._root is not None:
+                    self._root.remove(element)
+                if record is not None:
+                    yield record
+
+
+def _host_limiter(base_url: str, requests_per_second: float) -> TokenBucketLimiter:
+    """Get the limiter of an arXiv API host."""
+    # One bucket per host, shared by every client and worker
+    return get_rate_limiter(httpx.URL(base_url).netloc.decode(), requests_per_second)
+
+
+class ArxivClient:
+    """Async client for the arXiv query API.
+
+    Lookups of several identifiers are combined into one ``id_list``
+    request. The client keeps its HTTP connection pool open between calls,
+    so one instance should be shared by all requests of a process (within
+    one event loop); requests are paced to arXiv's rate limit.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient | None = None,
+        base_url: str = ARXIV_API_URL,
+        requests_per_second: float = _DEFAULT_RATE,
+        max_retries: int = 3,
+        timeout: float = 20.0,
+    ):
+        """Initialize the client.
+
+        Args:
+            http_client: HTTP client to send requests with. A private client
+                is created (and closed by ``aclose``) if omitted.
+            base_url: Query endpoint URL.
+            requests_per_second: Default request rate for the host, used
+                unless RATE_LIMITS sets one.
+            max_retries: Retries of throttled or failed requests.
+            timeout: Request timeout in seconds for the private client.
+        """
+        self._owns_client = http_client is None
+        self._http = http_client or httpx.AsyncClient(timeout=timeout)
+        self._base_url = base_url
+        self._max_retries = max_retries
+        self._limiter = _host_limiter(base_url, requests_per_second)
+
+    async def __aenter__(self) -> "ArxivClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the HTTP client if this instance created it."""
+        if self._owns_client:
+            await self._http.aclose()
+
+    async def _query(self, params: dict[str, Any]) -> list[ArxivRecord]:
+        """Run a query, parsing the feed as it streams in."""
+        metrics = get_metrics()
+        for attempt in range(self._max_retries + 1):
+            await self._limiter.acquire()
+            metrics.increment("arxiv.requests")
+            try:
+                async with self._http.stream("GET", self._base_url, params=params) as response:
+                    if response.status_code in (429, 503) and attempt < self._max_retries:
+                        metrics.increment("arxiv.retries")
+                        retry_after = response.headers.get("Retry-After", "")
+                    else:
+                        response.raise_for_status()
+                        parser = ArxivFeedParser()
+                        return [
+                            record
+                            async for chunk in response.aiter_bytes()
+                            for record in parser.feed(chunk)
+                        ]
+            except httpx.TransportError:
+                if attempt == self._max_retries:
+                    raise
+                await asyncio.sleep(0.5 * 2**attempt)
+                continue
+            # Throttled: back off as the server asks before the next attempt
+            await asyncio.sleep(float(retry_after) if retry_after.isdigit() else 0.5 * 2**attempt)
+        return []
+
+    async def search(self, query: str, max_results: int = 5) -> list[ArxivRecord]:
+        """Search arXiv.
+
+        Args:
+            query: arXiv search query (plain terms search all fields).
+            max_results: Maximum number of papers.
+
+        Returns:
+            Records in relevance order.
+        """
+        return await self._query({
+            "search_query": query,
+            "max_results": max_results,
+            "sortBy": "relevance",
+        })
+
+    async def fetch_ids(self, arxiv_ids: list[str]) -> list[ArxivRecord]:
+        """Look up several papers by identifier in one request.
+
+        Args:
+            arxiv_ids: arXiv identifiers, with or without version suffix.
+
+        Returns:
+            Records of the papers found, in the order arXiv returns them.
+        """
+        if not arxiv_ids:
+            return []
+        return await self._query({
+            "id_list": ",".join(arxiv_ids),
+            "max_results": len(arxiv_ids),
+        })
 
 
 class ArxivSearchTool(BaseTool):
@@ -13,19 +256,39 @@ class ArxivSearchTool(BaseTool):
     No API key required - uses ArXiv's free public API.
     """
 
+    # Longer queries are rejected by the API
+    MAX_QUERY_LENGTH = 300
+
     def __init__(
         self,
         top_k_results: int = 5,
-        doc_content_chars_max: int = 4000,
+        doc_content_chars_max: int | None = 4000,
+        structured_output: bool = False,
+        base_url: str = ARXIV_API_URL,
+        requests_per_second: float = _DEFAULT_RATE,
+        http_registry: HTTPClientRegistry | None = None,
     ):
         """Initialize ArXiv search tool.
 
         Args:
             top_k_results: Maximum number of results to return.
-            doc_content_chars_max: Maximum characters per document summary.
+            doc_content_chars_max: Maximum characters of the output; abstracts are
+                cut to their sentences most relevant to the query to fit. None
+                for full records.
+            structured_output: Return the full records as ``{"papers": [...]}``
+                (see ``papers_to_records``) instead of labelled text, for
+                callers that build their own listing from them.
+            base_url: arXiv query endpoint URL.
+            requests_per_second: Request rate limit for the endpoint.
+            http_registry: Pooled HTTP clients to send requests with.
         """
         self._top_k_results = top_k_results
         self._doc_content_chars_max = doc_content_chars_max
+        self._structured_output = structured_output
+        self._base_url = base_url
+        self._requests_per_second = requests_per_second
+        self._http_registry = http_registry
+        self._client: ArxivClient | None = None
 
     @property
     def name(self) -> str:
@@ -36,21 +299,91 @@ class ArxivSearchTool(BaseTool):
         return (
             "Search ArXiv for preprints and open-access papers in physics, mathematics, "
             "computer science, biology, finance, and more. "
-            "Input can be a search query or an ArXiv paper ID (e.g., '2510.13422')."
+            "Input can be a search query or one or more ArXiv paper IDs "
+            "(e.g., '2510.13422' or '2510.13422, 2301.00001')."
+        )
+
+    @property
+    def rate_limiter(self) -> TokenBucketLimiter:
+        """Limiter of the arXiv host the tool's clients pace requests with."""
+        return _host_limiter(self._base_url, self._requests_per_second)
+
+    def create_client(self, http_client: httpx.AsyncClient | None = None) -> ArxivClient:
+        """Create an arXiv API client with this tool's configuration.
+
+        Args:
+            http_client: HTTP client to use. Defaults to the pooled client
+                when called on the registry's event loop, else a private one.
+
+        Returns:
+            Configured ArxivClient.
+        """
+        if http_client is None and self._http_registry is not None:
+            http_client = self._http_registry.client_for(self._base_url)
+        return ArxivClient(
+            http_client=http_client,
+            base_url=self._base_url,
+            requests_per_second=self._requests_per_second,
         )
 
+    async def _search(self, client: ArxivClient, query: str) -> str | dict[str, Any]:
+        try:
+            arxiv_ids = parse_arxiv_ids(query)
+            if arxiv_ids:
+                records = await client.fetch_ids(arxiv_ids)
+            else:
+                records = await client.search(query[: self.MAX_QUERY_LENGTH], self._top_k_results)
+        except RateLimitExceeded:
+            # Not a failure of the upstream, so circuit breakers don't count it
+            raise
+        except Exception as e:
+            logger.warning(f"ArXiv search failed: {e}")
+            return f"Arxiv exception: {e}"
+        if not records:
+            return "No good Arxiv Result was found"
+        papers = [record.to_paper() for record in records]
+        if self._structured_output:
+            return papers_to_records(papers)
+        return papers_to_text(papers, query, self._doc_content_chars_max)
+
     def create_tool(self) -> LangChainBaseTool:
         """Create ArXiv search tool.
 
         Returns:
-            ArxivQueryRun: Configured ArXiv search tool.
+            LangChainBaseTool: Configured ArXiv search tool.
         """
-        wrapper = ArxivAPIWrapper(
-            top_k_results=self._top_k_results,
-            doc_content_chars_max=self._doc_content_chars_max,
-        )
-        return ArxivQueryRun(
-            api_wrapper=wrapper,
+
+        def arxiv(query: str) -> str | dict[str, Any]:
+            """Search ArXiv by query or paper identifiers.
+
+            Args:
+                query: Search query, or one or more arXiv IDs.
+
+            Returns:
+                Matching papers with date, title, authors and abstract.
+            """
+
+            async def search() -> str | dict[str, Any]:
+                # asyncio.run starts a fresh loop, so the shared client can't be used
+                async with self.create_client() as client:
+                    return await self._search(client, query)
+
+            return asyncio.run(search())
+
+        async def aarxiv(query: str) -> str | dict[str, Any]:
+            """Async variant used when the agent runs on the event loop."""
+            # The pooled client is reused as is; otherwise keep one private client
+            if self._http_registry is not None and (
+                pooled := self._http_registry.client_for(self._base_url)
+            ):
+                return await self._search(self.create_client(pooled), query)
+            if self._client is None:
+                self._client = self.create_client()
+            return await self._search(self._client, query)
+
+        return StructuredTool.from_function(
+            func=arxiv,
+            coroutine=aarxiv,
             name=self.name,
             description=self.description,
         )
@@ -1,9 +1,31 @@
 """Base tool interface following Open/Closed Principle."""
 
+import re
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from langchain.tools import BaseTool as LangChainBaseTool
+from langchain_core.tools import StructuredTool
+
+if TYPE_CHECKING:
+    from .ratelimit import TokenBucketLimiter
+
+# Outputs the search wrappers return instead of raising on failure
+_ERROR_OUTPUT = re.compile(r"^\s*(\w+ exception:|error\b)", re.IGNORECASE)
+
+
+def is_error_output(output: Any) -> bool:
+    """Check whether a tool output reports a failure instead of results.
+
+    Args:
+        output: Tool output.
+
+    Returns:
+        True for error messages and ``{"error": ...}`` payloads.
+    """
+    if isinstance(output, str):
+        return bool(_ERROR_OUTPUT.match(output))
+    return isinstance(output, dict) and "error" in output
 
 
 class BaseTool(ABC):
@@ -34,6 +56,14 @@ class BaseTool(ABC):
         """
         ...
 
+    @property
+    def rate_limiter(self) -> "TokenBucketLimiter | None":
+        """Limiter the tool's own client takes a slot from for each request.
+
+        None for tools that don't pace their requests themselves.
+        """
+        return None
+
     def validate_config(self) -> bool:
         """Validate that the tool is properly configured.
 
@@ -44,3 +74,90 @@ class BaseTool(ABC):
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}(name='{self.name}')>"
+
+
+class WrappedTool(BaseTool):
+    """Base class for tools adding behaviour around another tool's calls.
+
+    The wrapped LangChain tool keeps the inner tool's name, description and
+    argument schema, so the agent sees no difference. Subclasses implement
+    ``_call`` and ``_acall``, which receive the inner LangChain tool and the
+    validated call arguments.
+    """
+
+    def __init__(self, inner: BaseTool):
+        """Initialize the wrapper.
+
+        Args:
+            inner: Tool whose calls are wrapped.
+        """
+        self._inner = inner
+
+    @property
+    def inner(self) -> BaseTool:
+        """Wrapped tool."""
+        return self._inner
+
+    @property
+    def name(self) -> str:
+        return self._inner.name
+
+    @property
+    def description(self) -> str:
+        return self._inner.description
+
+    @property
+    def rate_limiter(self) -> "TokenBucketLimiter | None":
+        return self._inner.rate_limiter
+
+    def create_tool(self) -> LangChainBaseTool:
+        """Create the inner tool and wrap its calls.
+
+        Returns:
+            LangChainBaseTool: Tool with the inner tool's interface.
+        """
+        tool = self._inner.create_tool()
+
+        def call(**kwargs: Any) -> Any:
+            return self._call(tool, kwargs)
+
+        async def acall(**kwargs: Any) -> Any:
+            return await self._acall(tool, kwargs)
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema or tool.tool_call_schema,
+            func=call,
+            coroutine=acall,
+        )
+
+    def validate_config(self) -> bool:
+        """Delegate to the wrapped tool."""
+        return self._inner.validate_config()
+
+    @abstractmethod
+    def _call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        """Run a call synchronously.
+
+        Args:
+            tool: Inner LangChain tool.
+            args: Validated call arguments.
+
+        Returns:
+            Tool output.
+        """
+        ...
+
+    @abstractmethod
+    async def _acall(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        """Run a call asynchronously.
+
+        Args:
+            tool: Inner LangChain tool.
+            args: Validated call arguments.
+
+        Returns:
+            Tool output.
+        """
+        ...
@@ -0,0 +1,337 @@
+"""Read-through cache of search tool results."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from langchain.tools import BaseTool as LangChainBaseTool
+
+from ..config import get_settings
+from ..monitoring import get_metrics
+from .base import BaseTool, WrappedTool, is_error_output
+
+logger = logging.getLogger(__name__)
+
+# Expired rows are deleted every this many writes
+_PRUNE_EVERY = 256
+
+
+def normalize_args(args: dict[str, Any]) -> str:
+    """Serialize call arguments so equivalent queries map to the same key.
+
+    Strings are case-folded and their whitespace collapsed; keys are sorted.
+
+    Args:
+        args: Tool call arguments.
+
+    Returns:
+        Canonical JSON representation.
+    """
+
+    def normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return " ".join(value.casefold().split())
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return value
+
+    return json.dumps(normalize(args), sort_keys=True, ensure_ascii=False, default=str)
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Cached tool output with its freshness deadlines (epoch seconds)."""
+
+    value: Any
+    expires_at: float
+    stale_until: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class ToolResultCache:
+    """SQLite-backed cache of tool outputs with an in-memory LRU in front.
+
+    Entries are served fresh until their TTL, then stale (while a refresh
+    runs) until ``stale_until``, after which they are dropped.
+    """
+
+    def __init__(self, path: str | Path = ":memory:", memory_entries: int = 256):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file (``:memory:`` for a process-local cache).
+            memory_entries: Number of entries kept in the in-memory LRU.
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        if str(path) != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS tool_cache (
+                key TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS tool_cache_stale_until ON tool_cache (stale_until)"
+        )
+        self._memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        get_metrics().register_gauge("tool_cache.memory_entries", lambda: len(self._memory))
+
+    @staticmethod
+    def key_for(tool: str, args: dict[str, Any]) -> str:
+        """Compute the cache key of a tool call.
+
+        Args:
+            tool: Tool name.
+            args: Call arguments.
+
+        Returns:
+            Hex SHA-256 of the tool name and normalized arguments.
+        """
+        return hashlib.sha256(f"{tool}\0{normalize_args(args)}".encode()).hexdigest()
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Look up an entry.
+
+        Args:
+            key: Key from ``key_for``.
+
+        Returns:
+            The entry (fresh or stale), or None if missing or past its stale window.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at, stale_until FROM tool_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    entry = CacheEntry(json.loads(row[0]), row[1], row[2])
+            if entry is None:
+                return None
+            if now >= entry.stale_until:
+                self._memory.pop(key, None)
+                return None
+            self._remember(key, entry)
+            return entry
+
+    def set(self, key: str, tool: str, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        """Store an entry.
+
+        Args:
+            key: Key from ``key_for``.
+            tool: Tool name, kept for inspection.
+            value: JSON-serializable tool output.
+            ttl: Seconds the entry is served as fresh.
+            stale_ttl: Further seconds it may be served while being refreshed.
+        """
+        now = time.time()
+        entry = CacheEntry(value, now + ttl, now + ttl + stale_ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, tool, json.dumps(value), now, entry.expires_at, entry.stale_until),
+            )
+            self._remember(key, entry)
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY == 0:
+                self._conn.execute("DELETE FROM tool_cache WHERE stale_until < ?", (now,))
+
+    def set_many(
+        self, items: list[tuple[str, Any]], tool: str, ttl: float, stale_ttl: float = 0.0
+    ) -> None:
+        """Store several entries in one transaction.
+
+        Args:
+            items: Keys from ``key_for`` and their JSON-serializable values.
+            tool: Tool name, kept for inspection.
+            ttl: Seconds the entries are served as fresh.
+            stale_ttl: Further seconds they may be served while being refreshed.
+        """
+        if not items:
+            return
+        now = time.time()
+        entries = [(key, CacheEntry(value, now + ttl, now + ttl + stale_ttl)) for key, value in items]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (key, tool, json.dumps(entry.value), now, entry.expires_at,
+                         entry.stale_until)
+                        for key, entry in entries
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            for key, entry in entries:
+                self._remember(key, entry)
+            self._writes += len(entries)
+
+    def prune(self) -> int:
+        """Delete entries past their stale window.
+
+        Returns:
+            Number of entries deleted.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM tool_cache WHERE stale_until < ?", (now,))
+            for key in [k for k, e in self._memory.items() if e.stale_until <= now]:
+                del self._memory[key]
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedTool(WrappedTool):
+    """Serve a tool's results from a ``ToolResultCache``.
+
+    Fresh entries are returned without calling the tool. Stale entries are
+    returned immediately while one background call refreshes them
+    (stale-while-revalidate). Failed calls and error outputs are not cached.
+    """
+
+    def __init__(
+        self,
+        inner: BaseTool,
+        cache: ToolResultCache,
+        ttl: float,
+        stale_ttl: float = 0.0,
+    ):
+        """Initialize the cached tool.
+
+        Args:
+            inner: Tool whose results are cached.
+            cache: Cache holding the results.
+            ttl: Seconds a result is served as fresh.
+            stale_ttl: Further seconds a result is served while being refreshed.
+        """
+        super().__init__(inner)
+        self._cache = cache
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    def _lookup(self, key: str) -> CacheEntry | None:
+        metrics = get_metrics()
+        entry = self._cache.get(key)
+        if entry is None:
+            outcome = "misses"
+        elif entry.fresh:
+            outcome = "hits"
+        else:
+            outcome = "stale_hits"
+        metrics.increment(f"tool_cache.{outcome}")
+        metrics.increment(f"tool_cache.{self.name}.{outcome}")
+        return entry
+
+    def _store(self, key: str, output: Any) -> None:
+        if not output or not isinstance(output, (str, dict, list)) or is_error_output(output):
+            return
+        self._cache.set(key, self.name, output, self._ttl, self._stale_ttl)
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: str) -> None:
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+
+    def _refresh(self, tool: LangChainBaseTool, key: str, args: dict[str, Any]) -> None:
+        try:
+            self._store(key, tool.invoke(args))
+            get_metrics().increment("tool_cache.refreshes")
+        except Exception as e:
+            logger.warning(f"Refreshing cached {self.name} result failed: {e}")
+        finally:
+            self._release_refresh(key)
+
+    async def _arefresh(self, tool: LangChainBaseTool, key: str, args: dict[str, Any]) -> None:
+        try:
+            await asyncio.to_thread(self._store, key, await tool.ainvoke(args))
+            get_metrics().increment("tool_cache.refreshes")
+        except Exception as e:
+            logger.warning(f"Refreshing cached {self.name} result failed: {e}")
+        finally:
+            self._release_refresh(key)
+
+    def _call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        key = self._cache.key_for(self.name, args)
+        entry = self._lookup(key)
+        if entry is not None:
+            if not entry.fresh and self._claim_refresh(key):
+                threading.Thread(target=self._refresh, args=(tool, key, args), daemon=True).start()
+            return entry.value
+        output = tool.invoke(args)
+        self._store(key, output)
+        return output
+
+    async def _acall(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        key = self._cache.key_for(self.name, args)
+        # The cache reads and writes SQLite under a lock, so keep it off the event loop
+        entry = await asyncio.to_thread(self._lookup, key)
+        if entry is not None:
+            if not entry.fresh and self._claim_refresh(key):
+                task = asyncio.create_task(self._arefresh(tool, key, args))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry.value
+        output = await tool.ainvoke(args)
+        await asyncio.to_thread(self._store, key, output)
+        return output
+
+
+@lru_cache
+def get_tool_cache() -> ToolResultCache:
+    """Get the process-wide tool result cache configured from settings."""
+    settings = get_settings()
+    return ToolResultCache(
+        path=settings.tool_cache_path,
+        memory_entries=settings.tool_cache_memory_entries,
+    )
@@ -0,0 +1,354 @@
+"""Circuit breakers and fallback chains for search tools.
+
+A breaker watches the error rate and p95 latency of a tool's recent calls.
+When either crosses its threshold the breaker opens and calls fail at once
+instead of waiting on a struggling upstream; after a cool-down one probe
+call is let through (half-open) and closes the breaker again if it works.
+``FallbackTool`` reroutes calls to the next tool of a chain while the
+primary's breaker is open or a call fails.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from enum import StrEnum
+from typing import Any
+
+from langchain.tools import BaseTool as LangChainBaseTool
+
+from ..config import get_settings
+from ..monitoring import get_metrics
+from .base import BaseTool, WrappedTool, is_error_output
+from .ratelimit import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    """Breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a tool whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        """Initialize the error.
+
+        Args:
+            name: Tool name.
+            retry_in: Seconds until the breaker lets a probe call through.
+        """
+        super().__init__(
+            f"{name} is temporarily unavailable (circuit open, retry in {retry_in:.0f}s)"
+        )
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Error-rate and latency circuit breaker over a window of recent calls."""
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        error_threshold: float = 0.5,
+        latency_threshold: float | None = None,
+        open_seconds: float = 30.0,
+    ):
+        """Initialize the breaker.
+
+        Args:
+            name: Name of the guarded tool.
+            window: Number of recent calls the statistics cover.
+            min_calls: Calls needed in the window before the breaker can open.
+            error_threshold: Failure ratio that opens the breaker.
+            latency_threshold: p95 latency in seconds that opens the breaker
+                (None to ignore latency).
+            open_seconds: Seconds the breaker stays open before a probe call.
+        """
+        self._name = name
+        self._calls: deque[tuple[bool, float]] = deque(maxlen=window)
+        self._min_calls = min_calls
+        self._error_threshold = error_threshold
+        self._latency_threshold = latency_threshold
+        self._open_seconds = open_seconds
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """Name of the guarded tool."""
+        return self._name
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state (an open breaker past its cool-down reads half-open)."""
+        with self._lock:
+            if self._state is CircuitState.OPEN and self._retry_in() <= 0:
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    @property
+    def is_available(self) -> bool:
+        """Whether calls are currently let through."""
+        return self.state is not CircuitState.OPEN
+
+    def _retry_in(self) -> float:
+        return self._opened_at + self._open_seconds - time.monotonic()
+
+    def error_rate(self) -> float:
+        """Failure ratio of the calls in the window."""
+        with self._lock:
+            if not self._calls:
+                return 0.0
+            return sum(1 for ok, _ in self._calls if not ok) / len(self._calls)
+
+    def p95_latency(self) -> float:
+        """95th percentile latency in seconds of the calls in the window."""
+        with self._lock:
+            return self._p95()
+
+    def _p95(self) -> float:
+        latencies = sorted(latency for _, latency in self._calls)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)]
+
+    def before_call(self) -> None:
+        """Admit a call or reject it while the breaker is open.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with its
+                probe call already in flight.
+        """
+        with self._lock:
+            if self._state is CircuitState.CLOSED:
+                return
+            retry_in = self._retry_in()
+            if retry_in > 0 or self._probing:
+                get_metrics().increment(f"circuit.{self._name}.rejected")
+                raise CircuitOpenError(self._name, max(retry_in, 0.0))
+            self._state = CircuitState.HALF_OPEN
+            self._probing = True
+
+    def record(self, success: bool, latency: float) -> None:
+        """Record the outcome of an admitted call.
+
+        Args:
+            success: Whether the call returned results.
+            latency: Call duration in seconds.
+        """
+        metrics = get_metrics()
+        metrics.observe(f"circuit.{self._name}.latency_seconds", latency)
+        if not success:
+            metrics.increment(f"circuit.{self._name}.failures")
+
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._calls.clear()
+                    self._set_state(CircuitState.CLOSED)
+                else:
+                    self._trip()
+                return
+
+            self._calls.append((success, latency))
+            if self._state is CircuitState.OPEN or len(self._calls) < self._min_calls:
+                return
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            slow = self._latency_threshold is not None and self._p95() > self._latency_threshold
+            if failures / len(self._calls) >= self._error_threshold or slow:
+                self._trip()
+
+    def release(self) -> None:
+        """Release an admitted call that never reached the upstream, recording nothing.
+
+        A half-open breaker lets its next probe call through.
+        """
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN:
+                self._probing = False
+
+    def _trip(self) -> None:
+        self._opened_at = time.monotonic()
+        self._set_state(CircuitState.OPEN)
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state is not self._state:
+            logger.warning(
+                f"Circuit breaker for {self._name}: {self._state.value} -> {state.value}"
+            )
+            get_metrics().increment(f"circuit.{self._name}.{state.value}")
+        self._state = state
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the process-wide breaker of a tool, creating it on first use.
+
+    Args:
+        name: Tool name.
+
+    Returns:
+        Breaker configured from settings.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            settings = get_settings()
+            breaker = CircuitBreaker(
+                name,
+                window=settings.circuit_breaker_window,
+                min_calls=settings.circuit_breaker_min_calls,
+                error_threshold=settings.circuit_breaker_error_rate,
+                latency_threshold=settings.circuit_breaker_p95_seconds,
+                open_seconds=settings.circuit_breaker_open_seconds,
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+class CircuitBreakerTool(WrappedTool):
+    """Guard a tool's calls with a circuit breaker.
+
+    Exceptions, error outputs and (for async calls) calls running past
+    ``timeout`` count as failures. Error outputs are returned unchanged; while
+    the breaker is open calls raise ``CircuitOpenError`` without reaching the
+    tool. ``RateLimitExceeded`` and cancellation are not failures of the
+    upstream: the call is released without being recorded. Rate limiters
+    should wrap the breaker, so queueing for a slot isn't timed as latency.
+    """
+
+    def __init__(self, inner: BaseTool, breaker: CircuitBreaker, timeout: float | None = None):
+        """Initialize the guarded tool.
+
+        Args:
+            inner: Tool whose calls are guarded.
+            breaker: Breaker of the tool.
+            timeout: Seconds an async call may run before it is abandoned.
+        """
+        super().__init__(inner)
+        self._breaker = breaker
+        self._timeout = timeout
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """Breaker of the tool."""
+        return self._breaker
+
+    def _call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        self._breaker.before_call()
+        start = time.monotonic()
+        try:
+            output = tool.invoke(args)
+        except RateLimitExceeded:
+            self._breaker.release()
+            raise
+        except Exception:
+            self._breaker.record(False, time.monotonic() - start)
+            raise
+        self._breaker.record(not is_error_output(output), time.monotonic() - start)
+        return output
+
+    async def _acall(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        self._breaker.before_call()
+        start = time.monotonic()
+        try:
+            output = await asyncio.wait_for(tool.ainvoke(args), self._timeout)
+        except (RateLimitExceeded, asyncio.CancelledError):
+            self._breaker.release()
+            raise
+        except Exception as e:
+            self._breaker.record(False, time.monotonic() - start)
+            if isinstance(e, TimeoutError) and not str(e):
+                # Raised by wait_for, which gives no message
+                raise TimeoutError(f"{self.name} timed out after {self._timeout:.0f}s") from None
+            raise
+        self._breaker.record(not is_error_output(output), time.monotonic() - start)
+        return output
+
+
+class FallbackTool(WrappedTool):
+    """Reroute a tool's calls along a fallback chain when it fails.
+
+    The first tool of the chain whose call returns results answers; the
+    output notes which tool it came from (structured fallback outputs are
+    serialized to JSON under the note). Fallbacks must accept the primary
+    tool's arguments.
+    """
+
+    def __init__(self, inner: BaseTool, fallbacks: list[BaseTool]):
+        """Initialize the tool.
+
+        Args:
+            inner: Primary tool.
+            fallbacks: Tools tried in order when the primary fails.
+        """
+        super().__init__(inner)
+        self._fallbacks = fallbacks
+        self._fallback_tools: list[LangChainBaseTool] | None = None
+
+    @property
+    def fallbacks(self) -> list[BaseTool]:
+        """Tools tried in order when the primary fails."""
+        return self._fallbacks
+
+    def _chain(self, tool: LangChainBaseTool) -> list[LangChainBaseTool]:
+        if self._fallback_tools is None:
+            self._fallback_tools = [fallback.create_tool() for fallback in self._fallbacks]
+        return [tool, *self._fallback_tools]
+
+    def _answer(self, index: int, tool: LangChainBaseTool, output: Any, errors: list[str]) -> Any:
+        if index == 0:
+            return output
+        get_metrics().increment(f"fallback.{self.name}.rerouted")
+        logger.info(f"{self.name} failed ({errors[0]}), answered by {tool.name}")
+        if not isinstance(output, str):
+            output = json.dumps(output, ensure_ascii=False, default=str)
+        return f"[{self.name} unavailable, results from {tool.name}]\n\n{output}"
+
+    def _failed(self, tool: LangChainBaseTool, error: Any, errors: list[str]) -> None:
+        get_metrics().increment(f"fallback.{tool.name}.failed")
+        errors.append(str(error).splitlines()[0] if str(error) else type(error).__name__)
+
+    def _call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        errors: list[str] = []
+        for index, candidate in enumerate(self._chain(tool)):
+            try:
+                output = candidate.invoke(args)
+            except Exception as e:
+                self._failed(candidate, e, errors)
+                continue
+            if not is_error_output(output):
+                return self._answer(index, candidate, output, errors)
+            self._failed(candidate, output, errors)
+        return f"Error: all of {self.name} and its fallbacks failed: {'; '.join(errors)}"
+
+    async def _acall(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        errors: list[str] = []
+        for index, candidate in enumerate(self._chain(tool)):
+            try:
+                output = await candidate.ainvoke(args)
+            except Exception as e:
+                self._failed(candidate, e, errors)
+                continue
+            if not is_error_output(output):
+                return self._answer(index, candidate, output, errors)
+            self._failed(candidate, output, errors)
+        return f"Error: all of {self.name} and its fallbacks failed: {'; '.join(errors)}"
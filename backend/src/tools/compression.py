@@ -0,0 +1,187 @@
+"""Query-focused extractive compression of abstracts.
+
+Instead of cutting an abstract at a fixed length, its sentences are scored
+against the search query with BM25 and the best ones that fit a token
+budget are kept, in their original order. Scoring is lexical and local: no
+model calls.
+"""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Callable
+
+# Sentence ends: terminal punctuation (maybe closing a bracket or quote)
+# followed by the start of a new sentence
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][)\]\"']))\s+(?=[A-Z0-9(\[\"'])")
+_WORD = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# Marks text left out between kept sentences
+_GAP = " ... "
+
+_CHARS_PER_TOKEN = 4
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "been", "but", "by", "can", "did", "do", "does",
+    "for", "from", "had", "has", "have", "how", "in", "into", "is", "it", "its", "may", "more",
+    "most", "not", "of", "on", "or", "our", "over", "such", "than", "that", "the", "their", "then",
+    "there", "these", "they", "this", "those", "to", "using", "via", "was", "we", "were", "what",
+    "when", "where", "which", "while", "who", "why", "will", "with", "within",
+})
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split a text into sentences.
+
+    Args:
+        text: Text to split.
+
+    Returns:
+        Sentences with whitespace normalized.
+    """
+    text = " ".join(text.split())
+    return [sentence for sentence in _SENTENCE_END.split(text) if sentence]
+
+
+def terms(text: str) -> list[str]:
+    """Extract the index terms of a text.
+
+    Args:
+        text: Text to tokenize.
+
+    Returns:
+        Lowercased words without stopwords, with plural "s" removed.
+    """
+    words = _WORD.findall(text.lower())
+    return [
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in words
+        if word not in _STOPWORDS
+    ]
+
+
+def _estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+class ExtractiveCompressor:
+    """Shorten texts to their sentences most relevant to a query.
+
+    Sentences are ranked by BM25 against the query, with term statistics
+    taken over all sentences of the texts compressed together (e.g. the
+    abstracts of one result listing). Without a query, or when no sentence
+    matches it, texts keep their leading sentences.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int] | None = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        """Initialize the compressor.
+
+        Args:
+            count_tokens: Token counter of the budget. Defaults to a length
+                estimate; ``len`` makes the budget a character count.
+            k1: BM25 term frequency saturation.
+            b: BM25 sentence length normalization.
+        """
+        self._count_tokens = count_tokens or _estimate_tokens
+        self._k1 = k1
+        self._b = b
+
+    def compress(self, text: str, query: str, max_tokens: int) -> str:
+        """Compress one text.
+
+        Args:
+            text: Text to compress.
+            query: Query the kept sentences should answer.
+            max_tokens: Token budget of the result.
+
+        Returns:
+            The text if it fits, else its best sentences within the budget.
+        """
+        return self.compress_many([text], query, max_tokens)[0]
+
+    def compress_many(self, texts: list[str], query: str, max_tokens: int) -> list[str]:
+        """Compress several texts against one query.
+
+        Args:
+            texts: Texts to compress.
+            query: Query the kept sentences should answer.
+            max_tokens: Token budget of each result.
+
+        Returns:
+            Compressed texts, in order.
+        """
+        split = [split_sentences(text) for text in texts]
+        sentence_terms = [[terms(sentence) for sentence in sentences] for sentences in split]
+        all_terms = [t for per_text in sentence_terms for t in per_text]
+        query_terms = set(terms(query))
+
+        # Document frequency of the query terms over all sentences
+        df = Counter(term for t in all_terms for term in query_terms.intersection(t))
+        n = len(all_terms) or 1
+        idf = {term: math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5)) for term in df}
+        avg_length = sum(len(t) for t in all_terms) / n or 1
+
+        compressed = []
+        for sentences, per_sentence in zip(split, sentence_terms, strict=True):
+            scores = [self._score(t, idf, avg_length) for t in per_sentence]
+            compressed.append(self._select(sentences, scores, max_tokens))
+        return compressed
+
+    def _score(self, sentence_terms: list[str], idf: dict[str, float], avg_length: float) -> float:
+        if not idf or not sentence_terms:
+            return 0.0
+        counts = Counter(sentence_terms)
+        norm = self._k1 * (1 - self._b + self._b * len(sentence_terms) / avg_length)
+        return sum(
+            weight * counts[term] * (self._k1 + 1) / (counts[term] + norm)
+            for term, weight in idf.items()
+            if term in counts
+        )
+
+    def _select(self, sentences: list[str], scores: list[float], max_tokens: int) -> str:
+        text = " ".join(sentences)
+        if self._count_tokens(text) <= max_tokens:
+            return text
+
+        matched = any(scores)
+        if matched:
+            order = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+            order = [i for i in order if scores[i] > 0]
+        else:
+            order = list(range(len(sentences)))
+        kept: list[int] = []
+        for i in order:
+            candidate = sorted(kept + [i])
+            if self._count_tokens(_join(sentences, candidate)) <= max_tokens:
+                kept = candidate
+            elif not matched:
+                break  # Leading sentences only: don't skip ahead
+        if kept:
+            return _join(sentences, kept)
+        return self._truncate(sentences[order[0]], max_tokens) if order else ""
+
+    def _truncate(self, sentence: str, max_tokens: int) -> str:
+        """Cut a sentence at a word boundary to fit the budget."""
+        words = sentence[: max_tokens * _CHARS_PER_TOKEN * 2].split()
+        while words and self._count_tokens(" ".join(words) + "...") > max_tokens:
+            words.pop()
+        return " ".join(words) + "..." if words else ""
+
+
+def _join(sentences: list[str], indices: list[int]) -> str:
+    """Join kept sentences, marking gaps and a cut-off end."""
+    text = ""
+    for position, i in enumerate(indices):
+        if position:
+            text += " " if i == indices[position - 1] + 1 else _GAP
+        elif i:
+            text += _GAP.lstrip()
+        text += sentences[i]
+    if indices[-1] < len(sentences) - 1:
+        text += _GAP.rstrip()
+    return text
@@ -1,7 +1,7 @@
 """DuckDuckGo search tool - free fallback search."""
 
 from langchain.tools import BaseTool as LangChainBaseTool
-from langchain_community.tools import DuckDuckGoSearchRun
+from langchain_community.tools import DuckDuckGoSearchResults
 
 from .base import BaseTool
 
@@ -29,11 +29,13 @@ class DuckDuckGoSearchTool(BaseTool):
         """Create DuckDuckGo search tool.
 
         Returns:
-            DuckDuckGoSearchRun: Configured DuckDuckGo search tool.
+            DuckDuckGoSearchResults: Configured DuckDuckGo search tool, returning
+            a list of results with title, link and snippet.
         """
-        return DuckDuckGoSearchRun(
+        return DuckDuckGoSearchResults(
             name=self.name,
             description=self.description,
+            output_format="list",
         )
 
     def validate_config(self) -> bool:
@@ -0,0 +1,199 @@
+"""Federated search tool querying several academic databases at once."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any
+
+from langchain.tools import BaseTool as LangChainBaseTool
+from langchain_core.tools import StructuredTool
+
+from ..monitoring import get_metrics
+from .base import BaseTool
+from .compression import ExtractiveCompressor
+from .fusion import fuse_papers
+from .papers import Paper, PaperRenderer, papers_from_output
+from .ratelimit import RateLimitExceeded
+
+_SUMMARY_CHARS = 300
+
+# Summaries keep their sentences most relevant to the query within _SUMMARY_CHARS
+_SUMMARIES = ExtractiveCompressor(count_tokens=len)
+
+
+class FederatedSearchTool(BaseTool):
+    """Search several academic databases concurrently in a single tool call.
+
+    Each source runs with its own timeout; slow or failing sources are
+    reported in the output instead of failing the call. Papers returned by
+    several sources are merged on their ids or (near-)identical titles and
+    ranked by reciprocal rank fusion (see ``fuse_papers``).
+    """
+
+    def __init__(
+        self,
+        sources: list[BaseTool],
+        timeout: float = 15.0,
+        max_results: int = 10,
+        renderer: PaperRenderer | None = None,
+    ):
+        """Initialize federated search tool.
+
+        Args:
+            sources: Search tools to query (e.g. Google Scholar, PubMed, ArXiv).
+            timeout: Seconds to wait for each source.
+            max_results: Maximum number of merged results to return.
+            renderer: Compact renderer of the merged papers. Defaults to a
+                numbered listing with every field.
+        """
+        self._sources = sources
+        self._timeout = timeout
+        self._max_results = max_results
+        self._renderer = renderer
+
+    @property
+    def name(self) -> str:
+        return "federated_search"
+
+    @property
+    def description(self) -> str:
+        source_names = ", ".join(source.name for source in self._sources)
+        return (
+            "Search several academic databases at once "
+            f"({source_names}) and return one merged, deduplicated list of papers. "
+            "Prefer this over calling each database separately for topic searches. "
+            "Input should be a search query string."
+        )
+
+    def create_tool(self) -> LangChainBaseTool:
+        """Create federated search tool.
+
+        Returns:
+            LangChainBaseTool: Configured federated search tool.
+        """
+        source_tools = [source.create_tool() for source in self._sources]
+
+        def federated_search(query: str) -> str:
+            """Search all configured academic databases concurrently.
+
+            Args:
+                query: The search query.
+
+            Returns:
+                Merged list of papers, noting sources that failed.
+            """
+            outputs: dict[str, Any] = {}
+            executor = ThreadPoolExecutor(max_workers=len(source_tools) or 1)
+            futures = {tool.name: executor.submit(tool.invoke, query) for tool in source_tools}
+            wait(futures.values(), timeout=self._timeout)
+            # Don't block on sources that are still running past their timeout
+            executor.shutdown(wait=False, cancel_futures=True)
+            for name, future in futures.items():
+                if not future.done():
+                    outputs[name] = TimeoutError()
+                elif future.exception() is not None:
+                    outputs[name] = future.exception()
+                else:
+                    outputs[name] = future.result()
+            return self._merge(outputs, query)
+
+        async def afederated_search(query: str) -> str:
+            """Async variant used when the agent runs on the event loop."""
+            results = await asyncio.gather(
+                *(asyncio.wait_for(tool.ainvoke(query), self._timeout) for tool in source_tools),
+                return_exceptions=True,
+            )
+            names = [tool.name for tool in source_tools]
+            papers, failures = self._fuse(dict(zip(names, results, strict=True)))
+            if self._renderer is not None:
+                return await self._renderer.arender(
+                    papers, footer=_footer(failures), query=query
+                )
+            return self._listing(papers, failures, query)
+
+        return StructuredTool.from_function(
+            func=federated_search,
+            coroutine=afederated_search,
+            name=self.name,
+            description=self.description,
+        )
+
+    def validate_config(self) -> bool:
+        """Check that at least one source is configured."""
+        return any(source.validate_config() for source in self._sources)
+
+    def _merge(self, outputs: dict[str, Any], query: str) -> str:
+        """Merge per-source outputs into one ranked, deduplicated listing."""
+        papers, failures = self._fuse(outputs)
+        if self._renderer is not None:
+            return self._renderer.render(papers, footer=_footer(failures), query=query)
+        return self._listing(papers, failures, query)
+
+    def _fuse(self, outputs: dict[str, Any]) -> tuple[list[Paper], list[str]]:
+        """Rank and deduplicate the papers of per-source outputs, noting failed sources."""
+        metrics = get_metrics()
+        results: dict[str, list[Paper]] = {}
+        failures: list[str] = []
+        for source, output in outputs.items():
+            if isinstance(output, BaseException):
+                reason, metric = _failure(output)
+                failures.append(f"{source} {reason}")
+                metrics.increment(f"federated_search.{metric}")
+                continue
+            results[source] = papers_from_output(output, source) or []
+
+        papers = fuse_papers(results)
+        metrics.increment(
+            "federated_search.duplicates",
+            sum(len(found) for found in results.values()) - len(papers),
+        )
+        return papers[: self._max_results], failures
+
+    def _listing(self, papers: list[Paper], failures: list[str], query: str) -> str:
+        """Render fused papers in the plain listing used without a compact renderer."""
+        summaries = _SUMMARIES.compress_many(
+            [paper.abstract for paper in papers], query, _SUMMARY_CHARS
+        )
+        lines = [
+            _render(i, paper, summary)
+            for i, (paper, summary) in enumerate(zip(papers, summaries, strict=True), 1)
+        ]
+        if not lines:
+            lines.append("No papers were found.")
+        if failures:
+            lines.append(_footer(failures))
+        return "\n\n".join(lines)
+
+
+def _failure(error: BaseException) -> tuple[str, str]:
+    """Reason reported for a failed source and the metric counting it."""
+    # Checked first: RateLimitExceeded is a TimeoutError
+    if isinstance(error, RateLimitExceeded):
+        return "rate limited", "rate_limited"
+    if isinstance(error, TimeoutError):
+        return "timed out", "timeouts"
+    return f"failed: {error}", "errors"
+
+
+def _footer(failures: list[str]) -> str:
+    return "Unavailable sources: " + "; ".join(failures) if failures else ""
+
+
+def _render(position: int, paper: Paper, summary: str) -> str:
+    lines = [f"{position}. {paper.title}"]
+    details = [
+        f"{label}: {value}"
+        for label, value in (
+            ("Authors", ", ".join(paper.authors)),
+            ("Published", paper.year),
+            ("PMID", paper.pmid),
+            ("ArXiv", paper.arxiv_id),
+            ("DOI", paper.doi),
+            ("Citations", "" if paper.citations is None else str(paper.citations)),
+        )
+        if value
+    ]
+    details.append(f"Sources: {', '.join(paper.sources)}")
+    lines.append("   " + " | ".join(details))
+    if summary:
+        lines.append(f"   {summary}")
+    return "\n".join(lines)
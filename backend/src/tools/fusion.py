@@ -0,0 +1,296 @@
+"""Cross-source deduplication and rank fusion of paper results.
+
+Papers returned by several sources are matched on their identifiers (DOI,
+PMID, arXiv id), then on normalized titles: exact title keys first, and
+MinHash signatures of title shingles, bucketed with locality-sensitive
+hashing, for near-identical titles (punctuation, typos, subtitles). Only
+LSH candidates are compared, so matching stays close to linear in the
+number of papers. Matched records are merged and ranked with reciprocal
+rank fusion (RRF).
+"""
+
+import re
+import time
+import zlib
+from dataclasses import dataclass, field, replace
+
+from ..monitoring import get_metrics
+from .papers import Paper, title_key
+
+# 64-bit multiplicative mixing of the shingle hashes (crc32 alone is linear)
+_MIX = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+# arXiv-issued DOIs name the preprint, so they don't conflict with a journal DOI
+_ARXIV_DOI = re.compile(r"^10\.48550/", re.IGNORECASE)
+_ARXIV_VERSION = re.compile(r"v\d+$")
+
+
+def _shingles(key: str, size: int = 3) -> set[str]:
+    """Character shingles of a normalized title."""
+    if len(key) <= size:
+        return {key}
+    return {key[i : i + size] for i in range(len(key) - size + 1)}
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures of shingle sets, with LSH band keys.
+
+    Uses one permutation hashing: each shingle is hashed once and the hash
+    range is split into ``num_perm`` bins whose minima form the signature;
+    empty bins borrow the next non-empty bin's minimum (densification). This
+    estimates Jaccard similarity like ``num_perm`` independent permutations
+    at the cost of one hash per shingle.
+    """
+
+    def __init__(self, num_perm: int = 32, bands: int = 8):
+        """Initialize the hasher.
+
+        Args:
+            num_perm: Signature length.
+            bands: Number of LSH bands; ``num_perm`` must be a multiple.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self._num_perm = num_perm
+        self._rows = num_perm // bands
+
+    def signature(self, shingles: set[str]) -> tuple[int, ...]:
+        """Compute the MinHash signature of a shingle set.
+
+        Args:
+            shingles: Non-empty shingle set.
+
+        Returns:
+            One minimum per bin.
+        """
+        bins = self._num_perm
+        empty = _MASK
+        signature = [empty] * bins
+        for shingle in shingles:
+            value = (zlib.crc32(shingle.encode()) * _MIX) & _MASK
+            slot, value = value % bins, value // bins
+            if value < signature[slot]:
+                signature[slot] = value
+        for i in range(bins):
+            if signature[i] == empty:
+                for step in range(1, bins):
+                    borrowed = signature[(i + step) % bins]
+                    if borrowed != empty:
+                        # Offset by the distance so borrowed minima rarely collide
+                        signature[i] = borrowed + step * empty
+                        break
+        return tuple(signature)
+
+    def bands(self, signature: tuple[int, ...]) -> list[tuple[int, ...]]:
+        """Split a signature into LSH band keys.
+
+        Args:
+            signature: Signature from ``signature``.
+
+        Returns:
+            One key per band, prefixed with the band number.
+        """
+        rows = self._rows
+        return [
+            (i, *signature[start : start + rows])
+            for i, start in enumerate(range(0, len(signature), rows))
+        ]
+
+
+def _ids(paper: Paper) -> list[str]:
+    ids = []
+    if paper.doi and not _ARXIV_DOI.match(paper.doi):
+        ids.append(f"doi:{paper.doi.lower()}")
+    if paper.pmid:
+        ids.append(f"pmid:{paper.pmid}")
+    if paper.arxiv_id:
+        ids.append(f"arxiv:{_ARXIV_VERSION.sub('', paper.arxiv_id.lower())}")
+    return ids
+
+
+def _conflict(a: Paper, b: Paper) -> bool:
+    """Whether two papers carry different identifiers of the same kind."""
+    kinds_a = {i.split(":", 1)[0]: i for i in _ids(a)}
+    kinds_b = {i.split(":", 1)[0]: i for i in _ids(b)}
+    if any(kinds_a[kind] != kinds_b[kind] for kind in kinds_a.keys() & kinds_b.keys()):
+        return True
+    years = (a.year[:4], b.year[:4])
+    return all(y.isdigit() for y in years) and abs(int(years[0]) - int(years[1])) > 1
+
+
+def _merge(target: Paper, paper: Paper) -> Paper:
+    """Combine two copies of a paper into a new record, leaving both unchanged."""
+    updates = {
+        name: getattr(paper, name)
+        for name in ("year", "venue", "doi", "pmid", "arxiv_id", "url")
+        if not getattr(target, name) and getattr(paper, name)
+    }
+    if len(paper.abstract) > len(target.abstract):
+        updates["abstract"] = paper.abstract
+    if len(paper.authors) > len(target.authors):
+        updates["authors"] = list(paper.authors)
+    if paper.citations is not None:
+        updates["citations"] = max(target.citations or 0, paper.citations)
+    updates["sources"] = target.sources + [s for s in paper.sources if s not in target.sources]
+    return replace(target, **updates)
+
+
+@dataclass(slots=True)
+class _Cluster:
+    """One paper merged across its copies, with its best rank per source."""
+
+    paper: Paper
+    shingles: set[str]
+    ranks: dict[str, int] = field(default_factory=dict)
+    # Cluster this one was joined to when a paper matched both
+    merged_into: int | None = None
+
+
+class PaperIndex:
+    """Clusters of matching papers, looked up by id, title and MinHash.
+
+    Identifiers match exactly. Titles match on their normalized key, or on
+    shingle similarity for LSH candidates; either is rejected when the two
+    papers have different ids of the same kind or years more than a year
+    apart. A paper matching several clusters (e.g. one by id, another by
+    title) joins them into one, unless their records conflict.
+    """
+
+    def __init__(self, threshold: float = 0.8, hasher: MinHasher | None = None):
+        """Initialize the index.
+
+        Args:
+            threshold: Title shingle Jaccard similarity at which two papers
+                without conflicting identifiers are the same.
+            hasher: MinHash signer. Defaults to 32-bin signatures in 8 bands.
+        """
+        self._threshold = threshold
+        self._hasher = hasher or MinHasher()
+        self._clusters: list[_Cluster] = []
+        self._by_id: dict[str, int] = {}
+        self._by_title: dict[str, int] = {}
+        self._by_band: dict[tuple[int, ...], list[int]] = {}
+        self.fuzzy_matches = 0
+
+    @property
+    def clusters(self) -> list[_Cluster]:
+        """Clusters in order of creation, without those joined to another."""
+        return [cluster for cluster in self._clusters if cluster.merged_into is None]
+
+    def _root(self, index: int) -> int:
+        while (parent := self._clusters[index].merged_into) is not None:
+            index = parent
+        return index
+
+    def _find(self, paper: Paper, key: str, shingles: set[str], bands: list) -> list[int]:
+        """Find the clusters a paper matches by id and by title, in order of creation."""
+        matches = {self._root(self._by_id[i]) for i in _ids(paper) if i in self._by_id}
+        index = self._by_title.get(key)
+        if index is not None and not _conflict(self._clusters[self._root(index)].paper, paper):
+            matches.add(self._root(index))
+            return sorted(matches)
+        candidates = {self._root(i) for band in bands for i in self._by_band.get(band, ())}
+        best, best_score = None, self._threshold
+        for i in candidates:
+            cluster = self._clusters[i]
+            score = _jaccard(shingles, cluster.shingles)
+            if score >= best_score and not _conflict(cluster.paper, paper):
+                best, best_score = i, score
+        if best is not None and best not in matches:
+            self.fuzzy_matches += 1
+            matches.add(best)
+        return sorted(matches)
+
+    def _join(self, index: int, other: int) -> None:
+        """Join a cluster into another, unless their records conflict."""
+        cluster, joined = self._clusters[index], self._clusters[other]
+        if _conflict(cluster.paper, joined.paper):
+            return
+        cluster.paper = _merge(cluster.paper, joined.paper)
+        for source, rank in joined.ranks.items():
+            cluster.ranks[source] = min(rank, cluster.ranks.get(source, rank))
+        joined.merged_into = index
+
+    def add(self, paper: Paper, source: str, rank: int) -> bool:
+        """Add a paper, merging it into the clusters it matches.
+
+        Args:
+            paper: Paper to add (kept as the cluster's record if new; merged
+                records are new copies, so no paper passed in is modified).
+            source: Source that returned it.
+            rank: Its 1-based rank in that source's results.
+
+        Returns:
+            True if it was a duplicate of a paper already added.
+        """
+        key = title_key(paper.title)
+        shingles = _shingles(key)
+        bands = self._hasher.bands(self._hasher.signature(shingles)) if key else []
+        matches = self._find(paper, key, shingles, bands)
+        if not matches:
+            index = len(self._clusters)
+            self._clusters.append(_Cluster(paper=paper, shingles=shingles))
+        else:
+            index = matches[0]
+            self._clusters[index].paper = _merge(self._clusters[index].paper, paper)
+            for other in matches[1:]:
+                self._join(index, other)
+
+        cluster = self._clusters[index]
+        cluster.ranks[source] = min(rank, cluster.ranks.get(source, rank))
+        for paper_id in _ids(paper):
+            self._by_id.setdefault(paper_id, index)
+        if key:
+            self._by_title.setdefault(key, index)
+            for band in bands:
+                bucket = self._by_band.setdefault(band, [])
+                if index not in bucket:
+                    bucket.append(index)
+        return bool(matches)
+
+
+def fuse_papers(
+    results: dict[str, list[Paper]],
+    k: int = 60,
+    threshold: float = 0.8,
+) -> list[Paper]:
+    """Deduplicate papers across sources and rank them by reciprocal rank fusion.
+
+    A paper's score is the sum over the sources that returned it of
+    ``1 / (k + rank)``, so papers ranked high by several sources come first.
+
+    Args:
+        results: Papers of each source, in that source's rank order.
+        k: RRF constant; larger values flatten the rank differences.
+        threshold: Title similarity at which papers are merged.
+
+    Returns:
+        Merged papers, best first.
+    """
+    start = time.perf_counter()
+    index = PaperIndex(threshold=threshold)
+    candidates = duplicates = 0
+    for source, papers in results.items():
+        for rank, paper in enumerate(papers, 1):
+            candidates += 1
+            duplicates += index.add(paper, source, rank)
+
+    scored = [
+        (sum(1 / (k + rank) for rank in cluster.ranks.values()), -position, cluster.paper)
+        for position, cluster in enumerate(index.clusters)
+    ]
+    scored.sort(key=lambda item: item[:2], reverse=True)
+
+    metrics = get_metrics()
+    metrics.observe("fusion.candidates", candidates)
+    metrics.increment("fusion.duplicates", duplicates)
+    metrics.increment("fusion.fuzzy_matches", index.fuzzy_matches)
+    metrics.observe("fusion.seconds", time.perf_counter() - start)
+    return [paper for _, _, paper in scored]
@@ -0,0 +1,176 @@
+"""Hedged tool calls for cutting tail latency."""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from langchain.tools import BaseTool as LangChainBaseTool
+
+from ..monitoring import get_metrics
+from .base import BaseTool, WrappedTool, is_error_output
+from .ratelimit import RateLimitExceeded, TokenBucketLimiter, prepaid_slot
+
+
+class HedgedTool(WrappedTool):
+    """Send a duplicate of slow calls and keep whichever answers first.
+
+    Once a call has run longer than the tool's observed latency percentile
+    (p90 by default), a second identical call is started; the first
+    successful result wins and the other call is cancelled. Hedges are
+    bounded two ways: they only start when the limiter has a free slot right
+    now (they never queue), and at most ``budget`` of calls are hedged.
+
+    When ``limiter`` is given, this wrapper also rate-limits the primary
+    calls and replaces a ``RateLimitedTool``; with ``paced`` the inner tool's
+    client takes the slots itself and a hedge's reserved slot is handed to
+    its first request. Only async calls are hedged.
+    """
+
+    def __init__(
+        self,
+        inner: BaseTool,
+        limiter: TokenBucketLimiter | None = None,
+        percentile: float = 0.9,
+        min_samples: int = 20,
+        window: int = 200,
+        budget: float = 0.1,
+        min_delay: float = 0.2,
+        paced: bool = False,
+    ):
+        """Initialize the hedged tool.
+
+        Args:
+            inner: Tool whose calls are hedged.
+            limiter: Limiter of the tool's upstream, taken by every call.
+            percentile: Latency percentile after which a hedge is sent.
+            min_samples: Calls observed before hedging starts.
+            window: Number of recent latencies the percentile covers.
+            budget: Largest fraction of calls that may be hedged.
+            min_delay: Shortest wait before hedging, in seconds.
+            paced: Whether the inner tool takes a slot of ``limiter`` for each
+                of its requests, so primary calls aren't limited here.
+        """
+        super().__init__(inner)
+        self._limiter = limiter
+        self._paced = paced
+        self._percentile = percentile
+        self._min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._budget = budget
+        self._min_delay = min_delay
+        self._calls = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+
+        get_metrics().register_gauge(f"hedge.{self.name}.extra_call_ratio", self.extra_call_ratio)
+
+    def extra_call_ratio(self) -> float:
+        """Hedged calls as a fraction of all calls (the cost of hedging)."""
+        with self._lock:
+            return self._hedges / self._calls if self._calls else 0.0
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging, or None until enough calls were seen."""
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, math.ceil(self._percentile * len(latencies)) - 1)
+        return max(self._min_delay, latencies[index])
+
+    def _observe(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _claim_hedge(self) -> bool:
+        metrics = get_metrics()
+        with self._lock:
+            if self._hedges >= self._budget * self._calls:
+                metrics.increment(f"hedge.{self.name}.skipped_budget")
+                return False
+            self._hedges += 1
+        return True
+
+    def _call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        if self._limiter is not None and not self._paced:
+            # Sync calls run in a worker thread without an event loop
+            asyncio.run(self._limiter.acquire())
+        with self._lock:
+            self._calls += 1
+        start = time.monotonic()
+        output = tool.invoke(args)
+        self._observe(time.monotonic() - start)
+        return output
+
+    async def _acall(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        metrics = get_metrics()
+        if self._limiter is not None and not self._paced:
+            await self._limiter.acquire()
+        with self._lock:
+            self._calls += 1
+        delay = self.hedge_delay()
+
+        start = time.monotonic()
+        primary = asyncio.create_task(tool.ainvoke(args))
+        tasks = {primary}
+        try:
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+            if delay is not None and not primary.done() and await self._start_hedge():
+                metrics.increment(f"hedge.{self.name}.fired")
+                hedge = self._start_call(tool, args)
+                tasks.add(hedge)
+                output, winner = await self._first_result(tasks)
+                if winner is hedge:
+                    metrics.increment(f"hedge.{self.name}.wins")
+            else:
+                output = await primary
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # When the hedge wins the primary's latency is only known to exceed
+        # this, which still places it above the percentile, so the hedge
+        # delay doesn't drift down as hedges succeed
+        latency = time.monotonic() - start
+        self._observe(latency)
+        metrics.observe(f"hedge.{self.name}.latency_seconds", latency)
+        return output
+
+    async def _start_hedge(self) -> bool:
+        """Take the hedging budget and a rate-limit slot, without queueing."""
+        if not self._claim_hedge():
+            return False
+        if self._limiter is None:
+            return True
+        try:
+            await self._limiter.acquire(timeout=0)
+        except RateLimitExceeded:
+            with self._lock:
+                self._hedges -= 1
+            get_metrics().increment(f"hedge.{self.name}.skipped_rate_limited")
+            return False
+        return True
+
+    def _start_call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> asyncio.Task:
+        """Start a hedge, handing it the slot it reserved if the tool paces itself."""
+        if self._limiter is None or not self._paced:
+            return asyncio.create_task(tool.ainvoke(args))
+        with prepaid_slot(self._limiter):
+            return asyncio.create_task(tool.ainvoke(args))
+
+    async def _first_result(self, tasks: set[asyncio.Task]) -> tuple[Any, asyncio.Task]:
+        """Wait for the first call that succeeds, or the last one to fail."""
+        pending = set(tasks)
+        last: asyncio.Task | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                last = task
+                if task.exception() is None and not is_error_output(task.result()):
+                    return task.result(), task
+        assert last is not None
+        return last.result(), last
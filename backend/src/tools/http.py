@@ -0,0 +1,158 @@
+"""Process-wide pooled HTTP clients shared by the search tools."""
+
+import asyncio
+import importlib.util
+import logging
+from typing import Any
+
+import httpx
+
+from ..config import Settings, get_settings
+from ..monitoring import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientRegistry:
+    """Pooled ``httpx.AsyncClient`` instances, one per origin.
+
+    Each origin (scheme, host and port) gets its own client so connection
+    limits apply per host, and connections are kept alive across tool calls
+    and chat requests. Clients are bound to the event loop that first asks
+    for one (the server loop); callers running on another loop get None and
+    fall back to a private client.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 10,
+        max_keepalive_per_host: int = 5,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 20.0,
+        http2: bool = True,
+    ):
+        """Initialize the registry.
+
+        Args:
+            max_connections_per_host: Maximum open connections per origin.
+            max_keepalive_per_host: Idle connections kept open per origin.
+            keepalive_expiry: Seconds an idle connection is kept open.
+            timeout: Request timeout in seconds.
+            http2: Negotiate HTTP/2 when the ``h2`` package is installed.
+        """
+        self._limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = timeout
+        self._http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._requests = 0
+        self._connections = 0
+
+        metrics = get_metrics()
+        metrics.register_gauge("http.clients", lambda: len(self._clients))
+        metrics.register_gauge("http.connection_reuse_ratio", self._reuse_ratio)
+
+    @property
+    def http2(self) -> bool:
+        """Whether clients negotiate HTTP/2."""
+        return self._http2
+
+    def _reuse_ratio(self) -> float:
+        if not self._requests:
+            return 0.0
+        return max(0.0, 1 - self._connections / self._requests)
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self._requests += 1
+        get_metrics().increment("http.requests")
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, _info: dict[str, Any]) -> None:
+        # httpcore reports a TCP connect only when no pooled connection is free
+        if event == "connection.connect_tcp.complete":
+            self._connections += 1
+            get_metrics().increment("http.connections_opened")
+
+    def client_for(self, url: str) -> httpx.AsyncClient | None:
+        """Get the pooled client for a URL's origin.
+
+        Args:
+            url: URL (or base URL) the client will send requests to.
+
+        Returns:
+            Shared client, or None if called outside the registry's event loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if self._loop is None:
+            self._loop = loop
+        elif loop is not self._loop:
+            return None
+
+        parsed = httpx.URL(url)
+        origin = f"{parsed.scheme}://{parsed.netloc.decode('ascii')}"
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=self._timeout,
+                http2=self._http2,
+                event_hooks={"request": [self._on_request]},
+            )
+            self._clients[origin] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close all clients and their connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._loop = None
+        for client in clients:
+            await client.aclose()
+
+
+_registry: HTTPClientRegistry | None = None
+
+
+def init_http_registry(settings: Settings | None = None) -> HTTPClientRegistry:
+    """Create the process-wide HTTP client registry.
+
+    Called from the application lifespan, so pooled clients are closed on
+    shutdown.
+
+    Args:
+        settings: Settings to configure the pools from. Defaults to app settings.
+
+    Returns:
+        The new registry.
+    """
+    global _registry
+    settings = settings or get_settings()
+    _registry = HTTPClientRegistry(
+        max_connections_per_host=settings.http_max_connections_per_host,
+        max_keepalive_per_host=settings.http_max_keepalive_per_host,
+        keepalive_expiry=settings.http_keepalive_expiry,
+        timeout=settings.http_timeout,
+        http2=settings.http2_enabled,
+    )
+    logger.info(f"HTTP client pool ready (HTTP/2 {'on' if _registry.http2 else 'off'})")
+    return _registry
+
+
+def get_http_registry() -> HTTPClientRegistry | None:
+    """Get the process-wide HTTP client registry, if the app created one."""
+    return _registry
+
+
+async def close_http_registry() -> None:
+    """Close the process-wide HTTP client registry, if created."""
+    global _registry
+    if _registry is not None:
+        await _registry.aclose()
+    _registry = None
@@ -0,0 +1,525 @@
+"""Common paper record and compact, token-budgeted rendering of search results.
+
+Search tools return their full labelled text, or, when their results are
+compacted, their records as ``{"papers": [...]}`` (cached, merged by
+federated search). Before results reach the agent, ``CompactResultsTool``
+turns them into ``Paper`` records, stores the full records for the
+``paper_details`` tool and hands the model a dense listing that fits a
+token budget.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import re
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field, replace
+from functools import lru_cache
+from typing import Any
+
+from langchain.tools import BaseTool as LangChainBaseTool
+from langchain_core.tools import StructuredTool
+
+from ..config import get_settings
+from ..monitoring import get_metrics
+from .base import BaseTool, WrappedTool, is_error_output
+from .cache import ToolResultCache, get_tool_cache
+from .compression import ExtractiveCompressor
+
+# Field labels of the search tools' text output
+_FIELD = re.compile(
+    r"^(PMID|ArXiv ID|DOI|Published|Title|Authors|Journal|URL|Summary|Copyright Information"
+    r"|Total-Citations)::?\s?(.*)$"
+)
+
+# Characters per token used when no token counter is given
+_CHARS_PER_TOKEN = 4
+
+# Authors listed before "et al."
+_MAX_AUTHORS = 3
+
+# Shortest abstract excerpt worth keeping a paper for in a capped listing
+_MIN_ABSTRACT_CHARS = 200
+
+# Compressor of abstracts budgeted in characters
+_CHAR_COMPRESSOR = ExtractiveCompressor(count_tokens=len)
+
+
+def parse_results(text: str) -> list[dict[str, str]]:
+    """Split a search tool's text output into one record per paper.
+
+    Args:
+        text: Output of a PubMed, ArXiv or Google Scholar query.
+
+    Returns:
+        Records keyed by lowercase field label (``title``, ``authors``,
+        ``published``, ``summary``...), in the order returned by the source.
+        Records without a title are dropped.
+    """
+    records: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    key = None
+    for line in text.splitlines():
+        match = _FIELD.match(line)
+        if match:
+            key = match.group(1).lower()
+            if key in current:
+                records.append(current)
+                current = {}
+            current[key] = match.group(2).strip()
+        elif key is not None and line.strip():
+            current[key] = f"{current[key]} {line.strip()}".strip()
+    if current:
+        records.append(current)
+    return [record for record in records if record.get("title")]
+
+
+def title_key(title: str) -> str:
+    """Normalize a title for matching (lowercase alphanumeric words)."""
+    return " ".join(re.findall(r"[a-z0-9]+", title.lower()))
+
+
+@dataclass(slots=True)
+class Paper:
+    """Paper (or web page) returned by a search tool."""
+
+    title: str
+    authors: list[str] = field(default_factory=list)
+    year: str = ""
+    venue: str = ""
+    doi: str = ""
+    pmid: str = ""
+    arxiv_id: str = ""
+    url: str = ""
+    abstract: str = ""
+    citations: int | None = None
+    sources: list[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        """Short stable identifier, preferring DOI, PMID and arXiv id."""
+        if self.doi:
+            return f"doi:{self.doi}"
+        if self.pmid:
+            return f"pmid:{self.pmid}"
+        if self.arxiv_id:
+            return f"arxiv:{self.arxiv_id}"
+        digest = hashlib.sha1(title_key(self.title).encode()).hexdigest()[:8]
+        return f"t:{digest}"
+
+    @classmethod
+    def from_fields(cls, fields: dict[str, str], source: str = "") -> "Paper":
+        """Build a paper from a record of ``parse_results``.
+
+        Args:
+            fields: Record keyed by lowercase field label.
+            source: Name of the tool that returned it.
+
+        Returns:
+            The paper.
+        """
+        citations = fields.get("total-citations", "").strip()
+        return cls(
+            title=fields["title"].rstrip("."),
+            authors=[a.strip() for a in fields.get("authors", "").split(",") if a.strip()],
+            year=fields.get("published", "")[:4],
+            venue=fields.get("journal", ""),
+            doi=fields.get("doi", ""),
+            pmid=fields.get("pmid", ""),
+            arxiv_id=fields.get("arxiv id", ""),
+            url=fields.get("url", ""),
+            abstract=fields.get("summary", ""),
+            citations=int(citations) if citations.isdigit() else None,
+            sources=[source] if source else [],
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Paper":
+        """Rebuild a paper from ``to_dict`` output."""
+        return cls(**data)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable representation."""
+        return asdict(self)
+
+    def to_text(self) -> str:
+        """Render the paper in the labelled format the search tools return."""
+        lines = []
+        for label, value in (
+            ("PMID", self.pmid),
+            ("ArXiv ID", self.arxiv_id),
+            ("Published", self.year),
+            ("Title", self.title),
+            ("Authors", ", ".join(self.authors)),
+            ("Journal", self.venue),
+            ("DOI", self.doi),
+            ("Total-Citations", "" if self.citations is None else str(self.citations)),
+            ("URL", self.url),
+        ):
+            if value or label in ("Published", "Title"):
+                lines.append(f"{label}: {value}")
+        lines.append(f"Summary: {self.abstract}")
+        return "\n".join(lines)
+
+
+def papers_to_records(papers: list[Paper]) -> dict[str, Any]:
+    """Package papers as a search tool's structured output.
+
+    Args:
+        papers: Papers in rank order.
+
+    Returns:
+        JSON-serializable ``{"papers": [...]}`` read back by ``papers_from_output``.
+    """
+    return {"papers": [paper.to_dict() for paper in papers]}
+
+
+def papers_from_output(output: Any, source: str) -> list[Paper] | None:
+    """Convert a search tool's output to papers.
+
+    Structured records are rebuilt as returned; labelled text is parsed,
+    which splits authors on commas.
+
+    Args:
+        output: Records from ``papers_to_records``, labelled text (PubMed,
+            ArXiv, Scholar), a Tavily response or a list of DuckDuckGo results.
+        source: Name of the tool that returned it.
+
+    Returns:
+        Papers in the order returned (empty for structured records without
+        any), or None if the output isn't a result listing (errors, free text).
+    """
+    if is_error_output(output):
+        return None
+    if isinstance(output, str):
+        records = parse_results(output)
+        return [Paper.from_fields(record, source) for record in records] or None
+    if isinstance(output, dict) and "papers" in output:
+        return [Paper.from_dict(record) for record in output["papers"]]
+    if isinstance(output, dict):
+        output = output.get("results")
+    if not isinstance(output, list):
+        return None
+    papers = [
+        Paper(
+            title=item.get("title", ""),
+            url=item.get("url") or item.get("link", ""),
+            abstract=item.get("content") or item.get("snippet", ""),
+            sources=[source],
+        )
+        for item in output
+        if isinstance(item, dict) and item.get("title")
+    ]
+    return papers or None
+
+
+def papers_to_text(papers: list[Paper], query: str = "", max_chars: int | None = None) -> str:
+    """Render papers in the labelled text format of the search tools.
+
+    Over ``max_chars``, each abstract is cut down to its sentences most
+    relevant to the query, sharing what the other fields leave of the budget.
+    Trailing papers are dropped only if fewer than ``_MIN_ABSTRACT_CHARS``
+    would be left per abstract.
+
+    Args:
+        papers: Papers in rank order.
+        query: Search query the abstract excerpts are chosen for.
+        max_chars: Length limit of the text (None for no limit).
+
+    Returns:
+        The papers' labelled records, blank-line separated.
+    """
+    text = "\n\n".join(paper.to_text() for paper in papers)
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    # Leave "Summary: " lines the abstracts are added to
+    stubs = [replace(paper, abstract="").to_text() for paper in papers]
+    count = len(papers)
+    while count > 1:
+        fixed = sum(len(stub) for stub in stubs[:count]) + 2 * (count - 1)
+        if fixed + count * _MIN_ABSTRACT_CHARS <= max_chars:
+            break
+        count -= 1
+    fixed = sum(len(stub) for stub in stubs[:count]) + 2 * (count - 1)
+    abstracts = _CHAR_COMPRESSOR.compress_many(
+        [paper.abstract for paper in papers[:count]], query, max(0, (max_chars - fixed) // count)
+    )
+    return "\n\n".join(
+        replace(paper, abstract=abstract).to_text()
+        for paper, abstract in zip(papers[:count], abstracts, strict=True)
+    )
+
+
+def _estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+class PaperStore:
+    """Full paper records kept for follow-up questions.
+
+    Records live in the tool result cache (shared by all workers), keyed by
+    ``Paper.key``.
+    """
+
+    def __init__(self, cache: ToolResultCache, ttl: float = 7 * 24 * 60 * 60):
+        """Initialize the store.
+
+        Args:
+            cache: Cache holding the records.
+            ttl: Seconds a record is kept.
+        """
+        self._cache = cache
+        self._ttl = ttl
+
+    def put(self, papers: list[Paper]) -> None:
+        """Store full records in one write.
+
+        Args:
+            papers: Papers to store.
+        """
+        self._cache.set_many(
+            [(f"paper\0{paper.key}", paper.to_dict()) for paper in papers], "paper", self._ttl
+        )
+
+    async def aput(self, papers: list[Paper]) -> None:
+        """Store full records without blocking the event loop on SQLite.
+
+        Args:
+            papers: Papers to store.
+        """
+        await asyncio.to_thread(self.put, papers)
+
+    def get(self, key: str) -> Paper | None:
+        """Look up a record.
+
+        Args:
+            key: Paper key as shown in the compact listing.
+
+        Returns:
+            The paper, or None if it isn't stored.
+        """
+        entry = self._cache.get(f"paper\0{key}")
+        return Paper.from_dict(entry.value) if entry is not None else None
+
+
+@lru_cache
+def get_paper_store() -> PaperStore:
+    """Get the process-wide paper store configured from settings."""
+    return PaperStore(get_tool_cache(), ttl=get_settings().paper_details_ttl)
+
+
+class PaperRenderer:
+    """Render papers as a dense listing within a token budget.
+
+    Each paper gets one header line (key, title, first authors, year, venue,
+    citations) and, budget permitting, an abstract excerpt made of the
+    sentences most relevant to the search query. Papers that
+    don't fit are counted at the end. Full records are kept in the store so
+    the agent can ask for them with ``paper_details``.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 600,
+        abstract_tokens: int = 50,
+        count_tokens: Callable[[str], int] | None = None,
+        store: PaperStore | None = None,
+    ):
+        """Initialize the renderer.
+
+        Args:
+            max_tokens: Token budget of one listing.
+            abstract_tokens: Token budget of the abstract excerpt of a paper.
+            count_tokens: Token counter. Defaults to a length estimate.
+            store: Store for the full records (None to not keep them).
+        """
+        self._max_tokens = max_tokens
+        self._abstract_tokens = abstract_tokens
+        self._count_tokens = count_tokens or _estimate_tokens
+        self._compressor = ExtractiveCompressor(count_tokens=self._count_tokens)
+        self._store = store
+
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens of a text with the renderer's counter."""
+        return self._count_tokens(text)
+
+    def _header(self, paper: Paper) -> str:
+        parts = [f"[{paper.key}] {paper.title}"]
+        if paper.authors:
+            authors = ", ".join(paper.authors[:_MAX_AUTHORS])
+            if len(paper.authors) > _MAX_AUTHORS:
+                authors += " et al."
+            parts.append(authors)
+        details = " ".join(filter(None, (f"({paper.year})" if paper.year else "", paper.venue)))
+        if details:
+            parts.append(details)
+        if paper.citations is not None:
+            parts.append(f"{paper.citations} cites")
+        if paper.url and not (paper.doi or paper.pmid or paper.arxiv_id):
+            parts.append(paper.url)
+        return " | ".join(parts)
+
+    def render(self, papers: list[Paper], footer: str = "", query: str = "") -> str:
+        """Render papers within the token budget.
+
+        Args:
+            papers: Papers in rank order.
+            footer: Extra line appended to the listing (e.g. failed sources).
+            query: Search query the excerpts are chosen for. Without one,
+                excerpts are the leading sentences.
+
+        Returns:
+            The listing.
+        """
+        if self._store is not None:
+            self._store.put(papers)
+        return self._listing(papers, footer, query)
+
+    async def arender(self, papers: list[Paper], footer: str = "", query: str = "") -> str:
+        """Render papers within the token budget, storing them off the event loop.
+
+        Args:
+            papers: Papers in rank order.
+            footer: Extra line appended to the listing (e.g. failed sources).
+            query: Search query the excerpts are chosen for.
+
+        Returns:
+            The listing.
+        """
+        if self._store is not None:
+            await self._store.aput(papers)
+        return self._listing(papers, footer, query)
+
+    def _listing(self, papers: list[Paper], footer: str, query: str) -> str:
+        closing = [footer] if footer else []
+        if self._store is not None and papers:
+            closing.append("Full abstracts and authors: paper_details with the [ids].")
+        used = self._count_tokens("\n".join(closing))
+        entries: list[str] = []
+        excerpts = self._compressor.compress_many(
+            [paper.abstract for paper in papers], query, self._abstract_tokens
+        )
+        for paper, excerpt in zip(papers, excerpts, strict=True):
+            header = self._header(paper)
+            entry = header
+            if excerpt:
+                entry = f"{header}\n  {excerpt}"
+            tokens = self._count_tokens(entry)
+            if used + tokens > self._max_tokens:
+                entry = header
+                tokens = self._count_tokens(entry)
+                if used + tokens > self._max_tokens:
+                    break
+            entries.append(entry)
+            used += tokens
+        if len(entries) < len(papers):
+            entries.append(f"(+{len(papers) - len(entries)} more not shown)")
+        if not papers:
+            entries.append("No papers were found.")
+        return "\n".join(entries + closing)
+
+
+class CompactResultsTool(WrappedTool):
+    """Hand the agent a compact listing of a search tool's results.
+
+    Outputs that aren't result listings (errors, free text) pass through
+    unchanged. The prompt tokens saved are recorded under
+    ``compact_results.*``.
+    """
+
+    def __init__(self, inner: BaseTool, renderer: PaperRenderer):
+        """Initialize the compacting tool.
+
+        Args:
+            inner: Search tool whose results are compacted.
+            renderer: Renderer of the listing.
+        """
+        super().__init__(inner)
+        self._renderer = renderer
+
+    def _measure(self, output: Any, compact: str) -> None:
+        raw = output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
+        tokens_in = self._renderer.count_tokens(raw)
+        tokens_out = self._renderer.count_tokens(compact)
+        metrics = get_metrics()
+        metrics.observe(f"compact_results.{self.name}.tokens_in", tokens_in)
+        metrics.observe(f"compact_results.{self.name}.tokens_out", tokens_out)
+        metrics.increment("compact_results.tokens_saved", max(0, tokens_in - tokens_out))
+
+    def _call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        output = tool.invoke(args)
+        papers = papers_from_output(output, self.name)
+        if papers is None:
+            return output
+        compact = self._renderer.render(papers, query=str(args.get("query", "")))
+        self._measure(output, compact)
+        return compact
+
+    async def _acall(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        output = await tool.ainvoke(args)
+        papers = papers_from_output(output, self.name)
+        if papers is None:
+            return output
+        compact = await self._renderer.arender(papers, query=str(args.get("query", "")))
+        self._measure(output, compact)
+        return compact
+
+
+class PaperDetailsTool(BaseTool):
+    """Full details of papers listed earlier by the search tools."""
+
+    def __init__(self, store: PaperStore | None = None):
+        """Initialize the tool.
+
+        Args:
+            store: Store of full records. Defaults to the process-wide store.
+        """
+        self._store = store
+
+    @property
+    def name(self) -> str:
+        return "paper_details"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Get the full details (all authors, complete abstract, identifiers, URL) "
+            "of papers listed by the search tools. "
+            "Input should be one or more paper ids as shown in brackets, comma-separated "
+            "(e.g., 'pmid:101, doi:10.1000/xyz')."
+        )
+
+    def create_tool(self) -> LangChainBaseTool:
+        """Create the paper details tool.
+
+        Returns:
+            LangChainBaseTool: Configured paper details tool.
+        """
+
+        def paper_details(ids: str) -> str:
+            """Look up stored papers by id.
+
+            Args:
+                ids: Comma-separated paper ids.
+
+            Returns:
+                Full records of the papers found.
+            """
+            store = self._store or get_paper_store()
+            found, missing = [], []
+            for key in filter(None, (part.strip(" []") for part in ids.split(","))):
+                paper = store.get(key)
+                if paper is None:
+                    missing.append(key)
+                else:
+                    found.append(paper.to_text())
+            if missing:
+                found.append(f"No stored details for: {', '.join(missing)}. Search again.")
+            return "\n\n".join(found)
+
+        return StructuredTool.from_function(
+            func=paper_details,
+            name=self.name,
+            description=self.description,
+        )
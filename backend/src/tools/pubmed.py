@@ -1,31 +1,340 @@
 """PubMed search tool for biomedical literature."""
 
+import asyncio
+import logging
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any, cast
+from xml.etree.ElementTree import Element, XMLPullParser
+
+import httpx
 from langchain.tools import BaseTool as LangChainBaseTool
-from langchain_community.tools.pubmed.tool import PubmedQueryRun
-from langchain_community.utilities.pubmed import PubMedAPIWrapper
+from langchain_core.tools import StructuredTool
 
+from ..monitoring import get_metrics
 from .base import BaseTool
+from .http import HTTPClientRegistry
+from .papers import Paper, papers_to_records, papers_to_text
+from .ratelimit import RateLimitExceeded, TokenBucketLimiter, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+# NCBI allows 3 requests per second per client, 10 with an API key
+_RATE_WITHOUT_KEY = 3.0
+_RATE_WITH_KEY = 10.0
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+@dataclass
+class PubMedRecord:
+    """Article metadata returned by PubMed."""
+
+    pmid: str
+    title: str
+    authors: list[str] = field(default_factory=list)
+    journal: str = ""
+    year: str = ""
+    doi: str = ""
+    abstract: str = ""
+
+    def to_paper(self) -> Paper:
+        """Convert to the common paper record."""
+        return Paper(
+            title=self.title,
+            authors=list(self.authors),
+            year=self.year,
+            venue=self.journal,
+            doi=self.doi,
+            pmid=self.pmid,
+            abstract=self.abstract,
+            sources=["pubmed"],
+        )
+
+    def to_text(self) -> str:
+        """Render the record in the labelled format the search tools return."""
+        return self.to_paper().to_text()
+
+
+def _text(element: Element | None) -> str:
+    """Text of an element including inline markup such as <i>, whitespace-normalized."""
+    if element is None:
+        return ""
+    return " ".join("".join(element.itertext()).split())
+
+
+def _parse_article(article: Element) -> PubMedRecord:
+    citation = article.find("MedlineCitation")
+    info = citation.find("Article") if citation is not None else None
+    if citation is None or info is None:
+        return PubMedRecord(pmid=_text(article.find(".//PMID")), title="")
+
+    authors = []
+    for author in info.iterfind("AuthorList/Author"):
+        name = _text(author.find("CollectiveName"))
+        if not name:
+            name = " ".join(filter(None, (_text(author.find("ForeName")), _text(author.find("LastName")))))
+        if name:
+            authors.append(name)
+
+    sections = []
+    for part in info.iterfind("Abstract/AbstractText"):
+        label = part.get("Label")
+        sections.append(f"{label}: {_text(part)}" if label else _text(part))
+
+    pub_date = info.find("Journal/JournalIssue/PubDate")
+    year = _text(pub_date.find("Year")) if pub_date is not None else ""
+    if not year and pub_date is not None:
+        year = _text(pub_date.find("MedlineDate"))[:4]
+
+    doi = ""
+    for article_id in article.iterfind("PubmedData/ArticleIdList/ArticleId"):
+        if article_id.get("IdType") == "doi":
+            doi = _text(article_id)
+            break
+
+    return PubMedRecord(
+        pmid=_text(citation.find("PMID")),
+        title=_text(info.find("ArticleTitle")),
+        authors=authors,
+        journal=_text(info.find("Journal/Title")),
+        year=year,
+        doi=doi,
+        abstract=" ".join(sections),
+    )
+
+
+class PubMedArticleParser:
+    """Incremental parser for efetch ``PubmedArticleSet`` XML.
+
+    Bytes are fed as they arrive and each article is converted and released
+    as soon as its closing tag is read, so memory stays flat however many
+    articles the response holds.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._parser: XMLPullParser[Element] = XMLPullParser(events=("start", "end"))
+        self._root: Element | None = None
+
+    def feed(self, data: bytes) -> Iterator[PubMedRecord]:
+        """Parse a chunk of the response.
+
+        Args:
+            data: Next chunk of the XML document.
+
+        Yields:
+            Records of the articles completed by this chunk.
+        """
+        self._parser.feed(data)
+        # Only start and end events are requested, and both carry an element
+        events = cast(Iterator[tuple[str, Element]], self._parser.read_events())
+        for event, element in events:
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                continue
+            if element.tag == "PubmedArticle":
+                yield _parse_article(element)
+                if self._root is not None:
+                    self._root.clear()
+
+
+def _host_limiter(
+    base_url: str, api_key: str | None, requests_per_second: float | None = None
+) -> TokenBucketLimiter:
+    """Get the limiter of an E-utilities host and key."""
+    if requests_per_second is None:
+        requests_per_second = _RATE_WITH_KEY if api_key else _RATE_WITHOUT_KEY
+    # One bucket per host (and key, as NCBI counts per key), shared by every
+    # client and worker
+    host = httpx.URL(base_url.rstrip("/")).netloc.decode()
+    return get_rate_limiter(f"{host}+key" if api_key else host, requests_per_second)
+
+
+class PubMedClient:
+    """Async client for the NCBI E-utilities search and fetch endpoints.
+
+    A search costs two requests whatever the number of results: one
+    ``esearch`` for the PMIDs and one batched ``efetch`` for all articles.
+    Requests are paced to NCBI's rate limit and retried on throttling and
+    server errors.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient | None = None,
+        api_key: str | None = None,
+        base_url: str = EUTILS_URL,
+        email: str | None = None,
+        requests_per_second: float | None = None,
+        max_retries: int = 3,
+        timeout: float = 20.0,
+    ):
+        """Initialize the client.
+
+        Args:
+            http_client: HTTP client to send requests with. A private client
+                is created (and closed by ``aclose``) if omitted.
+            api_key: NCBI API key, raising the rate limit to 10 requests/s.
+            base_url: E-utilities base URL.
+            email: Contact address sent to NCBI with each request.
+            requests_per_second: Default request rate, used unless
+                RATE_LIMITS sets one. Defaults to NCBI's limit.
+            max_retries: Retries of throttled or failed requests.
+            timeout: Request timeout in seconds for the private client.
+        """
+        self._owns_client = http_client is None
+        self._http = http_client or httpx.AsyncClient(timeout=timeout)
+        self._api_key = api_key
+        self._base_url = base_url.rstrip("/")
+        self._email = email
+        self._max_retries = max_retries
+        self._limiter = _host_limiter(self._base_url, api_key, requests_per_second)
+
+    async def __aenter__(self) -> "PubMedClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the HTTP client if this instance created it."""
+        if self._owns_client:
+            await self._http.aclose()
+
+    def _params(self, **params: Any) -> dict[str, Any]:
+        params = {"db": "pubmed", "tool": "agente-investigador", **params}
+        if self._api_key:
+            params["api_key"] = self._api_key
+        if self._email:
+            params["email"] = self._email
+        return params
+
+    async def _send(self, method: str, endpoint: str, **kwargs: Any) -> httpx.Response:
+        """Send a paced request with retries, returning the open streaming response."""
+        request = self._http.build_request(method, f"{self._base_url}/{endpoint}", **kwargs)
+        metrics = get_metrics()
+        for attempt in range(self._max_retries + 1):
+            await self._limiter.acquire()
+            metrics.increment("pubmed.requests")
+            try:
+                response = await self._http.send(request, stream=True)
+            except httpx.TransportError:
+                if attempt == self._max_retries:
+                    raise
+                await asyncio.sleep(0.5 * 2**attempt)
+                continue
+            if response.status_code not in _RETRY_STATUSES or attempt == self._max_retries:
+                break
+            await response.aclose()
+            metrics.increment("pubmed.retries")
+            retry_after = response.headers.get("Retry-After", "")
+            await asyncio.sleep(float(retry_after) if retry_after.isdigit() else 0.5 * 2**attempt)
+        if response.is_error:
+            await response.aclose()
+            response.raise_for_status()
+        return response
+
+    async def search_ids(self, query: str, max_results: int) -> list[str]:
+        """Find the PMIDs matching a query.
+
+        Args:
+            query: PubMed search term.
+            max_results: Maximum number of PMIDs.
+
+        Returns:
+            PMIDs in relevance order.
+        """
+        response = await self._send("GET", "esearch.fcgi", params=self._params(
+            term=query, retmax=max_results, retmode="json", sort="relevance",
+        ))
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        pmids: list[str] = response.json()["esearchresult"].get("idlist", [])
+        return pmids
+
+    async def fetch(self, pmids: list[str]) -> list[PubMedRecord]:
+        """Fetch article metadata for PMIDs in one request.
+
+        Args:
+            pmids: PMIDs to fetch.
+
+        Returns:
+            Records in the order of ``pmids`` (missing articles are skipped).
+        """
+        if not pmids:
+            return []
+        # POST keeps long ID lists out of the URL
+        response = await self._send("POST", "efetch.fcgi", data=self._params(
+            id=",".join(pmids), retmode="xml", rettype="abstract",
+        ))
+        parser = PubMedArticleParser()
+        records: dict[str, PubMedRecord] = {}
+        try:
+            async for chunk in response.aiter_bytes():
+                for record in parser.feed(chunk):
+                    records[record.pmid] = record
+        finally:
+            await response.aclose()
+        return [records[pmid] for pmid in pmids if pmid in records]
+
+    async def search(self, query: str, max_results: int = 10) -> list[PubMedRecord]:
+        """Search PubMed and fetch the matching articles.
+
+        Args:
+            query: PubMed search term.
+            max_results: Maximum number of articles.
+
+        Returns:
+            Records in relevance order.
+        """
+        return await self.fetch(await self.search_ids(query, max_results))
 
 
 class PubMedSearchTool(BaseTool):
     """PubMed search tool for biomedical and life sciences literature.
 
-    No API key required - uses NCBI's free public API.
+    No API key required - uses NCBI's free public API. An NCBI API key
+    (NCBI_API_KEY) raises the rate limit from 3 to 10 requests per second.
     """
 
+    # Queries longer than this are rejected by esearch
+    MAX_QUERY_LENGTH = 300
+
     def __init__(
         self,
         top_k_results: int = 10,
-        doc_content_chars_max: int = 2000,
+        doc_content_chars_max: int | None = 2000,
+        structured_output: bool = False,
+        api_key: str | None = None,
+        base_url: str = EUTILS_URL,
+        http_registry: HTTPClientRegistry | None = None,
     ):
         """Initialize PubMed search tool.
 
         Args:
             top_k_results: Maximum number of results to return.
-            doc_content_chars_max: Maximum characters per document summary.
+            doc_content_chars_max: Maximum characters of the output; abstracts are
+                cut to their sentences most relevant to the query to fit. None
+                for full records.
+            structured_output: Return the full records as ``{"papers": [...]}``
+                (see ``papers_to_records``) instead of labelled text, for
+                callers that build their own listing from them.
+            api_key: NCBI API key. If None, reads from NCBI_API_KEY env var.
+            base_url: E-utilities base URL.
+            http_registry: Pooled HTTP clients to send requests with.
         """
         self._top_k_results = top_k_results
         self._doc_content_chars_max = doc_content_chars_max
+        self._structured_output = structured_output
+        self._api_key = api_key
+        self._base_url = base_url
+        self._http_registry = http_registry
 
     @property
     def name(self) -> str:
@@ -40,18 +349,71 @@ class PubMedSearchTool(BaseTool):
             "Input should be a search query string."
         )
 
+    @property
+    def rate_limiter(self) -> TokenBucketLimiter:
+        """Limiter of the E-utilities host the tool's clients pace requests with."""
+        return _host_limiter(self._base_url, self._api_key or os.getenv("NCBI_API_KEY"))
+
+    def create_client(self, http_client: httpx.AsyncClient | None = None) -> PubMedClient:
+        """Create an E-utilities client with this tool's configuration.
+
+        Args:
+            http_client: HTTP client to use. Defaults to the pooled client
+                when called on the registry's event loop, else a private one.
+
+        Returns:
+            Configured PubMedClient.
+        """
+        if http_client is None and self._http_registry is not None:
+            http_client = self._http_registry.client_for(self._base_url)
+        return PubMedClient(
+            http_client=http_client,
+            api_key=self._api_key or os.getenv("NCBI_API_KEY"),
+            base_url=self._base_url,
+        )
+
+    async def _search(self, query: str) -> str | dict[str, Any]:
+        try:
+            async with self.create_client() as client:
+                records = await client.search(query[: self.MAX_QUERY_LENGTH], self._top_k_results)
+        except RateLimitExceeded:
+            # Not a failure of the upstream, so circuit breakers don't count it
+            raise
+        except Exception as e:
+            logger.warning(f"PubMed search failed: {e}")
+            return f"PubMed exception: {e}"
+        if not records:
+            return "No good PubMed Result was found"
+        papers = [record.to_paper() for record in records]
+        if self._structured_output:
+            return papers_to_records(papers)
+        return papers_to_text(papers, query, self._doc_content_chars_max)
+
     def create_tool(self) -> LangChainBaseTool:
         """Create PubMed search tool.
 
         Returns:
-            PubmedQueryRun: Configured PubMed search tool.
+            LangChainBaseTool: Configured PubMed search tool.
         """
-        wrapper = PubMedAPIWrapper(
-            top_k_results=self._top_k_results,
-            doc_content_chars_max=self._doc_content_chars_max,
-        )
-        return PubmedQueryRun(
-            api_wrapper=wrapper,
+
+        def pubmed(query: str) -> str | dict[str, Any]:
+            """Search PubMed for articles matching a query.
+
+            Args:
+                query: The search query.
+
+            Returns:
+                Matching articles with title, authors, year and abstract.
+            """
+            return asyncio.run(self._search(query))
+
+        async def apubmed(query: str) -> str | dict[str, Any]:
+            """Async variant used when the agent runs on the event loop."""
+            return await self._search(query)
+
+        return StructuredTool.from_function(
+            func=pubmed,
+            coroutine=apubmed,
             name=self.name,
             description=self.description,
         )
@@ -0,0 +1,311 @@
+"""Token-bucket rate limiting for external search APIs.
+
+Buckets are kept as a "theoretical arrival time" (GCRA, equivalent to a
+token bucket): each caller atomically reserves the next free slot and then
+sleeps until it, so callers queue in arrival order instead of failing. The
+bucket state can live in a SQLite file so every uvicorn worker on a host
+draws from the same budget.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from langchain.tools import BaseTool as LangChainBaseTool
+
+from ..config import get_settings
+from ..monitoring import get_metrics
+from .base import BaseTool, WrappedTool
+
+logger = logging.getLogger(__name__)
+
+# Slots the current task already reserved, by limiter name (see ``prepaid_slot``)
+_prepaid_slots: ContextVar[dict[str, int] | None] = ContextVar("prepaid_slots", default=None)
+
+
+class RateLimitExceeded(TimeoutError):
+    """Raised when the next free slot is later than the caller can wait."""
+
+    def __init__(self, name: str, wait: float):
+        """Initialize the error.
+
+        Args:
+            name: Rate limiter name.
+            wait: Seconds the caller would have had to queue.
+        """
+        super().__init__(f"{name} is rate limited: next request slot in {wait:.1f}s")
+        self.name = name
+        self.wait = wait
+
+
+def _reserve(
+    tat: float, now: float, interval: float, burst: int, max_wait: float | None
+) -> tuple[float, float | None]:
+    """Compute the wait for the next slot and the bucket's new arrival time.
+
+    The new arrival time is None when the wait exceeds ``max_wait``.
+    """
+    tat = max(tat, now)
+    wait = max(0.0, tat - (burst - 1) * interval - now)
+    if max_wait is not None and wait > max_wait:
+        return wait, None
+    return wait, tat + interval
+
+
+class BucketStore(ABC):
+    """Storage of bucket state, updated atomically per reservation."""
+
+    # Whether reservations block on I/O and should run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def reserve(
+        self, name: str, interval: float, burst: int, max_wait: float | None
+    ) -> tuple[float, bool]:
+        """Reserve the next slot of a bucket.
+
+        Args:
+            name: Bucket name.
+            interval: Seconds between slots (1 / rate).
+            burst: Number of requests allowed back to back.
+            max_wait: Longest acceptable wait, or None to always reserve.
+
+        Returns:
+            Seconds until the next slot, and whether it was reserved (it is
+            not if the wait exceeds ``max_wait``).
+        """
+        pass
+
+
+class MemoryBucketStore(BucketStore):
+    """Bucket state shared by the threads and event loops of one process."""
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        self._tats: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(
+        self, name: str, interval: float, burst: int, max_wait: float | None
+    ) -> tuple[float, bool]:
+        with self._lock:
+            wait, tat = _reserve(self._tats.get(name, 0.0), time.time(), interval, burst, max_wait)
+            if tat is not None:
+                self._tats[name] = tat
+            return wait, tat is not None
+
+
+class SQLiteBucketStore(BucketStore):
+    """Bucket state in a SQLite file shared by the processes of a host."""
+
+    blocking = True
+
+    def __init__(self, path: str | Path):
+        """Initialize the store.
+
+        Args:
+            path: SQLite database file.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None, timeout=5.0
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (name TEXT PRIMARY KEY, tat REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def reserve(
+        self, name: str, interval: float, burst: int, max_wait: float | None
+    ) -> tuple[float, bool]:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, serializing workers
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tat FROM rate_buckets WHERE name = ?", (name,)
+                ).fetchone()
+                wait, tat = _reserve(row[0] if row else 0.0, time.time(), interval, burst, max_wait)
+                if tat is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO rate_buckets VALUES (?, ?)", (name, tat)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait, tat is not None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class TokenBucketLimiter:
+    """Rate limiter for one upstream, queueing callers for the next slot."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int = 1,
+        store: BucketStore | None = None,
+        max_wait: float | None = None,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            name: Upstream name, also the bucket key in the store.
+            rate: Requests per second (0 or less disables limiting).
+            burst: Requests allowed back to back after an idle period.
+            store: Bucket state storage. Defaults to process memory.
+            max_wait: Default longest queueing time (None waits as long as needed).
+        """
+        self._name = name
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._burst = max(1, burst)
+        self._store = store or MemoryBucketStore()
+        self._max_wait = max_wait
+
+    @property
+    def name(self) -> str:
+        """Upstream name."""
+        return self._name
+
+    async def acquire(self, timeout: float | None = None) -> float:
+        """Queue for the next request slot.
+
+        Args:
+            timeout: Longest acceptable wait in seconds. Defaults to the
+                limiter's ``max_wait``; 0 only takes a slot that is free now.
+
+        Returns:
+            Seconds spent queueing.
+
+        Raises:
+            RateLimitExceeded: If the next slot is further away than ``timeout``.
+        """
+        prepaid = _prepaid_slots.get()
+        if prepaid and prepaid.get(self._name):
+            prepaid[self._name] -= 1
+            return 0.0
+        if not self._interval:
+            return 0.0
+        max_wait = self._max_wait if timeout is None else timeout
+        args = (self._name, self._interval, self._burst, max_wait)
+        if self._store.blocking:
+            wait, reserved = await asyncio.to_thread(self._store.reserve, *args)
+        else:
+            wait, reserved = self._store.reserve(*args)
+
+        metrics = get_metrics()
+        if not reserved:
+            metrics.increment(f"ratelimit.{self._name}.rejected")
+            raise RateLimitExceeded(self._name, wait)
+        metrics.observe(f"ratelimit.{self._name}.wait_seconds", wait)
+        if wait > 0:
+            metrics.increment(f"ratelimit.{self._name}.queued")
+            await asyncio.sleep(wait)
+        return wait
+
+
+@contextmanager
+def prepaid_slot(limiter: TokenBucketLimiter) -> Iterator[None]:
+    """Hand a slot reserved by the caller to the tasks created in this block.
+
+    Their next ``acquire`` on the limiter returns at once instead of taking
+    another slot; later acquires queue as usual.
+
+    Args:
+        limiter: Limiter the caller reserved a slot of.
+    """
+    prepaid = dict(_prepaid_slots.get() or {})
+    prepaid[limiter.name] = prepaid.get(limiter.name, 0) + 1
+    token = _prepaid_slots.set(prepaid)
+    try:
+        yield
+    finally:
+        _prepaid_slots.reset(token)
+
+
+@lru_cache
+def _get_bucket_store() -> BucketStore:
+    """Get the process-wide bucket store configured from settings."""
+    path = get_settings().rate_limit_store_path
+    if not path:
+        return MemoryBucketStore()
+    try:
+        return SQLiteBucketStore(path)
+    except sqlite3.Error as e:
+        logger.warning(f"Rate limit store {path} unavailable, limiting per process: {e}")
+        return MemoryBucketStore()
+
+
+_limiters: dict[str, TokenBucketLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, burst: int = 1) -> TokenBucketLimiter:
+    """Get the shared limiter of an upstream, creating it on first use.
+
+    Args:
+        name: Upstream name (API host or tool name).
+        rate: Default requests per second, overridden by ``RATE_LIMITS``.
+        burst: Requests allowed back to back after an idle period.
+
+    Returns:
+        Limiter shared by every caller of the upstream in the process (and
+        across processes when the SQLite store is configured).
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            settings = get_settings()
+            limiter = TokenBucketLimiter(
+                name,
+                rate=settings.rate_limits.get(name, rate),
+                burst=burst,
+                store=_get_bucket_store(),
+                max_wait=settings.rate_limit_max_wait,
+            )
+            _limiters[name] = limiter
+        return limiter
+
+
+class RateLimitedTool(WrappedTool):
+    """Queue a tool's calls on a rate limiter before they reach the upstream.
+
+    Used for tools whose SDK makes its own HTTP requests; clients written
+    here (PubMed, ArXiv) pace each request themselves.
+    """
+
+    def __init__(self, inner: BaseTool, limiter: TokenBucketLimiter):
+        """Initialize the rate-limited tool.
+
+        Args:
+            inner: Tool whose calls are limited.
+            limiter: Limiter of the tool's upstream.
+        """
+        super().__init__(inner)
+        self._limiter = limiter
+
+    def _call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        # Sync calls run in a worker thread without an event loop
+        asyncio.run(self._limiter.acquire())
+        return tool.invoke(args)
+
+    async def _acall(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        await self._limiter.acquire()
+        return await tool.ainvoke(args)
@@ -0,0 +1,146 @@
+"""Coalescing of identical concurrent tool calls."""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any
+
+from langchain.tools import BaseTool as LangChainBaseTool
+
+from ..monitoring import get_metrics
+from .base import BaseTool, WrappedTool
+from .cache import normalize_args
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared call whose leader was cancelled before it finished."""
+
+
+class SingleFlight:
+    """Registry of in-flight calls shared by their concurrent duplicates.
+
+    The first caller of a key (the leader) runs the call; callers arriving
+    before it finishes wait for the leader's result instead. Futures are
+    thread-safe, so duplicates are coalesced across worker threads and event
+    loops of the process.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._calls: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        get_metrics().register_gauge("singleflight.in_flight", lambda: len(self._calls))
+
+    @staticmethod
+    def key_for(tool: str, args: dict[str, Any]) -> str:
+        """Compute the key of a tool call.
+
+        Args:
+            tool: Tool name.
+            args: Call arguments.
+
+        Returns:
+            Tool name and normalized arguments.
+        """
+        return f"{tool}\0{normalize_args(args)}"
+
+    def claim(self, key: str) -> tuple[Future, bool]:
+        """Join the in-flight call of a key, or register a new one.
+
+        Args:
+            key: Key from ``key_for``.
+
+        Returns:
+            The call's future, and whether the caller is its leader and must
+            run the call and ``release`` it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def release(self, key: str, future: Future) -> None:
+        """Remove a finished call so later callers start a new one.
+
+        Args:
+            key: Key from ``key_for``.
+            future: The call's future.
+        """
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+@lru_cache
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide in-flight call registry."""
+    return SingleFlight()
+
+
+class SingleFlightTool(WrappedTool):
+    """Share one upstream call between identical concurrent calls of a tool.
+
+    Calls match when the tool name and normalized arguments (see
+    ``normalize_args``) are equal. Followers get the leader's output or
+    exception; if the leader is cancelled they run the call themselves.
+    """
+
+    def __init__(self, inner: BaseTool, group: SingleFlight | None = None):
+        """Initialize the coalescing tool.
+
+        Args:
+            inner: Tool whose calls are coalesced.
+            group: In-flight call registry. Defaults to the process-wide one.
+        """
+        super().__init__(inner)
+        self._group = group or get_single_flight()
+
+    def _joined(self) -> None:
+        metrics = get_metrics()
+        metrics.increment("singleflight.calls_saved")
+        metrics.increment(f"singleflight.{self.name}.calls_saved")
+
+    def _call(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        key = self._group.key_for(self.name, args)
+        future, leader = self._group.claim(key)
+        if not leader:
+            self._joined()
+            try:
+                return future.result()
+            except _LeaderCancelled:
+                return tool.invoke(args)
+        try:
+            output = tool.invoke(args)
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else _LeaderCancelled())
+            raise
+        else:
+            future.set_result(output)
+        finally:
+            self._group.release(key, future)
+        return output
+
+    async def _acall(self, tool: LangChainBaseTool, args: dict[str, Any]) -> Any:
+        key = self._group.key_for(self.name, args)
+        future, leader = self._group.claim(key)
+        if not leader:
+            self._joined()
+            try:
+                # Shielded: a cancelled follower must not cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderCancelled:
+                return await tool.ainvoke(args)
+        try:
+            output = await tool.ainvoke(args)
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else _LeaderCancelled())
+            raise
+        else:
+            future.set_result(output)
+        finally:
+            self._group.release(key, future)
+        return output
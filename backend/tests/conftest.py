@@ -6,9 +6,14 @@ from typing import Generator
 import pytest
 from fastapi.testclient import TestClient
 
+from tests.fakes import StubHTTPServer
+
 # Set test environment variables before importing app
 os.environ["OPENAI_API_KEY"] = "test-key"
 os.environ["ENVIRONMENT"] = "testing"
+os.environ["RATE_LIMIT_STORE_PATH"] = ""
+os.environ["TOOL_CACHE_PATH"] = ":memory:"
+os.environ["LLM_CACHE_PATH"] = ":memory:"
 
 
 @pytest.fixture(scope="session")
@@ -30,6 +35,18 @@ def test_client() -> Generator[TestClient, None, None]:
         yield client
 
 
+@pytest.fixture
+def stub_server() -> Generator[StubHTTPServer, None, None]:
+    """Start a local HTTP server for API client tests.
+
+    Yields:
+        Running StubHTTPServer with no handlers registered.
+    """
+    server = StubHTTPServer().start()
+    yield server
+    server.stop()
+
+
 @pytest.fixture
 def mock_env(monkeypatch: pytest.MonkeyPatch) -> None:
     """Set up mock environment variables.
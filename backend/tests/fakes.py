@@ -0,0 +1,215 @@
+"""Network-free fakes shared by the test suite."""
+
+import asyncio
+import json
+import math
+import re
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import tool
+from typing_extensions import override
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Fake chat model that replays scripted replies after a delay.
+
+    Replies are streamed word by word, followed by any tool calls, so the
+    agent behaves like a streaming OpenAI model without network access.
+    """
+
+    responses: list[AIMessage]
+    delay: float = 0.0
+    calls: int = 0
+    prompts: list[list[BaseMessage]] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @override
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _next_response(self, messages: list[BaseMessage]) -> AIMessage:
+        self.prompts.append(messages)
+        response = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        # Copy so replies replayed more than once get distinct message IDs
+        return response.model_copy()
+
+    @override
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._next_response(messages))])
+
+    @override
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        await asyncio.sleep(self.delay)
+        response = self._next_response(messages)
+        for token in response.content.split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=f"{token} "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        if response.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(response.tool_calls)
+                ],
+            ))
+
+    @override
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._next_response(messages))])
+
+
+class WordEmbeddings(Embeddings):
+    """Fake embeddings: normalized counts of hashed words.
+
+    Texts sharing most of their words get a high cosine similarity, so
+    near-identical questions match without an embedding API.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.calls = 0
+
+    def _embed(self, text: str) -> list[float]:
+        self.calls += 1
+        vector = [0.0] * self.dimensions
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+@tool
+async def lookup_papers(query: str) -> str:
+    """Look up papers for a query."""
+    return f"2 papers about {query}"
+
+
+@dataclass
+class StubRequest:
+    """Request received by the stub server."""
+
+    method: str
+    path: str
+    params: dict[str, str]
+    time: float
+
+
+@dataclass
+class StubResponse:
+    """Canned reply: the body is sent in ``chunk_size`` pieces."""
+
+    body: bytes
+    status: int = 200
+    headers: dict[str, str] = field(default_factory=dict)
+    chunk_size: int = 0
+
+
+class StubHTTPServer:
+    """Local HTTP server answering registered paths, for API client tests.
+
+    Handlers receive the parsed request (query string and form body merged
+    into ``params``) and return a ``StubResponse``. All requests are recorded.
+    """
+
+    def __init__(self) -> None:
+        self.handlers: dict[str, Callable[[StubRequest], StubResponse]] = {}
+        self.requests: list[StubRequest] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _handle(self) -> None:
+                url = urlsplit(self.path)
+                params = parse_qs(url.query)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    params.update(parse_qs(self.rfile.read(length).decode()))
+                request = StubRequest(
+                    method=self.command,
+                    path=url.path,
+                    params={key: values[-1] for key, values in params.items()},
+                    time=time.monotonic(),
+                )
+                stub.requests.append(request)
+                handler = stub.handlers.get(url.path)
+                reply = handler(request) if handler else StubResponse(b"not found", status=404)
+
+                self.send_response(reply.status)
+                for name, value in reply.headers.items():
+                    self.send_header(name, value)
+                if reply.chunk_size:
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for i in range(0, len(reply.body), reply.chunk_size):
+                        piece = reply.body[i:i + reply.chunk_size]
+                        self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    self.send_header("Content-Length", str(len(reply.body)))
+                    self.end_headers()
+                    self.wfile.write(reply.body)
+
+            do_GET = do_POST = _handle
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubHTTPServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
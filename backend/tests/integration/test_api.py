@@ -1,7 +1,61 @@
 """Integration tests for API endpoints."""
 
+import asyncio
+import json
+import time
+from typing import Any
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from tests.fakes import ScriptedChatModel, lookup_papers
+
+# Simulated LLM latency for the concurrency tests
+AGENT_DELAY_SECONDS = 0.3
+
+
+@pytest.fixture
+def slow_agent(monkeypatch: pytest.MonkeyPatch) -> Any:
+    """Replace the chat agent singleton with a slow, network-free agent."""
+    from src.api.routes import chat as chat_routes
+
+    agent = create_react_agent(
+        ScriptedChatModel(responses=[AIMessage(content="done")], delay=AGENT_DELAY_SECONDS),
+        [],
+        checkpointer=MemorySaver(),
+    )
+    monkeypatch.setattr(chat_routes, "_agent", agent)
+    return agent
+
+
+@pytest.fixture
+def tool_agent(monkeypatch: pytest.MonkeyPatch) -> Any:
+    """Replace the chat agent singleton with one that calls a tool, then answers."""
+    from src.api.routes import chat as chat_routes
+
+    model = ScriptedChatModel(responses=[
+        AIMessage(
+            content="Searching",
+            tool_calls=[{"name": "lookup_papers", "args": {"query": "crispr"}, "id": "call-1"}],
+        ),
+        AIMessage(content="Found two papers"),
+    ])
+    agent = create_react_agent(model, [lookup_papers], checkpointer=MemorySaver())
+    monkeypatch.setattr(chat_routes, "_agent", agent)
+    return agent
+
+
+def parse_sse(body: str) -> list[tuple[int, dict[str, Any]]]:
+    """Parse an SSE body into (event id, JSON payload) pairs."""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((int(fields["id"]), json.loads(fields["data"])))
+    return events
 
 
 class TestHealthEndpoints:
@@ -13,11 +67,41 @@ class TestHealthEndpoints:
         assert response.status_code == 200
         assert response.json() == {"status": "healthy"}
 
+    def test_metrics(self, test_client: TestClient) -> None:
+        """Test metrics endpoint exposes the registry sections."""
+        response = test_client.get("/api/metrics")
+        assert response.status_code == 200
+        assert set(response.json()) == {"counters", "summaries", "gauges"}
+
     def test_readiness_check(self, test_client: TestClient) -> None:
         """Test readiness endpoint returns ready."""
         response = test_client.get("/api/ready")
         assert response.status_code == 200
-        assert response.json() == {"status": "ready"}
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["openai_configured"] is True
+        assert data["in_flight"] == 0
+        assert data["queue_depth"] == 0
+        assert data["saturated"] is False
+
+    def test_readiness_reports_saturation(
+        self, test_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test readiness reports a full run queue while staying ready."""
+        from src.api.routes import health as health_routes
+        from src.core import RunScheduler
+
+        scheduler = RunScheduler(max_concurrent=1, max_queued=0)
+        monkeypatch.setattr(health_routes, "get_run_scheduler", lambda: scheduler)
+        held = scheduler.reserve("busy-thread")
+
+        data = test_client.get("/api/ready").json()
+        assert data["status"] == "ready"
+        assert data["saturated"] is True
+        assert data["max_concurrent_runs"] == 1
+
+        held.release()
+        assert test_client.get("/api/ready").json()["saturated"] is False
 
 
 class TestToolsEndpoints:
@@ -51,6 +135,22 @@ class TestToolsEndpoints:
         assert data["requires_api_key"] is False
         assert data["is_available"] is True
 
+    def test_tool_unavailable_while_circuit_open(
+        self, test_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test availability reflects the tool's live breaker state."""
+        from src.tools import circuit
+
+        monkeypatch.setattr(circuit, "_breakers", {})
+        breaker = circuit.get_circuit_breaker("arxiv")
+        for _ in range(5):
+            breaker.record(False, 0.1)
+
+        data = test_client.get("/api/tools/arxiv").json()
+        assert data["is_available"] is False
+        assert data["circuit_state"] == "open"
+        assert test_client.get("/api/tools/pubmed").json()["circuit_state"] == "closed"
+
     def test_get_nonexistent_tool(self, test_client: TestClient) -> None:
         """Test getting a non-existent tool returns 404."""
         response = test_client.get("/api/tools/nonexistent")
@@ -65,6 +165,299 @@ class TestChatEndpoints:
         response = test_client.delete("/api/chat/nonexistent-thread-id")
         assert response.status_code == 404
 
+    def test_delete_purges_thread(
+        self, test_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test deleting a thread removes its stored conversation state."""
+        from src.api.routes import chat as chat_routes
+
+        memory = chat_routes.get_agent_factory().memory_manager
+        agent = create_react_agent(
+            ScriptedChatModel(responses=[AIMessage(content="hello")]),
+            [],
+            checkpointer=memory.checkpointer,
+        )
+        monkeypatch.setattr(chat_routes, "_agent", agent)
+        config = {"configurable": {"thread_id": "t-purge"}}
+
+        response = test_client.post("/api/chat", json={"message": "hi", "thread_id": "t-purge"})
+        assert response.status_code == 200
+        assert memory.checkpointer.get_tuple(config) is not None
+
+        response = test_client.delete("/api/chat/t-purge")
+        assert response.status_code == 200
+        assert memory.checkpointer.get_tuple(config) is None
+        assert test_client.delete("/api/chat/t-purge").status_code == 404
+
+    def test_history_and_thread_listing(
+        self, test_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test stored conversations can be listed and paged through."""
+        from src.api.routes import chat as chat_routes
+
+        memory = chat_routes.get_agent_factory().memory_manager
+        agent = create_react_agent(
+            ScriptedChatModel(responses=[AIMessage(content="hello")]),
+            [],
+            checkpointer=memory.checkpointer,
+        )
+        monkeypatch.setattr(chat_routes, "_agent", agent)
+        for text in ("first", "second"):
+            response = test_client.post(
+                "/api/chat", json={"message": text, "thread_id": "t-history"}
+            )
+            assert response.status_code == 200
+
+        page = test_client.get("/api/chat/t-history/history", params={"limit": 3}).json()
+        assert [m["content"] for m in page["messages"]] == ["hello", "second", "hello"]
+        assert page["created_at"] <= page["updated_at"]
+
+        older = test_client.get(
+            "/api/chat/t-history/history", params={"cursor": page["next_cursor"]}
+        ).json()
+        assert [(m["role"], m["content"]) for m in older["messages"]] == [("human", "first")]
+        assert older["next_cursor"] is None
+
+        threads = test_client.get("/api/chat/threads").json()["threads"]
+        listed = next(t for t in threads if t["thread_id"] == "t-history")
+        assert listed["title"] == "first"
+        assert listed["message_count"] == 4
+
+    @pytest.mark.usefixtures("tool_agent")
+    def test_response_holds_only_current_turn(self, test_client: TestClient) -> None:
+        """Test each response carries this turn's messages with tool call details."""
+        response = test_client.post(
+            "/api/chat", json={"message": "find crispr papers", "thread_id": "t-delta"}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert [m["role"] for m in body["messages"]] == ["human", "ai", "tool", "ai"]
+
+        human, call, result, answer = body["messages"]
+        assert human["content"] == "find crispr papers"
+        assert call["tool_calls"] == [
+            {"id": "call-1", "name": "lookup_papers", "args": {"query": "crispr"}}
+        ]
+        assert result["tool_call_id"] == "call-1"
+        assert result["content"] == "2 papers about crispr"
+        assert body["final_response"] == answer["content"] == "Found two papers"
+
+        # The next turn does not repeat the previous one
+        response = test_client.post("/api/chat", json={"message": "thanks", "thread_id": "t-delta"})
+        assert [m["content"] for m in response.json()["messages"]] == ["thanks", "Found two papers"]
+
+    def test_identifier_lookup_skips_the_agent(
+        self, test_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test an identifier-only message is answered by the fast path."""
+        from langchain_core.tools import StructuredTool
+
+        from src.api.routes import chat as chat_routes
+        from src.core import FastPathRouter
+        from src.tools import Paper
+
+        async def arxiv(query: str) -> str:
+            return Paper(title="Graph networks", arxiv_id=query, abstract="Graphs.").to_text()
+
+        memory = chat_routes.get_agent_factory().memory_manager
+        model = ScriptedChatModel(responses=[AIMessage(content="hello")])
+        agent = create_react_agent(model, [], checkpointer=memory.checkpointer)
+        monkeypatch.setattr(chat_routes, "_agent", agent)
+        monkeypatch.setattr(chat_routes, "_fast_path", FastPathRouter({
+            "arxiv": StructuredTool.from_function(coroutine=arxiv, name="arxiv", description="a"),
+        }))
+
+        response = test_client.post(
+            "/api/chat", json={"message": "get me 2510.13422", "thread_id": "t-fast"}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert [m["role"] for m in body["messages"]] == ["human", "ai", "tool", "ai"]
+        assert body["final_response"].startswith("**Graph networks**")
+        assert model.calls == 0
+
+        history = test_client.get("/api/chat/t-fast/history").json()
+        assert [m["role"] for m in history["messages"]] == ["human", "ai", "tool", "ai"]
+        assert test_client.get("/api/metrics").json()["gauges"]["fastpath.hit_rate"] > 0
+
+    def test_similar_first_question_is_answered_from_cache(
+        self, test_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Any
+    ) -> None:
+        """Test a new thread's near-identical question reuses an earlier answer."""
+        from src.api.routes import chat as chat_routes
+        from src.core import SemanticAnswerCache
+        from tests.fakes import WordEmbeddings
+
+        memory = chat_routes.get_agent_factory().memory_manager
+        model = ScriptedChatModel(responses=[AIMessage(content="CRISPR answer")])
+        agent = create_react_agent(model, [], checkpointer=memory.checkpointer)
+        monkeypatch.setattr(chat_routes, "_agent", agent)
+        monkeypatch.setattr(
+            chat_routes, "_answer_cache", SemanticAnswerCache(WordEmbeddings(), path=tmp_path)
+        )
+
+        def ask(message: str, thread_id: str) -> dict[str, Any]:
+            response = test_client.post(
+                "/api/chat", json={"message": message, "thread_id": thread_id}
+            )
+            assert response.status_code == 200
+            return response.json()
+
+        first = ask("latest papers on CRISPR off-target effects", "t-answer-1")
+        assert first["cached"] is False and model.calls == 1
+        # Later turns are neither served nor stored
+        ask("and in mice?", "t-answer-1")
+        assert model.calls == 2
+
+        second = ask("Latest papers on CRISPR off-target effects", "t-answer-2")
+        assert second["cached"] is True and model.calls == 2
+        assert second["final_response"] == "CRISPR answer"
+        history = test_client.get("/api/chat/t-answer-2/history").json()
+        assert [m["content"] for m in history["messages"]] == [
+            "Latest papers on CRISPR off-target effects", "CRISPR answer",
+        ]
+
+        response = test_client.post(
+            "/api/chat/stream",
+            json={"message": "latest papers on crispr off-target effects", "thread_id": "t-3"},
+        )
+        events = [payload for _, payload in parse_sse(response.text)]
+        assert events == [
+            {"type": "message", "content": "CRISPR answer", "cached": True}, {"type": "done"},
+        ]
+        assert model.calls == 2
+        assert test_client.get("/api/metrics").json()["gauges"]["answer_cache.hit_rate"] > 0
+
+    def test_history_errors(self, test_client: TestClient) -> None:
+        """Test unknown threads and malformed cursors are rejected."""
+        assert test_client.get("/api/chat/missing/history").status_code == 404
+        assert test_client.get("/api/chat/threads", params={"cursor": "bad"}).status_code == 400
+
+
+class TestChatConcurrency:
+    """Tests for non-blocking agent execution."""
+
+    @pytest.mark.usefixtures("slow_agent")
+    async def test_parallel_chats_overlap(self) -> None:
+        """Test N parallel chats finish in about the time of the slowest one."""
+        from src.main import app
+
+        n_requests = 5
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/api/chat", json={"message": "hi", "thread_id": f"t-{i}"})
+                for i in range(n_requests)
+            ))
+            elapsed = time.perf_counter() - start
+
+        assert all(r.status_code == 200 for r in responses)
+        assert all(r.json()["final_response"] == "done" for r in responses)
+        # Serial execution would take n_requests * delay
+        assert elapsed < 2 * AGENT_DELAY_SECONDS
+
+    @pytest.mark.usefixtures("slow_agent")
+    async def test_health_responsive_during_chat(self) -> None:
+        """Test health checks are served while an agent run is in flight."""
+        from src.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            chat_task = asyncio.create_task(
+                client.post("/api/chat", json={"message": "hi", "thread_id": "t-health"})
+            )
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            health = await client.get("/api/health")
+            health_elapsed = time.perf_counter() - start
+            chat_response = await chat_task
+
+        assert health.status_code == 200
+        assert health_elapsed < 0.1
+        assert chat_response.status_code == 200
+
+
+class TestChatStreaming:
+    """Tests for the SSE streaming endpoint."""
+
+    @pytest.mark.usefixtures("tool_agent")
+    def test_stream_emits_typed_chunks(self, test_client: TestClient) -> None:
+        """Test tokens, tool events and done are streamed as StreamChunk frames."""
+        response = test_client.post(
+            "/api/chat/stream",
+            json={"message": "find crispr papers", "thread_id": "t-stream"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = parse_sse(response.text)
+        ids = [event_id for event_id, _ in events]
+        types = [chunk["type"] for _, chunk in events]
+
+        assert ids == list(range(1, len(events) + 1))
+        assert types[-1] == "done"
+        assert types.index("tool_call") < types.index("tool_result")
+
+        tool_call = next(chunk for _, chunk in events if chunk["type"] == "tool_call")
+        assert tool_call["tool_name"] == "lookup_papers"
+        assert tool_call["tool_input"] == {"query": "crispr"}
+
+        tool_result = next(chunk for _, chunk in events if chunk["type"] == "tool_result")
+        assert tool_result["tool_call_id"] == tool_call["tool_call_id"]
+        assert tool_result["tool_output"] == "2 papers about crispr"
+
+        tokens = [chunk["content"] for _, chunk in events if chunk["type"] == "message"]
+        assert len(tokens) > 2
+        assert "".join(tokens).strip().endswith("Found two papers")
+
+
+class TestAdmissionControl:
+    """Tests for chat admission control."""
+
+    def test_saturated_returns_429(
+        self, test_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a full run queue rejects chats with Retry-After."""
+        from src.api.routes import chat as chat_routes
+        from src.core import RunScheduler
+
+        scheduler = RunScheduler(max_concurrent=1, max_queued=0)
+        monkeypatch.setattr(chat_routes, "get_run_scheduler", lambda: scheduler)
+        held = scheduler.reserve("busy-thread")
+
+        for endpoint in ("/api/chat", "/api/chat/stream"):
+            response = test_client.post(endpoint, json={"message": "hi", "thread_id": "t-1"})
+            assert response.status_code == 429
+            assert int(response.headers["Retry-After"]) >= 1
+
+        held.release()
+
+
+class TestClientDisconnect:
+    """Tests for cancelling agent runs on client disconnect."""
+
+    async def test_disconnect_cancels_run(self, slow_agent: Any) -> None:
+        """Test a detected disconnect cancels the in-flight agent run."""
+        from langchain_core.messages import HumanMessage
+
+        from src.api.routes import chat as chat_routes
+        from src.core import AgentRun
+
+        class DisconnectedRequest:
+            async def is_disconnected(self) -> bool:
+                return True
+
+        run = AgentRun(
+            slow_agent,
+            {"messages": [HumanMessage(content="hi")]},
+            {"configurable": {"thread_id": "t-disconnect"}},
+        )
+        await chat_routes._cancel_on_disconnect(DisconnectedRequest(), run)
+        await run.wait_closed()
+
+        assert run.cancelled
+
 
 class TestCORSHeaders:
     """Tests for CORS configuration."""
@@ -0,0 +1,991 @@
+"""Unit tests for core agent components."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.tools import StructuredTool, tool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from src.config import Settings
+from src.core.answer_cache import SemanticAnswerCache, is_cached_answer
+from src.core.blobs import (
+    BLOB_REF_KEY,
+    BlobOffloadingSerializer,
+    FileBlobStore,
+    InMemoryBlobStore,
+    resolve_message,
+)
+from src.core.checkpoint import SQLiteCheckpointSaver
+from src.core.fastpath import FastPathRouter, Identifier, parse_identifiers
+from src.core.history import SUMMARY_PREFIX, HistoryTrimmer, ResearchAgentState
+from src.core.llm_cache import LLMResponseCache, get_llm_cache, llm_cache_for
+from src.core.memory import (
+    MemoryManager,
+    _memory_saver_thread_sizes,
+    create_blob_store,
+    create_checkpointer,
+)
+from src.core.runner import CANCELLED_TOOL_RESULT, AgentRun, AgentRunCancelledError
+from src.core.scheduler import RunScheduler, SchedulerSaturatedError
+from src.core.thread_index import (
+    IndexedMemorySaver,
+    IndexedSQLiteCheckpointSaver,
+    ThreadIndex,
+)
+from src.monitoring import get_metrics
+from src.tools.papers import Paper
+from tests.fakes import ScriptedChatModel, WordEmbeddings
+
+
+class TestAgentRun:
+    """Tests for cancellable agent runs."""
+
+    @pytest.fixture
+    def blocking_tool(self) -> Any:
+        """Tool that blocks until cancelled, recording what happened."""
+        state = {"started": asyncio.Event(), "cancelled": False}
+
+        @tool
+        async def slow_search(query: str) -> str:  # noqa: ARG001 (names the tool argument)
+            """Search slowly."""
+            state["started"].set()
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+            return "unreachable"
+
+        return slow_search, state
+
+    def _agent(self, tools: list[Any]) -> Any:
+        model = ScriptedChatModel(responses=[
+            AIMessage(
+                content="Searching",
+                tool_calls=[{"name": "slow_search", "args": {"query": "x"}, "id": "call-1"}],
+            ),
+            AIMessage(content="Recovered"),
+        ])
+        return create_react_agent(model, tools, checkpointer=MemorySaver())
+
+    async def test_completed_run_yields_all_items(self) -> None:
+        """Test a run that is not cancelled streams to completion."""
+        agent = create_react_agent(
+            ScriptedChatModel(responses=[AIMessage(content="hello there")]),
+            [],
+            checkpointer=MemorySaver(),
+        )
+        config = {"configurable": {"thread_id": "t-complete"}}
+        run = AgentRun(agent, {"messages": [HumanMessage(content="hi")]}, config)
+
+        steps = [step async for step in run]
+
+        assert steps[-1]["messages"][-1].content == "hello there"
+        assert run.done and not run.cancelled
+
+    async def test_cancel_aborts_tool_call(self, blocking_tool: Any) -> None:
+        """Test cancelling a run cancels the in-flight tool coroutine."""
+        slow_search, state = blocking_tool
+        agent = self._agent([slow_search])
+        config = {"configurable": {"thread_id": "t-cancel"}}
+        metrics = get_metrics()
+        cancelled_before = metrics.counter("chat.cancelled_runs")
+        tools_before = metrics.counter("chat.cancelled_tool_calls")
+
+        run = AgentRun(
+            agent,
+            {"messages": [HumanMessage(content="hi")]},
+            config,
+            stream_mode=["messages", "updates"],
+        )
+        await asyncio.wait_for(state["started"].wait(), timeout=5)
+        run.cancel("test")
+
+        with pytest.raises(AgentRunCancelledError):
+            async for _ in run:
+                pass
+        await run.wait_closed()
+
+        assert state["cancelled"] is True
+        assert metrics.counter("chat.cancelled_runs") == cancelled_before + 1
+        assert metrics.counter("chat.cancelled_tool_calls") == tools_before + 1
+
+    async def test_cancel_leaves_consistent_checkpoint(self, blocking_tool: Any) -> None:
+        """Test dangling tool calls are answered so the thread stays usable."""
+        slow_search, state = blocking_tool
+        agent = self._agent([slow_search])
+        config = {"configurable": {"thread_id": "t-repair"}}
+
+        run = AgentRun(
+            agent,
+            {"messages": [HumanMessage(content="hi")]},
+            config,
+            stream_mode=["messages", "updates"],
+        )
+        await asyncio.wait_for(state["started"].wait(), timeout=5)
+        run.cancel("test")
+        await run.wait_closed()
+
+        snapshot = await agent.aget_state(config)
+        last = snapshot.values["messages"][-1]
+        assert isinstance(last, ToolMessage)
+        assert last.tool_call_id == "call-1"
+        assert last.content == CANCELLED_TOOL_RESULT
+
+        follow_up = AgentRun(agent, {"messages": [HumanMessage(content="again")]}, config)
+        steps = [step async for step in follow_up]
+        assert steps[-1]["messages"][-1].content == "Recovered"
+
+
+class TestRunScheduler:
+    """Tests for run admission control."""
+
+    def test_invalid_concurrency(self) -> None:
+        """Test a zero concurrency cap is rejected."""
+        with pytest.raises(ValueError):
+            RunScheduler(max_concurrent=0, max_queued=1)
+
+    async def test_concurrency_cap(self) -> None:
+        """Test no more than max_concurrent runs execute at once."""
+        scheduler = RunScheduler(max_concurrent=2, max_queued=10)
+        running = 0
+        peak = 0
+
+        async def job(i: int) -> None:
+            nonlocal running, peak
+            async with scheduler.reserve(f"thread-{i}"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(job(i) for i in range(6)))
+
+        assert peak == 2
+        assert scheduler.in_flight == 0
+        assert scheduler.queue_depth == 0
+
+    async def test_rejects_when_saturated(self) -> None:
+        """Test reservations beyond capacity raise with a retry hint."""
+        scheduler = RunScheduler(max_concurrent=1, max_queued=1)
+        first = scheduler.reserve("a")
+        second = scheduler.reserve("b")
+
+        assert scheduler.saturated
+        with pytest.raises(SchedulerSaturatedError) as exc_info:
+            scheduler.reserve("c")
+        assert exc_info.value.retry_after >= 1
+
+        first.release()
+        second.release()
+        assert not scheduler.saturated
+
+    async def test_fifo_order(self) -> None:
+        """Test queued runs start in arrival order."""
+        scheduler = RunScheduler(max_concurrent=1, max_queued=10)
+        order: list[int] = []
+
+        async def job(i: int) -> None:
+            async with scheduler.reserve(f"thread-{i}"):
+                order.append(i)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(job(i) for i in range(5)))
+
+        assert order == [0, 1, 2, 3, 4]
+
+    async def test_same_thread_serialized(self) -> None:
+        """Test runs on one thread never overlap, even with free slots."""
+        scheduler = RunScheduler(max_concurrent=4, max_queued=10)
+        active = 0
+        overlap = False
+
+        async def job() -> None:
+            nonlocal active, overlap
+            async with scheduler.reserve("shared"):
+                active += 1
+                overlap = overlap or active > 1
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(job() for _ in range(3)))
+
+        assert overlap is False
+
+    async def test_cancelled_waiter_frees_queue(self) -> None:
+        """Test a run cancelled while queued does not leak capacity."""
+        scheduler = RunScheduler(max_concurrent=1, max_queued=1)
+        holder = scheduler.reserve("a")
+        await holder.acquire()
+
+        waiting = asyncio.create_task(scheduler.reserve("b").acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert scheduler.queue_depth == 0
+        holder.release()
+        assert scheduler.in_flight == 0
+
+
+class TestSQLiteCheckpointSaver:
+    """Tests for the disk-backed checkpointer."""
+
+    def _agent(self, saver: SQLiteCheckpointSaver, reply: str = "hello") -> Any:
+        return create_react_agent(
+            ScriptedChatModel(responses=[AIMessage(content=reply)]),
+            [],
+            checkpointer=saver,
+        )
+
+    async def test_state_survives_restart(self, tmp_path: Path) -> None:
+        """Test conversation state is persisted across saver instances."""
+        db_path = tmp_path / "checkpoints.sqlite"
+        config = {"configurable": {"thread_id": "t-persist"}}
+
+        saver = SQLiteCheckpointSaver(db_path, flush_interval=0)
+        await self._agent(saver).ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+        saver.close()
+
+        reopened = SQLiteCheckpointSaver(db_path, flush_interval=0)
+        snapshot = await self._agent(reopened).aget_state(config)
+        reopened.close()
+
+        assert [m.content for m in snapshot.values["messages"]] == ["hi", "hello"]
+
+    async def test_only_changed_channels_are_written(self, tmp_path: Path) -> None:
+        """Test each checkpoint stores only the channel values it changed."""
+        db_path = tmp_path / "db.sqlite"
+        saver = SQLiteCheckpointSaver(db_path, flush_interval=0)
+        config = {"configurable": {"thread_id": "t-blobs"}}
+        agent = self._agent(saver)
+        for message in ("hi", "again"):
+            await agent.ainvoke({"messages": [HumanMessage(content=message)]}, config)
+        saver.close()
+
+        conn = sqlite3.connect(db_path)
+        checkpoints = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        messages = conn.execute(
+            "SELECT COUNT(*) FROM blobs WHERE channel = 'messages'"
+        ).fetchone()[0]
+        conn.close()
+        # One messages value per turn input and per answer, not one per checkpoint
+        assert messages == 4 < checkpoints
+
+        reopened = SQLiteCheckpointSaver(db_path, flush_interval=0)
+        history = [c.checkpoint["channel_values"].get("messages", []) for c in reopened.list(config)]
+        assert [m.content for m in history[0]] == ["hi", "hello", "again", "hello"]
+        assert [len(h) for h in history] == sorted((len(h) for h in history), reverse=True)
+        reopened.close()
+
+    async def test_writes_are_batched(self, tmp_path: Path) -> None:
+        """Test rows are buffered until the batch is full or flushed."""
+        saver = SQLiteCheckpointSaver(tmp_path / "db.sqlite", batch_size=1000, flush_interval=0)
+        config = {"configurable": {"thread_id": "t-batch"}}
+        await self._agent(saver).ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+
+        assert saver.pending_rows > 0
+        # Reads of the latest checkpoint are served from the cache
+        assert saver.get_tuple(config) is not None
+        assert saver.pending_rows > 0
+
+        saver.flush()
+        assert saver.pending_rows == 0
+        saver.close()
+
+    async def test_cache_respects_memory_budget(self, tmp_path: Path) -> None:
+        """Test the hot-thread cache stays under its byte budget."""
+        saver = SQLiteCheckpointSaver(tmp_path / "db.sqlite", cache_max_bytes=4096, flush_interval=0)
+        agent = self._agent(saver, reply="x" * 500)
+        for i in range(20):
+            config = {"configurable": {"thread_id": f"t-{i}"}}
+            await agent.ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+
+        assert saver.cache_bytes <= 4096
+
+        # Evicted threads are reloaded from disk
+        snapshot = await agent.aget_state({"configurable": {"thread_id": "t-0"}})
+        assert snapshot.values["messages"][-1].content == "x" * 500
+        saver.close()
+
+    async def test_delete_thread(self, tmp_path: Path) -> None:
+        """Test deleting a thread removes buffered and persisted checkpoints."""
+        saver = SQLiteCheckpointSaver(tmp_path / "db.sqlite", flush_interval=0)
+        config = {"configurable": {"thread_id": "t-delete"}}
+        await self._agent(saver).ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+        saver.flush()
+
+        saver.delete_thread("t-delete")
+
+        assert saver.get_tuple(config) is None
+        assert list(saver.list(config)) == []
+        saver.close()
+
+    async def test_list_newest_first_with_limit(self, tmp_path: Path) -> None:
+        """Test listing checkpoints honours ordering, before and limit."""
+        saver = SQLiteCheckpointSaver(tmp_path / "db.sqlite", flush_interval=0)
+        config = {"configurable": {"thread_id": "t-list"}}
+        await self._agent(saver).ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+
+        checkpoints = list(saver.list(config))
+        ids = [c.config["configurable"]["checkpoint_id"] for c in checkpoints]
+        assert ids == sorted(ids, reverse=True)
+        assert len(list(saver.list(config, limit=1))) == 1
+        older = list(saver.list(config, before=checkpoints[0].config))
+        assert len(older) == len(checkpoints) - 1
+        saver.close()
+
+
+class TestMemoryManager:
+    """Tests for conversation memory management."""
+
+    def test_default_backend_is_memory(self) -> None:
+        """Test the in-process saver is used by default."""
+        from langgraph.checkpoint.memory import MemorySaver
+
+        assert isinstance(create_checkpointer(Settings()), MemorySaver)
+
+    def test_sqlite_backend(self, tmp_path: Path) -> None:
+        """Test the SQLite saver is selected from settings."""
+        settings = Settings(
+            checkpointer_backend="sqlite",
+            checkpoint_db_path=str(tmp_path / "db.sqlite"),
+        )
+        manager = MemoryManager(create_checkpointer(settings))
+        assert isinstance(manager.checkpointer, SQLiteCheckpointSaver)
+        manager.close()
+
+    def test_unknown_backend(self) -> None:
+        """Test an unknown backend name is rejected."""
+        with pytest.raises(ValueError, match="Unknown checkpointer backend"):
+            create_checkpointer(Settings(checkpointer_backend="redis"))
+
+    async def _converse(self, manager: MemoryManager, *thread_ids: str) -> None:
+        agent = create_react_agent(
+            ScriptedChatModel(responses=[AIMessage(content="hello")] * len(thread_ids)),
+            [],
+            checkpointer=manager.checkpointer,
+        )
+        for thread_id in thread_ids:
+            await agent.ainvoke(
+                {"messages": [HumanMessage(content="hi")]},
+                manager.get_config(thread_id),
+            )
+
+    async def test_delete_purges_checkpoints(self) -> None:
+        """Test deleting a thread frees its checkpoints, blobs and writes."""
+        saver = MemorySaver()
+        manager = MemoryManager(saver, ttl_seconds=0, max_bytes=0)
+        await self._converse(manager, "t-keep", "t-delete")
+
+        assert await manager.adelete_thread("t-delete")
+
+        assert set(manager.thread_sizes()) == {"t-keep"}
+        assert not any(key[0] == "t-delete" for key in saver.blobs)
+        assert not any(key[0] == "t-delete" for key in saver.writes)
+        assert not manager.thread_exists("t-delete")
+        assert not await manager.adelete_thread("t-delete")
+
+    async def test_thread_exists_after_restart(self, tmp_path: Path) -> None:
+        """Test threads stored by a previous process can be found and deleted."""
+        db_path = tmp_path / "db.sqlite"
+        manager = MemoryManager(SQLiteCheckpointSaver(db_path, flush_interval=0))
+        await self._converse(manager, "t-old")
+        manager.close()
+
+        reopened = MemoryManager(SQLiteCheckpointSaver(db_path, flush_interval=0))
+        assert reopened.thread_exists("t-old")
+        assert reopened.delete_thread("t-old")
+        assert reopened.thread_sizes() == {}
+        reopened.close()
+
+    async def test_sweep_keeps_persisted_threads_by_default(self, tmp_path: Path) -> None:
+        """Test unset eviction limits never delete history from a SQLite checkpointer."""
+        manager = MemoryManager(SQLiteCheckpointSaver(tmp_path / "db.sqlite", flush_interval=0))
+        await self._converse(manager, "t-idle")
+        manager._active_threads["t-idle"] = time.monotonic() - 7 * 24 * 60 * 60
+
+        assert manager.sweep() == []
+        assert manager.thread_exists("t-idle")
+        manager.close()
+
+    async def test_sweep_evicts_idle_threads(self) -> None:
+        """Test threads idle for longer than the TTL are evicted, unless protected."""
+        metrics = get_metrics()
+        evicted_before = metrics.counter("memory.evicted_threads.ttl")
+        manager = MemoryManager(MemorySaver(), ttl_seconds=60, max_bytes=0)
+        await self._converse(manager, "t-idle", "t-busy", "t-fresh")
+
+        now = time.monotonic()
+        manager._active_threads["t-idle"] = now - 120
+        manager._active_threads["t-busy"] = now - 120
+
+        assert manager.sweep(protected={"t-busy"}) == ["t-idle"]
+        assert set(manager.list_threads()) == {"t-busy", "t-fresh"}
+        assert metrics.counter("memory.evicted_threads.ttl") == evicted_before + 1
+
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    async def test_sweep_enforces_byte_budget(self, backend: str, tmp_path: Path) -> None:
+        """Test least recently used threads are evicted until under budget."""
+        saver = (
+            MemorySaver()
+            if backend == "memory"
+            else SQLiteCheckpointSaver(tmp_path / "db.sqlite", flush_interval=0)
+        )
+        manager = MemoryManager(saver, ttl_seconds=0, max_bytes=0)
+        await self._converse(manager, "t-1", "t-2", "t-3")
+        sizes = manager.thread_sizes()
+        assert set(sizes) == {"t-1", "t-2", "t-3"}
+
+        # Budget fits two threads; t-1 is the least recently used
+        manager._max_bytes = sizes["t-2"] + sizes["t-3"]
+        manager.get_config("t-2")
+        evicted_bytes_before = get_metrics().counter("memory.evicted_bytes")
+
+        assert manager.sweep() == ["t-1"]
+        assert set(manager.thread_sizes()) == {"t-2", "t-3"}
+        assert get_metrics().counter("memory.evicted_bytes") == evicted_bytes_before + sizes["t-1"]
+        manager.close()
+
+
+    async def test_asweep_spares_threads_admitted_during_the_sweep(self, tmp_path: Path) -> None:
+        """Test a thread that gets a run while the sweep reads the disk isn't evicted."""
+        manager = MemoryManager(
+            SQLiteCheckpointSaver(tmp_path / "db.sqlite", flush_interval=0),
+            ttl_seconds=60,
+            max_bytes=0,
+        )
+        await self._converse(manager, "t-admitted", "t-idle")
+        now = time.monotonic()
+        manager._active_threads["t-admitted"] = now - 120
+        manager._active_threads["t-idle"] = now - 120
+
+        checks: list[set[str]] = []
+
+        def active_runs() -> set[str]:
+            # Nothing runs when victims are picked; a run is admitted right after
+            checks.append(set() if not checks else {"t-admitted"})
+            return checks[-1]
+
+        assert await manager.asweep(active_runs) == ["t-idle"]
+        assert set(manager.thread_sizes()) == {"t-admitted"}
+        manager.close()
+
+class TestHistoryTrimmer:
+    """Tests for the token-budgeted pre-model hook."""
+
+    def _turn(self, n: int, tool_output: str = "") -> list[Any]:
+        messages: list[Any] = [HumanMessage(content=f"question {n}", id=f"h{n}")]
+        if tool_output:
+            messages.append(AIMessage(
+                content="",
+                id=f"c{n}",
+                tool_calls=[{"name": "search", "args": {"q": str(n)}, "id": f"call-{n}"}],
+            ))
+            messages.append(ToolMessage(content=tool_output, tool_call_id=f"call-{n}", id=f"t{n}"))
+        messages.append(AIMessage(content=f"answer {n}", id=f"a{n}"))
+        return messages
+
+    def test_collapses_stale_tool_outputs(self) -> None:
+        """Test earlier turns' tool dumps are shortened, the current turn's are not."""
+        trimmer = HistoryTrimmer(max_tokens=100_000, model_name="gpt-4o-mini", stale_tool_chars=50)
+        dump = "x" * 4000
+        current = self._turn(2, dump)[:-1]
+        state = {"messages": self._turn(1, dump) + current}
+
+        update = trimmer.trim(state)
+        sent = update["llm_input_messages"]
+
+        assert len(sent[2].content) < 200
+        assert "omitted" in sent[2].content
+        assert sent[-1].content == dump
+        assert state["messages"][2].content == dump
+        assert trimmer.counter.count_messages(sent) < trimmer.counter.count_messages(
+            state["messages"]
+        )
+
+    def test_folds_old_turns_into_summary(self) -> None:
+        """Test old turns are summarized once when over budget."""
+        summarizer = ScriptedChatModel(responses=[AIMessage(content="user asked about crispr")])
+        trimmer = HistoryTrimmer(max_tokens=45, model_name="gpt-4o-mini", summarizer=summarizer)
+        messages = self._turn(1) + self._turn(2) + self._turn(3) + [
+            HumanMessage(content="question 4", id="h4")
+        ]
+
+        update = trimmer.trim({"messages": messages})
+        sent = update["llm_input_messages"]
+
+        assert sent[0].content == f"{SUMMARY_PREFIX}\nuser asked about crispr"
+        assert sent[-1].content == "question 4"
+        assert update["history_summary"] == "user asked about crispr"
+        assert 0 < update["summarized_messages"] < len(messages)
+        assert isinstance(messages[update["summarized_messages"]], HumanMessage)
+
+        # The stored summary is reused on the next LLM call of the same turn
+        again = trimmer.trim({"messages": messages, **update})
+        assert again["llm_input_messages"] == sent
+        assert summarizer.calls == 1
+
+    def test_drops_old_turns_without_summarizer(self) -> None:
+        """Test old turns are dropped at turn boundaries when no summarizer is set."""
+        trimmer = HistoryTrimmer(max_tokens=40, model_name="gpt-4o-mini")
+        messages = self._turn(1, "result " * 50) + [HumanMessage(content="question 2", id="h2")]
+
+        update = trimmer.trim({"messages": messages})
+
+        assert [m.content for m in update["llm_input_messages"]] == ["question 2"]
+        assert update["history_summary"] == ""
+
+    async def test_hook_limits_agent_prompt(self) -> None:
+        """Test the agent only sends the trimmed history to the model."""
+        model = ScriptedChatModel(responses=[AIMessage(content="ok " * 100)])
+        trimmer = HistoryTrimmer(max_tokens=150, model_name="gpt-4o-mini")
+        agent = create_react_agent(
+            model,
+            [],
+            checkpointer=MemorySaver(),
+            state_schema=ResearchAgentState,
+            pre_model_hook=trimmer.as_hook(),
+        )
+        config = {"configurable": {"thread_id": "t-long"}}
+
+        for n in range(5):
+            await agent.ainvoke({"messages": [HumanMessage(content=f"question {n}")]}, config)
+
+        state = await agent.aget_state(config)
+        assert len(state.values["messages"]) == 10
+        assert trimmer.counter.count_messages(model.prompts[-1]) <= 150
+        assert model.prompts[-1][-1].content == "question 4"
+
+
+class TestBlobOffloading:
+    """Tests for moving large tool outputs out of checkpoints."""
+
+    DUMP = "Title: CRISPR screening. " * 400
+
+    async def _run(self, saver: MemorySaver, turns: int) -> Any:
+        @tool
+        async def dump(query: str) -> str:  # noqa: ARG001 (names the tool argument)
+            """Return a large search result."""
+            return self.DUMP
+
+        model = ScriptedChatModel(responses=[
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "dump", "args": {"query": "crispr"}, "id": f"call-{n}"}],
+            )
+            if n % 2 == 0
+            else AIMessage(content="done")
+            for n in range(2 * turns)
+        ])
+        agent = create_react_agent(model, [dump], checkpointer=saver)
+        config = {"configurable": {"thread_id": "t-blobs"}}
+        for _ in range(turns):
+            await agent.ainvoke({"messages": [HumanMessage(content="search")]}, config)
+        return await agent.aget_state(config)
+
+    async def test_large_outputs_stored_once(self) -> None:
+        """Test repeated tool dumps are stored once and checkpoints hold references."""
+        store = InMemoryBlobStore()
+        offloaded = MemorySaver(serde=BlobOffloadingSerializer(store, threshold=1000))
+        state = await self._run(offloaded, turns=3)
+        inline = MemorySaver()
+        await self._run(inline, turns=3)
+
+        assert len(store) == 1
+        offloaded_size = _memory_saver_thread_sizes(offloaded)["t-blobs"]
+        inline_size = _memory_saver_thread_sizes(inline)["t-blobs"]
+        assert offloaded_size * 5 < inline_size
+
+        tool_messages = [m for m in state.values["messages"] if isinstance(m, ToolMessage)]
+        assert len(tool_messages) == 3
+        assert all(len(m.content) < 200 for m in tool_messages)
+        assert resolve_message(tool_messages[0], store).content == self.DUMP
+
+    def test_manager_offloads_by_default(self, tmp_path: Path) -> None:
+        """Test the settings-built checkpointer offloads, to disk when persistent."""
+        assert isinstance(MemoryManager().blob_store, InMemoryBlobStore)
+
+        settings = Settings(
+            checkpointer_backend="sqlite",
+            checkpoint_db_path=str(tmp_path / "db.sqlite"),
+            blob_store_path=str(tmp_path / "blobs"),
+        )
+        store = create_blob_store(settings)
+        assert isinstance(store, FileBlobStore)
+        assert create_blob_store(Settings(blob_store_backend="none")) is None
+
+    def test_resolved_copy_is_not_stored_again(self) -> None:
+        """Test serializing a resolved message writes the placeholder, not the text."""
+        store = InMemoryBlobStore()
+        serde = BlobOffloadingSerializer(store, threshold=100)
+        message = ToolMessage(content="x" * 500, tool_call_id="call-1")
+
+        stored = serde.loads_typed(serde.dumps_typed([message]))[0]
+        resolved = resolve_message(stored, store)
+        again = serde.loads_typed(serde.dumps_typed([resolved]))[0]
+
+        assert stored.additional_kwargs[BLOB_REF_KEY] == store.key_for("x" * 500)
+        assert resolved.content == "x" * 500
+        assert again.content == stored.content
+
+    def test_file_store_survives_restart_and_prunes(self, tmp_path: Path) -> None:
+        """Test blobs persist on disk and idle ones are pruned."""
+        key = FileBlobStore(tmp_path).put("payload")
+
+        reopened = FileBlobStore(tmp_path)
+        assert reopened.get(key) == "payload"
+        assert reopened.prune(max_idle_seconds=3600) == 0
+        reopened.touch(key)
+        reopened.touch("0" * 64)  # never stored
+        assert reopened.prune(max_idle_seconds=-1) == 1
+        assert reopened._touched == {}
+        with pytest.raises(KeyError):
+            FileBlobStore(tmp_path).get(key)
+
+    def test_trimmer_resolves_current_turn(self) -> None:
+        """Test the prompt carries the full text of offloaded tool outputs."""
+        store = InMemoryBlobStore()
+        serde = BlobOffloadingSerializer(store, threshold=100)
+        messages = serde.loads_typed(serde.dumps_typed([
+            HumanMessage(content="search", id="h1"),
+            AIMessage(
+                content="",
+                id="a1",
+                tool_calls=[{"name": "search", "args": {}, "id": "call-1"}],
+            ),
+            ToolMessage(content="result " * 100, tool_call_id="call-1", id="t1"),
+        ]))
+        trimmer = HistoryTrimmer(max_tokens=10_000, model_name="gpt-4o-mini", blob_store=store)
+
+        sent = trimmer.trim({"messages": messages})["llm_input_messages"]
+
+        assert sent[-1].content == "result " * 100
+
+
+class TestThreadIndex:
+    """Tests for the incremental message index."""
+
+    def _messages(self, n: int) -> list[Any]:
+        return [
+            HumanMessage(content=f"q{i}", id=f"m{i}") if i % 2 == 0
+            else AIMessage(content=f"a{i}", id=f"m{i}")
+            for i in range(n)
+        ]
+
+    def test_appends_only_new_messages(self) -> None:
+        """Test growing message lists append, and edited ones rewrite the log."""
+        index = ThreadIndex()
+        index.record("t", self._messages(2), "2024-01-01T00:00:00")
+        index.record("t", self._messages(4), "2024-01-01T00:01:00")
+
+        messages, _ = index.get_messages("t", limit=10)
+        assert [m["content"] for m in messages] == ["q0", "a1", "q2", "a3"]
+        thread = index.get_thread("t")
+        assert thread["message_count"] == 4
+        assert thread["title"] == "q0"
+        assert thread["created_at"] == "2024-01-01T00:00:00"
+        assert thread["updated_at"] == "2024-01-01T00:01:00"
+
+        edited = [HumanMessage(content="other", id="x0")]
+        index.record("t", edited, "2024-01-01T00:02:00")
+        messages, _ = index.get_messages("t", limit=10)
+        assert [m["content"] for m in messages] == ["other"]
+
+    def test_history_pages_newest_first(self) -> None:
+        """Test history is paged backwards with chronological pages."""
+        index = ThreadIndex()
+        index.record("t", self._messages(5), "2024-01-01T00:00:00")
+
+        pages = []
+        cursor = None
+        while True:
+            messages, cursor = index.get_messages("t", limit=2, cursor=cursor)
+            pages.append([m["content"] for m in messages])
+            if cursor is None:
+                break
+
+        assert pages == [["a3", "q4"], ["a1", "q2"], ["q0"]]
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            index.get_messages("t", cursor="not-a-cursor")
+
+    def test_threads_listed_by_recency(self) -> None:
+        """Test threads are listed most recently updated first, with a cursor."""
+        index = ThreadIndex()
+        for i in range(3):
+            index.record(f"t{i}", self._messages(1), f"2024-01-0{i + 1}T00:00:00")
+
+        first, cursor = index.list_threads(limit=2)
+        rest, end = index.list_threads(limit=2, cursor=cursor)
+
+        assert [t["thread_id"] for t in first] == ["t2", "t1"]
+        assert [t["thread_id"] for t in rest] == ["t0"]
+        assert end is None
+
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    async def test_kept_in_step_with_checkpointer(self, backend: str, tmp_path: Path) -> None:
+        """Test agent runs are indexed and deleting a thread clears its entries."""
+        saver = (
+            IndexedMemorySaver()
+            if backend == "memory"
+            else IndexedSQLiteCheckpointSaver(tmp_path / "db.sqlite", flush_interval=0)
+        )
+        saver.thread_index = ThreadIndex(tmp_path / "threads.sqlite")
+        agent = create_react_agent(
+            ScriptedChatModel(responses=[AIMessage(content="hello")]),
+            [],
+            checkpointer=saver,
+        )
+        config = {"configurable": {"thread_id": "t-indexed"}}
+        for text in ("hi", "again"):
+            await agent.ainvoke({"messages": [HumanMessage(content=text)]}, config)
+
+        messages, _ = saver.thread_index.get_messages("t-indexed")
+        assert [(m["role"], m["content"]) for m in messages] == [
+            ("human", "hi"), ("ai", "hello"), ("human", "again"), ("ai", "hello"),
+        ]
+
+        await saver.adelete_thread("t-indexed")
+        assert saver.thread_index.get_thread("t-indexed") is None
+        assert saver.thread_index.get_messages("t-indexed") == ([], None)
+
+
+def _lookup_tool(name: str, papers: list[Paper], calls: list[str]) -> StructuredTool:
+    """Fake search tool returning fixed papers in the tools' text format."""
+
+    async def search(query: str) -> str:
+        calls.append(query)
+        return "\n\n".join(paper.to_text() for paper in papers) or f"No good {name} Result"
+
+    return StructuredTool.from_function(coroutine=search, name=name, description=name)
+
+
+class TestFastPathRouter:
+    """Tests for the identifier fast path."""
+
+    @pytest.mark.parametrize(("message", "expected"), [
+        ("get me 2510.13422", [("arxiv", "2510.13422")]),
+        ("arXiv:2301.00001v2, PMID: 123", [("arxiv", "2301.00001v2"), ("pmid", "123")]),
+        ("https://doi.org/10.1038/nature12373.", [("doi", "10.1038/nature12373")]),
+        ("doi 10.48550/arXiv.2301.00001", [("arxiv", "2301.00001")]),
+        ("can you find https://pubmed.ncbi.nlm.nih.gov/31452104/ please?", [("pmid", "31452104")]),
+        ("summarize 2510.13422", None),
+        ("compare 2510.13422 with 2301.00001", None),
+        ("get me 2 papers on sleep", None),
+    ])
+    def test_parse_identifiers(self, message: str, expected: list | None) -> None:
+        """Test only identifier lookups are recognized."""
+        identifiers = parse_identifiers(message)
+        if expected is None:
+            assert identifiers is None
+        else:
+            assert identifiers == [Identifier(kind, value) for kind, value in expected]
+
+    async def test_answers_and_records_the_exchange(self) -> None:
+        """Test a lookup skips the model and later turns see the exchange."""
+        calls: list[str] = []
+        router = FastPathRouter({
+            "arxiv": _lookup_tool("arxiv", [
+                Paper(title="Graph networks", authors=["C. Node"], arxiv_id="2510.13422v1",
+                      abstract="Graphs."),
+            ], calls),
+            "pubmed": _lookup_tool("pubmed", [
+                Paper(title="Sleep", pmid="123", doi="10.1000/sleep", year="2020"),
+            ], calls),
+        })
+        model = ScriptedChatModel(responses=[AIMessage(content="It is about graphs.")])
+        agent = create_react_agent(model, [], checkpointer=MemorySaver())
+        config = {"configurable": {"thread_id": "t-fast"}}
+        hits = get_metrics().counter("fastpath.hits")
+
+        messages = await router.route(agent, config, "2510.13422 and doi:10.1000/SLEEP")
+
+        assert messages is not None and model.calls == 0
+        assert sorted(calls) == ["10.1000/SLEEP[doi]", "2510.13422"]
+        assert [m.type for m in messages] == ["human", "ai", "tool", "tool", "ai"]
+        answer = messages[-1].content
+        assert answer.index("**Graph networks**") < answer.index("**Sleep**")
+        assert "PMID: 123 | DOI: 10.1000/sleep" in answer
+        assert get_metrics().counter("fastpath.hits") == hits + 1
+
+        state = await agent.aget_state(config)
+        assert len(state.values["messages"]) == 5
+        assert not state.next
+
+        await agent.ainvoke({"messages": [HumanMessage(content="what is it about?")]}, config)
+        assert "**Graph networks**" in model.prompts[-1][-2].content
+
+    async def test_falls_back_when_a_paper_is_missing(self) -> None:
+        """Test unresolved identifiers and other requests go to the agent."""
+        router = FastPathRouter({"arxiv": _lookup_tool("arxiv", [], [])})
+        agent = create_react_agent(
+            ScriptedChatModel(responses=[AIMessage(content="x")]), [], checkpointer=MemorySaver()
+        )
+        config = {"configurable": {"thread_id": "t-fallback"}}
+        fallbacks = get_metrics().counter("fastpath.fallbacks")
+
+        assert await router.route(agent, config, "2510.13422") is None
+        assert await router.route(agent, config, "PMID 123") is None  # no pubmed tool
+        assert await router.route(agent, config, "papers on sleep") is None
+        assert get_metrics().counter("fastpath.fallbacks") == fallbacks + 1
+        assert not (await agent.aget_state(config)).values
+
+
+class TestLLMResponseCache:
+    """Tests for the exact-match LLM response cache."""
+
+    async def test_repeated_calls_are_served_from_the_cache(self) -> None:
+        """Test identical prompts reuse the response, whatever their tool call ids."""
+        cache = LLMResponseCache()
+        model = ScriptedChatModel(
+            responses=[
+                AIMessage(
+                    content="",
+                    tool_calls=[{"name": "search", "args": {"query": "sleep"}, "id": "call_a"}],
+                ),
+            ],
+            cache=cache,
+        )
+        metrics = get_metrics()
+        hits = metrics.counter("llm_cache.hits")
+
+        def history(call_id: str) -> list:
+            return [
+                HumanMessage(content="find sleep papers"),
+                AIMessage(
+                    content="",
+                    tool_calls=[{"name": "search", "args": {"query": "sleep"}, "id": call_id}],
+                ),
+                ToolMessage(content="No results", tool_call_id=call_id),
+            ]
+
+        first = await model.ainvoke(history("call_1"))
+        second = await model.ainvoke(history("call_2"))
+
+        assert model.calls == 1
+        assert metrics.counter("llm_cache.hits") == hits + 1
+        assert second.tool_calls[0]["args"] == {"query": "sleep"}
+        assert second.tool_calls[0]["id"] != first.tool_calls[0]["id"]
+        assert second.id != first.id
+
+        await model.ainvoke([HumanMessage(content="something else")])
+        assert model.calls == 2
+
+    def test_evicts_least_recently_used_past_max_bytes(self, tmp_path: Path) -> None:
+        """Test the store stays under its size limit and persists across instances."""
+        path = tmp_path / "llm.sqlite"
+        cache = LLMResponseCache(path, memory_entries=1, max_bytes=600)
+
+        def reply(text: str) -> list:
+            return [ChatGeneration(message=AIMessage(content=text * 40))]
+
+        cache.update("a", "model", reply("a"))
+        cache.update("b", "model", reply("b"))
+        assert cache.lookup("a", "model") is not None  # "b" is now least recently used
+        cache.update("c", "model", reply("c"))
+
+        assert cache.lookup("b", "model") is None
+        assert cache.lookup("a", "other-model") is None
+        cache.close()
+
+        reopened = LLMResponseCache(path, memory_entries=1, max_bytes=600)
+        assert reopened.lookup("a", "model")[0].message.content == "a" * 40
+        assert reopened.lookup("c", "model") is not None
+        reopened.close()
+
+    async def test_async_calls_run_off_the_event_loop(self, tmp_path: Path) -> None:
+        """Test async lookups and updates do their SQLite work in worker threads."""
+        loop_thread = threading.get_ident()
+        threads: list[int] = []
+
+        class RecordingCache(LLMResponseCache):
+            def lookup(self, prompt: str, llm_string: str) -> Any:
+                threads.append(threading.get_ident())
+                return super().lookup(prompt, llm_string)
+
+            def update(self, prompt: str, llm_string: str, return_val: Any) -> None:
+                threads.append(threading.get_ident())
+                super().update(prompt, llm_string, return_val)
+
+        cache = RecordingCache(tmp_path / "llm.sqlite")
+        await cache.aupdate("a", "model", [ChatGeneration(message=AIMessage(content="hi"))])
+        cached = await cache.alookup("a", "model")
+
+        assert cached[0].message.content == "hi"
+        assert len(threads) == 2
+        assert loop_thread not in threads
+        cache.close()
+
+    def test_only_deterministic_models_are_cached(self) -> None:
+        """Test models sampling at a temperature above 0 get no cache."""
+        assert llm_cache_for(0.0) is get_llm_cache()
+        assert llm_cache_for(0.7) is None
+        assert llm_cache_for(None) is None
+
+
+class TestSemanticAnswerCache:
+    """Tests for the semantic cache of first-turn answers."""
+
+    async def test_similar_questions_reuse_the_answer(self, tmp_path: Path) -> None:
+        """Test a near-identical question is answered from the cache, others aren't."""
+        cache = SemanticAnswerCache(WordEmbeddings(), path=tmp_path, namespace="m", threshold=0.8)
+        turn = [
+            HumanMessage(content="latest papers on CRISPR off-target effects"),
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "pubmed", "args": {"query": "crispr"}, "id": "call-1"}],
+            ),
+            ToolMessage(content="raw results", tool_call_id="call-1"),
+            AIMessage(content="Three recent studies on off-target editing."),
+        ]
+        hits = get_metrics().counter("answer_cache.hits")
+
+        assert await cache.lookup("latest papers on CRISPR off-target effects") is None
+        assert await cache.store("latest papers on CRISPR off-target effects", turn)
+
+        cached = await cache.lookup("Latest papers on CRISPR off-target effects?")
+        assert cached is not None and cached.similarity >= 0.8
+        assert cached.answer == "Three recent studies on off-target editing."
+        assert await cache.lookup("history of the printing press") is None
+        assert get_metrics().counter("answer_cache.hits") == hits + 1
+
+        other_model = SemanticAnswerCache(WordEmbeddings(), path=tmp_path, namespace="other")
+        assert await other_model.lookup("latest papers on CRISPR off-target effects") is None
+
+    async def test_expired_and_unfinished_turns_are_not_served(self, tmp_path: Path) -> None:
+        """Test answers past their TTL and turns without a final answer aren't reused."""
+        cache = SemanticAnswerCache(WordEmbeddings(), path=tmp_path, ttl=0.05)
+        calling = AIMessage(
+            content="", tool_calls=[{"name": "pubmed", "args": {"query": "x"}, "id": "call-1"}]
+        )
+
+        assert not await cache.store("papers on sleep", [HumanMessage(content="q"), calling])
+        assert await cache.store("papers on sleep", [AIMessage(content="Sleep answer")])
+        assert await cache.lookup("papers on sleep") is not None
+        await asyncio.sleep(0.1)
+        assert await cache.lookup("papers on sleep") is None
+
+    async def test_route_records_a_marked_answer(self, tmp_path: Path) -> None:
+        """Test a cached answer is written to the new thread and marked as cached."""
+        cache = SemanticAnswerCache(WordEmbeddings(), path=tmp_path)
+        await cache.store("papers on sleep and memory", [AIMessage(content="Sleep answer")])
+        model = ScriptedChatModel(responses=[AIMessage(content="follow-up answer")])
+        agent = create_react_agent(model, [], checkpointer=MemorySaver())
+        config = {"configurable": {"thread_id": "t-cached"}}
+
+        messages = await cache.route(agent, config, "papers on sleep and memory")
+
+        assert messages is not None and model.calls == 0
+        assert [m.type for m in messages] == ["human", "ai"]
+        assert is_cached_answer(messages[-1]) and messages[-1].content == "Sleep answer"
+        await agent.ainvoke({"messages": [HumanMessage(content="tell me more")]}, config)
+        assert model.prompts[-1][-2].content == "Sleep answer"
@@ -1,14 +1,61 @@
 """Unit tests for research tools."""
 
+import asyncio
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
 import pytest
+from langchain_core.tools import StructuredTool
 
+from src.config import get_settings
+from src.core import agent as agent_module
+from src.monitoring import get_metrics
 from src.tools import (
     ArxivSearchTool,
+    BaseTool,
     DuckDuckGoSearchTool,
+    FederatedSearchTool,
     GoogleScholarTool,
+    HTTPClientRegistry,
     PubMedSearchTool,
     TavilySearchTool,
 )
+from src.tools.arxiv import ArxivClient, ArxivFeedParser, parse_arxiv_ids
+from src.tools.cache import CachedTool, ToolResultCache
+from src.tools.circuit import (
+    CircuitBreaker,
+    CircuitBreakerTool,
+    CircuitOpenError,
+    CircuitState,
+    FallbackTool,
+)
+from src.tools.compression import ExtractiveCompressor, split_sentences
+from src.tools.fusion import PaperIndex, fuse_papers
+from src.tools.hedging import HedgedTool
+from src.tools.papers import (
+    CompactResultsTool,
+    Paper,
+    PaperDetailsTool,
+    PaperRenderer,
+    PaperStore,
+    papers_from_output,
+    papers_to_records,
+    papers_to_text,
+    parse_results,
+)
+from src.tools.pubmed import PubMedArticleParser, PubMedClient
+from src.tools.ratelimit import (
+    RateLimitedTool,
+    RateLimitExceeded,
+    SQLiteBucketStore,
+    TokenBucketLimiter,
+)
+from src.tools.singleflight import SingleFlight, SingleFlightTool
+from tests.fakes import StubHTTPServer, StubResponse
 
 
 class TestArxivTool:
@@ -37,6 +84,107 @@ class TestArxivTool:
         assert hasattr(langchain_tool, "run")
 
 
+def _atom_entry(arxiv_id: str, title: str) -> str:
+    return f"""<entry>
+<id>http://arxiv.org/abs/{arxiv_id}</id><published>2025-10-15T12:00:00Z</published>
+<title>{title}
+  continued</title><summary>Abstract of {title}.</summary>
+<author><name>Ada Lovelace</name></author><author><name>Alan Turing</name></author>
+<arxiv:doi>10.48550/{arxiv_id}</arxiv:doi>
+</entry>"""
+
+
+def _atom_feed(entries: list[str]) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        "<title>query</title>" + "".join(entries) + "</feed>"
+    ).encode()
+
+
+class TestArxivClient:
+    """Tests for the async arXiv client against a stub feed server."""
+
+    def test_parse_arxiv_ids(self) -> None:
+        """Test identifier-only queries are detected."""
+        assert parse_arxiv_ids("2510.13422") == ["2510.13422"]
+        assert parse_arxiv_ids("arXiv:2510.13422v2, hep-th/9901001") == [
+            "2510.13422v2",
+            "hep-th/9901001",
+        ]
+        assert parse_arxiv_ids("transformers 2510.13422") == []
+        assert parse_arxiv_ids("sleep and memory") == []
+
+    def test_parser_accepts_arbitrary_chunks(self) -> None:
+        """Test entries are parsed whatever the chunk boundaries, skipping errors."""
+        feed = _atom_feed([
+            _atom_entry("2510.13422v1", "Agents"),
+            "<entry><id>http://arxiv.org/api/errors#incorrect_id_format</id>"
+            "<title>Error</title></entry>",
+        ])
+        parser = ArxivFeedParser()
+        records = [r for i in range(0, len(feed), 7) for r in parser.feed(feed[i:i + 7])]
+
+        assert len(records) == 1
+        record = records[0]
+        assert record.arxiv_id == "2510.13422v1"
+        assert record.title == "Agents continued"
+        assert record.authors == ["Ada Lovelace", "Alan Turing"]
+        assert (record.published, record.doi) == ("2025-10-15", "10.48550/2510.13422v1")
+
+    async def test_ids_are_fetched_in_one_request(self, stub_server: StubHTTPServer) -> None:
+        """Test several identifiers cost a single id_list query on a shared client."""
+        def query(request):
+            ids = request.params.get("id_list", "").split(",")
+            return StubResponse(
+                _atom_feed([_atom_entry(i, f"Paper {i}") for i in ids if i]), chunk_size=128
+            )
+
+        stub_server.handlers["/api/query"] = query
+        tool = ArxivSearchTool(base_url=f"{stub_server.url}/api/query", requests_per_second=0)
+        arxiv = tool.create_tool()
+
+        output = await arxiv.ainvoke({"query": "2510.13422, 2301.00001"})
+        await arxiv.ainvoke({"query": "2401.00002"})
+
+        assert [r.params["id_list"] for r in stub_server.requests] == [
+            "2510.13422,2301.00001",
+            "2401.00002",
+        ]
+        assert "ArXiv ID: 2510.13422" in output and "ArXiv ID: 2301.00001" in output
+        assert parse_results(output)[1]["title"] == "Paper 2301.00001 continued"
+
+    async def test_search_query(self, stub_server: StubHTTPServer) -> None:
+        """Test free-text queries use search_query with the result limit."""
+        stub_server.handlers["/api/query"] = lambda _request: StubResponse(_atom_feed([]))
+        async with ArxivClient(
+            base_url=f"{stub_server.url}/api/query", requests_per_second=0
+        ) as client:
+            assert await client.search("graph networks", max_results=3) == []
+
+        params = stub_server.requests[0].params
+        assert (params["search_query"], params["max_results"]) == ("graph networks", "3")
+
+    async def test_throttled_requests_wait_before_retrying(
+        self, stub_server: StubHTTPServer
+    ) -> None:
+        """Test a 429 is retried after the Retry-After delay, not straight away."""
+        answers = iter([
+            StubResponse(b"", status=429, headers={"Retry-After": "1"}),
+            StubResponse(_atom_feed([_atom_entry("2510.13422v1", "Agents")])),
+        ])
+        stub_server.handlers["/api/query"] = lambda _request: next(answers)
+        async with ArxivClient(
+            base_url=f"{stub_server.url}/api/query", requests_per_second=0
+        ) as client:
+            start = time.perf_counter()
+            records = await client.search("agents")
+
+        assert time.perf_counter() - start >= 1
+        assert [r.arxiv_id for r in records] == ["2510.13422v1"]
+        assert len(stub_server.requests) == 2
+
+
 class TestPubMedTool:
     """Tests for PubMed search tool."""
 
@@ -56,6 +204,114 @@ class TestPubMedTool:
         assert tool.validate_config() is True
 
 
+_EFETCH_XML = b"""<?xml version="1.0" ?>
+<!DOCTYPE PubmedArticleSet PUBLIC "-//NLM//DTD PubMedArticle, 1st January 2024//EN" "x.dtd">
+<PubmedArticleSet>
+<PubmedArticle><MedlineCitation><PMID>111</PMID><Article>
+<Journal><JournalIssue><PubDate><Year>2022</Year></PubDate></JournalIssue><Title>Sleep</Title></Journal>
+<ArticleTitle>Sleep and <i>memory</i> consolidation</ArticleTitle>
+<Abstract><AbstractText Label="BACKGROUND">Sleep matters.</AbstractText>
+<AbstractText Label="RESULTS">Memory improves.</AbstractText></Abstract>
+<AuthorList><Author><LastName>Smith</LastName><ForeName>Ana</ForeName></Author>
+<Author><CollectiveName>Sleep Consortium</CollectiveName></Author></AuthorList>
+</Article></MedlineCitation>
+<PubmedData><ArticleIdList><ArticleId IdType="pubmed">111</ArticleId>
+<ArticleId IdType="doi">10.1000/sleep.1</ArticleId></ArticleIdList></PubmedData></PubmedArticle>
+<PubmedArticle><MedlineCitation><PMID>222</PMID><Article>
+<Journal><JournalIssue><PubDate><MedlineDate>2019 Jan-Feb</MedlineDate></PubDate></JournalIssue></Journal>
+<ArticleTitle>Naps</ArticleTitle></Article></MedlineCitation></PubmedArticle>
+</PubmedArticleSet>"""
+
+
+def _eutils(server: StubHTTPServer, ids: list[str], throttle: int = 0) -> None:
+    """Register esearch/efetch handlers, answering 429 to the first ``throttle`` fetches."""
+    fetches = {"count": 0}
+
+    def esearch(request):
+        body = {"esearchresult": {"idlist": ids[: int(request.params["retmax"])]}}
+        return StubResponse(json.dumps(body).encode())
+
+    def efetch(_request):
+        fetches["count"] += 1
+        if fetches["count"] <= throttle:
+            return StubResponse(b"", status=429, headers={"Retry-After": "0"})
+        return StubResponse(_EFETCH_XML, chunk_size=64)
+
+    server.handlers["/esearch.fcgi"] = esearch
+    server.handlers["/efetch.fcgi"] = efetch
+
+
+class TestPubMedClient:
+    """Tests for the async E-utilities client against a stub server."""
+
+    def test_parser_accepts_arbitrary_chunks(self) -> None:
+        """Test articles are parsed whatever the chunk boundaries."""
+        parser = PubMedArticleParser()
+        records = [r for i in range(len(_EFETCH_XML)) for r in parser.feed(_EFETCH_XML[i:i + 1])]
+
+        assert [r.pmid for r in records] == ["111", "222"]
+        first = records[0]
+        assert first.title == "Sleep and memory consolidation"
+        assert first.authors == ["Ana Smith", "Sleep Consortium"]
+        assert first.abstract == "BACKGROUND: Sleep matters. RESULTS: Memory improves."
+        assert (first.year, first.journal, first.doi) == ("2022", "Sleep", "10.1000/sleep.1")
+        assert records[1].year == "2019"
+
+    async def test_search_uses_one_batched_fetch(self, stub_server: StubHTTPServer) -> None:
+        """Test a search costs one esearch and one efetch, in relevance order."""
+        _eutils(stub_server, ["222", "111"])
+        async with PubMedClient(base_url=stub_server.url, requests_per_second=0) as client:
+            records = await client.search("sleep", max_results=10)
+
+        assert [r.pmid for r in records] == ["222", "111"]
+        assert [r.path for r in stub_server.requests] == ["/esearch.fcgi", "/efetch.fcgi"]
+        fetch = stub_server.requests[1]
+        assert fetch.method == "POST"
+        assert fetch.params["id"] == "222,111"
+
+    async def test_requests_are_paced_and_retried(self, stub_server: StubHTTPServer) -> None:
+        """Test throttled fetches are retried within the configured rate."""
+        _eutils(stub_server, ["111"], throttle=1)
+        async with PubMedClient(
+            base_url=stub_server.url, api_key="paced-key", requests_per_second=10
+        ) as client:
+            records = await client.search("sleep", max_results=1)
+
+        assert [r.pmid for r in records] == ["111"]
+        assert len(stub_server.requests) == 3
+        assert stub_server.requests[0].params["api_key"] == "paced-key"
+        gaps = [b.time - a.time for a, b in itertools.pairwise(stub_server.requests)]
+        assert min(gaps) >= 0.09
+
+    async def test_tool_formats_records(self, stub_server: StubHTTPServer) -> None:
+        """Test the tool renders records in the labelled search format."""
+        _eutils(stub_server, ["111"])
+        tool = PubMedSearchTool(base_url=stub_server.url).create_tool()
+
+        output = await tool.ainvoke({"query": "sleep"})
+
+        assert output.startswith("PMID: 111\nPublished: 2022\nTitle: Sleep and memory consolidation")
+        assert "DOI: 10.1000/sleep.1" in output
+        assert parse_results(output)[0]["authors"] == "Ana Smith, Sleep Consortium"
+
+    async def test_tool_returns_structured_records(self, stub_server: StubHTTPServer) -> None:
+        """Test the tool can return its full records instead of text."""
+        _eutils(stub_server, ["111"])
+        tool = PubMedSearchTool(base_url=stub_server.url, structured_output=True).create_tool()
+
+        output = await tool.ainvoke({"query": "sleep"})
+
+        [paper] = papers_from_output(output, "pubmed")
+        assert paper.title == "Sleep and memory consolidation"
+        assert paper.authors == ["Ana Smith", "Sleep Consortium"]
+        assert paper.abstract == "BACKGROUND: Sleep matters. RESULTS: Memory improves."
+
+    def test_tool_reports_errors(self, stub_server: StubHTTPServer) -> None:
+        """Test HTTP errors are returned as text rather than raised."""
+        tool = PubMedSearchTool(base_url=stub_server.url).create_tool()
+        assert tool.invoke({"query": "sleep"}).startswith("PubMed exception:")
+
+
 class TestDuckDuckGoTool:
     """Tests for DuckDuckGo search tool."""
 
@@ -120,3 +376,831 @@ class TestTavilyTool:
         """Test custom max_results parameter."""
         tool = TavilySearchTool(max_results=10)
         assert tool._max_results == 10
+
+
+class _FakeSource(BaseTool):
+    """Search source answering with a fixed output after a delay."""
+
+    def __init__(
+        self, name: str, output: Any, delay: float = 0.0, error: bool | Exception = False
+    ):
+        self._name = name
+        self._output = output
+        self._delay = delay
+        self._error = error
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return f"Fake {self._name} source"
+
+    def create_tool(self) -> StructuredTool:
+        def search(query: str) -> Any:  # noqa: ARG001 (names the tool argument)
+            self.calls += 1
+            time.sleep(self._delay)
+            if isinstance(self._error, Exception):
+                raise self._error
+            if self._error:
+                raise RuntimeError("service unavailable")
+            return self._output
+
+        async def asearch(query: str) -> Any:  # noqa: ARG001 (names the tool argument)
+            self.calls += 1
+            await asyncio.sleep(self._delay)
+            if isinstance(self._error, Exception):
+                raise self._error
+            if self._error:
+                raise RuntimeError("service unavailable")
+            return self._output
+
+        return StructuredTool.from_function(
+            func=search, coroutine=asearch, name=self.name, description=self.description
+        )
+
+
+_PUBMED_OUTPUT = (
+    "PMID: 101\nPublished: 2021-03-01\nTitle: Deep learning for protein folding\n"
+    "Copyright Information: \nSummary::\nProteins fold.\nAcross two lines.\n\n"
+    "PMID: 102\nPublished: 2019-05-02\nTitle: CRISPR screens in yeast\n"
+    "Copyright Information: \nSummary::\nScreens."
+)
+_ARXIV_OUTPUT = (
+    "Published: 2021-02-11\nTitle: Deep Learning for Protein Folding.\n"
+    "Authors: A. Fold, B. Chain\nSummary: Preprint version.\n\n"
+    "Published: 2020-01-01\nTitle: Graph networks\nAuthors: C. Node\nSummary: Graphs."
+)
+
+
+class TestFederatedSearchTool:
+    """Tests for the federated academic search tool."""
+
+    def test_name_and_description(self) -> None:
+        """Test the description lists the configured sources."""
+        tool = FederatedSearchTool(sources=[_FakeSource("pubmed", ""), _FakeSource("arxiv", "")])
+        assert tool.name == "federated_search"
+        assert "pubmed, arxiv" in tool.description
+
+    def test_parse_results(self) -> None:
+        """Test wrapper text is split into records with multi-line summaries."""
+        records = parse_results(_PUBMED_OUTPUT)
+        assert [r["pmid"] for r in records] == ["101", "102"]
+        assert records[0]["summary"] == "Proteins fold. Across two lines."
+
+    async def test_sources_run_concurrently_and_merge(self) -> None:
+        """Test sources are queried in parallel and duplicates are merged."""
+        tool = FederatedSearchTool(sources=[
+            _FakeSource("pubmed", _PUBMED_OUTPUT, delay=0.2),
+            _FakeSource("arxiv", _ARXIV_OUTPUT, delay=0.2),
+        ]).create_tool()
+
+        start = time.perf_counter()
+        output = await tool.ainvoke({"query": "protein folding"})
+        assert time.perf_counter() - start < 0.35
+
+        assert output.count("rotein folding") == 1
+        first = output.split("\n\n")[0]
+        assert first.startswith("1. Deep learning for protein folding")
+        assert "Sources: pubmed, arxiv" in first
+        assert "Authors: A. Fold, B. Chain" in first
+        assert "Graph networks" in output and "CRISPR screens in yeast" in output
+
+    @pytest.mark.parametrize("use_async", [False, True])
+    async def test_slow_and_failing_sources_are_reported(self, use_async: bool) -> None:
+        """Test a timed-out or failing source does not fail the call."""
+        tool = FederatedSearchTool(
+            sources=[
+                _FakeSource("pubmed", _PUBMED_OUTPUT),
+                _FakeSource("arxiv", _ARXIV_OUTPUT, delay=2),
+                _FakeSource("google_scholar", "", error=True),
+            ],
+            timeout=0.2,
+        ).create_tool()
+
+        start = time.perf_counter()
+        if use_async:
+            output = await tool.ainvoke({"query": "q"})
+        else:
+            output = await asyncio.to_thread(tool.invoke, {"query": "q"})
+        assert time.perf_counter() - start < 1
+
+        assert "CRISPR screens in yeast" in output
+        assert "Graph networks" not in output
+        assert "arxiv timed out" in output
+        assert "google_scholar failed: service unavailable" in output
+
+    @pytest.mark.parametrize("use_async", [False, True])
+    async def test_rate_limited_source_is_not_reported_as_timeout(self, use_async: bool) -> None:
+        """Test a source rejected by its rate limiter gets its own reason and metric."""
+        tool = FederatedSearchTool(sources=[
+            _FakeSource("pubmed", _PUBMED_OUTPUT),
+            _FakeSource("arxiv", "", error=RateLimitExceeded("arxiv", 3.0)),
+        ]).create_tool()
+        metrics = get_metrics()
+        limited = metrics.counter("federated_search.rate_limited")
+        timeouts = metrics.counter("federated_search.timeouts")
+
+        if use_async:
+            output = await tool.ainvoke({"query": "q"})
+        else:
+            output = await asyncio.to_thread(tool.invoke, {"query": "q"})
+
+        assert "arxiv rate limited" in output
+        assert "timed out" not in output
+        assert metrics.counter("federated_search.rate_limited") == limited + 1
+        assert metrics.counter("federated_search.timeouts") == timeouts
+
+    def test_max_results(self) -> None:
+        """Test the merged list is cut to max_results."""
+        tool = FederatedSearchTool(
+            sources=[_FakeSource("pubmed", _PUBMED_OUTPUT), _FakeSource("arxiv", _ARXIV_OUTPUT)],
+            max_results=1,
+        ).create_tool()
+        output = tool.invoke({"query": "q"})
+        assert output.startswith("1. ")
+        assert "2. " not in output
+
+
+class TestHTTPClientRegistry:
+    """Tests for the pooled HTTP client registry."""
+
+    async def test_one_client_per_origin(self) -> None:
+        """Test clients are shared per origin and bound to one event loop."""
+        registry = HTTPClientRegistry()
+        first = registry.client_for("https://eutils.ncbi.nlm.nih.gov/entrez/eutils")
+        assert registry.client_for("https://eutils.ncbi.nlm.nih.gov/other") is first
+        assert registry.client_for("https://export.arxiv.org/api/query") is not first
+
+        async def from_other_loop():
+            return registry.client_for("https://export.arxiv.org/api/query")
+
+        assert await asyncio.to_thread(asyncio.run, from_other_loop()) is None
+        await registry.aclose()
+
+    async def test_connections_are_reused(self, stub_server: StubHTTPServer) -> None:
+        """Test tools share kept-alive connections and reuse is reported."""
+        stub_server.handlers["/api/query"] = lambda _request: StubResponse(_atom_feed([]))
+        registry = HTTPClientRegistry()
+        metrics = get_metrics()
+        opened = metrics.counter("http.connections_opened")
+        requests = metrics.counter("http.requests")
+
+        for _ in range(3):
+            tool = ArxivSearchTool(
+                base_url=f"{stub_server.url}/api/query",
+                requests_per_second=0,
+                http_registry=registry,
+            )
+            await tool.create_tool().ainvoke({"query": "graphs"})
+
+        assert metrics.counter("http.requests") - requests == 3
+        assert metrics.counter("http.connections_opened") - opened == 1
+        assert metrics.snapshot()["gauges"]["http.connection_reuse_ratio"] > 0.6
+        await registry.aclose()
+
+
+class TestToolResultCache:
+    """Tests for the read-through search result cache."""
+
+    def test_equivalent_queries_share_a_key(self) -> None:
+        """Test keys ignore case and whitespace but not the tool or query."""
+        key = ToolResultCache.key_for("pubmed", {"query": "  Sleep   Memory"})
+        assert key == ToolResultCache.key_for("pubmed", {"query": "sleep memory"})
+        assert key != ToolResultCache.key_for("arxiv", {"query": "sleep memory"})
+        assert key != ToolResultCache.key_for("pubmed", {"query": "sleep"})
+
+    async def test_hits_survive_restart(self, tmp_path) -> None:
+        """Test results are served from disk by a new cache instance."""
+        source = _FakeSource("pubmed", _PUBMED_OUTPUT)
+        path = tmp_path / "cache.sqlite"
+        metrics = get_metrics()
+        hits = metrics.counter("tool_cache.pubmed.hits")
+
+        tool = CachedTool(source, ToolResultCache(path), ttl=60).create_tool()
+        assert await tool.ainvoke({"query": "Protein Folding"}) == _PUBMED_OUTPUT
+        assert await tool.ainvoke({"query": "protein folding"}) == _PUBMED_OUTPUT
+
+        restarted = CachedTool(source, ToolResultCache(path, memory_entries=1), ttl=60)
+        assert restarted.create_tool().invoke({"query": "protein folding"}) == _PUBMED_OUTPUT
+        assert source.calls == 1
+        assert metrics.counter("tool_cache.pubmed.hits") - hits == 2
+
+    async def test_stale_while_revalidate(self) -> None:
+        """Test an expired entry is served once more while it is refreshed."""
+        source = _FakeSource("arxiv", "Title: first")
+        cache = ToolResultCache()
+        tool = CachedTool(source, cache, ttl=0.05, stale_ttl=60).create_tool()
+        await tool.ainvoke({"query": "q"})
+        source._output = "Title: second"
+        await asyncio.sleep(0.06)
+
+        assert await tool.ainvoke({"query": "q"}) == "Title: first"
+        await asyncio.sleep(0.05)
+        assert source.calls == 2
+        assert await tool.ainvoke({"query": "q"}) == "Title: second"
+        assert source.calls == 2
+
+    async def test_async_calls_keep_sqlite_off_the_event_loop(self, tmp_path) -> None:
+        """Test lookups, stores and refreshes of async calls run in worker threads."""
+        loop_thread = threading.get_ident()
+        threads: list[int] = []
+
+        class RecordingCache(ToolResultCache):
+            def get(self, key: str) -> Any:
+                threads.append(threading.get_ident())
+                return super().get(key)
+
+            def set(self, *args: Any, **kwargs: Any) -> None:
+                threads.append(threading.get_ident())
+                super().set(*args, **kwargs)
+
+        source = _FakeSource("arxiv", "Title: first")
+        cache = RecordingCache(tmp_path / "cache.sqlite")
+        tool = CachedTool(source, cache, ttl=0.05, stale_ttl=60).create_tool()
+        await tool.ainvoke({"query": "q"})
+        await asyncio.sleep(0.06)
+        await tool.ainvoke({"query": "q"})
+        await asyncio.sleep(0.05)
+
+        assert source.calls == 2
+        assert len(threads) == 4
+        assert loop_thread not in threads
+
+    async def test_errors_are_not_cached(self) -> None:
+        """Test error outputs and exceptions reach the upstream again."""
+        source = _FakeSource("pubmed", "PubMed exception: HTTP 503")
+        tool = CachedTool(source, ToolResultCache(), ttl=60).create_tool()
+        await tool.ainvoke({"query": "q"})
+        await tool.ainvoke({"query": "q"})
+        assert source.calls == 2
+
+        failing = _FakeSource("arxiv", "", error=True)
+        tool = CachedTool(failing, ToolResultCache(), ttl=60).create_tool()
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await tool.ainvoke({"query": "q"})
+        assert failing.calls == 2
+
+
+class TestTokenBucketLimiter:
+    """Tests for the shared token-bucket rate limiter."""
+
+    async def test_callers_queue_in_order(self) -> None:
+        """Test concurrent callers are spaced by the rate after the burst."""
+        limiter = TokenBucketLimiter("queue", rate=20, burst=2)
+        start = time.monotonic()
+        waits = await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2:] == sorted(waits[2:])
+        assert waits[-1] == pytest.approx(0.15, abs=0.02)
+        assert time.monotonic() - start >= 0.14
+
+    async def test_deadline_rejects_without_reserving(self) -> None:
+        """Test a caller that can't wait long enough fails fast and frees its place."""
+        limiter = TokenBucketLimiter("deadline", rate=1)
+        await limiter.acquire()
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            await limiter.acquire(timeout=0.1)
+        assert exc_info.value.wait == pytest.approx(1, abs=0.05)
+        # The rejected call did not push the next slot further back
+        assert await limiter.acquire(timeout=1.5) == pytest.approx(1, abs=0.05)
+
+    async def test_buckets_are_shared_through_sqlite(self, tmp_path) -> None:
+        """Test limiters in different workers draw from one budget."""
+        path = tmp_path / "buckets.sqlite"
+        worker_a = TokenBucketLimiter("shared", rate=5, store=SQLiteBucketStore(path))
+        worker_b = TokenBucketLimiter("shared", rate=5, store=SQLiteBucketStore(path))
+
+        assert await worker_a.acquire() == 0.0
+        assert await worker_b.acquire() == pytest.approx(0.2, abs=0.05)
+
+    async def test_rate_limited_tool(self) -> None:
+        """Test tool calls wait for their upstream's slot."""
+        source = _FakeSource("duckduckgo", "Title: x")
+        tool = RateLimitedTool(source, TokenBucketLimiter("ddg-test", rate=10)).create_tool()
+        start = time.monotonic()
+        await asyncio.gather(*(tool.ainvoke({"query": f"q{i}"}) for i in range(3)))
+        assert time.monotonic() - start >= 0.19
+        assert source.calls == 3
+
+
+class TestCircuitBreaker:
+    """Tests for circuit breakers and fallback chains."""
+
+    def test_opens_on_error_rate(self) -> None:
+        """Test the breaker opens once enough recent calls fail."""
+        breaker = CircuitBreaker("t", window=4, min_calls=3, error_threshold=0.5)
+        breaker.record(True, 0.1)
+        breaker.record(False, 0.1)
+        assert breaker.state is CircuitState.CLOSED
+        breaker.record(False, 0.1)
+
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.is_available is False
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_opens_on_p95_latency(self) -> None:
+        """Test slow but successful calls open the breaker too."""
+        breaker = CircuitBreaker("t", min_calls=3, latency_threshold=1.0)
+        for latency in (0.2, 3.0, 4.0):
+            breaker.record(True, latency)
+        assert breaker.p95_latency() == 4.0
+        assert breaker.state is CircuitState.OPEN
+
+    def test_half_open_probe(self) -> None:
+        """Test one probe call is let through after the cool-down."""
+        breaker = CircuitBreaker("t", min_calls=1, open_seconds=0.05)
+        breaker.record(False, 0.1)
+        time.sleep(0.06)
+        assert breaker.state is CircuitState.HALF_OPEN
+
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record(True, 0.1)
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.error_rate() == 0.0
+
+    async def test_timeout_counts_as_failure(self) -> None:
+        """Test async calls are abandoned after the timeout."""
+        breaker = CircuitBreaker("slow", min_calls=1)
+        tool = CircuitBreakerTool(_FakeSource("slow", "x", delay=1.0), breaker, timeout=0.05)
+        with pytest.raises(TimeoutError, match="slow timed out"):
+            await tool.create_tool().ainvoke({"query": "q"})
+        assert breaker.state is CircuitState.OPEN
+
+    async def test_slow_limiter_leaves_breaker_closed(self, monkeypatch) -> None:
+        """Test calls queueing for a rate-limit slot aren't timed or failed by the breaker."""
+        settings = get_settings().model_copy(update={
+            "rate_limits": {"throttled": 5.0}, "circuit_breaker_timeout": 0.1,
+        })
+        breaker = CircuitBreaker("throttled", min_calls=2, latency_threshold=0.1)
+        monkeypatch.setattr(agent_module, "get_settings", lambda: settings)
+        monkeypatch.setattr(agent_module, "MemoryManager", lambda: None)
+        monkeypatch.setattr(agent_module, "get_circuit_breaker", lambda _name: breaker)
+        monkeypatch.setattr(
+            agent_module, "get_rate_limiter", lambda name, rate: TokenBucketLimiter(name, rate)
+        )
+        source = _FakeSource("throttled", "Title: x")
+        tool = agent_module.AgentFactory()._wrap(source).create_tool()
+
+        # Queued 0, 0.2, 0.4 and 0.6s: past the timeout if the breaker timed the wait
+        outputs = await asyncio.gather(*(tool.ainvoke({"query": f"q{i}"}) for i in range(4)))
+
+        assert outputs == ["Title: x"] * 4
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.error_rate() == 0.0
+        assert breaker.p95_latency() < 0.1
+
+    async def test_rate_limit_rejection_releases_probe(self) -> None:
+        """Test a probe call rejected by a rate limiter isn't recorded and frees the probe."""
+
+        class Throttled(_FakeSource):
+            def create_tool(self) -> StructuredTool:
+                async def search(query: str) -> str:  # noqa: ARG001 (names the tool argument)
+                    raise RateLimitExceeded("throttled", 5.0)
+
+                return StructuredTool.from_function(
+                    coroutine=search, name=self.name, description=self.description
+                )
+
+        breaker = CircuitBreaker("throttled", min_calls=1, open_seconds=0.05)
+        breaker.record(False, 0.1)
+        time.sleep(0.06)
+        tool = CircuitBreakerTool(Throttled("throttled", ""), breaker).create_tool()
+
+        with pytest.raises(RateLimitExceeded):
+            await tool.ainvoke({"query": "q"})
+        assert breaker.state is CircuitState.HALF_OPEN
+        breaker.before_call()
+
+    async def test_fallback_while_open(self) -> None:
+        """Test calls reroute to the fallback and skip the primary once open."""
+        primary = _FakeSource("tavily_search", "x", error=True)
+        fallback = _FakeSource("duckduckgo", "Title: from ddg")
+        breaker = CircuitBreaker("tavily_search", min_calls=2, open_seconds=60)
+        tool = FallbackTool(CircuitBreakerTool(primary, breaker), [fallback]).create_tool()
+
+        outputs = [await tool.ainvoke({"query": "q"}) for _ in range(3)]
+
+        assert outputs[-1] == "[tavily_search unavailable, results from duckduckgo]\n\nTitle: from ddg"
+        assert primary.calls == 2
+        assert fallback.calls == 3
+
+    def test_structured_fallback_output_is_noted(self) -> None:
+        """Test results of a fallback returning a list still carry the reroute note."""
+        results = [{"title": "From ddg", "link": "https://example.org", "snippet": "x"}]
+        tool = FallbackTool(
+            _FakeSource("tavily_search", "x", error=True), [_FakeSource("duckduckgo", results)]
+        ).create_tool()
+
+        note, listing = tool.invoke({"query": "q"}).split("\n\n", 1)
+
+        assert note == "[tavily_search unavailable, results from duckduckgo]"
+        assert json.loads(listing) == results
+
+    def test_all_failing(self) -> None:
+        """Test the errors of the whole chain are reported."""
+        tool = FallbackTool(
+            _FakeSource("tavily_search", "x", error=True),
+            [_FakeSource("duckduckgo", "DuckDuckGo exception: blocked")],
+        ).create_tool()
+        output = tool.invoke({"query": "q"})
+        assert output.startswith("Error:")
+        assert "service unavailable" in output and "blocked" in output
+
+
+class _StallingSource(BaseTool):
+    """Search source answering each call after the next delay of a script."""
+
+    def __init__(self, delays: list[float]):
+        self._delays = delays
+        self.calls = 0
+        self.cancelled = 0
+
+    @property
+    def name(self) -> str:
+        return "pubmed"
+
+    @property
+    def description(self) -> str:
+        return "Fake source"
+
+    def create_tool(self) -> StructuredTool:
+        async def search(query: str) -> str:  # noqa: ARG001 (names the tool argument)
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            delay = self._delays[self.calls]
+            self.calls += 1
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            return f"Title: answered after {delay}"
+
+        return StructuredTool.from_function(
+            coroutine=search, name=self.name, description=self.description
+        )
+
+
+class _PacedSource(_StallingSource):
+    """Stalling source whose client takes a slot of its host's limiter per call."""
+
+    def __init__(self, delays: list[float], limiter: TokenBucketLimiter):
+        super().__init__(delays)
+        self._limiter = limiter
+
+    @property
+    def rate_limiter(self) -> TokenBucketLimiter:
+        return self._limiter
+
+
+class TestHedgedTool:
+    """Tests for hedged tool calls."""
+
+    async def _warm_up(self, tool: StructuredTool, calls: int) -> None:
+        for _ in range(calls):
+            await tool.ainvoke({"query": "q"})
+
+    async def test_hedge_wins_over_stalled_call(self) -> None:
+        """Test a stalled call is duplicated after the p90 and cancelled."""
+        source = _StallingSource([0.01] * 5 + [2.0, 0.01])
+        hedged = HedgedTool(source, min_samples=5, budget=1.0, min_delay=0.02)
+        tool = hedged.create_tool()
+        await self._warm_up(tool, 5)
+
+        start = time.monotonic()
+        output = await tool.ainvoke({"query": "q"})
+
+        assert output == "Title: answered after 0.01"
+        assert time.monotonic() - start < 0.5
+        assert source.calls == 7
+        assert source.cancelled == 1
+        assert hedged.extra_call_ratio() == pytest.approx(1 / 6)
+
+    async def test_no_hedge_without_history(self) -> None:
+        """Test calls aren't hedged until the latency percentile is known."""
+        source = _StallingSource([0.1])
+        tool = HedgedTool(source, min_samples=5, budget=1.0, min_delay=0.01).create_tool()
+        await tool.ainvoke({"query": "q"})
+        assert source.calls == 1
+
+    async def test_hedge_needs_free_rate_limit_slot(self) -> None:
+        """Test hedges are skipped rather than queued when the limiter is busy."""
+        source = _StallingSource([0.0] * 3 + [0.2])
+        limiter = TokenBucketLimiter("hedge-test", rate=0.5, burst=4)
+        tool = HedgedTool(
+            source, limiter=limiter, min_samples=3, budget=1.0, min_delay=0.01
+        ).create_tool()
+        await self._warm_up(tool, 3)
+        skipped = get_metrics().counter("hedge.pubmed.skipped_rate_limited")
+
+        await tool.ainvoke({"query": "q"})
+
+        assert source.calls == 4
+        assert get_metrics().counter("hedge.pubmed.skipped_rate_limited") == skipped + 1
+
+    async def test_paced_tool_hedges_on_its_host_limiter(self) -> None:
+        """Test hedges of a self-pacing tool take one host slot each and don't queue."""
+        limiter = TokenBucketLimiter("hedge-host", rate=0.5, burst=5)
+        source = _PacedSource([0.0] * 3 + [2.0, 0.0], limiter)
+        tool = HedgedTool(
+            source, limiter=limiter, paced=True, min_samples=3, budget=1.0, min_delay=0.01
+        ).create_tool()
+        await self._warm_up(tool, 3)
+
+        start = time.monotonic()
+        output = await tool.ainvoke({"query": "q"})
+
+        assert output == "Title: answered after 0.0"
+        assert time.monotonic() - start < 0.5
+        assert source.calls == 5
+        # Three warm-up calls, the primary and the hedge used the five slots
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire(timeout=0)
+
+    async def test_hedge_budget(self) -> None:
+        """Test no more than the budgeted fraction of calls is hedged."""
+        source = _StallingSource([0.01] * 3 + [0.1] * 4)
+        tool = HedgedTool(source, min_samples=3, budget=0.0, min_delay=0.01).create_tool()
+        await self._warm_up(tool, 4)
+        assert source.calls == 4
+
+
+class TestSingleFlightTool:
+    """Tests for coalescing identical concurrent tool calls."""
+
+    async def test_concurrent_duplicates_share_one_call(self) -> None:
+        """Test equivalent concurrent calls reach the upstream once."""
+        source = _FakeSource("pubmed", "Title: x", delay=0.05)
+        tool = SingleFlightTool(source, SingleFlight()).create_tool()
+        saved = get_metrics().counter("singleflight.pubmed.calls_saved")
+
+        queries = ["sleep apnea", "Sleep  Apnea", "sleep apnea ", "insomnia"]
+        outputs = await asyncio.gather(*(tool.ainvoke({"query": q}) for q in queries))
+
+        assert outputs == ["Title: x"] * 4
+        assert source.calls == 2
+        assert get_metrics().counter("singleflight.pubmed.calls_saved") == saved + 2
+
+    async def test_sequential_calls_are_not_shared(self) -> None:
+        """Test a finished call isn't reused by later callers."""
+        source = _FakeSource("pubmed", "Title: x")
+        tool = SingleFlightTool(source, SingleFlight()).create_tool()
+        await tool.ainvoke({"query": "q"})
+        await tool.ainvoke({"query": "q"})
+        assert source.calls == 2
+
+    async def test_followers_get_leader_error(self) -> None:
+        """Test a failed upstream call fails all of its waiters."""
+        source = _FakeSource("pubmed", "x", delay=0.05, error=True)
+        tool = SingleFlightTool(source, SingleFlight()).create_tool()
+        results = await asyncio.gather(
+            *(tool.ainvoke({"query": "q"}) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert source.calls == 1
+
+    async def test_leader_cancelled(self) -> None:
+        """Test followers run the call themselves when the leader is cancelled."""
+        source = _FakeSource("pubmed", "Title: x", delay=0.05)
+        tool = SingleFlightTool(source, SingleFlight()).create_tool()
+        leader = asyncio.create_task(tool.ainvoke({"query": "q"}))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(tool.ainvoke({"query": "q"}))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await follower == "Title: x"
+        assert source.calls == 2
+
+    def test_coalesces_across_threads(self) -> None:
+        """Test sync calls from worker threads are coalesced too."""
+        source = _FakeSource("arxiv", "Title: x", delay=0.1)
+        tool = SingleFlightTool(source, SingleFlight()).create_tool()
+        with ThreadPoolExecutor(4) as pool:
+            outputs = list(pool.map(lambda _: tool.invoke({"query": "q"}), range(4)))
+        assert outputs == ["Title: x"] * 4
+        assert source.calls == 1
+
+
+class TestPapers:
+    """Tests for paper records and compact result rendering."""
+
+    def test_round_trip_through_text(self) -> None:
+        """Test the labelled text of a paper parses back to the same record."""
+        paper = Paper(
+            title="Sleep and memory",
+            authors=["Ana Smith", "Bo Li"],
+            year="2022",
+            venue="Nature",
+            pmid="111",
+            doi="10.1000/sleep",
+            abstract="Sleep helps memory.",
+            citations=12,
+        )
+        parsed = papers_from_output(paper.to_text(), "pubmed")
+        assert parsed is not None
+        assert parsed[0] == Paper(**{**paper.to_dict(), "sources": ["pubmed"]})
+        assert paper.key == "doi:10.1000/sleep"
+        assert Paper(title="x", pmid="1").key == "pmid:1"
+        assert Paper(title="Some Title").key == Paper(title="some title.").key
+
+    def test_web_results(self) -> None:
+        """Test Tavily and DuckDuckGo results become papers and errors don't."""
+        tavily = {"results": [{"title": "A page", "url": "https://a", "content": "Text."}]}
+        ddg = [{"title": "B page", "link": "https://b", "snippet": "Snippet."}]
+
+        assert papers_from_output(tavily, "tavily_search")[0].url == "https://a"
+        assert papers_from_output(ddg, "duckduckgo")[0].abstract == "Snippet."
+        assert papers_from_output("PubMed exception: timeout", "pubmed") is None
+        assert papers_from_output("free text answer", "duckduckgo") is None
+
+    def test_render_within_budget(self) -> None:
+        """Test the listing keeps to the token budget and counts what it drops."""
+        papers = [
+            Paper(title=f"Paper {i}", authors=["A", "B", "C", "D"], year="2020",
+                  pmid=str(i), abstract="Long abstract sentence. " * 40)
+            for i in range(10)
+        ]
+        renderer = PaperRenderer(max_tokens=150, abstract_tokens=30)
+        output = renderer.render(papers)
+
+        assert renderer.count_tokens(output) <= 150
+        assert output.startswith("[pmid:0] Paper 0 | A, B, C et al. | (2020)")
+        assert "more not shown)" in output
+
+    async def test_compact_results_keep_details(self) -> None:
+        """Test the agent gets a compact listing and full records stay retrievable."""
+        store = PaperStore(ToolResultCache())
+        abstract = "Sleep consolidates memory. " * 30
+        source = _FakeSource("pubmed", Paper(title="Sleep", pmid="7", abstract=abstract).to_text())
+        tool = CompactResultsTool(source, PaperRenderer(store=store)).create_tool()
+        saved = get_metrics().counter("compact_results.tokens_saved")
+
+        output = await tool.ainvoke({"query": "sleep"})
+
+        assert output.startswith("[pmid:7] Sleep")
+        assert len(output) < len(abstract)
+        assert get_metrics().counter("compact_results.tokens_saved") > saved
+        details = PaperDetailsTool(store).create_tool().invoke({"ids": "[pmid:7], pmid:8"})
+        assert abstract.strip() in details
+        assert "No stored details for: pmid:8" in details
+
+    async def test_structured_records_keep_authors_intact(self) -> None:
+        """Test records returned as data aren't split on commas like labelled text."""
+        paper = Paper(
+            title="Genome editing", pmid="9", authors=["Smith, Ana", "CRISPR Consortium, Boston"]
+        )
+        store = PaperStore(ToolResultCache())
+        source = _FakeSource("pubmed", papers_to_records([paper]))
+        tool = CompactResultsTool(source, PaperRenderer(store=store)).create_tool()
+
+        output = await tool.ainvoke({"query": "crispr"})
+
+        assert output.startswith("[pmid:9] Genome editing | Smith, Ana, CRISPR Consortium, Boston")
+        assert store.get("pmid:9") == paper
+        assert papers_from_output(paper.to_text(), "pubmed")[0].authors != paper.authors
+        assert papers_from_output(papers_to_records([]), "pubmed") == []
+
+    async def test_federated_search_renders_compactly(self) -> None:
+        """Test federated search uses the compact renderer when given one."""
+        tool = FederatedSearchTool(
+            sources=[
+                _FakeSource("pubmed", _PUBMED_OUTPUT),
+                _FakeSource("arxiv", "x", error=True),
+            ],
+            renderer=PaperRenderer(),
+        ).create_tool()
+        output = await tool.ainvoke({"query": "protein folding"})
+        assert output.startswith("[pmid:101] Deep learning for protein folding | (2021)")
+        assert output.endswith("Unavailable sources: arxiv failed: service unavailable")
+
+
+class TestFusion:
+    """Tests for cross-source deduplication and rank fusion."""
+
+    def test_matches_ids_and_near_identical_titles(self) -> None:
+        """Test copies are merged on ids, and on titles differing by a typo."""
+        index = PaperIndex()
+        assert not index.add(Paper(title="Sleep and memory", doi="10.1/ABC"), "pubmed", 1)
+        assert index.add(Paper(title="Unrelated title", doi="10.1/abc"), "scholar", 1)
+        assert not index.add(Paper(title="Transformers for protein structure"), "arxiv", 1)
+        assert index.add(
+            Paper(title="Transformer for protein structures", year="2021"), "scholar", 2
+        )
+        assert index.fuzzy_matches == 1
+        assert len(index.clusters) == 2
+
+    def test_conflicting_ids_are_not_merged(self) -> None:
+        """Test same-titled papers with different ids or years stay apart."""
+        index = PaperIndex()
+        index.add(Paper(title="Annual review of sleep", pmid="1"), "pubmed", 1)
+        index.add(Paper(title="Annual review of sleep", pmid="2"), "pubmed", 2)
+        index.add(Paper(title="Annual review of dreams", year="2010"), "scholar", 1)
+        index.add(Paper(title="Annual review of dream", year="2020"), "scholar", 2)
+        assert len(index.clusters) == 4
+
+    def test_paper_matching_two_clusters_joins_them(self) -> None:
+        """Test a paper found by id in one cluster and by title in another merges both."""
+        index = PaperIndex()
+        index.add(Paper(title="Preprint title", arxiv_id="2101.00001"), "arxiv", 1)
+        index.add(Paper(title="Sleep and memory", pmid="7"), "pubmed", 1)
+        assert len(index.clusters) == 2
+
+        assert index.add(Paper(title="Sleep and memory", arxiv_id="2101.00001v2"), "scholar", 3)
+
+        [cluster] = index.clusters
+        assert (cluster.paper.arxiv_id, cluster.paper.pmid) == ("2101.00001", "7")
+        assert cluster.ranks == {"arxiv": 1, "pubmed": 1, "scholar": 3}
+
+    def test_fusion_leaves_inputs_unchanged(self) -> None:
+        """Test merged records are copies, so cached or shared papers aren't modified."""
+        first = Paper(title="Shared paper", pmid="2", sources=["pubmed"])
+        second = Paper(title="Shared paper", doi="10.1/x", citations=4, sources=["scholar"])
+
+        [merged] = fuse_papers({"pubmed": [first], "scholar": [second]})
+
+        assert (merged.doi, merged.citations, merged.sources) == ("10.1/x", 4, ["pubmed", "scholar"])
+        assert first == Paper(title="Shared paper", pmid="2", sources=["pubmed"])
+        assert second.sources == ["scholar"]
+
+    def test_merge_and_reciprocal_rank_fusion(self) -> None:
+        """Test merged records keep the richest fields and rank by RRF."""
+        fused = fuse_papers({
+            "pubmed": [
+                Paper(title="Only in PubMed", pmid="1", sources=["pubmed"]),
+                Paper(title="Shared paper", pmid="2", abstract="Short.", sources=["pubmed"]),
+            ],
+            "arxiv": [
+                Paper(
+                    title="Shared paper.",
+                    arxiv_id="2101.00001v2",
+                    authors=["A. B"],
+                    abstract="A longer abstract.",
+                    sources=["arxiv"],
+                ),
+            ],
+            "google_scholar": [
+                Paper(title="Shared Paper", citations=12, sources=["google_scholar"]),
+            ],
+        })
+        assert [paper.title for paper in fused] == ["Shared paper", "Only in PubMed"]
+        shared = fused[0]
+        assert shared.sources == ["pubmed", "arxiv", "google_scholar"]
+        assert (shared.pmid, shared.arxiv_id, shared.citations) == ("2", "2101.00001v2", 12)
+        assert shared.abstract == "A longer abstract."
+        assert shared.authors == ["A. B"]
+
+
+_ABSTRACT = (
+    "Sleep is important for health. We recruited 200 adults in a cohort. "
+    "Hippocampal replay during slow-wave sleep predicted memory consolidation gains. "
+    "Results were robust across sites. Funding was provided by the NIH."
+)
+
+
+class TestExtractiveCompressor:
+    """Tests for query-focused extractive compression."""
+
+    def test_split_sentences(self) -> None:
+        """Test sentences split at terminal punctuation but not inside numbers."""
+        assert split_sentences("Dose was 2.5 mg.  It worked! (See text.) Done") == [
+            "Dose was 2.5 mg.", "It worked!", "(See text.)", "Done",
+        ]
+
+    def test_keeps_sentences_relevant_to_the_query(self) -> None:
+        """Test the best-matching sentence is kept over the leading ones."""
+        compressor = ExtractiveCompressor()
+        output = compressor.compress(_ABSTRACT, "memory consolidation replay", 25)
+        assert output == (
+            "... Hippocampal replay during slow-wave sleep predicted memory consolidation gains. ..."
+        )
+        assert compressor.compress(_ABSTRACT, "memory", 1000) == _ABSTRACT
+
+    def test_falls_back_to_leading_sentences(self) -> None:
+        """Test texts without a matching sentence keep their beginning."""
+        compressor = ExtractiveCompressor(count_tokens=len)
+        for query in ("", "zebrafish"):
+            output = compressor.compress(_ABSTRACT, query, 80)
+            assert output == "Sleep is important for health. We recruited 200 adults in a cohort. ..."
+        assert compressor.compress("word " * 50, "", 20) == "word word word..."
+
+    def test_tool_output_keeps_every_paper_within_the_cap(self) -> None:
+        """Test capped tool output cuts abstracts, not whole papers."""
+        papers = [
+            Paper(title=f"Paper {i}", pmid=str(i), year="2020", abstract=_ABSTRACT * 3)
+            for i in range(4)
+        ]
+        text = papers_to_text(papers, "slow-wave sleep replay", max_chars=1200)
+        assert len(text) <= 1200
+        parsed = parse_results(text)
+        assert [record["pmid"] for record in parsed] == ["0", "1", "2", "3"]
+        assert all("Hippocampal replay" in record["summary"] for record in parsed)
+        assert papers_to_text(papers[:1]) == papers[0].to_text()